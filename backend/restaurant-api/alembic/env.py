@@ -0,0 +1,50 @@
+from logging.config import fileConfig
+from alembic import context
+from app.core.database import engine, Base, SQLALCHEMY_DATABASE_URL
+from app.core.search import MENU_ITEMS_FTS_TABLE, CMS_CONTENT_FTS_TABLE
+import app.models  # noqa: F401  registers every table on Base.metadata
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate away from the search structures managed by app.core.search"""
+    if type_ == "table" and name.startswith((MENU_ITEMS_FTS_TABLE, CMS_CONTENT_FTS_TABLE)):
+        return False
+    if type_ == "index" and name in ("ix_menu_items_search", "ix_cms_content_search"):
+        return False
+    return True
+
+def run_migrations_offline():
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+        render_as_batch=SQLALCHEMY_DATABASE_URL.startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
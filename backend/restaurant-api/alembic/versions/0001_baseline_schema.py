@@ -0,0 +1,291 @@
+"""Baseline schema
+
+Tables as created by Base.metadata.create_all before migrations were
+introduced. Existing databases should be stamped at this revision
+(``alembic stamp 0001``) rather than upgraded through it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('cache_versions',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_table('cms_content',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.Column('content_type', sa.Enum('PAGE', 'GALLERY_IMAGE', 'HERO_BANNER', 'ANNOUNCEMENT', 'CONTACT_INFO', name='contenttype'), nullable=False),
+    sa.Column('status', sa.Enum('DRAFT', 'PUBLISHED', 'ARCHIVED', name='contentstatus'), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('excerpt', sa.Text(), nullable=True),
+    sa.Column('meta_data', sa.Text(), nullable=True),
+    sa.Column('featured_image', sa.String(), nullable=True),
+    sa.Column('gallery_images', sa.Text(), nullable=True),
+    sa.Column('meta_title', sa.String(), nullable=True),
+    sa.Column('meta_description', sa.Text(), nullable=True),
+    sa.Column('meta_keywords', sa.Text(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('show_in_menu', sa.Boolean(), nullable=True),
+    sa.Column('published_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('cms_content', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cms_content_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cms_content_slug'), ['slug'], unique=True)
+
+    op.create_table('restaurants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('address', sa.Text(), nullable=False),
+    sa.Column('city', sa.String(), nullable=False),
+    sa.Column('state', sa.String(), nullable=False),
+    sa.Column('zip_code', sa.String(), nullable=False),
+    sa.Column('country', sa.String(), nullable=True),
+    sa.Column('phone_number', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_open', sa.Boolean(), nullable=True),
+    sa.Column('opening_hours', sa.Text(), nullable=True),
+    sa.Column('toast_location_id', sa.String(), nullable=True),
+    sa.Column('clover_merchant_id', sa.String(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('website', sa.String(), nullable=True),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_restaurants_id'), ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('full_name', sa.String(), nullable=True),
+    sa.Column('phone_number', sa.String(), nullable=True),
+    sa.Column('role', sa.Enum('ADMIN', 'MANAGER', 'STAFF', name='userrole'), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_users_username'), ['username'], unique=True)
+
+    op.create_table('menus',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.Enum('ACTIVE', 'INACTIVE', 'DRAFT', name='menustatus'), nullable=True),
+    sa.Column('is_default', sa.Boolean(), nullable=True),
+    sa.Column('toast_menu_id', sa.String(), nullable=True),
+    sa.Column('clover_menu_id', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('menus', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_menus_id'), ['id'], unique=False)
+
+    op.create_table('order_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.Enum('HOUR', 'DAY', name='rollupgranularity'), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('order_type', sa.Enum('PICKUP', 'DINE_IN', 'DELIVERY', name='ordertype'), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'CONFIRMED', 'PREPARING', 'READY', 'COMPLETED', 'CANCELLED', name='orderstatus'), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('restaurant_id', 'granularity', 'bucket_start', 'order_type', 'status', name='uq_order_rollups_bucket')
+    )
+    with op.batch_alter_table('order_rollups', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_rollups_id'), ['id'], unique=False)
+
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('order_number', sa.String(), nullable=False),
+    sa.Column('order_type', sa.Enum('PICKUP', 'DINE_IN', 'DELIVERY', name='ordertype'), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'CONFIRMED', 'PREPARING', 'READY', 'COMPLETED', 'CANCELLED', name='orderstatus'), nullable=True),
+    sa.Column('customer_name', sa.String(), nullable=False),
+    sa.Column('customer_phone', sa.String(), nullable=False),
+    sa.Column('customer_email', sa.String(), nullable=True),
+    sa.Column('subtotal', sa.Float(), nullable=False),
+    sa.Column('tax_amount', sa.Float(), nullable=True),
+    sa.Column('tip_amount', sa.Float(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('payment_status', sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', 'REFUNDED', name='paymentstatus'), nullable=True),
+    sa.Column('payment_method', sa.String(), nullable=True),
+    sa.Column('toast_order_id', sa.String(), nullable=True),
+    sa.Column('clover_order_id', sa.String(), nullable=True),
+    sa.Column('pos_payment_id', sa.String(), nullable=True),
+    sa.Column('estimated_ready_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('actual_ready_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('special_instructions', sa.Text(), nullable=True),
+    sa.Column('otp_code', sa.String(), nullable=True),
+    sa.Column('otp_verified', sa.Boolean(), nullable=True),
+    sa.Column('otp_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_number')
+    )
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_orders_id'), ['id'], unique=False)
+
+    op.create_table('menu_categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('menu_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('toast_category_id', sa.String(), nullable=True),
+    sa.Column('clover_category_id', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['menu_id'], ['menus.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('menu_categories', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_menu_categories_id'), ['id'], unique=False)
+
+    op.create_table('notification_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('kind', sa.Enum('OTP', 'ORDER_CONFIRMATION', 'ORDER_READY', name='notificationkind'), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SENDING', 'SENT', 'DEAD', name='notificationstatus'), nullable=False),
+    sa.Column('phone_number', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_notification_outbox_id'), ['id'], unique=False)
+
+    op.create_table('menu_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('menu_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('calories', sa.Integer(), nullable=True),
+    sa.Column('ingredients', sa.Text(), nullable=True),
+    sa.Column('allergens', sa.Text(), nullable=True),
+    sa.Column('dietary_info', sa.Text(), nullable=True),
+    sa.Column('is_available', sa.Boolean(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('images', sa.Text(), nullable=True),
+    sa.Column('toast_item_id', sa.String(), nullable=True),
+    sa.Column('clover_item_id', sa.String(), nullable=True),
+    sa.Column('modifiers', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['menu_categories.id'], ),
+    sa.ForeignKeyConstraint(['menu_id'], ['menus.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_menu_items_id'), ['id'], unique=False)
+
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.Column('total_price', sa.Float(), nullable=False),
+    sa.Column('modifiers', sa.Text(), nullable=True),
+    sa.Column('special_instructions', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_id'), ['id'], unique=False)
+
+def downgrade():
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_items_id'))
+
+    op.drop_table('order_items')
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_menu_items_id'))
+
+    op.drop_table('menu_items')
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_notification_outbox_id'))
+
+    op.drop_table('notification_outbox')
+    with op.batch_alter_table('menu_categories', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_menu_categories_id'))
+
+    op.drop_table('menu_categories')
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_id'))
+
+    op.drop_table('orders')
+    with op.batch_alter_table('order_rollups', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_rollups_id'))
+
+    op.drop_table('order_rollups')
+    with op.batch_alter_table('menus', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_menus_id'))
+
+    op.drop_table('menus')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_restaurants_id'))
+
+    op.drop_table('restaurants')
+    with op.batch_alter_table('cms_content', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cms_content_slug'))
+        batch_op.drop_index(batch_op.f('ix_cms_content_id'))
+
+    op.drop_table('cms_content')
+    op.drop_table('cache_versions')
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""Hot path indexes
+
+Composite indexes matched to the filters and sort orders of the order,
+menu, CMS and outbox queries, plus the full-text search structures.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.search import create_search_indexes, drop_search_indexes
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    create_search_indexes(op.get_bind())
+
+    with op.batch_alter_table('cms_content', schema=None) as batch_op:
+        batch_op.create_index('ix_cms_content_type_order', ['content_type', 'display_order'], unique=False)
+        batch_op.create_index('ix_cms_content_type_status_published', ['content_type', 'status', 'published_at'], unique=False)
+
+    with op.batch_alter_table('menu_categories', schema=None) as batch_op:
+        batch_op.create_index('ix_menu_categories_menu_active_order', ['menu_id', 'is_active', 'display_order'], unique=False)
+
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.create_index('ix_menu_items_category', ['category_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_menu_items_clover_item_id'), ['clover_item_id'], unique=False)
+        batch_op.create_index('ix_menu_items_menu_available_order', ['menu_id', 'is_available', 'display_order'], unique=False)
+        batch_op.create_index(batch_op.f('ix_menu_items_toast_item_id'), ['toast_item_id'], unique=False)
+
+    with op.batch_alter_table('menus', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_menus_restaurant_id'), ['restaurant_id'], unique=False)
+
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_outbox_status_next_attempt', ['status', 'next_attempt_at'], unique=False)
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_order_id'), ['order_id'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_created', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_orders_restaurant_created', ['restaurant_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_orders_restaurant_status_created', ['restaurant_id', 'status', 'created_at'], unique=False)
+
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_restaurants_clover_merchant_id'), ['clover_merchant_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_restaurants_toast_location_id'), ['toast_location_id'], unique=False)
+
+def downgrade():
+    drop_search_indexes(op.get_bind())
+
+    with op.batch_alter_table('restaurants', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_restaurants_toast_location_id'))
+        batch_op.drop_index(batch_op.f('ix_restaurants_clover_merchant_id'))
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_restaurant_status_created')
+        batch_op.drop_index('ix_orders_restaurant_created')
+        batch_op.drop_index('ix_orders_created')
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
+
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_outbox_status_next_attempt')
+
+    with op.batch_alter_table('menus', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_menus_restaurant_id'))
+
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_menu_items_toast_item_id'))
+        batch_op.drop_index('ix_menu_items_menu_available_order')
+        batch_op.drop_index(batch_op.f('ix_menu_items_clover_item_id'))
+        batch_op.drop_index('ix_menu_items_category')
+
+    with op.batch_alter_table('menu_categories', schema=None) as batch_op:
+        batch_op.drop_index('ix_menu_categories_menu_active_order')
+
+    with op.batch_alter_table('cms_content', schema=None) as batch_op:
+        batch_op.drop_index('ix_cms_content_type_status_published')
+        batch_op.drop_index('ix_cms_content_type_order')
@@ -0,0 +1,39 @@
+"""Order events
+
+Append-only log behind the kitchen order event stream.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('order_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.Enum('CREATED', 'STATUS_CHANGED', name='ordereventtype'), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_events_created_at'), ['created_at'], unique=False)
+        batch_op.create_index('ix_order_events_restaurant_id', ['restaurant_id', 'id'], unique=False)
+
+def downgrade():
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_events_restaurant_id')
+        batch_op.drop_index(batch_op.f('ix_order_events_created_at'))
+
+    op.drop_table('order_events')
+    sa.Enum(name='ordereventtype').drop(op.get_bind(), checkfirst=True)
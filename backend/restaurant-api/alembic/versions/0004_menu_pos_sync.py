@@ -0,0 +1,36 @@
+"""Menu POS sync
+
+Content hashes for diff-based POS menu sync and a soft-delete marker for
+items removed from the POS catalog.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.search import create_search_indexes, drop_search_indexes
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('menu_categories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('pos_sync_hash', sa.String(), nullable=True))
+
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('pos_sync_hash', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('pos_deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+def downgrade():
+    # Dropping columns rebuilds menu_items on SQLite, which takes the search triggers with it
+    drop_search_indexes(op.get_bind())
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.drop_column('pos_deleted_at')
+        batch_op.drop_column('pos_sync_hash')
+
+    with op.batch_alter_table('menu_categories', schema=None) as batch_op:
+        batch_op.drop_column('pos_sync_hash')
+    create_search_indexes(op.get_bind())
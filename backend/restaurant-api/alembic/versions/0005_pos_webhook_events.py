@@ -0,0 +1,54 @@
+"""POS webhook events
+
+Inbox for Toast and Clover webhook deliveries, plus lookups of orders by
+their POS order id.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('pos_webhook_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('event_id', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PROCESSING', 'PROCESSED', 'FAILED', name='poswebhookstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('provider', 'event_id', name='uq_pos_webhook_events_provider_event')
+    )
+    with op.batch_alter_table('pos_webhook_events', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_pos_webhook_events_received_at'), ['received_at'], unique=False)
+        batch_op.create_index('ix_pos_webhook_events_status_next_attempt', ['status', 'next_attempt_at'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_clover_order_id', ['clover_order_id'], unique=False)
+        batch_op.create_index('ix_orders_toast_order_id', ['toast_order_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_toast_order_id')
+        batch_op.drop_index('ix_orders_clover_order_id')
+
+    with op.batch_alter_table('pos_webhook_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_pos_webhook_events_status_next_attempt')
+        batch_op.drop_index(batch_op.f('ix_pos_webhook_events_received_at'))
+
+    op.drop_table('pos_webhook_events')
+    sa.Enum(name='poswebhookstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,50 @@
+"""POS submissions
+
+Outbox of verified orders to submit to Toast and Clover, with retry state
+and the POS order id once accepted.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('pos_submissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('merchant_id', sa.String(), nullable=False),
+    sa.Column('idempotency_key', sa.String(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SUBMITTING', 'SUBMITTED', 'DEAD', name='possubmissionstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('pos_order_id', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('submitted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('idempotency_key'),
+    sa.UniqueConstraint('order_id', 'provider', name='uq_pos_submissions_order_provider')
+    )
+    with op.batch_alter_table('pos_submissions', schema=None) as batch_op:
+        batch_op.create_index('ix_pos_submissions_restaurant_status', ['restaurant_id', 'status'], unique=False)
+        batch_op.create_index('ix_pos_submissions_status_next_attempt', ['status', 'next_attempt_at'], unique=False)
+
+def downgrade():
+    with op.batch_alter_table('pos_submissions', schema=None) as batch_op:
+        batch_op.drop_index('ix_pos_submissions_status_next_attempt')
+        batch_op.drop_index('ix_pos_submissions_restaurant_status')
+
+    op.drop_table('pos_submissions')
+    sa.Enum(name='possubmissionstatus').drop(op.get_bind(), checkfirst=True)
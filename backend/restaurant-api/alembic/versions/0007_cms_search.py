@@ -0,0 +1,36 @@
+"""CMS content search
+
+Markup-free copy of the CMS body (search_text), backfilled from content,
+and the full-text search structures over title, excerpt, body and keywords.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.search import create_cms_search_indexes, drop_cms_search_indexes, strip_html
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('cms_content', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_text', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    cms_content = sa.table('cms_content', sa.column('id', sa.Integer), sa.column('content', sa.Text), sa.column('search_text', sa.Text))
+    rows = bind.execute(sa.select(cms_content.c.id, cms_content.c.content).where(cms_content.c.content.isnot(None))).fetchall()
+    for row in rows:
+        bind.execute(cms_content.update().where(cms_content.c.id == row.id).values(search_text=strip_html(row.content)))
+
+    create_cms_search_indexes(bind)
+
+def downgrade():
+    # Dropping a column rebuilds cms_content on SQLite, so the search triggers go first
+    drop_cms_search_indexes(op.get_bind())
+
+    with op.batch_alter_table('cms_content', schema=None) as batch_op:
+        batch_op.drop_column('search_text')
@@ -0,0 +1,34 @@
+"""Order rollup deltas
+
+Append-only rollup changes written with each order and folded into
+order_rollups by the background aggregator.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # The enum types already exist from the baseline schema
+    op.create_table('order_rollup_deltas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('order_created_at', sa.DateTime(), nullable=False),
+    sa.Column('order_type', postgresql.ENUM('PICKUP', 'DINE_IN', 'DELIVERY', name='ordertype', create_type=False), nullable=False),
+    sa.Column('status', postgresql.ENUM('PENDING', 'CONFIRMED', 'PREPARING', 'READY', 'COMPLETED', 'CANCELLED', name='orderstatus', create_type=False), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+def downgrade():
+    op.drop_table('order_rollup_deltas')
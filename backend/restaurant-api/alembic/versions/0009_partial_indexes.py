@@ -0,0 +1,28 @@
+"""Partial indexes
+
+Featured, available menu items, the only rows the featured-items query
+reads.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_menu_items_featured', ['menu_id', 'is_featured', 'is_available', 'display_order'], unique=False,
+            sqlite_where=sa.text('is_featured = 1 AND is_available = 1'),
+            postgresql_where=sa.text('is_featured AND is_available')
+        )
+
+def downgrade():
+    with op.batch_alter_table('menu_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_menu_items_featured')
@@ -0,0 +1,37 @@
+"""CMS display order not null
+
+display_order is the leading key of the CMS keyset pagination; a NULL
+there compares as unknown and ends the walk early, so it becomes NOT NULL
+with a default of 0.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.search import create_cms_search_indexes, drop_cms_search_indexes
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute(sa.text('UPDATE cms_content SET display_order = 0 WHERE display_order IS NULL'))
+
+    # Altering a column rebuilds cms_content on SQLite, which drops the search triggers with it
+    bind = op.get_bind()
+    drop_cms_search_indexes(bind)
+    with op.batch_alter_table('cms_content', schema=None) as batch_op:
+        batch_op.alter_column(
+            'display_order', existing_type=sa.Integer(), nullable=False, server_default=sa.text('0')
+        )
+    create_cms_search_indexes(bind)
+
+def downgrade():
+    bind = op.get_bind()
+    drop_cms_search_indexes(bind)
+    with op.batch_alter_table('cms_content', schema=None) as batch_op:
+        batch_op.alter_column('display_order', existing_type=sa.Integer(), nullable=True, server_default=None)
+    create_cms_search_indexes(bind)
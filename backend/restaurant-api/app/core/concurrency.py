@@ -0,0 +1,151 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+import anyio
+import anyio.to_thread
+import threading
+import time
+from .config import settings
+
+T = TypeVar("T")
+
+_blocking_limiter: Optional[anyio.CapacityLimiter] = None
+
+def get_blocking_limiter() -> anyio.CapacityLimiter:
+    """Get the limiter bounding the threads used for blocking work"""
+    global _blocking_limiter
+    if _blocking_limiter is None:
+        _blocking_limiter = anyio.CapacityLimiter(settings.blocking_pool_size)
+    return _blocking_limiter
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking work (sync SQLAlchemy sessions, HTTP clients) off the event loop"""
+    return await anyio.to_thread.run_sync(
+        partial(func, *args, **kwargs),
+        limiter=get_blocking_limiter()
+    )
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a BoundedExecutor already holds its maximum amount of work"""
+
+class BoundedExecutor:
+    """Thread pool that rejects new work once its queue is full instead of queueing without bound"""
+
+    def __init__(self, max_workers: int, max_queue: int, thread_name_prefix: str = ""):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturatedError(f"{self._pending} tasks already pending")
+            self._pending += 1
+
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release(completed=True))
+        return future
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Submit work and block the calling thread until it finishes"""
+        return self.submit(func, *args, **kwargs).result()
+
+    def _release(self, completed: bool = False):
+        with self._lock:
+            self._pending -= 1
+            if completed:
+                self.completed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+@dataclass
+class _Circuit:
+    failures: int = 0
+    opened_at: Optional[float] = None
+    trial_started_at: Optional[float] = None
+
+class CircuitBreaker:
+    """Per-key circuit breaker: after `failure_threshold` consecutive failures a key is
+    skipped for `reset_timeout` seconds, then a single trial call decides whether it closes.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits: Dict[Any, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: Any) -> bool:
+        """Whether a call for `key` may go ahead; in half-open state only one caller is let through"""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - circuit.opened_at < self.reset_timeout:
+                return False
+            # A trial that never reported back (e.g. a crashed worker) must not wedge the key
+            if circuit.trial_started_at is not None and now - circuit.trial_started_at < self.reset_timeout:
+                return False
+            circuit.trial_started_at = now
+            return True
+
+    def record_success(self, key: Any):
+        with self._lock:
+            self._circuits.pop(key, None)
+
+    def record_failure(self, key: Any):
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            circuit.failures += 1
+            circuit.trial_started_at = None
+            if circuit.failures >= self.failure_threshold:
+                circuit.opened_at = time.monotonic()
+
+    def retry_after(self, key: Any) -> float:
+        """Seconds until `key` may be tried again (0 when closed)"""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - circuit.opened_at))
+
+    def _state(self, circuit: _Circuit, now: float) -> str:
+        if circuit.opened_at is None:
+            return "closed"
+        return "open" if now - circuit.opened_at < self.reset_timeout else "half_open"
+
+    def states(self) -> Dict[Any, str]:
+        """State of every key that has failed since its last success"""
+        with self._lock:
+            now = time.monotonic()
+            return {key: self._state(circuit, now) for key, circuit in self._circuits.items()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                str(key): {"state": self._state(circuit, now), "consecutive_failures": circuit.failures}
+                for key, circuit in self._circuits.items()
+            }
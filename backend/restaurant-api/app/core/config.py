@@ -3,13 +3,59 @@ from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./restaurant.db"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: Optional[int] = None
+    db_application_name: str = "restaurant-api"
+
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456  # 256 MB
+    sqlite_cache_size: int = -64000  # negative means KiB, so ~64 MB
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_foreign_keys: bool = True
     secret_key: str = "your-secret-key-here-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 32
+    password_hash_retry_after: int = 1
+    principal_cache_size: int = 1024
+    principal_cache_ttl: float = 60.0
+    principal_version_ttl: float = 2.0  # bounds how long another worker may miss a role or active change
+    auth_trust_token_claims: bool = False  # trust signed role/active claims for the token lifetime
     
     twilio_account_sid: Optional[str] = None
     twilio_auth_token: Optional[str] = None
     twilio_phone_number: Optional[str] = None
+    sms_transport: str = "twilio"  # "twilio" or "fake"
+    sms_fake_latency_ms: int = 0
+    sms_fake_failure_rate: float = 0.0
+
+    notification_dispatcher_enabled: bool = True
+    notification_poll_interval: float = 1.0
+    notification_batch_size: int = 50
+    notification_concurrency: int = 10
+    notification_max_attempts: int = 5
+    notification_retry_base_seconds: float = 5.0
+    notification_lease_seconds: int = 60
+    notification_retention_hours: int = 72
+
+    order_events_enabled: bool = True
+    order_events_poll_interval: float = 0.5  # how quickly other workers' changes are picked up
+    order_events_batch_size: int = 500
+    order_events_queue_size: int = 1000
+    order_events_replay_limit: int = 1000
+    order_events_heartbeat_seconds: float = 15.0
+    order_events_retention_hours: int = 24
+
+    analytics_rollup_enabled: bool = True
+    analytics_rollup_interval: float = 2.0  # how often recorded order changes are folded into rollups
+    analytics_rollup_batch_size: int = 5000
     
     toast_client_id: Optional[str] = None
     toast_client_secret: Optional[str] = None
@@ -18,9 +64,61 @@ class Settings(BaseSettings):
     clover_client_id: Optional[str] = None
     clover_client_secret: Optional[str] = None
     clover_api_base_url: str = "https://api.clover.com"
+
+    pos_transport: str = "http"  # "http" or "mock"
+    pos_connect_timeout: float = 3.0
+    pos_read_timeout: float = 10.0
+    pos_pool_timeout: float = 5.0
+    pos_max_connections: int = 100
+    pos_max_keepalive_connections: int = 20
+    pos_max_concurrency_per_merchant: int = 4
+    pos_token_refresh_margin_seconds: float = 300.0
+    pos_token_default_ttl_seconds: float = 3600.0  # used when the provider does not say
+    pos_mock_latency_ms: int = 0
+    pos_mock_catalog_size: int = 25
+    pos_clover_page_size: int = 1000
+    menu_sync_batch_size: int = 500
+
+    toast_webhook_secret: Optional[str] = None
+    clover_webhook_auth_code: Optional[str] = None
+    pos_webhooks_enabled: bool = True
+    pos_webhook_poll_interval: float = 1.0
+    pos_webhook_coalesce_ms: int = 200  # wait this long after a delivery so a burst lands in one batch
+    pos_webhook_batch_size: int = 1000
+    pos_webhook_max_attempts: int = 5
+    pos_webhook_retry_base_seconds: float = 5.0
+    pos_webhook_lease_seconds: int = 60
+    pos_webhook_retention_hours: int = 72  # also the redelivery dedupe window
+
+    pos_submission_enabled: bool = True
+    pos_submission_poll_interval: float = 1.0
+    pos_submission_concurrency: int = 10
+    pos_submission_max_attempts: int = 8
+    pos_submission_retry_base_seconds: float = 2.0
+    pos_submission_max_backoff_seconds: float = 300.0
+    pos_submission_lease_seconds: int = 120  # must outlast a request's connect + read timeouts
+    pos_submission_lag_window_minutes: int = 60
+    pos_circuit_failure_threshold: int = 5
+    pos_circuit_reset_seconds: float = 30.0
     
     environment: str = "development"
 
+    blocking_pool_size: int = 40
+
+    readiness_db_timeout: float = 1.0
+    readiness_max_utilization: float = 0.9  # a pool or queue fuller than this reports not ready
+    readiness_max_queue_lag: float = 300.0  # seconds the oldest due outbox row may wait before readiness fails; 0 disables
+    shutdown_drain_delay: float = 5.0  # after SIGTERM, how long to keep serving while readiness reports 503
+    shutdown_drain_timeout: float = 10.0  # how long shutdown waits for in-flight requests
+
+    menu_snapshot_cache_size: int = 256
+    cms_cache_size: int = 256
+    bootstrap_cache_size: int = 64
+    bootstrap_featured_limit: int = 10
+    geo_index_enabled: bool = True
+    menu_search_backend: str = "auto"  # "auto", "sqlite", "postgres" or "memory"
+    cms_search_backend: str = "auto"  # same choices as menu_search_backend
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+from sqlalchemy import and_, or_, select, func, DateTime
+from sqlalchemy.orm import Query
+from fastapi import HTTPException, Response, status
+import base64
+import json
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+@dataclass
+class Cursor:
+    anchor_id: Any
+    values: List[Any] = field(default_factory=list)
+    backwards: bool = False
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Serialize a cursor into an opaque URL-safe token"""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in cursor.values]
+    raw = json.dumps({"id": cursor.anchor_id, "v": values, "b": cursor.backwards}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        return Cursor(anchor_id=data["id"], values=list(data["v"]), backwards=bool(data.get("b", False)))
+    except (ValueError, KeyError, TypeError) as e:
+        raise _invalid_cursor() from e
+
+def _cursor_for(item: Any, columns: Sequence[Any], backwards: bool = False) -> str:
+    return encode_cursor(Cursor(
+        anchor_id=item.id,
+        values=[getattr(item, column.key) for column in columns],
+        backwards=backwards
+    ))
+
+def _anchor_values(model: Any, columns: Sequence[Any], cursor: Cursor) -> List[Any]:
+    """Read the sort key of the anchor row straight from the table.
+
+    Comparing against the stored values (rather than values round-tripped
+    through Python) keeps the comparison exact for columns such as SQLite
+    timestamps; the values carried in the cursor are used only if the
+    anchor row has since been deleted.
+    """
+    if len(cursor.values) != len(columns):
+        raise _invalid_cursor()
+
+    anchors = []
+    for column, value in zip(columns, cursor.values):
+        if value is not None and isinstance(column.type, DateTime):
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError) as e:
+                raise _invalid_cursor() from e
+        stored = select(column).where(model.id == cursor.anchor_id).scalar_subquery()
+        anchors.append(func.coalesce(stored, value))
+    return anchors
+
+def keyset_paginate(query: Query,
+                    model: Any,
+                    columns: Sequence[Any],
+                    limit: int,
+                    cursor: Optional[str] = None,
+                    descending: bool = False,
+                    skip: int = 0) -> Page:
+    """Paginate a query on a unique sort key (the last column must be the primary key).
+
+    Without a cursor the first page is read with skip/limit for compatibility
+    with offset clients; cursors for the neighbouring pages are still returned.
+    """
+    decoded = decode_cursor(cursor) if cursor else None
+    backwards = decoded.backwards if decoded else False
+
+    # Walking backwards flips both the comparison and the scan order
+    scan_descending = descending != backwards
+    if decoded:
+        anchors = _anchor_values(model, columns, decoded)
+        clauses = []
+        for position, column in enumerate(columns):
+            equal_prefix = [columns[i] == anchors[i] for i in range(position)]
+            beyond = column < anchors[position] if scan_descending else column > anchors[position]
+            clauses.append(and_(*equal_prefix, beyond))
+        # The redundant bound on the leading column lets the planner seek the index instead of scanning it
+        leading = columns[0] <= anchors[0] if scan_descending else columns[0] >= anchors[0]
+        query = query.filter(leading, or_(*clauses))
+
+    query = query.order_by(*[column.desc() if scan_descending else column.asc() for column in columns])
+    if not decoded and skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    if backwards:
+        items.reverse()
+
+    page = Page(items=items)
+    if not items:
+        return page
+
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else bool(decoded) or skip > 0
+    if has_next:
+        page.next_cursor = _cursor_for(items[-1], columns)
+    if has_prev:
+        page.prev_cursor = _cursor_for(items[0], columns, backwards=True)
+    return page
+
+def set_page_headers(response: Response, page: Page):
+    """Expose a page's cursors as response headers, leaving the list body unchanged"""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.prev_cursor:
+        response.headers[PREV_CURSOR_HEADER] = page.prev_cursor
@@ -0,0 +1,36 @@
+from typing import Any, Generic, Mapping, Optional, TypeVar
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+import orjson
+
+T = TypeVar("T")
+
+def json_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+def json_loads(raw: Any) -> Any:
+    return orjson.loads(raw)
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; used for handlers without a response model"""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+class ResponseSerializer(Generic[T]):
+    """A response type compiled once into a TypeAdapter.
+
+    Renders ORM rows straight to JSON bytes in pydantic-core, skipping the
+    per-request model construction, jsonable_encoder pass and json.dumps
+    that a response_model costs on older FastAPI releases. Endpoints keep
+    their response_model for the OpenAPI schema and return `response()`.
+    """
+
+    def __init__(self, response_type: Any):
+        self.adapter: TypeAdapter[T] = TypeAdapter(response_type)
+
+    def dump(self, value: Any) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(value, from_attributes=True))
+
+    def response(self, value: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+        return Response(content=self.dump(value), status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,186 @@
+from typing import List, Optional
+from html.parser import HTMLParser
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+MENU_ITEMS_FTS_TABLE = "menu_items_fts"
+
+_SQLITE_MENU_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {MENU_ITEMS_FTS_TABLE} USING fts5(
+        name, description,
+        content='menu_items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS menu_items_fts_ai AFTER INSERT ON menu_items BEGIN
+        INSERT INTO {MENU_ITEMS_FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS menu_items_fts_ad AFTER DELETE ON menu_items BEGIN
+        INSERT INTO {MENU_ITEMS_FTS_TABLE}({MENU_ITEMS_FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS menu_items_fts_au AFTER UPDATE OF name, description ON menu_items BEGIN
+        INSERT INTO {MENU_ITEMS_FTS_TABLE}({MENU_ITEMS_FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {MENU_ITEMS_FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+# The query expression must match the indexed one for the planner to use the GIN index
+_POSTGRES_MENU_SEARCH_EXPRESSION = "to_tsvector('simple'::regconfig, coalesce({prefix}name, '') || ' ' || coalesce({prefix}description, ''))"
+POSTGRES_MENU_SEARCH_VECTOR = _POSTGRES_MENU_SEARCH_EXPRESSION.format(prefix="menu_items.")
+
+_POSTGRES_MENU_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_menu_items_search ON menu_items USING GIN ("
+    + _POSTGRES_MENU_SEARCH_EXPRESSION.format(prefix="") + ")",
+]
+
+CMS_CONTENT_FTS_TABLE = "cms_content_fts"
+
+_SQLITE_CMS_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {CMS_CONTENT_FTS_TABLE} USING fts5(
+        title, excerpt, search_text, meta_keywords,
+        content='cms_content', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS cms_content_fts_ai AFTER INSERT ON cms_content BEGIN
+        INSERT INTO {CMS_CONTENT_FTS_TABLE}(rowid, title, excerpt, search_text, meta_keywords)
+        VALUES (new.id, new.title, new.excerpt, new.search_text, new.meta_keywords);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cms_content_fts_ad AFTER DELETE ON cms_content BEGIN
+        INSERT INTO {CMS_CONTENT_FTS_TABLE}({CMS_CONTENT_FTS_TABLE}, rowid, title, excerpt, search_text, meta_keywords)
+        VALUES ('delete', old.id, old.title, old.excerpt, old.search_text, old.meta_keywords);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cms_content_fts_au AFTER UPDATE OF title, excerpt, search_text, meta_keywords ON cms_content BEGIN
+        INSERT INTO {CMS_CONTENT_FTS_TABLE}({CMS_CONTENT_FTS_TABLE}, rowid, title, excerpt, search_text, meta_keywords)
+        VALUES ('delete', old.id, old.title, old.excerpt, old.search_text, old.meta_keywords);
+        INSERT INTO {CMS_CONTENT_FTS_TABLE}(rowid, title, excerpt, search_text, meta_keywords)
+        VALUES (new.id, new.title, new.excerpt, new.search_text, new.meta_keywords);
+    END""",
+]
+
+# Title outranks keywords and excerpt, which outrank the page body
+_POSTGRES_CMS_SEARCH_EXPRESSION = (
+    "(setweight(to_tsvector('simple'::regconfig, coalesce({prefix}title, '')), 'A')"
+    " || setweight(to_tsvector('simple'::regconfig, coalesce({prefix}meta_keywords, '') || ' ' || coalesce({prefix}excerpt, '')), 'B')"
+    " || setweight(to_tsvector('simple'::regconfig, coalesce({prefix}search_text, '')), 'D'))"
+)
+POSTGRES_CMS_SEARCH_VECTOR = _POSTGRES_CMS_SEARCH_EXPRESSION.format(prefix="cms_content.")
+
+_POSTGRES_CMS_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_cms_content_search ON cms_content USING GIN ("
+    + _POSTGRES_CMS_SEARCH_EXPRESSION.format(prefix="") + ")",
+]
+
+# Highlight markers from the private use area, swapped for tags after the snippet is escaped
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_END = "\ue001"
+
+class _TextExtractor(HTMLParser):
+    _SKIPPED_TAGS = {"script", "style", "template"}
+    _INLINE_TAGS = {"a", "abbr", "b", "code", "em", "i", "mark", "s", "small", "span", "strong", "sub", "sup", "u"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag not in self._INLINE_TAGS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIPPED_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag not in self._INLINE_TAGS:
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+def strip_html(value: Optional[str]) -> Optional[str]:
+    """Reduce HTML to its visible text, with whitespace collapsed"""
+    if not value:
+        return value
+    if "<" not in value and "&" not in value:
+        return " ".join(value.split())
+    parser = _TextExtractor()
+    parser.feed(value)
+    parser.close()
+    return " ".join("".join(parser.parts).split())
+
+def tokenize(value: str) -> List[str]:
+    """Split free text into lowercase word tokens"""
+    return [token.lower() for token in _TOKEN_PATTERN.findall(value or "")]
+
+def fts5_available(connection: Connection) -> bool:
+    try:
+        rows = connection.exec_driver_sql("PRAGMA compile_options").fetchall()
+    except Exception:
+        return False
+    return any(row[0] == "ENABLE_FTS5" for row in rows)
+
+def has_table(connection: Connection, name: str) -> bool:
+    if connection.dialect.name == "sqlite":
+        row = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": name}
+        ).first()
+        return row is not None
+    return connection.dialect.has_table(connection, name)
+
+def _create_fts_structures(connection: Connection, fts_table: str, sqlite_ddl: List[str], postgres_ddl: List[str]):
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        if not fts5_available(connection):
+            logger.warning("SQLite was built without FTS5; search falls back to the in-memory index")
+            return
+        created = not has_table(connection, fts_table)
+        for statement in sqlite_ddl:
+            connection.exec_driver_sql(statement)
+        if created:
+            connection.exec_driver_sql(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        for statement in postgres_ddl:
+            connection.exec_driver_sql(statement)
+
+def create_search_indexes(connection: Connection):
+    """Create full-text search structures on an open connection, if the database supports them"""
+    _create_fts_structures(connection, MENU_ITEMS_FTS_TABLE, _SQLITE_MENU_SEARCH_DDL, _POSTGRES_MENU_SEARCH_DDL)
+
+def drop_search_indexes(connection: Connection):
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for trigger in ("menu_items_fts_ai", "menu_items_fts_ad", "menu_items_fts_au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {MENU_ITEMS_FTS_TABLE}")
+    elif dialect == "postgresql":
+        connection.exec_driver_sql("DROP INDEX IF EXISTS ix_menu_items_search")
+
+def create_cms_search_indexes(connection: Connection):
+    """Create the CMS content search structures, once cms_content.search_text exists"""
+    columns = {column["name"] for column in inspect(connection).get_columns("cms_content")}
+    if "search_text" not in columns:
+        logger.warning("cms_content.search_text is missing; run `alembic upgrade head` to enable CMS search")
+        return
+    _create_fts_structures(connection, CMS_CONTENT_FTS_TABLE, _SQLITE_CMS_SEARCH_DDL, _POSTGRES_CMS_SEARCH_DDL)
+
+def drop_cms_search_indexes(connection: Connection):
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for trigger in ("cms_content_fts_ai", "cms_content_fts_ad", "cms_content_fts_au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {CMS_CONTENT_FTS_TABLE}")
+    elif dialect == "postgresql":
+        connection.exec_driver_sql("DROP INDEX IF EXISTS ix_cms_content_search")
+
+def setup_search_indexes(engine: Engine):
+    """Create full-text search structures for the current database, if supported"""
+    with engine.begin() as connection:
+        create_search_indexes(connection)
+        create_cms_search_indexes(connection)
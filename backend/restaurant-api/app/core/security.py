@@ -1,26 +1,70 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from .concurrency import BoundedExecutor, ExecutorSaturatedError
 from .config import settings
+import threading
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Hashes made with a different cost factor are flagged for rehash by verify_and_update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.password_hash_rounds)
+
+_password_executor: Optional[BoundedExecutor] = None
+_password_executor_lock = threading.Lock()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if the stored one uses outdated settings"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def get_password_executor() -> BoundedExecutor:
+    """Get the dedicated pool that bcrypt work runs on"""
+    global _password_executor
+    with _password_executor_lock:
+        if _password_executor is None:
+            _password_executor = BoundedExecutor(
+                settings.password_hash_workers,
+                settings.password_hash_max_queue,
+                thread_name_prefix="password-hash"
+            )
+        return _password_executor
+
+def shutdown_password_executor():
+    """Stop the password pool; the next get_password_executor builds a fresh one"""
+    global _password_executor
+    with _password_executor_lock:
+        executor, _password_executor = _password_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+def run_password_task(func: Callable[..., T], *args: Any) -> T:
+    """Run password hashing on the bounded pool, rejecting with 429 when it is saturated"""
+    try:
+        return get_password_executor().run(func, *args)
+    except ExecutorSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent authentication requests, please retry",
+            headers={"Retry-After": str(settings.password_hash_retry_after)},
+        )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
+    issued_at = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = issued_at + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+        expire = issued_at + timedelta(minutes=settings.access_token_expire_minutes)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": issued_at})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
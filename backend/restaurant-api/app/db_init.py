@@ -9,6 +9,7 @@ from app.models.restaurant import Restaurant
 from app.models.menu import Menu, MenuCategory, MenuItem
 from app.models.cms import CMSContent, ContentType, ContentStatus
 from app.core.security import get_password_hash
+from app.core.search import setup_search_indexes
 import json
 
 def create_sample_data():
@@ -39,7 +40,7 @@ def create_sample_data():
             longitude=-122.4194,
             description="A family-owned restaurant serving fresh, delicious meals made with locally sourced ingredients.",
             website="https://deliciousbites.com",
-            opening_hours=json.dumps({
+            opening_hours={
                 "monday": {"open": "11:00", "close": "22:00"},
                 "tuesday": {"open": "11:00", "close": "22:00"},
                 "wednesday": {"open": "11:00", "close": "22:00"},
@@ -47,7 +48,7 @@ def create_sample_data():
                 "friday": {"open": "11:00", "close": "23:00"},
                 "saturday": {"open": "10:00", "close": "23:00"},
                 "sunday": {"open": "10:00", "close": "21:00"}
-            })
+            }
         )
         db.add(restaurant)
         db.flush()
@@ -91,8 +92,8 @@ def create_sample_data():
                 description="Fresh squid rings served with marinara sauce",
                 price=12.99,
                 calories=320,
-                ingredients=json.dumps(["squid", "flour", "marinara sauce", "lemon"]),
-                allergens=json.dumps(["gluten", "seafood"]),
+                ingredients=["squid", "flour", "marinara sauce", "lemon"],
+                allergens=["gluten", "seafood"],
                 is_featured=True,
                 display_order=1
             ),
@@ -103,8 +104,8 @@ def create_sample_data():
                 description="Spicy chicken wings with blue cheese dip",
                 price=14.99,
                 calories=450,
-                ingredients=json.dumps(["chicken wings", "buffalo sauce", "blue cheese", "celery"]),
-                allergens=json.dumps(["dairy"]),
+                ingredients=["chicken wings", "buffalo sauce", "blue cheese", "celery"],
+                allergens=["dairy"],
                 display_order=2
             ),
             MenuItem(
@@ -114,9 +115,9 @@ def create_sample_data():
                 description="Atlantic salmon with lemon herb butter and seasonal vegetables",
                 price=24.99,
                 calories=520,
-                ingredients=json.dumps(["salmon", "lemon", "herbs", "butter", "vegetables"]),
-                allergens=json.dumps(["fish", "dairy"]),
-                dietary_info=json.dumps(["gluten-free"]),
+                ingredients=["salmon", "lemon", "herbs", "butter", "vegetables"],
+                allergens=["fish", "dairy"],
+                dietary_info=["gluten-free"],
                 is_featured=True,
                 display_order=1
             ),
@@ -127,8 +128,8 @@ def create_sample_data():
                 description="12oz prime ribeye with garlic mashed potatoes",
                 price=32.99,
                 calories=780,
-                ingredients=json.dumps(["ribeye steak", "potatoes", "garlic", "butter"]),
-                allergens=json.dumps(["dairy"]),
+                ingredients=["ribeye steak", "potatoes", "garlic", "butter"],
+                allergens=["dairy"],
                 display_order=2
             ),
             MenuItem(
@@ -138,8 +139,8 @@ def create_sample_data():
                 description="Warm chocolate cake with molten center and vanilla ice cream",
                 price=8.99,
                 calories=420,
-                ingredients=json.dumps(["chocolate", "flour", "eggs", "vanilla ice cream"]),
-                allergens=json.dumps(["gluten", "dairy", "eggs"]),
+                ingredients=["chocolate", "flour", "eggs", "vanilla ice cream"],
+                allergens=["gluten", "dairy", "eggs"],
                 display_order=1
             )
         ]
@@ -208,5 +209,6 @@ def create_sample_data():
 
 if __name__ == "__main__":
     Base.metadata.create_all(bind=engine)
+    setup_search_indexes(engine)
     
     create_sample_data()
@@ -1,48 +1,91 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import engine, Base
+from app.core.config import settings
+from app.core.database import engine
+from app.core.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
+from app.core.responses import ORJSONResponse
+from app.core.security import shutdown_password_executor
+from app.services.analytics_service import order_rollup_aggregator
+from app.services.health_service import InFlightMiddleware, readiness_service
+from app.services.notification_service import notification_dispatcher
+from app.services.order_event_service import order_event_relay
+from app.services.pos_client import pos_client
+from app.services.pos_webhook_service import pos_webhook_consumer
+from app.services.pos_submission_service import pos_submission_dispatcher
 from app.routers import (
     auth_router,
     restaurants_router,
     menus_router,
     orders_router,
     cms_router,
-    pos_router
+    pos_router,
+    system_router
 )
 
-Base.metadata.create_all(bind=engine)
+# The schema is not touched at startup: run `alembic upgrade head` (or
+# `python -m app.db_init` for a fresh development database) before serving.
 
-app = FastAPI(
-    title="Restaurant Platform API",
-    description="A comprehensive restaurant ordering platform API with POS integration",
-    version="1.0.0"
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    readiness_service.start()
+    # Under uvicorn the listener is closed before shutdown runs, so SIGTERM starts the drain while still serving
+    readiness_service.drain_on_signal(settings.shutdown_drain_delay)
+    if settings.notification_dispatcher_enabled:
+        notification_dispatcher.start()
+    if settings.order_events_enabled:
+        order_event_relay.start()
+    if settings.analytics_rollup_enabled:
+        order_rollup_aggregator.start()
+    if settings.pos_webhooks_enabled:
+        pos_webhook_consumer.start()
+    if settings.pos_submission_enabled:
+        pos_submission_dispatcher.start()
+    yield
+    readiness_service.restore_signals()
+    # Servers that run shutdown with the listener still open get their drain here
+    await readiness_service.drain(settings.shutdown_drain_timeout)
+    await pos_submission_dispatcher.stop()
+    await pos_webhook_consumer.stop()
+    await order_rollup_aggregator.stop()
+    await order_event_relay.stop()
+    await notification_dispatcher.stop()
+    await pos_client.aclose()
+    shutdown_password_executor()
+    readiness_service.close()
+    engine.dispose()
 
-# Disable CORS. Do not remove this for full-stack development.
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allows all origins
-    allow_credentials=True,
-    allow_methods=["*"],  # Allows all methods
-    allow_headers=["*"],  # Allows all headers
-)
+def create_app() -> FastAPI:
+    """Build the API application; serve with `uvicorn app.main:app` or `uvicorn --factory app.main:create_app`"""
+    app = FastAPI(
+        title="Restaurant Platform API",
+        description="A comprehensive restaurant ordering platform API with POS integration",
+        version="1.0.0",
+        lifespan=lifespan,
+        # Kept as a default so FastAPI releases that encode response models in
+        # pydantic-core still take that path; orjson renders everything else
+        default_response_class=Default(ORJSONResponse)
+    )
 
-app.include_router(auth_router)
-app.include_router(restaurants_router)
-app.include_router(menus_router)
-app.include_router(orders_router)
-app.include_router(cms_router)
-app.include_router(pos_router)
+    # Disable CORS. Do not remove this for full-stack development.
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Allows all origins
+        allow_credentials=True,
+        allow_methods=["*"],  # Allows all methods
+        allow_headers=["*"],  # Allows all headers
+        expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER],
+    )
+    app.add_middleware(InFlightMiddleware, readiness_service=readiness_service)
 
-@app.get("/")
-async def root():
-    return {
-        "message": "Restaurant Platform API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "health": "/healthz"
-    }
+    app.include_router(system_router)
+    app.include_router(auth_router)
+    app.include_router(restaurants_router)
+    app.include_router(menus_router)
+    app.include_router(orders_router)
+    app.include_router(cms_router)
+    app.include_router(pos_router)
+    return app
 
-@app.get("/healthz")
-async def healthz():
-    return {"status": "ok"}
+app = create_app()
@@ -3,6 +3,12 @@ from .restaurant import Restaurant
 from .menu import Menu, MenuItem, MenuCategory
 from .order import Order, OrderItem
 from .cms import CMSContent
+from .notification import NotificationOutbox
+from .cache_version import CacheVersion
+from .analytics import OrderRollup, OrderRollupDelta
+from .order_event import OrderEvent
+from .pos_webhook import POSWebhookEvent
+from .pos_submission import POSSubmission
 
 __all__ = [
     "User",
@@ -12,5 +18,12 @@ __all__ = [
     "MenuCategory",
     "Order",
     "OrderItem",
-    "CMSContent"
+    "CMSContent",
+    "NotificationOutbox",
+    "CacheVersion",
+    "OrderRollup",
+    "OrderRollupDelta",
+    "OrderEvent",
+    "POSWebhookEvent",
+    "POSSubmission"
 ]
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Enum, UniqueConstraint
+from app.core.database import Base
+from app.models.order import OrderType, OrderStatus
+import enum
+
+class RollupGranularity(enum.Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+class OrderRollup(Base):
+    __tablename__ = "order_rollups"
+    __table_args__ = (
+        UniqueConstraint("restaurant_id", "granularity", "bucket_start", "order_type", "status", name="uq_order_rollups_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
+    
+    granularity = Column(Enum(RollupGranularity), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)  # UTC, truncated to the granularity
+    order_type = Column(Enum(OrderType), nullable=False)
+    status = Column(Enum(OrderStatus), nullable=False)
+    
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class OrderRollupDelta(Base):
+    """Rollup changes recorded with the order and folded into order_rollups in the background.
+
+    Appending a row never contends, where incrementing the current bucket
+    inside every order transaction would serialize a restaurant's orders
+    on one hot row.
+    """
+    __tablename__ = "order_rollup_deltas"
+
+    id = Column(Integer, primary_key=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
+    order_created_at = Column(DateTime, nullable=False)  # UTC
+    order_type = Column(Enum(OrderType), nullable=False)
+    status = Column(Enum(OrderStatus), nullable=False)
+    order_count = Column(Integer, nullable=False)
+    revenue = Column(Float, nullable=False)
@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, Index
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.core.search import strip_html
+from app.models.types import JSONText
 import enum
 
 class ContentType(enum.Enum):
@@ -17,6 +20,10 @@ class ContentStatus(enum.Enum):
 
 class CMSContent(Base):
     __tablename__ = "cms_content"
+    __table_args__ = (
+        Index("ix_cms_content_type_status_published", "content_type", "status", "published_at"),
+        Index("ix_cms_content_type_order", "content_type", "display_order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -26,17 +33,18 @@ class CMSContent(Base):
     status = Column(Enum(ContentStatus), default=ContentStatus.DRAFT)
     
     content = Column(Text, nullable=True)  # Main content (HTML/Markdown)
+    search_text = Column(Text, nullable=True)  # content without markup, for full-text search
     excerpt = Column(Text, nullable=True)  # Short description
-    meta_data = Column(Text, nullable=True)  # JSON string for additional data
+    meta_data = Column(JSONText, nullable=True)  # additional data
     
     featured_image = Column(String, nullable=True)
-    gallery_images = Column(Text, nullable=True)  # JSON array of image URLs
+    gallery_images = Column(JSONText, nullable=True)  # list of image URLs
     
     meta_title = Column(String, nullable=True)
     meta_description = Column(Text, nullable=True)
     meta_keywords = Column(Text, nullable=True)
     
-    display_order = Column(Integer, default=0)
+    display_order = Column(Integer, nullable=False, default=0, server_default="0")  # leading keyset pagination key
     is_featured = Column(Boolean, default=False)
     show_in_menu = Column(Boolean, default=True)
     
@@ -45,3 +53,8 @@ class CMSContent(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    @validates("content")
+    def _sync_search_text(self, key, value):
+        self.search_text = strip_html(value)
+        return value
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.types import JSONText
 import enum
 
 class MenuStatus(enum.Enum):
@@ -13,7 +14,7 @@ class Menu(Base):
     __tablename__ = "menus"
 
     id = Column(Integer, primary_key=True, index=True)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     status = Column(Enum(MenuStatus), default=MenuStatus.ACTIVE)
@@ -31,6 +32,9 @@ class Menu(Base):
 
 class MenuCategory(Base):
     __tablename__ = "menu_categories"
+    __table_args__ = (
+        Index("ix_menu_categories_menu_active_order", "menu_id", "is_active", "display_order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
@@ -42,6 +46,7 @@ class MenuCategory(Base):
     
     toast_category_id = Column(String, nullable=True)
     clover_category_id = Column(String, nullable=True)
+    pos_sync_hash = Column(String, nullable=True)  # content hash of the last applied POS payload
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -51,6 +56,18 @@ class MenuCategory(Base):
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        Index("ix_menu_items_menu_available_order", "menu_id", "is_available", "display_order"),
+        Index("ix_menu_items_category", "category_id"),
+        # Featured items are a handful per menu, so the partial index holds only those. The flags
+        # are repeated in the key because SQLite's planner ranks indexes by matched equalities, not
+        # by partial index size, and would otherwise pick ix_menu_items_menu_available_order
+        Index(
+            "ix_menu_items_featured", "menu_id", "is_featured", "is_available", "display_order",
+            sqlite_where=text("is_featured = 1 AND is_available = 1"),
+            postgresql_where=text("is_featured AND is_available")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
@@ -61,21 +78,23 @@ class MenuItem(Base):
     price = Column(Float, nullable=False)
     
     calories = Column(Integer, nullable=True)
-    ingredients = Column(Text, nullable=True)  # JSON string
-    allergens = Column(Text, nullable=True)    # JSON string
-    dietary_info = Column(Text, nullable=True) # JSON string (vegan, gluten-free, etc.)
+    ingredients = Column(JSONText, nullable=True)
+    allergens = Column(JSONText, nullable=True)
+    dietary_info = Column(JSONText, nullable=True)  # vegan, gluten-free, etc.
     
     is_available = Column(Boolean, default=True)
     is_featured = Column(Boolean, default=False)
     display_order = Column(Integer, default=0)
     
     image_url = Column(String, nullable=True)
-    images = Column(Text, nullable=True)  # JSON array of image URLs
+    images = Column(JSONText, nullable=True)  # list of image URLs
     
-    toast_item_id = Column(String, nullable=True)
-    clover_item_id = Column(String, nullable=True)
+    toast_item_id = Column(String, nullable=True, index=True)
+    clover_item_id = Column(String, nullable=True, index=True)
+    pos_sync_hash = Column(String, nullable=True)  # content hash of the last applied POS payload
+    pos_deleted_at = Column(DateTime(timezone=True), nullable=True)  # removed from the POS catalog
     
-    modifiers = Column(Text, nullable=True)  # JSON string for modifiers
+    modifiers = Column(JSONText, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
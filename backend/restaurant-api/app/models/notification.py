@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class NotificationKind(enum.Enum):
+    OTP = "otp"
+    ORDER_CONFIRMATION = "order_confirmation"
+    ORDER_READY = "order_ready"
+
+class NotificationStatus(enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
+    
+    kind = Column(Enum(NotificationKind), nullable=False)
+    status = Column(Enum(NotificationStatus), default=NotificationStatus.PENDING, nullable=False)
+    phone_number = Column(String, nullable=False)
+    payload = Column(Text, nullable=True)  # JSON string with message parameters
+    
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.types import JSONText
 import enum
 
 class OrderType(enum.Enum):
@@ -26,6 +27,13 @@ class PaymentStatus(enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_restaurant_status_created", "restaurant_id", "status", "created_at"),
+        Index("ix_orders_restaurant_created", "restaurant_id", "created_at", "id"),
+        Index("ix_orders_created", "created_at", "id"),
+        Index("ix_orders_toast_order_id", "toast_order_id"),
+        Index("ix_orders_clover_order_id", "clover_order_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
@@ -69,14 +77,14 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     menu_item_id = Column(Integer, ForeignKey("menu_items.id"), nullable=False)
     
     quantity = Column(Integer, nullable=False, default=1)
     unit_price = Column(Float, nullable=False)
     total_price = Column(Float, nullable=False)
     
-    modifiers = Column(Text, nullable=True)  # JSON string for selected modifiers
+    modifiers = Column(JSONText, nullable=True)  # selected modifiers
     special_instructions = Column(Text, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
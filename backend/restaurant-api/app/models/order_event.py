@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, Text, ForeignKey, Enum, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class OrderEventType(enum.Enum):
+    CREATED = "order.created"
+    STATUS_CHANGED = "order.status_changed"
+
+class OrderEvent(Base):
+    """Append-only log of order changes; the id doubles as the SSE event id"""
+    __tablename__ = "order_events"
+    __table_args__ = (
+        Index("ix_order_events_restaurant_id", "restaurant_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    event_type = Column(Enum(OrderEventType), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON string with the order summary
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
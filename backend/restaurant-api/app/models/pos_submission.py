@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class POSSubmissionStatus(enum.Enum):
+    PENDING = "pending"
+    SUBMITTING = "submitting"
+    SUBMITTED = "submitted"
+    DEAD = "dead"
+
+class POSSubmission(Base):
+    """Outbox of verified orders waiting to be sent to a restaurant's POS"""
+    __tablename__ = "pos_submissions"
+    __table_args__ = (
+        UniqueConstraint("order_id", "provider", name="uq_pos_submissions_order_provider"),
+        Index("ix_pos_submissions_status_next_attempt", "status", "next_attempt_at"),
+        Index("ix_pos_submissions_restaurant_status", "restaurant_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
+    provider = Column(String, nullable=False)
+    merchant_id = Column(String, nullable=False)  # Toast location guid or Clover merchant id
+    idempotency_key = Column(String, unique=True, nullable=False)
+
+    status = Column(Enum(POSSubmissionStatus), default=POSSubmissionStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    pos_order_id = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    submitted_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class POSWebhookStatus(enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+class POSWebhookEvent(Base):
+    """Inbox of POS webhook deliveries; the unique event id makes redeliveries no-ops"""
+    __tablename__ = "pos_webhook_events"
+    __table_args__ = (
+        UniqueConstraint("provider", "event_id", name="uq_pos_webhook_events_provider_event"),
+        Index("ix_pos_webhook_events_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    provider = Column(String, nullable=False)
+    event_id = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON string with the normalized event
+
+    status = Column(Enum(POSWebhookStatus), default=POSWebhookStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.types import JSONText
 
 class Restaurant(Base):
     __tablename__ = "restaurants"
@@ -21,10 +22,10 @@ class Restaurant(Base):
     
     is_active = Column(Boolean, default=True)
     is_open = Column(Boolean, default=True)
-    opening_hours = Column(Text, nullable=True)  # JSON string
+    opening_hours = Column(JSONText, nullable=True)
     
-    toast_location_id = Column(String, nullable=True)
-    clover_merchant_id = Column(String, nullable=True)
+    toast_location_id = Column(String, nullable=True, index=True)
+    clover_merchant_id = Column(String, nullable=True, index=True)
     
     description = Column(Text, nullable=True)
     website = Column(String, nullable=True)
@@ -0,0 +1,29 @@
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+from app.core.responses import json_dumps, json_loads
+
+class JSONText(TypeDecorator):
+    """JSON stored in a Text column, decoded once when the row is loaded.
+
+    Values that do not parse load as None, which is what the response
+    schemas used to fall back to when they decoded these columns per request.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return json_dumps(value).decode()
+
+    def process_result_value(self, value, dialect):
+        if not value:
+            return None
+        try:
+            return json_loads(value)
+        except ValueError:
+            return None
+
+    def coerce_compared_value(self, op, value):
+        # LIKE patterns and equality checks compare against the raw JSON text
+        return self.impl.coerce_compared_value(op, value)
@@ -4,6 +4,7 @@ from .menus import router as menus_router
 from .orders import router as orders_router
 from .cms import router as cms_router
 from .pos import router as pos_router
+from .system import router as system_router
 
 __all__ = [
     "auth_router",
@@ -11,5 +12,6 @@ __all__ = [
     "menus_router",
     "orders_router",
     "cms_router",
-    "pos_router"
+    "pos_router",
+    "system_router"
 ]
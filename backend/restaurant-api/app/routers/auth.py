@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.schemas.user import UserCreate, UserLogin, Token, UserResponse
-from app.services.auth_service import AuthService
-from app.utils.dependencies import get_current_user
+from app.core.concurrency import run_blocking
+from app.schemas.user import UserCreate, UserLogin, UserUpdate, Token, UserResponse
+from app.services.auth_service import AuthService, Principal
+from app.utils.dependencies import get_current_user, get_current_admin_user
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -12,7 +13,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     auth_service = AuthService(db)
     try:
-        user = auth_service.create_user(user_data)
+        user = await run_blocking(auth_service.create_user, user_data)
         return user
     except HTTPException:
         raise
@@ -27,7 +28,7 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
     """Authenticate user and return access token"""
     auth_service = AuthService(db)
     
-    user = auth_service.authenticate_user(login_data)
+    user = await run_blocking(auth_service.authenticate_user, login_data)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,14 +36,37 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    token_data = auth_service.create_access_token_for_user(user)
+    token_data = await run_blocking(auth_service.create_access_token_for_user, user)
     return token_data
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get current user information"""
-    return current_user
+    auth_service = AuthService(db)
+    user = await run_blocking(auth_service.get_user_by_id, current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
 
-from app.utils.dependencies import get_current_user
+@router.put("/users/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: int,
+    user_data: UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Update a user's profile (managers and admins); roles and the active flag are admin only"""
+    auth_service = AuthService(db)
+    user = await run_blocking(auth_service.update_user, user_id, user_data, current_user)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
@@ -1,33 +1,58 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.schemas.cms import CMSContentCreate, CMSContentResponse, CMSContentUpdate, CMSContentSummary
+from app.core.concurrency import run_blocking
+from app.core.cache import etag_matches, http_date, not_modified_since
+from app.core.pagination import set_page_headers
+from app.models.cms import ContentType, ContentStatus
+from app.core.responses import ResponseSerializer
+from app.schemas.cms import CMSContentCreate, CMSContentResponse, CMSContentUpdate, CMSContentSummary, CMSSearchResult
 from app.services.cms_service import CMSService
 from app.utils.dependencies import get_current_admin_user, get_optional_current_user
-from app.models.user import User
+from app.services.auth_service import Principal
 
 router = APIRouter(prefix="/cms", tags=["content management"])
 
+search_result_list = ResponseSerializer(List[CMSSearchResult])
+
+def view_response(request: Request, view: Dict[str, Any]) -> Response:
+    """Serve a cached CMS view, answering conditional requests with 304"""
+    headers = {
+        "ETag": view["etag"],
+        "Last-Modified": http_date(view["last_modified"]),
+        "Cache-Control": "no-cache"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, view["etag"]) or (
+        if_none_match is None and not_modified_since(request.headers.get("if-modified-since"), view["last_modified"])
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=view["body"], media_type="application/json", headers=headers)
+
 @router.post("/", response_model=CMSContentResponse)
 async def create_content(
     content_data: CMSContentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Create new content (Admin only)"""
     cms_service = CMSService(db)
-    return cms_service.create_content(content_data)
+    return await run_blocking(cms_service.create_content, content_data)
 
 @router.get("/", response_model=List[CMSContentSummary])
 async def get_contents(
-    content_type: Optional[str] = Query(None),
-    status: Optional[str] = Query(None),
+    response: Response,
+    content_type: Optional[ContentType] = Query(None),
+    status: Optional[ContentStatus] = Query(None),
     published_only: bool = Query(False),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    current_user: Optional[Principal] = Depends(get_optional_current_user)
 ):
     """Get all content"""
     cms_service = CMSService(db)
@@ -35,7 +60,9 @@ async def get_contents(
     if current_user is None or current_user.role.value not in ['admin', 'manager']:
         published_only = True
     
-    contents = cms_service.get_contents(content_type, status, published_only, skip, limit)
+    page = await run_blocking(cms_service.get_contents_page, content_type, status, published_only, cursor, skip, limit)
+    set_page_headers(response, page)
+    contents = page.items
     
     return [
         CMSContentSummary(
@@ -51,77 +78,85 @@ async def get_contents(
     ]
 
 @router.get("/pages", response_model=List[CMSContentResponse])
-async def get_published_pages(db: Session = Depends(get_db)):
+async def get_published_pages(request: Request, db: Session = Depends(get_db)):
     """Get all published pages for navigation"""
     cms_service = CMSService(db)
-    return cms_service.get_published_pages()
+    view = await run_blocking(cms_service.get_public_view, ContentType.PAGE, cms_service.get_published_pages)
+    return view_response(request, view)
 
 @router.get("/gallery", response_model=List[CMSContentResponse])
 async def get_gallery_images(
+    request: Request,
     limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """Get gallery images"""
     cms_service = CMSService(db)
-    return cms_service.get_gallery_images(limit)
+    view = await run_blocking(cms_service.get_public_view, ContentType.GALLERY_IMAGE, cms_service.get_gallery_images, limit)
+    return view_response(request, view)
 
 @router.get("/banners", response_model=List[CMSContentResponse])
 async def get_hero_banners(
+    request: Request,
     active_only: bool = Query(True),
     db: Session = Depends(get_db)
 ):
     """Get hero banners"""
     cms_service = CMSService(db)
-    return cms_service.get_hero_banners(active_only)
+    view = await run_blocking(cms_service.get_public_view, ContentType.HERO_BANNER, cms_service.get_hero_banners, active_only)
+    return view_response(request, view)
 
 @router.get("/announcements", response_model=List[CMSContentResponse])
 async def get_announcements(
+    request: Request,
     active_only: bool = Query(True),
     db: Session = Depends(get_db)
 ):
     """Get announcements"""
     cms_service = CMSService(db)
-    return cms_service.get_announcements(active_only)
+    view = await run_blocking(cms_service.get_public_view, ContentType.ANNOUNCEMENT, cms_service.get_announcements, active_only)
+    return view_response(request, view)
 
 @router.get("/contact", response_model=CMSContentResponse)
-async def get_contact_info(db: Session = Depends(get_db)):
+async def get_contact_info(request: Request, db: Session = Depends(get_db)):
     """Get contact information"""
     cms_service = CMSService(db)
-    contact_info = cms_service.get_contact_info()
-    if not contact_info:
+    view = await run_blocking(cms_service.get_public_view, ContentType.CONTACT_INFO, cms_service.get_contact_info)
+    if view["body"] is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Contact information not found"
         )
-    return contact_info
+    return view_response(request, view)
 
-@router.get("/search", response_model=List[CMSContentResponse])
+@router.get("/search", response_model=List[CMSSearchResult])
 async def search_content(
     q: str = Query(..., description="Search term"),
-    content_type: Optional[str] = Query(None),
+    content_type: Optional[ContentType] = Query(None),
     limit: int = Query(20, ge=1, le=50),
     db: Session = Depends(get_db)
 ):
-    """Search content"""
+    """Search published content, best match first, with highlighted snippets"""
     cms_service = CMSService(db)
-    return cms_service.search_content(q, content_type, limit)
+    results = await run_blocking(cms_service.search_content, q, content_type, limit)
+    return search_result_list.response([{**content.__dict__, "snippet": snippet} for content, snippet in results])
 
 @router.get("/{content_id}", response_model=CMSContentResponse)
 async def get_content(
     content_id: int,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    current_user: Optional[Principal] = Depends(get_optional_current_user)
 ):
     """Get content by ID"""
     cms_service = CMSService(db)
-    content = cms_service.get_content(content_id)
+    content = await run_blocking(cms_service.get_content, content_id)
     if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Content not found"
         )
     
-    if content.status != "published" and (current_user is None or current_user.role.value not in ['admin', 'manager']):
+    if not cms_service.is_public(content, datetime.utcnow()) and (current_user is None or current_user.role.value not in ['admin', 'manager']):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Content not found"
@@ -133,18 +168,18 @@ async def get_content(
 async def get_content_by_slug(
     slug: str,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    current_user: Optional[Principal] = Depends(get_optional_current_user)
 ):
     """Get content by slug"""
     cms_service = CMSService(db)
-    content = cms_service.get_content_by_slug(slug)
+    content = await run_blocking(cms_service.get_content_by_slug, slug)
     if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Content not found"
         )
     
-    if content.status != "published" and (current_user is None or current_user.role.value not in ['admin', 'manager']):
+    if not cms_service.is_public(content, datetime.utcnow()) and (current_user is None or current_user.role.value not in ['admin', 'manager']):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Content not found"
@@ -157,11 +192,11 @@ async def update_content(
     content_id: int,
     content_data: CMSContentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Update content (Admin only)"""
     cms_service = CMSService(db)
-    content = cms_service.update_content(content_id, content_data)
+    content = await run_blocking(cms_service.update_content, content_id, content_data)
     if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -173,11 +208,11 @@ async def update_content(
 async def delete_content(
     content_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Delete content (Admin only)"""
     cms_service = CMSService(db)
-    success = cms_service.delete_content(content_id)
+    success = await run_blocking(cms_service.delete_content, content_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
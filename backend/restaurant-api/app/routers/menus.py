@@ -1,7 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.concurrency import run_blocking
+from app.core.cache import etag_matches
+from app.core.responses import ResponseSerializer
 from app.schemas.menu import (
     MenuCreate, MenuResponse, MenuUpdate, MenuWithItems,
     MenuItemCreate, MenuItemResponse, MenuItemUpdate,
@@ -9,19 +12,22 @@ from app.schemas.menu import (
 )
 from app.services.menu_service import MenuService
 from app.utils.dependencies import get_current_admin_user, get_optional_current_user
-from app.models.user import User
+from app.services.auth_service import Principal
 
 router = APIRouter(prefix="/menus", tags=["menus"])
 
+menu_item_list = ResponseSerializer(List[MenuItemResponse])
+menu_category_list = ResponseSerializer(List[MenuCategoryResponse])
+
 @router.post("/", response_model=MenuResponse)
 async def create_menu(
     menu_data: MenuCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Create a new menu (Admin only)"""
     menu_service = MenuService(db)
-    return menu_service.create_menu(menu_data)
+    return await run_blocking(menu_service.create_menu, menu_data)
 
 @router.get("/restaurant/{restaurant_id}", response_model=List[MenuResponse])
 async def get_restaurant_menus(
@@ -31,41 +37,39 @@ async def get_restaurant_menus(
 ):
     """Get all menus for a restaurant"""
     menu_service = MenuService(db)
-    return menu_service.get_restaurant_menus(restaurant_id, active_only)
+    return await run_blocking(menu_service.get_restaurant_menus, restaurant_id, active_only)
 
 @router.get("/{menu_id}", response_model=MenuWithItems)
 async def get_menu_with_items(
     menu_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Get menu with all items and categories"""
     menu_service = MenuService(db)
-    menu = menu_service.get_menu(menu_id)
-    if not menu:
+    snapshot = await run_blocking(menu_service.get_menu_snapshot, menu_id)
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Menu not found"
         )
     
-    categories = menu_service.get_menu_categories(menu_id)
-    items = menu_service.get_menu_items(menu_id)
-    
-    menu_dict = menu.__dict__.copy()
-    menu_dict['categories'] = categories
-    menu_dict['items'] = items
+    headers = {"ETag": snapshot["etag"], "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), snapshot["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    return menu_dict
+    return Response(content=snapshot["body"], media_type="application/json", headers=headers)
 
 @router.put("/{menu_id}", response_model=MenuResponse)
 async def update_menu(
     menu_id: int,
     menu_data: MenuUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Update menu (Admin only)"""
     menu_service = MenuService(db)
-    menu = menu_service.update_menu(menu_id, menu_data)
+    menu = await run_blocking(menu_service.update_menu, menu_id, menu_data)
     if not menu:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -77,11 +81,11 @@ async def update_menu(
 async def delete_menu(
     menu_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Delete menu (Admin only)"""
     menu_service = MenuService(db)
-    success = menu_service.delete_menu(menu_id)
+    success = await run_blocking(menu_service.delete_menu, menu_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,11 +97,11 @@ async def delete_menu(
 async def create_menu_category(
     category_data: MenuCategoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Create a new menu category (Admin only)"""
     menu_service = MenuService(db)
-    return menu_service.create_menu_category(category_data)
+    return await run_blocking(menu_service.create_menu_category, category_data)
 
 @router.get("/{menu_id}/categories", response_model=List[MenuCategoryResponse])
 async def get_menu_categories(
@@ -107,18 +111,19 @@ async def get_menu_categories(
 ):
     """Get all categories for a menu"""
     menu_service = MenuService(db)
-    return menu_service.get_menu_categories(menu_id, active_only)
+    categories = await run_blocking(menu_service.get_menu_categories, menu_id, active_only)
+    return menu_category_list.response(categories)
 
 @router.put("/categories/{category_id}", response_model=MenuCategoryResponse)
 async def update_menu_category(
     category_id: int,
     category_data: MenuCategoryUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Update menu category (Admin only)"""
     menu_service = MenuService(db)
-    category = menu_service.update_menu_category(category_id, category_data)
+    category = await run_blocking(menu_service.update_menu_category, category_id, category_data)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -130,11 +135,11 @@ async def update_menu_category(
 async def delete_menu_category(
     category_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Delete menu category (Admin only)"""
     menu_service = MenuService(db)
-    success = menu_service.delete_menu_category(category_id)
+    success = await run_blocking(menu_service.delete_menu_category, category_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -146,11 +151,11 @@ async def delete_menu_category(
 async def create_menu_item(
     item_data: MenuItemCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Create a new menu item (Admin only)"""
     menu_service = MenuService(db)
-    return menu_service.create_menu_item(item_data)
+    return await run_blocking(menu_service.create_menu_item, item_data)
 
 @router.get("/{menu_id}/items", response_model=List[MenuItemResponse])
 async def get_menu_items(
@@ -161,7 +166,8 @@ async def get_menu_items(
 ):
     """Get all items for a menu"""
     menu_service = MenuService(db)
-    return menu_service.get_menu_items(menu_id, category_id, available_only)
+    items = await run_blocking(menu_service.get_menu_items, menu_id, category_id, available_only)
+    return menu_item_list.response(items)
 
 @router.get("/items/{item_id}", response_model=MenuItemResponse)
 async def get_menu_item(
@@ -170,7 +176,7 @@ async def get_menu_item(
 ):
     """Get menu item by ID"""
     menu_service = MenuService(db)
-    item = menu_service.get_menu_item(item_id)
+    item = await run_blocking(menu_service.get_menu_item, item_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -183,11 +189,11 @@ async def update_menu_item(
     item_id: int,
     item_data: MenuItemUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Update menu item (Admin only)"""
     menu_service = MenuService(db)
-    item = menu_service.update_menu_item(item_id, item_data)
+    item = await run_blocking(menu_service.update_menu_item, item_id, item_data)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -199,11 +205,11 @@ async def update_menu_item(
 async def delete_menu_item(
     item_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Delete menu item (Admin only)"""
     menu_service = MenuService(db)
-    success = menu_service.delete_menu_item(item_id)
+    success = await run_blocking(menu_service.delete_menu_item, item_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -219,15 +225,19 @@ async def get_featured_items(
 ):
     """Get featured menu items for a restaurant"""
     menu_service = MenuService(db)
-    return menu_service.get_featured_items(restaurant_id, limit)
+    items = await run_blocking(menu_service.get_featured_items, restaurant_id, limit)
+    return menu_item_list.response(items)
 
 @router.get("/restaurant/{restaurant_id}/search", response_model=List[MenuItemResponse])
 async def search_menu_items(
     restaurant_id: int,
     q: str = Query(..., description="Search term"),
     limit: int = Query(20, ge=1, le=50),
+    exclude_allergens: Optional[List[str]] = Query(None, description="Skip items containing any of these allergens"),
+    dietary: Optional[List[str]] = Query(None, description="Only items tagged with all of these dietary labels"),
     db: Session = Depends(get_db)
 ):
     """Search menu items by name or description"""
     menu_service = MenuService(db)
-    return menu_service.search_menu_items(restaurant_id, q, limit)
+    items = await run_blocking(menu_service.search_menu_items, restaurant_id, q, limit, exclude_allergens, dietary)
+    return menu_item_list.response(items)
@@ -1,18 +1,31 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.concurrency import run_blocking
+from app.core.pagination import set_page_headers
+from app.core.responses import ResponseSerializer
 from app.schemas.order import (
     OrderCreate, OrderResponse, OrderUpdate, OrderSummary,
     OTPRequest, OTPVerification
 )
 from app.services.order_service import OrderService
-from app.utils.dependencies import get_current_admin_user, get_optional_current_user
-from app.models.user import User
+from app.services.export_service import OrderExportService, ExportFormat
+from app.services.notification_service import NotificationService, notification_dispatcher
+from app.services.order_event_service import order_event_hub, order_event_relay
+from app.utils.dependencies import get_current_admin_user, get_optional_current_user, get_event_stream_admin_user
+from app.services.auth_service import Principal
+from app.models.analytics import RollupGranularity
+from app.models.order import OrderStatus
+import asyncio
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
+order_summaries = ResponseSerializer(List[OrderSummary])
+
 @router.post("/", response_model=OrderResponse)
 async def create_order(
     order_data: OrderCreate,
@@ -20,7 +33,7 @@ async def create_order(
 ):
     """Create a new order"""
     order_service = OrderService(db)
-    return order_service.create_order(order_data)
+    return await run_blocking(order_service.create_order, order_data)
 
 @router.post("/{order_id}/verify-otp")
 async def verify_order_otp(
@@ -31,7 +44,7 @@ async def verify_order_otp(
     """Verify OTP for order"""
     order_service = OrderService(db)
     
-    order = order_service.get_order(order_id)
+    order = await run_blocking(order_service.get_order, order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -44,7 +57,7 @@ async def verify_order_otp(
             detail="Phone number does not match order"
         )
     
-    success = order_service.verify_otp(order_id, otp_data.otp_code)
+    success = await run_blocking(order_service.verify_otp, order_id, otp_data.otp_code)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,39 +69,95 @@ async def verify_order_otp(
 @router.get("/", response_model=List[OrderSummary])
 async def get_orders(
     restaurant_id: Optional[int] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get all orders (Admin only)"""
     order_service = OrderService(db)
-    orders = order_service.get_orders(restaurant_id, skip, limit)
-    
+    page = await run_blocking(order_service.get_orders_page, restaurant_id, cursor, skip, limit)
+    response = order_summaries.response(page.items)
+    set_page_headers(response, page)
+    return response
+
+@router.get("/export")
+async def export_orders(
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv (one row per line item) or ndjson (one order per line)"),
+    restaurant_id: Optional[int] = Query(None),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    gzip: bool = Query(False, description="Compress the export with gzip"),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Stream orders with their line items for accounting (Admin only)"""
+    export_service = OrderExportService()
+    body = export_service.stream(
+        format,
+        compress=gzip,
+        restaurant_id=restaurant_id,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    filename = f"orders.{format.value}"
+    if gzip:
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/notifications/dead")
+async def get_dead_notifications(
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Customer SMS that ran out of retries (Admin only); message payloads are not returned"""
+    notifications = await run_blocking(NotificationService(db).get_dead_letters, limit)
     return [
-        OrderSummary(
-            id=order.id,
-            order_number=order.order_number,
-            customer_name=order.customer_name,
-            customer_phone=order.customer_phone,
-            order_type=order.order_type,
-            status=order.status,
-            total_amount=order.total_amount,
-            payment_status=order.payment_status,
-            estimated_ready_time=order.estimated_ready_time,
-            created_at=order.created_at
-        ) for order in orders
+        {
+            "id": notification.id,
+            "order_id": notification.order_id,
+            "kind": notification.kind.value,
+            "phone_number": notification.phone_number,
+            "attempts": notification.attempts,
+            "last_error": notification.last_error,
+            "created_at": notification.created_at
+        }
+        for notification in notifications
     ]
 
+@router.post("/notifications/{notification_id}/requeue")
+async def requeue_notification(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Retry a dead-lettered customer SMS (Admin only)"""
+    if not await run_blocking(NotificationService(db).requeue, notification_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dead-lettered notification not found"
+        )
+    notification_dispatcher.notify()
+    return {"requeued": True}
+
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    current_user: Optional[Principal] = Depends(get_optional_current_user)
 ):
     """Get order by ID"""
     order_service = OrderService(db)
-    order = order_service.get_order(order_id)
+    order = await run_blocking(order_service.get_order, order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,7 +179,7 @@ async def get_order_by_number(
 ):
     """Get order by order number (for customer lookup)"""
     order_service = OrderService(db)
-    order = order_service.get_order_by_number(order_number)
+    order = await run_blocking(order_service.get_order_by_number, order_number)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -123,11 +192,11 @@ async def update_order(
     order_id: int,
     order_data: OrderUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Update order status (Admin only)"""
     order_service = OrderService(db)
-    order = order_service.update_order(order_id, order_data)
+    order = await run_blocking(order_service.update_order, order_id, order_data)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -139,11 +208,11 @@ async def update_order(
 async def cancel_order(
     order_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Cancel order (Admin only)"""
     order_service = OrderService(db)
-    success = order_service.cancel_order(order_id)
+    success = await run_blocking(order_service.cancel_order, order_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -154,37 +223,80 @@ async def cancel_order(
 @router.get("/restaurant/{restaurant_id}/status/{status}", response_model=List[OrderSummary])
 async def get_orders_by_status(
     restaurant_id: int,
-    status: str,
+    status: OrderStatus,
+    limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get orders by status for a restaurant (Admin only)"""
     order_service = OrderService(db)
-    orders = order_service.get_orders_by_status(restaurant_id, status)
-    
-    return [
-        OrderSummary(
-            id=order.id,
-            order_number=order.order_number,
-            customer_name=order.customer_name,
-            customer_phone=order.customer_phone,
-            order_type=order.order_type,
-            status=order.status,
-            total_amount=order.total_amount,
-            payment_status=order.payment_status,
-            estimated_ready_time=order.estimated_ready_time,
-            created_at=order.created_at
-        ) for order in orders
-    ]
+    orders = await run_blocking(order_service.get_orders_by_status, restaurant_id, status, limit)
+    return order_summaries.response(orders)
+
+@router.get("/restaurant/{restaurant_id}/events")
+async def stream_order_events(
+    restaurant_id: int,
+    last_event_id: Optional[int] = Query(None, ge=0, description="Resume after this event id"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: Principal = Depends(get_event_stream_admin_user)
+):
+    """Stream order created and status-changed events as Server-Sent Events (Admin only)"""
+    if last_event_id is None and last_event_id_header:
+        try:
+            last_event_id = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid Last-Event-ID"
+            )
+
+    # Subscribe before replaying so nothing committed in between is missed
+    subscription = order_event_hub.subscribe(restaurant_id)
+
+    async def event_stream():
+        try:
+            yield b"retry: 3000\n\n"
+            sent_id = last_event_id or 0
+            if last_event_id is not None:
+                while True:
+                    events = await order_event_relay.replay(restaurant_id, sent_id)
+                    for event in events:
+                        yield event.frame
+                        sent_id = event.id
+                    if len(events) < settings.order_events_replay_limit:
+                        break
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=settings.order_events_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    # Fell too far behind; end the stream so the client resumes from the log
+                    break
+                if event.id <= sent_id:
+                    continue
+                yield event.frame
+                sent_id = event.id
+        finally:
+            order_event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/restaurant/{restaurant_id}/analytics")
 async def get_order_analytics(
     restaurant_id: int,
     start_date: datetime = Query(..., description="Start date for analytics"),
     end_date: datetime = Query(..., description="End date for analytics"),
+    bucket: Optional[RollupGranularity] = Query(None, description="Time series bucket size"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get order analytics for a restaurant (Admin only)"""
     order_service = OrderService(db)
-    return order_service.get_order_analytics(restaurant_id, start_date, end_date)
+    return await run_blocking(order_service.get_order_analytics, restaurant_id, start_date, end_date, bucket)
@@ -1,31 +1,60 @@
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.concurrency import run_blocking
+from app.core.config import settings
 from app.services.pos_service import POSService
 from app.services.restaurant_service import RestaurantService
-from app.services.menu_service import MenuService
+from app.services.menu_sync_service import MenuSyncService
+from app.services.pos_webhook_service import (
+    POSWebhookService,
+    pos_webhook_consumer,
+    parse_toast_webhook,
+    parse_clover_webhook,
+    verify_toast_signature,
+    verify_clover_auth,
+    TOAST_SIGNATURE_HEADER,
+    CLOVER_AUTH_HEADER
+)
+from app.services.pos_submission_service import POSSubmissionService, pos_submission_dispatcher
+from app.models.pos_webhook import POSWebhookStatus
 from app.utils.dependencies import get_current_admin_user
-from app.models.user import User
+from app.services.auth_service import Principal
+from datetime import datetime
+import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/pos", tags=["POS integration"])
 
+def _require_token(token: Optional[str], provider: str) -> str:
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Could not obtain a {provider} access token"
+        )
+    return token
+
 @router.post("/toast/sync-restaurants")
 async def sync_toast_restaurants(
-    access_token: str,
+    access_token: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Sync restaurants from Toast POS (Admin only)"""
     pos_service = POSService()
     restaurant_service = RestaurantService(db)
+    access_token = _require_token(access_token or await pos_service.get_toast_access_token(), "Toast")
     
     try:
-        toast_restaurants = pos_service.sync_toast_restaurants(access_token)
+        toast_restaurants = await pos_service.sync_toast_restaurants(access_token)
         
         synced_count = 0
         for toast_restaurant in toast_restaurants:
-            existing = restaurant_service.get_restaurant_by_location_id(
+            existing = await run_blocking(
+                restaurant_service.get_restaurant_by_location_id,
                 toast_location_id=toast_restaurant.get('guid')
             )
             
@@ -54,30 +83,40 @@ async def sync_toast_restaurants(
 @router.post("/toast/sync-menu/{restaurant_id}")
 async def sync_toast_menu(
     restaurant_id: int,
-    access_token: str,
+    access_token: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Sync menu from Toast POS for a specific restaurant (Admin only)"""
     pos_service = POSService()
     restaurant_service = RestaurantService(db)
-    menu_service = MenuService(db)
+    menu_sync_service = MenuSyncService(db)
     
-    restaurant = restaurant_service.get_restaurant(restaurant_id)
+    restaurant = await run_blocking(restaurant_service.get_restaurant, restaurant_id)
     if not restaurant or not restaurant.toast_location_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Restaurant not found or not linked to Toast"
         )
     
+    access_token = _require_token(access_token or await pos_service.get_toast_access_token(), "Toast")
+    
+    toast_menu = await pos_service.sync_toast_menu(access_token, restaurant.toast_location_id)
+    if not toast_menu:
+        # An empty or failed fetch must not be applied, or every synced item would be soft-deleted
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Toast returned no menu"
+        )
+    
     try:
-        toast_menu = pos_service.sync_toast_menu(access_token, restaurant.toast_location_id)
-        
+        stats = await run_blocking(menu_sync_service.sync_toast_menus, restaurant_id, toast_menu)
         
         return {
             "message": f"Successfully synced menu for restaurant {restaurant.name}",
             "restaurant_id": restaurant_id,
-            "toast_location_id": restaurant.toast_location_id
+            "toast_location_id": restaurant.toast_location_id,
+            "stats": stats.as_dict()
         }
     except Exception as e:
         raise HTTPException(
@@ -88,27 +127,30 @@ async def sync_toast_menu(
 @router.post("/clover/sync-merchant/{restaurant_id}")
 async def sync_clover_merchant(
     restaurant_id: int,
-    access_token: str,
     merchant_id: str,
+    access_token: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Sync merchant info from Clover POS (Admin only)"""
     pos_service = POSService()
     restaurant_service = RestaurantService(db)
     
-    restaurant = restaurant_service.get_restaurant(restaurant_id)
+    restaurant = await run_blocking(restaurant_service.get_restaurant, restaurant_id)
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Restaurant not found"
         )
     
+    access_token = _require_token(
+        access_token or await pos_service.get_clover_access_token(merchant_id=merchant_id), "Clover"
+    )
+    
     try:
-        clover_merchant = pos_service.sync_clover_merchant(access_token, merchant_id)
+        clover_merchant = await pos_service.sync_clover_merchant(access_token, merchant_id)
         
-        restaurant.clover_merchant_id = merchant_id
-        db.commit()
+        await run_blocking(restaurant_service.link_clover_merchant, restaurant_id, merchant_id)
         
         return {
             "message": f"Successfully synced Clover merchant for restaurant {restaurant.name}",
@@ -124,31 +166,43 @@ async def sync_clover_merchant(
 @router.post("/clover/sync-inventory/{restaurant_id}")
 async def sync_clover_inventory(
     restaurant_id: int,
-    access_token: str,
     merchant_id: str,
+    access_token: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Sync inventory/menu from Clover POS (Admin only)"""
     pos_service = POSService()
     restaurant_service = RestaurantService(db)
+    menu_sync_service = MenuSyncService(db)
     
-    restaurant = restaurant_service.get_restaurant(restaurant_id)
+    restaurant = await run_blocking(restaurant_service.get_restaurant, restaurant_id)
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Restaurant not found"
         )
     
+    access_token = _require_token(
+        access_token or await pos_service.get_clover_access_token(merchant_id=merchant_id), "Clover"
+    )
+    
+    clover_items = await pos_service.sync_clover_inventory(access_token, merchant_id)
+    if not clover_items:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Clover returned no inventory"
+        )
+    
     try:
-        clover_items = pos_service.sync_clover_inventory(access_token, merchant_id)
-        
+        stats = await run_blocking(menu_sync_service.sync_clover_inventory, restaurant_id, merchant_id, clover_items)
         
         return {
             "message": f"Successfully synced inventory for restaurant {restaurant.name}",
             "restaurant_id": restaurant_id,
             "merchant_id": merchant_id,
-            "items_count": len(clover_items)
+            "items_count": len(clover_items),
+            "stats": stats.as_dict()
         }
     except Exception as e:
         raise HTTPException(
@@ -159,16 +213,17 @@ async def sync_clover_inventory(
 @router.post("/toast/submit-order")
 async def submit_order_to_toast(
     order_data: Dict[str, Any],
-    access_token: str,
     restaurant_id: str,
+    access_token: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Submit order to Toast POS (Admin only)"""
     pos_service = POSService()
+    access_token = _require_token(access_token or await pos_service.get_toast_access_token(), "Toast")
     
     try:
-        toast_order_id = pos_service.submit_toast_order(access_token, restaurant_id, order_data)
+        toast_order_id = await pos_service.submit_toast_order(access_token, restaurant_id, order_data)
         
         if toast_order_id:
             return {
@@ -189,16 +244,19 @@ async def submit_order_to_toast(
 @router.post("/clover/submit-order")
 async def submit_order_to_clover(
     order_data: Dict[str, Any],
-    access_token: str,
     merchant_id: str,
+    access_token: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Submit order to Clover POS (Admin only)"""
     pos_service = POSService()
+    access_token = _require_token(
+        access_token or await pos_service.get_clover_access_token(merchant_id=merchant_id), "Clover"
+    )
     
     try:
-        clover_order_id = pos_service.submit_clover_order(access_token, merchant_id, order_data)
+        clover_order_id = await pos_service.submit_clover_order(access_token, merchant_id, order_data)
         
         if clover_order_id:
             return {
@@ -219,11 +277,11 @@ async def submit_order_to_clover(
 @router.get("/status")
 async def get_pos_integration_status(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get POS integration status (Admin only)"""
     restaurant_service = RestaurantService(db)
-    restaurants = restaurant_service.get_restaurants()
+    restaurants = await run_blocking(restaurant_service.get_restaurants)
     
     toast_connected = sum(1 for r in restaurants if r.toast_location_id)
     clover_connected = sum(1 for r in restaurants if r.clover_merchant_id)
@@ -237,3 +295,131 @@ async def get_pos_integration_status(
             "clover": clover_connected > 0
         }
     }
+
+async def _ingest_webhook(db: Session, events) -> Dict[str, int]:
+    accepted = await run_blocking(POSWebhookService(db).ingest, events)
+    if accepted:
+        pos_webhook_consumer.notify()
+    return {"received": len(events), "accepted": accepted}
+
+def _invalid_webhook_body() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Malformed webhook payload"
+    )
+
+@router.post("/webhooks/toast", status_code=status.HTTP_202_ACCEPTED)
+async def receive_toast_webhook(request: Request, db: Session = Depends(get_db)):
+    """Receive a Toast webhook; events are stored and applied in the background"""
+    body = await request.body()
+    if not verify_toast_signature(body, request.headers.get(TOAST_SIGNATURE_HEADER)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook signature"
+        )
+    try:
+        events = parse_toast_webhook(json.loads(body))
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise _invalid_webhook_body() from e
+    return await _ingest_webhook(db, events)
+
+@router.post("/webhooks/clover", status_code=status.HTTP_202_ACCEPTED)
+async def receive_clover_webhook(request: Request, db: Session = Depends(get_db)):
+    """Receive a Clover webhook; events are stored and applied in the background"""
+    try:
+        payload = json.loads(await request.body())
+    except ValueError as e:
+        raise _invalid_webhook_body() from e
+
+    if isinstance(payload, dict) and "verificationCode" in payload:
+        # Sent once when the webhook URL is registered, before an auth code exists
+        logger.info("Clover webhook verification code: %s", payload["verificationCode"])
+        return {"received": 0, "accepted": 0}
+
+    if not verify_clover_auth(request.headers.get(CLOVER_AUTH_HEADER)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook auth code"
+        )
+    try:
+        events = parse_clover_webhook(payload)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise _invalid_webhook_body() from e
+    return await _ingest_webhook(db, events)
+
+@router.get("/webhooks/status")
+async def get_webhook_status(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Inbox counts by status and consumer totals since startup (Admin only)"""
+    counts = await run_blocking(POSWebhookService(db).get_status_counts)
+    return {"events": counts, "consumer": dict(pos_webhook_consumer.stats)}
+
+@router.post("/webhooks/requeue")
+async def requeue_webhook_events(
+    provider: Optional[str] = Query(None, pattern="^(toast|clover)$"),
+    since: Optional[datetime] = Query(None),
+    include_processed: bool = Query(False, description="Also replay events that were already applied"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Replay stored webhook events through the consumer (Admin only)"""
+    statuses = (POSWebhookStatus.FAILED, POSWebhookStatus.PROCESSED) if include_processed else (POSWebhookStatus.FAILED,)
+    requeued = await run_blocking(POSWebhookService(db).requeue, provider, since, statuses)
+    if requeued:
+        pos_webhook_consumer.notify()
+    return {"requeued": requeued}
+
+@router.get("/submissions/lag")
+async def get_submission_lag(
+    window_minutes: Optional[int] = Query(None, ge=1, le=7 * 24 * 60),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Order submission backlog and lag per restaurant, plus per-merchant circuit state (Admin only)"""
+    window_minutes = window_minutes or settings.pos_submission_lag_window_minutes
+    restaurants = await run_blocking(POSSubmissionService(db).get_lag_report, window_minutes)
+    return {
+        "window_minutes": window_minutes,
+        "restaurants": restaurants,
+        "dispatcher": pos_submission_dispatcher.snapshot()
+    }
+
+@router.get("/submissions/dead")
+async def get_dead_submissions(
+    restaurant_id: Optional[int] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Order submissions that were rejected or ran out of retries (Admin only)"""
+    submissions = await run_blocking(POSSubmissionService(db).get_dead_letters, restaurant_id, limit)
+    return [
+        {
+            "id": submission.id,
+            "order_id": submission.order_id,
+            "restaurant_id": submission.restaurant_id,
+            "provider": submission.provider,
+            "merchant_id": submission.merchant_id,
+            "attempts": submission.attempts,
+            "last_error": submission.last_error,
+            "created_at": submission.created_at
+        }
+        for submission in submissions
+    ]
+
+@router.post("/submissions/{submission_id}/requeue")
+async def requeue_submission(
+    submission_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Retry a dead-lettered order submission with its original idempotency key (Admin only)"""
+    if not await run_blocking(POSSubmissionService(db).requeue, submission_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dead-lettered submission not found"
+        )
+    pos_submission_dispatcher.notify()
+    return {"requeued": True}
@@ -1,26 +1,35 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.cache import etag_matches
+from app.core.concurrency import run_blocking
+from app.core.pagination import set_page_headers
+from app.core.responses import ResponseSerializer
 from app.schemas.restaurant import RestaurantCreate, RestaurantResponse, RestaurantUpdate, RestaurantLocation
+from app.schemas.bootstrap import BootstrapResponse
 from app.services.restaurant_service import RestaurantService
+from app.services.bootstrap_service import BootstrapService
 from app.utils.dependencies import get_current_admin_user, get_optional_current_user
-from app.models.user import User
+from app.services.auth_service import Principal
 
 router = APIRouter(prefix="/restaurants", tags=["restaurants"])
 
+restaurant_list = ResponseSerializer(List[RestaurantResponse])
+
 @router.post("/", response_model=RestaurantResponse)
 async def create_restaurant(
     restaurant_data: RestaurantCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Create a new restaurant (Admin only)"""
     restaurant_service = RestaurantService(db)
-    return restaurant_service.create_restaurant(restaurant_data)
+    return await run_blocking(restaurant_service.create_restaurant, restaurant_data)
 
 @router.get("/", response_model=List[RestaurantResponse])
 async def get_restaurants(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     active_only: bool = Query(True),
@@ -28,18 +37,25 @@ async def get_restaurants(
 ):
     """Get all restaurants"""
     restaurant_service = RestaurantService(db)
-    return restaurant_service.get_restaurants(skip=skip, limit=limit, active_only=active_only)
+    page = await run_blocking(
+        restaurant_service.get_restaurants_page,
+        cursor=cursor, skip=skip, limit=limit, active_only=active_only
+    )
+    response = restaurant_list.response(page.items)
+    set_page_headers(response, page)
+    return response
 
 @router.get("/nearby", response_model=List[RestaurantLocation])
 async def get_nearby_restaurants(
     latitude: float = Query(..., description="User's latitude"),
     longitude: float = Query(..., description="User's longitude"),
     limit: int = Query(10, ge=1, le=50),
+    radius: Optional[float] = Query(None, gt=0, description="Search radius in miles"),
     db: Session = Depends(get_db)
 ):
     """Find nearby restaurants based on user location"""
     restaurant_service = RestaurantService(db)
-    return restaurant_service.find_nearest_restaurants(latitude, longitude, limit)
+    return await run_blocking(restaurant_service.find_nearest_restaurants, latitude, longitude, limit, radius)
 
 @router.get("/{restaurant_id}", response_model=RestaurantResponse)
 async def get_restaurant(
@@ -48,7 +64,7 @@ async def get_restaurant(
 ):
     """Get restaurant by ID"""
     restaurant_service = RestaurantService(db)
-    restaurant = restaurant_service.get_restaurant(restaurant_id)
+    restaurant = await run_blocking(restaurant_service.get_restaurant, restaurant_id)
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -56,16 +72,33 @@ async def get_restaurant(
         )
     return restaurant
 
+@router.get("/{restaurant_id}/bootstrap", response_model=BootstrapResponse)
+async def get_restaurant_bootstrap(restaurant_id: int, request: Request):
+    """Get the restaurant, its menus, default menu, featured items and CMS blocks in one response"""
+    bootstrap_service = BootstrapService()
+    payload = await bootstrap_service.get_payload(restaurant_id)
+    if payload["body"] is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Restaurant not found"
+        )
+    
+    headers = {"ETag": payload["etag"], "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), payload["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=payload["body"], media_type="application/json", headers=headers)
+
 @router.put("/{restaurant_id}", response_model=RestaurantResponse)
 async def update_restaurant(
     restaurant_id: int,
     restaurant_data: RestaurantUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Update restaurant (Admin only)"""
     restaurant_service = RestaurantService(db)
-    restaurant = restaurant_service.update_restaurant(restaurant_id, restaurant_data)
+    restaurant = await run_blocking(restaurant_service.update_restaurant, restaurant_id, restaurant_data)
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -77,11 +110,11 @@ async def update_restaurant(
 async def delete_restaurant(
     restaurant_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Delete restaurant (Admin only)"""
     restaurant_service = RestaurantService(db)
-    success = restaurant_service.delete_restaurant(restaurant_id)
+    success = await run_blocking(restaurant_service.delete_restaurant, restaurant_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends
+from app.core.database import get_pool_metrics
+from app.core.responses import ORJSONResponse
+from app.core.security import get_password_executor
+from app.services.auth_service import Principal
+from app.services.health_service import readiness_service
+from app.utils.dependencies import get_current_admin_user
+
+router = APIRouter(tags=["system"])
+
+@router.get("/")
+async def root():
+    return {
+        "message": "Restaurant Platform API",
+        "version": "1.0.0",
+        "docs": "/docs",
+        "health": "/healthz",
+        "ready": "/readyz"
+    }
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is serving requests. Dependencies are not checked here,
+    so a slow database never gets a healthy worker restarted"""
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness: 503 while the database is unreachable, a pool or queue is saturated,
+    a background worker has stopped, or the worker is draining for shutdown"""
+    report = await readiness_service.check()
+    return ORJSONResponse(report, status_code=200 if report["ready"] else 503, headers={"Cache-Control": "no-store"})
+
+@router.get("/metrics/db-pool")
+async def db_pool_metrics(current_user: Principal = Depends(get_current_admin_user)):
+    """Connection pool occupancy and checkout waits (Admin only)"""
+    return get_pool_metrics()
+
+@router.get("/metrics/password-pool")
+async def password_pool_metrics(current_user: Principal = Depends(get_current_admin_user)):
+    """Password hashing pool queue depth (Admin only)"""
+    return get_password_executor().snapshot()
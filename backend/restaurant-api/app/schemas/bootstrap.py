@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from app.schemas.restaurant import RestaurantResponse
+from app.schemas.menu import MenuResponse, MenuWithItems, MenuItemResponse
+from app.schemas.cms import CMSContentResponse
+
+class BootstrapResponse(BaseModel):
+    """Everything the first screen needs, in one response"""
+    restaurant: RestaurantResponse
+    menus: List[MenuResponse]
+    default_menu: Optional[MenuWithItems] = None
+    featured_items: List[MenuItemResponse]
+    banners: List[CMSContentResponse]
+    announcements: List[CMSContentResponse]
+    pages: List[CMSContentResponse]
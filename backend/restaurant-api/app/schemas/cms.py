@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from app.models.cms import ContentType, ContentStatus
@@ -19,6 +19,8 @@ class CMSContentCreate(CMSContentBase):
     meta_title: Optional[str] = None
     meta_description: Optional[str] = None
     meta_keywords: Optional[str] = None
+    published_at: Optional[datetime] = None  # defaults to now when created published
+    expires_at: Optional[datetime] = None
 
 class CMSContentUpdate(BaseModel):
     title: Optional[str] = None
@@ -37,6 +39,12 @@ class CMSContentUpdate(BaseModel):
     published_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
 
+    @validator('display_order')
+    def validate_display_order(cls, v):
+        if v is None:
+            raise ValueError('display_order cannot be null')
+        return v
+
 class CMSContentResponse(CMSContentBase):
     id: int
     status: ContentStatus
@@ -54,6 +62,9 @@ class CMSContentResponse(CMSContentBase):
     class Config:
         from_attributes = True
 
+class CMSSearchResult(CMSContentResponse):
+    snippet: Optional[str] = None  # escaped HTML with matches wrapped in <mark>
+
 class CMSContentSummary(BaseModel):
     id: int
     title: str
@@ -1,8 +1,7 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from app.models.menu import MenuStatus
-import json
 
 class MenuCategoryBase(BaseModel):
     name: str
@@ -75,59 +74,10 @@ class MenuItemResponse(MenuItemBase):
     modifiers: Optional[Dict[str, Any]] = None
     toast_item_id: Optional[str] = None
     clover_item_id: Optional[str] = None
+    pos_deleted_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    @field_validator('ingredients', mode='before')
-    @classmethod
-    def parse_ingredients(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except (json.JSONDecodeError, TypeError):
-                return None
-        return v
-
-    @field_validator('allergens', mode='before')
-    @classmethod
-    def parse_allergens(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except (json.JSONDecodeError, TypeError):
-                return None
-        return v
-
-    @field_validator('dietary_info', mode='before')
-    @classmethod
-    def parse_dietary_info(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except (json.JSONDecodeError, TypeError):
-                return None
-        return v
-
-    @field_validator('images', mode='before')
-    @classmethod
-    def parse_images(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except (json.JSONDecodeError, TypeError):
-                return None
-        return v
-
-    @field_validator('modifiers', mode='before')
-    @classmethod
-    def parse_modifiers(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except (json.JSONDecodeError, TypeError):
-                return None
-        return v
-
     class Config:
         from_attributes = True
 
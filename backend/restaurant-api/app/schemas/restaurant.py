@@ -1,7 +1,6 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from datetime import datetime
-import json
 
 class RestaurantBase(BaseModel):
     name: str
@@ -49,16 +48,6 @@ class RestaurantResponse(RestaurantBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    @field_validator('opening_hours', mode='before')
-    @classmethod
-    def parse_opening_hours(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except (json.JSONDecodeError, TypeError):
-                return None
-        return v
-
     class Config:
         from_attributes = True
 
@@ -1,17 +1,46 @@
 from .auth_service import AuthService
 from .restaurant_service import RestaurantService
 from .menu_service import MenuService
+from .menu_sync_service import MenuSyncService
 from .order_service import OrderService
 from .cms_service import CMSService
+from .bootstrap_service import BootstrapService
 from .pos_service import POSService
+from .pos_client import POSHttpClient
+from .pos_webhook_service import POSWebhookService, POSWebhookConsumer
+from .pos_submission_service import POSSubmissionService, POSSubmissionDispatcher
 from .sms_service import SMSService
+from .notification_service import NotificationService, NotificationDispatcher
+from .cache_service import CacheVersionService
+from .search_service import MenuSearchService
+from .analytics_service import OrderAnalyticsService
+from .export_service import OrderExportService
+from .order_event_service import OrderEventService, OrderEventHub, OrderEventRelay
+from .health_service import ReadinessService
 
 __all__ = [
     "AuthService",
     "RestaurantService", 
     "MenuService",
+    "MenuSyncService",
     "OrderService",
     "CMSService",
+    "BootstrapService",
     "POSService",
-    "SMSService"
+    "POSHttpClient",
+    "POSWebhookService",
+    "POSWebhookConsumer",
+    "POSSubmissionService",
+    "POSSubmissionDispatcher",
+    "SMSService",
+    "NotificationService",
+    "NotificationDispatcher",
+    "CacheVersionService",
+    "MenuSearchService",
+    "OrderAnalyticsService",
+    "OrderExportService",
+    "OrderEventService",
+    "OrderEventHub",
+    "OrderEventRelay",
+    "ReadinessService"
 ]
@@ -0,0 +1,273 @@
+from typing import Callable, List, Optional, Dict, Any
+from sqlalchemy import func, insert, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.analytics import OrderRollup, OrderRollupDelta, RollupGranularity
+from app.models.order import Order, OrderType, OrderStatus
+from datetime import datetime, timezone
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Keeps concurrent aggregators on Postgres from folding the same deltas twice
+_POSTGRES_ROLLUP_LOCK_KEY = 7304
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC, the form rollup buckets are stored in"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def truncate_to_bucket(value: datetime, granularity: RollupGranularity) -> datetime:
+    value = to_utc_naive(value)
+    if granularity == RollupGranularity.HOUR:
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class OrderAnalyticsService:
+    """SQL-aggregated order analytics backed by hourly and daily rollup rows.
+
+    Order writes only append OrderRollupDelta rows; OrderRollupAggregator
+    folds them into the rollups, so the time series trails the orders by
+    up to analytics_rollup_interval.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_order_created(self, order: Order):
+        self._record(order.restaurant_id, order.created_at, order.order_type, order.status or OrderStatus.PENDING, 1, order.total_amount)
+
+    def record_status_change(self, order: Order, old_status: OrderStatus, new_status: OrderStatus):
+        if old_status == new_status:
+            return
+        self._record(order.restaurant_id, order.created_at, order.order_type, old_status, -1, -order.total_amount)
+        self._record(order.restaurant_id, order.created_at, order.order_type, new_status, 1, order.total_amount)
+
+    def _record(self, restaurant_id: int, created_at: datetime, order_type: OrderType, status: OrderStatus, count: int, revenue: float):
+        self.db.add(OrderRollupDelta(
+            restaurant_id=restaurant_id,
+            order_created_at=to_utc_naive(created_at or datetime.utcnow()),
+            order_type=order_type,
+            status=status,
+            order_count=count,
+            revenue=revenue
+        ))
+
+    def fold_deltas(self, batch_size: int = 5000) -> int:
+        """Fold the oldest recorded deltas into the rollup rows in one transaction; returns how many were folded"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            locked = self.db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _POSTGRES_ROLLUP_LOCK_KEY}).scalar()
+            if not locked:
+                self.db.rollback()
+                return 0
+
+        deltas = self.db.query(
+            OrderRollupDelta.id, OrderRollupDelta.restaurant_id, OrderRollupDelta.order_created_at,
+            OrderRollupDelta.order_type, OrderRollupDelta.status, OrderRollupDelta.order_count, OrderRollupDelta.revenue
+        ).order_by(OrderRollupDelta.id).limit(batch_size).all()
+        if not deltas:
+            self.db.rollback()
+            return 0
+
+        totals: Dict[tuple, List[float]] = {}
+        for delta in deltas:
+            for granularity in RollupGranularity:
+                key = (delta.restaurant_id, granularity, truncate_to_bucket(delta.order_created_at, granularity), delta.order_type, delta.status)
+                entry = totals.setdefault(key, [0, 0.0])
+                entry[0] += delta.order_count
+                entry[1] += delta.revenue
+
+        for key, (count, revenue) in totals.items():
+            if count or revenue:
+                self._upsert(*key, count, revenue)
+        self.db.query(OrderRollupDelta).filter(
+            OrderRollupDelta.id <= deltas[-1].id
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return len(deltas)
+
+    def _upsert(self, restaurant_id, granularity, bucket_start, order_type, status, count, revenue):
+        if self._increment(restaurant_id, granularity, bucket_start, order_type, status, count, revenue):
+            return
+        try:
+            with self.db.begin_nested():
+                self.db.add(OrderRollup(
+                    restaurant_id=restaurant_id,
+                    granularity=granularity,
+                    bucket_start=bucket_start,
+                    order_type=order_type,
+                    status=status,
+                    order_count=count,
+                    revenue=revenue
+                ))
+        except IntegrityError:
+            self._increment(restaurant_id, granularity, bucket_start, order_type, status, count, revenue)
+
+    def _increment(self, restaurant_id, granularity, bucket_start, order_type, status, count, revenue) -> bool:
+        result = self.db.execute(
+            update(OrderRollup)
+            .where(
+                OrderRollup.restaurant_id == restaurant_id,
+                OrderRollup.granularity == granularity,
+                OrderRollup.bucket_start == bucket_start,
+                OrderRollup.order_type == order_type,
+                OrderRollup.status == status
+            )
+            .values(order_count=OrderRollup.order_count + count, revenue=OrderRollup.revenue + revenue)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
+    def get_summary(self, restaurant_id: int, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Aggregate order counts and revenue per order type in the database"""
+        rows = self.db.query(
+            Order.order_type,
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.total_amount), 0.0)
+        ).filter(
+            Order.restaurant_id == restaurant_id,
+            Order.created_at >= start_date,
+            Order.created_at <= end_date,
+            Order.status != OrderStatus.CANCELLED
+        ).group_by(Order.order_type).all()
+
+        order_types = {order_type.value: count for order_type, count, _ in rows}
+        total_orders = sum(order_types.values())
+        total_revenue = sum(revenue for _, _, revenue in rows)
+
+        return {
+            "total_orders": total_orders,
+            "total_revenue": round(total_revenue, 2),
+            "average_order_value": round(total_revenue / total_orders, 2) if total_orders > 0 else 0,
+            "order_types": order_types
+        }
+
+    def get_time_series(self, restaurant_id: int, start_date: datetime, end_date: datetime, granularity: RollupGranularity) -> List[Dict[str, Any]]:
+        """Per-bucket order counts and revenue from the rollup table, whole buckets only"""
+        rows = self.db.query(
+            OrderRollup.bucket_start,
+            OrderRollup.order_type,
+            func.sum(OrderRollup.order_count),
+            func.sum(OrderRollup.revenue)
+        ).filter(
+            OrderRollup.restaurant_id == restaurant_id,
+            OrderRollup.granularity == granularity,
+            OrderRollup.bucket_start >= truncate_to_bucket(start_date, granularity),
+            OrderRollup.bucket_start <= to_utc_naive(end_date),
+            OrderRollup.status != OrderStatus.CANCELLED
+        ).group_by(OrderRollup.bucket_start, OrderRollup.order_type).order_by(OrderRollup.bucket_start).all()
+
+        series: Dict[datetime, Dict[str, Any]] = {}
+        for bucket_start, order_type, count, revenue in rows:
+            if not count:
+                continue
+            bucket = series.setdefault(bucket_start, {
+                "bucket_start": bucket_start.isoformat(),
+                "total_orders": 0,
+                "total_revenue": 0.0,
+                "order_types": {}
+            })
+            bucket["total_orders"] += count
+            bucket["total_revenue"] = round(bucket["total_revenue"] + revenue, 2)
+            bucket["order_types"][order_type.value] = count
+
+        return list(series.values())
+
+    def rebuild_rollups(self, restaurant_id: Optional[int] = None, batch_size: int = 5000):
+        """Recompute rollup rows from the orders table, e.g. after a backfill; pending deltas are discarded"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _POSTGRES_ROLLUP_LOCK_KEY})
+
+        delete_query = self.db.query(OrderRollup)
+        delta_query = self.db.query(OrderRollupDelta)
+        order_query = self.db.query(
+            Order.restaurant_id, Order.created_at, Order.order_type, Order.status, Order.total_amount
+        )
+        if restaurant_id is not None:
+            delete_query = delete_query.filter(OrderRollup.restaurant_id == restaurant_id)
+            delta_query = delta_query.filter(OrderRollupDelta.restaurant_id == restaurant_id)
+            order_query = order_query.filter(Order.restaurant_id == restaurant_id)
+        delete_query.delete(synchronize_session=False)
+        delta_query.delete(synchronize_session=False)
+
+        totals: Dict[tuple, List[float]] = {}
+        for row in order_query.yield_per(batch_size):
+            for granularity in RollupGranularity:
+                key = (row.restaurant_id, granularity, truncate_to_bucket(row.created_at, granularity), row.order_type, row.status)
+                entry = totals.setdefault(key, [0, 0.0])
+                entry[0] += 1
+                entry[1] += row.total_amount
+
+        if totals:
+            self.db.execute(insert(OrderRollup), [
+                {
+                    "restaurant_id": key[0],
+                    "granularity": key[1],
+                    "bucket_start": key[2],
+                    "order_type": key[3],
+                    "status": key[4],
+                    "order_count": count,
+                    "revenue": revenue
+                } for key, (count, revenue) in totals.items()
+            ])
+        self.db.commit()
+
+class OrderRollupAggregator:
+    """Background task that folds recorded order changes into the rollup rows.
+
+    Runs on every worker; on Postgres an advisory lock lets one fold at a
+    time, on SQLite the write lock does the same. Stopping folds whatever
+    is left so a clean shutdown leaves the rollups current.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    async def run(self):
+        while True:
+            try:
+                folded = await run_blocking(self.fold)
+            except Exception:
+                logger.exception("Order rollup aggregation failed")
+                folded = 0
+
+            if self._stopping.is_set() and folded < settings.analytics_rollup_batch_size:
+                break
+            if folded < settings.analytics_rollup_batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=settings.analytics_rollup_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def fold(self) -> int:
+        db = self.session_factory()
+        try:
+            return OrderAnalyticsService(db).fold_deltas(settings.analytics_rollup_batch_size)
+        finally:
+            db.close()
+
+order_rollup_aggregator = OrderRollupAggregator()
@@ -1,11 +1,41 @@
-from typing import Optional
+from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.models.user import User, UserRole
+from app.schemas.user import UserCreate, UserLogin, UserUpdate
+from app.core.cache import LRUCache
+from app.core.security import verify_and_update_password, get_password_hash, create_access_token, run_password_task
 from datetime import timedelta
 from app.core.config import settings
+from app.services.cache_service import CacheVersionService
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, detached from any database session"""
+    id: int
+    username: str
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, username=user.username, role=user.role, is_active=user.is_active)
+
+ROLE_RANK = {UserRole.STAFF: 0, UserRole.MANAGER: 1, UserRole.ADMIN: 2}
+
+# Keyed by (user_id, token iat); values are (principal version, Principal)
+principal_cache = LRUCache(settings.principal_cache_size, ttl=settings.principal_cache_ttl)
+# user_id -> last principal version read from cache_versions, re-read every principal_version_ttl
+principal_versions = LRUCache(settings.principal_cache_size, ttl=settings.principal_version_ttl)
+
+def principal_cache_key(user_id: int) -> str:
+    return f"principal:{user_id}"
+
+def invalidate_principal(user_id: int):
+    """Forget this process's copy of the user's principal version so the next request re-reads it"""
+    principal_versions.delete(user_id)
 
 class AuthService:
     def __init__(self, db: Session):
@@ -22,7 +52,7 @@ class AuthService:
                 detail="User with this email or username already exists"
             )
 
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = run_password_task(get_password_hash, user_data.password)
         db_user = User(
             email=user_data.email,
             username=user_data.username,
@@ -40,7 +70,11 @@ class AuthService:
     def authenticate_user(self, login_data: UserLogin) -> Optional[User]:
         user = self.db.query(User).filter(User.username == login_data.username).first()
         
-        if not user or not verify_password(login_data.password, user.hashed_password):
+        if not user:
+            return None
+
+        verified, new_hash = run_password_task(verify_and_update_password, login_data.password, user.hashed_password)
+        if not verified:
             return None
         
         if not user.is_active:
@@ -48,13 +82,22 @@ class AuthService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Inactive user"
             )
+
+        if new_hash:
+            # The cost factor changed since this hash was made; upgrade it transparently
+            user.hashed_password = new_hash
+            self.db.commit()
+            self.db.refresh(user)
         
         return user
 
     def create_access_token_for_user(self, user: User) -> dict:
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
         access_token = create_access_token(
-            data={"sub": user.username, "user_id": user.id, "role": user.role.value},
+            data={
+                "sub": user.username, "user_id": user.id, "role": user.role.value, "active": user.is_active,
+                "ver": self.get_principal_version(user.id)
+            },
             expires_delta=access_token_expires
         )
         
@@ -65,6 +108,85 @@ class AuthService:
             "user": user
         }
 
+    def update_user(self, user_id: int, user_data: UserUpdate, actor: Principal) -> Optional[User]:
+        user = self.get_user_by_id(user_id)
+        if not user:
+            return None
+
+        update_data = user_data.model_dump(exclude_unset=True)
+        if ROLE_RANK[user.role] > ROLE_RANK[actor.role]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Cannot modify a user with a higher role"
+            )
+        if ("role" in update_data or "is_active" in update_data) and actor.role != UserRole.ADMIN:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only admins can change roles or deactivate users"
+            )
+        if update_data.get("role") is not None and ROLE_RANK[update_data["role"]] > ROLE_RANK[actor.role]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Cannot grant a role higher than your own"
+            )
+
+        for field, value in update_data.items():
+            setattr(user, field, value)
+
+        try:
+            self.db.flush()
+            # Every worker sees the new version on its next check and drops principals and claims issued before it
+            CacheVersionService(self.db).bump_version(principal_cache_key(user.id))
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email or username already exists"
+            )
+        self.db.refresh(user)
+        invalidate_principal(user.id)
+        return user
+
+    def get_principal_version(self, user_id: int) -> int:
+        version = principal_versions.get(user_id)
+        if version is None:
+            version = CacheVersionService(self.db).get_version(principal_cache_key(user_id))
+            principal_versions.set(user_id, version)
+        return version
+
+    def get_principal(self, payload: Dict[str, Any]) -> Optional[Principal]:
+        """Resolve a decoded token to a Principal, using signed claims or the principal cache when possible"""
+        username = payload.get("sub")
+        user_id = payload.get("user_id")
+        issued_at = payload.get("iat")
+        version = self.get_principal_version(user_id) if user_id is not None else None
+
+        if (settings.auth_trust_token_claims and version is not None and "role" in payload
+                and payload.get("ver", 0) == version):
+            return Principal(
+                id=user_id,
+                username=username,
+                role=UserRole(payload["role"]),
+                is_active=payload.get("active", True)
+            )
+
+        cache_key = (user_id if user_id is not None else username, issued_at)
+        cached = principal_cache.get(cache_key)
+        if cached is not None:
+            cached_version, principal = cached
+            if cached_version == version:
+                return principal
+
+        user = self.get_user_by_username(username)
+        if user is None or (user_id is not None and user.id != user_id):
+            return None
+
+        principal = Principal.from_user(user)
+        # Stored under the version read before the user row, so a racing update is never masked
+        principal_cache.set(cache_key, (version, principal))
+        return principal
+
     def get_user_by_username(self, username: str) -> Optional[User]:
         return self.db.query(User).filter(User.username == username).first()
 
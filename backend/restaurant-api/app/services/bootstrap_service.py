@@ -0,0 +1,144 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from datetime import datetime
+from app.models.cms import ContentType
+from app.models.menu import Menu, MenuStatus
+from app.schemas.menu import MenuResponse, MenuItemResponse
+from app.schemas.restaurant import RestaurantResponse
+from app.services.cache_service import CacheVersionService
+from app.services.cms_service import CMSService
+from app.services.menu_service import MenuService
+from app.services.restaurant_service import RestaurantService, RESTAURANTS_CACHE_KEY
+from app.core.cache import LRUCache, make_etag
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.responses import ResponseSerializer
+import asyncio
+
+bootstrap_cache = LRUCache(max_entries=settings.bootstrap_cache_size)
+restaurant_serializer = ResponseSerializer(RestaurantResponse)
+menu_list_serializer = ResponseSerializer(List[MenuResponse])
+menu_item_list_serializer = ResponseSerializer(List[MenuItemResponse])
+# (restaurant id, state) -> the build in progress, so a burst of misses builds the payload once
+bootstrap_builds: Dict[Tuple[int, Tuple], asyncio.Task] = {}
+
+# Response field -> (content type, CMSService loader, loader arguments)
+BOOTSTRAP_CMS_BLOCKS = {
+    "banners": (ContentType.HERO_BANNER, "get_hero_banners", (True,)),
+    "announcements": (ContentType.ANNOUNCEMENT, "get_announcements", (True,)),
+    "pages": (ContentType.PAGE, "get_published_pages", ())
+}
+
+class BootstrapService:
+    """Builds the first-screen payload (restaurant, menus, default menu, featured items
+    and published CMS blocks) as one cached JSON body.
+
+    The cached body is keyed by restaurant and checked against the versions of
+    everything it was built from, so a hit costs two small queries. On a miss
+    the parts are loaded concurrently, each on its own session; the menu
+    snapshot and CMS blocks come from their own caches. Concurrent misses for
+    the same restaurant and state share one build.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+
+    def _with_session(self, func: Callable[..., Any], *args: Any) -> Any:
+        db = self.session_factory()
+        try:
+            return func(db, *args)
+        finally:
+            db.close()
+
+    def read_state(self, db: Session, restaurant_id: int) -> Tuple:
+        """Everything the payload depends on: the restaurant's menus and the cache versions covering them"""
+        menus = db.query(Menu.id, Menu.is_default, Menu.status).filter(
+            Menu.restaurant_id == restaurant_id
+        ).order_by(Menu.id).all()
+        menu_service = MenuService(db)
+        keys = [RESTAURANTS_CACHE_KEY] + [menu_service.menu_cache_key(menu.id) for menu in menus]
+        keys += [CMSService(db).content_cache_key(content_type) for content_type, _, _ in BOOTSTRAP_CMS_BLOCKS.values()]
+        versions = CacheVersionService(db).get_versions(keys)
+        return tuple((menu.id, menu.is_default, menu.status) for menu in menus), tuple(sorted(versions.items()))
+
+    def default_menu_id(self, menus: Tuple) -> Optional[int]:
+        """The active menu flagged as default, else the first active menu"""
+        active = [(not is_default, menu_id) for menu_id, is_default, menu_status in menus if menu_status == MenuStatus.ACTIVE]
+        return min(active)[1] if active else None
+
+    def load_restaurant(self, db: Session, restaurant_id: int) -> Optional[Tuple[bytes, bytes]]:
+        restaurant = RestaurantService(db).get_restaurant(restaurant_id)
+        if not restaurant:
+            return None
+        menus = MenuService(db).get_restaurant_menus(restaurant_id)
+        return restaurant_serializer.dump(restaurant), menu_list_serializer.dump(menus)
+
+    def load_default_menu(self, db: Session, menu_id: Optional[int]) -> bytes:
+        snapshot = MenuService(db).get_menu_snapshot(menu_id) if menu_id is not None else None
+        return snapshot["body"] if snapshot else b"null"
+
+    def load_featured_items(self, db: Session, restaurant_id: int) -> bytes:
+        items = MenuService(db).get_featured_items(restaurant_id, settings.bootstrap_featured_limit)
+        return menu_item_list_serializer.dump(items)
+
+    def load_cms_blocks(self, db: Session) -> Dict[str, Dict[str, Any]]:
+        cms_service = CMSService(db)
+        return {
+            field: cms_service.get_public_view(content_type, getattr(cms_service, loader), *args)
+            for field, (content_type, loader, args) in BOOTSTRAP_CMS_BLOCKS.items()
+        }
+
+    async def build(self, restaurant_id: int, state: Tuple) -> Dict[str, Any]:
+        restaurant, default_menu, featured_items, cms_blocks = await asyncio.gather(
+            run_blocking(self._with_session, self.load_restaurant, restaurant_id),
+            run_blocking(self._with_session, self.load_default_menu, self.default_menu_id(state[0])),
+            run_blocking(self._with_session, self.load_featured_items, restaurant_id),
+            run_blocking(self._with_session, self.load_cms_blocks)
+        )
+        if restaurant is None:
+            return {"state": state, "valid_until": None, "etag": None, "body": None}
+
+        parts = [
+            (b"restaurant", restaurant[0]),
+            (b"menus", restaurant[1]),
+            (b"default_menu", default_menu),
+            (b"featured_items", featured_items)
+        ] + [(field.encode(), view["body"]) for field, view in cms_blocks.items()]
+        # The parts are already JSON, so they are spliced together rather than re-encoded
+        body = b"{" + b",".join(b'"' + name + b'":' + value for name, value in parts) + b"}"
+        boundaries = [view["valid_until"] for view in cms_blocks.values() if view["valid_until"] is not None]
+        return {
+            "state": state,
+            "valid_until": min(boundaries) if boundaries else None,
+            "etag": make_etag(body),
+            "body": body
+        }
+
+    async def get_payload(self, restaurant_id: int) -> Dict[str, Any]:
+        """Get the cached bootstrap payload, rebuilding it when anything it covers changed.
+        The body is None when the restaurant does not exist."""
+        state = await run_blocking(self._with_session, self.read_state, restaurant_id)
+        payload = bootstrap_cache.get(restaurant_id)
+        if (payload and payload["state"] == state
+                and (payload["valid_until"] is None or datetime.utcnow() < payload["valid_until"])):
+            return payload
+
+        key = (restaurant_id, state)
+        build = bootstrap_builds.get(key)
+        if build is None:
+            build = asyncio.create_task(self._build_and_cache(restaurant_id, state))
+            bootstrap_builds[key] = build
+            build.add_done_callback(lambda task: self._forget_build(key, task))
+        # Shielded: a caller that disconnects does not cancel the build the others are waiting on
+        return await asyncio.shield(build)
+
+    async def _build_and_cache(self, restaurant_id: int, state: Tuple) -> Dict[str, Any]:
+        payload = await self.build(restaurant_id, state)
+        bootstrap_cache.set(restaurant_id, payload)
+        return payload
+
+    def _forget_build(self, key: Tuple[int, Tuple], build: asyncio.Task):
+        bootstrap_builds.pop(key, None)
+        # A build whose callers all went away still has its error retrieved
+        build.cancelled() or build.exception()
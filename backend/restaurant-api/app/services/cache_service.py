@@ -0,0 +1,42 @@
+from typing import Dict, Iterable
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.cache_version import CacheVersion
+
+class CacheVersionService:
+    """Shared version counters that let every worker detect stale cached data"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_version(self, key: str) -> int:
+        version = self.db.query(CacheVersion.version).filter(CacheVersion.key == key).scalar()
+        return version or 0
+
+    def get_versions(self, keys: Iterable[str]) -> Dict[str, int]:
+        """Read several versions in one query; keys never bumped read as 0"""
+        versions = dict.fromkeys(keys, 0)
+        rows = self.db.query(CacheVersion.key, CacheVersion.version).filter(CacheVersion.key.in_(list(versions)))
+        versions.update({key: version or 0 for key, version in rows})
+        return versions
+
+    def bump_version(self, key: str):
+        """Increment the version for key; takes effect when the caller commits"""
+        if self._increment(key):
+            return
+
+        try:
+            with self.db.begin_nested():
+                self.db.add(CacheVersion(key=key, version=1))
+        except IntegrityError:
+            self._increment(key)
+
+    def _increment(self, key: str) -> bool:
+        result = self.db.execute(
+            update(CacheVersion)
+            .where(CacheVersion.key == key)
+            .values(version=CacheVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
@@ -1,14 +1,101 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from app.models.cms import CMSContent
-from app.schemas.cms import CMSContentCreate, CMSContentUpdate
+from typing import List, Optional, Dict, Any, Callable, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, Query
+from app.models.cms import CMSContent, ContentType, ContentStatus
+from app.schemas.cms import CMSContentCreate, CMSContentUpdate, CMSContentResponse
+from app.services.cache_service import CacheVersionService
+from app.services.search_service import CMSSearchService
+from app.core.cache import LRUCache, make_etag
+from app.core.responses import ResponseSerializer
+from app.core.pagination import Page, keyset_paginate
+from app.core.config import settings
 from fastapi import HTTPException, status
-from datetime import datetime
-import json
+from datetime import datetime, timezone
+
+cms_view_cache = LRUCache(max_entries=settings.cms_cache_size)
+cms_content_list = ResponseSerializer(List[CMSContentResponse])
+cms_content_item = ResponseSerializer(CMSContentResponse)
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Schedule times are compared against datetime.utcnow(), so keep them naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 class CMSService:
     def __init__(self, db: Session):
         self.db = db
+        self.cache_versions = CacheVersionService(db)
+        self.search_service = CMSSearchService(db)
+
+    def content_cache_key(self, content_type: ContentType) -> str:
+        return f"cms:{content_type.value}"
+
+    def invalidate_content(self, content_type: ContentType):
+        """Bump the version of a content type; its cached views and the search index go stale on commit"""
+        self.cache_versions.bump_version(self.content_cache_key(content_type))
+        self.search_service.invalidate()
+
+    def filter_published(self, query: Query, now: datetime) -> Query:
+        """Restrict a query to content that is published and inside its publish window"""
+        return query.filter(
+            CMSContent.status == ContentStatus.PUBLISHED,
+            or_(CMSContent.published_at.is_(None), CMSContent.published_at <= now),
+            or_(CMSContent.expires_at.is_(None), CMSContent.expires_at > now)
+        )
+
+    def is_public(self, content: CMSContent, now: datetime) -> bool:
+        """Whether anonymous visitors can see content: the same window filter_published applies"""
+        published_at = _utc_naive(content.published_at)
+        expires_at = _utc_naive(content.expires_at)
+        return (content.status == ContentStatus.PUBLISHED
+                and (published_at is None or published_at <= now)
+                and (expires_at is None or expires_at > now))
+
+    def next_schedule_change(self, content_type: ContentType, now: datetime) -> Optional[datetime]:
+        """The next published_at/expires_at after now, when the published set of a type changes by itself"""
+        published = self.db.query(CMSContent).filter(
+            CMSContent.content_type == content_type,
+            CMSContent.status == ContentStatus.PUBLISHED
+        )
+        upcoming = [
+            published.filter(CMSContent.published_at > now).with_entities(func.min(CMSContent.published_at)).scalar(),
+            published.filter(CMSContent.expires_at > now).with_entities(func.min(CMSContent.expires_at)).scalar()
+        ]
+        upcoming = [_utc_naive(moment) for moment in upcoming if moment is not None]
+        return min(upcoming) if upcoming else None
+
+    def get_public_view(self, content_type: ContentType, loader: Callable[..., Any], *args: Any) -> Dict[str, Any]:
+        """Get the rendered result of loader(*args) for one content type from the cache.
+
+        A cached view is rebuilt when content of that type is written or when
+        the next scheduled publish or expiry time passes, so scheduled content
+        appears and disappears on time. The body is None when loader finds nothing.
+        """
+        version = self.cache_versions.get_version(self.content_cache_key(content_type))
+        cache_key = (loader.__name__, *args)
+        now = datetime.utcnow()
+        view = cms_view_cache.get(cache_key)
+        if view and view["version"] == version and (view["valid_until"] is None or now < view["valid_until"]):
+            return view
+
+        # Look for the next boundary first: anything the loader sees past it is rebuilt again on the next read
+        valid_until = self.next_schedule_change(content_type, now)
+        result = loader(*args)
+        if isinstance(result, list):
+            body = cms_content_list.dump(result)
+        else:
+            body = cms_content_item.dump(result) if result is not None else None
+
+        view = {
+            "version": version,
+            "valid_until": valid_until,
+            "last_modified": now.replace(microsecond=0, tzinfo=timezone.utc),
+            "etag": make_etag(body) if body is not None else None,
+            "body": body
+        }
+        cms_view_cache.set(cache_key, view)
+        return view
 
     def create_content(self, content_data: CMSContentCreate) -> CMSContent:
         existing_content = self.db.query(CMSContent).filter(CMSContent.slug == content_data.slug).first()
@@ -18,9 +105,6 @@ class CMSService:
                 detail="Content with this slug already exists"
             )
 
-        meta_data_json = json.dumps(content_data.meta_data) if content_data.meta_data else None
-        gallery_images_json = json.dumps(content_data.gallery_images) if content_data.gallery_images else None
-
         db_content = CMSContent(
             title=content_data.title,
             slug=content_data.slug,
@@ -28,19 +112,22 @@ class CMSService:
             status=content_data.status,
             content=content_data.content,
             excerpt=content_data.excerpt,
-            meta_data=meta_data_json,
+            meta_data=content_data.meta_data or None,
             featured_image=content_data.featured_image,
-            gallery_images=gallery_images_json,
+            gallery_images=content_data.gallery_images or None,
             display_order=content_data.display_order,
             meta_title=content_data.meta_title,
             meta_description=content_data.meta_description,
-            meta_keywords=content_data.meta_keywords
+            meta_keywords=content_data.meta_keywords,
+            published_at=_utc_naive(content_data.published_at),
+            expires_at=_utc_naive(content_data.expires_at)
         )
 
-        if content_data.status == "published":
+        if content_data.status == ContentStatus.PUBLISHED and db_content.published_at is None:
             db_content.published_at = datetime.utcnow()
 
         self.db.add(db_content)
+        self.invalidate_content(content_data.content_type)
         self.db.commit()
         self.db.refresh(db_content)
         return db_content
@@ -52,11 +139,21 @@ class CMSService:
         return self.db.query(CMSContent).filter(CMSContent.slug == slug).first()
 
     def get_contents(self, 
-                    content_type: Optional[str] = None, 
-                    status: Optional[str] = None,
+                    content_type: Optional[ContentType] = None, 
+                    status: Optional[ContentStatus] = None,
                     published_only: bool = False,
                     skip: int = 0, 
                     limit: int = 100) -> List[CMSContent]:
+        return self.get_contents_page(content_type, status, published_only, skip=skip, limit=limit).items
+
+    def get_contents_page(self,
+                          content_type: Optional[ContentType] = None,
+                          status: Optional[ContentStatus] = None,
+                          published_only: bool = False,
+                          cursor: Optional[str] = None,
+                          skip: int = 0,
+                          limit: int = 100) -> Page:
+        """Get content in display order, paginated on (display_order, id)"""
         query = self.db.query(CMSContent)
         
         if content_type:
@@ -66,16 +163,12 @@ class CMSService:
             query = query.filter(CMSContent.status == status)
         
         if published_only:
-            query = query.filter(
-                CMSContent.status == "published",
-                CMSContent.published_at <= datetime.utcnow()
-            )
-            query = query.filter(
-                (CMSContent.expires_at.is_(None)) | 
-                (CMSContent.expires_at > datetime.utcnow())
-            )
+            query = self.filter_published(query, datetime.utcnow())
 
-        return query.order_by(CMSContent.display_order, CMSContent.created_at.desc()).offset(skip).limit(limit).all()
+        return keyset_paginate(
+            query, CMSContent, [CMSContent.display_order, CMSContent.id], limit,
+            cursor=cursor, skip=skip
+        )
 
     def update_content(self, content_id: int, content_data: CMSContentUpdate) -> Optional[CMSContent]:
         db_content = self.get_content(content_id)
@@ -95,18 +188,19 @@ class CMSService:
                     detail="Content with this slug already exists"
                 )
 
-        if 'meta_data' in update_data and update_data['meta_data'] is not None:
-            update_data['meta_data'] = json.dumps(update_data['meta_data'])
-        if 'gallery_images' in update_data and update_data['gallery_images'] is not None:
-            update_data['gallery_images'] = json.dumps(update_data['gallery_images'])
+        for field in ('published_at', 'expires_at'):
+            if field in update_data:
+                update_data[field] = _utc_naive(update_data[field])
 
         old_status = db_content.status
         for field, value in update_data.items():
             setattr(db_content, field, value)
 
-        if 'status' in update_data and update_data['status'] == "published" and old_status != "published":
+        if (update_data.get('status') == ContentStatus.PUBLISHED and old_status != ContentStatus.PUBLISHED
+                and db_content.published_at is None):
             db_content.published_at = datetime.utcnow()
 
+        self.invalidate_content(db_content.content_type)
         self.db.commit()
         self.db.refresh(db_content)
         return db_content
@@ -117,74 +211,52 @@ class CMSService:
             return False
 
         self.db.delete(db_content)
+        self.invalidate_content(db_content.content_type)
         self.db.commit()
         return True
 
     def get_published_pages(self) -> List[CMSContent]:
         """Get all published pages for navigation"""
-        return self.db.query(CMSContent).filter(
-            CMSContent.content_type == "page",
-            CMSContent.status == "published",
-            CMSContent.show_in_menu == True,
-            CMSContent.published_at <= datetime.utcnow()
-        ).filter(
-            (CMSContent.expires_at.is_(None)) | 
-            (CMSContent.expires_at > datetime.utcnow())
-        ).order_by(CMSContent.display_order).all()
+        query = self.db.query(CMSContent).filter(
+            CMSContent.content_type == ContentType.PAGE,
+            CMSContent.show_in_menu == True
+        )
+        return self.filter_published(query, datetime.utcnow()).order_by(CMSContent.display_order).all()
 
     def get_gallery_images(self, limit: int = 50) -> List[CMSContent]:
         """Get gallery images"""
-        return self.db.query(CMSContent).filter(
-            CMSContent.content_type == "gallery_image",
-            CMSContent.status == "published"
-        ).order_by(CMSContent.display_order, CMSContent.created_at.desc()).limit(limit).all()
+        query = self.db.query(CMSContent).filter(CMSContent.content_type == ContentType.GALLERY_IMAGE)
+        return self.filter_published(query, datetime.utcnow()).order_by(
+            CMSContent.display_order, CMSContent.created_at.desc()
+        ).limit(limit).all()
 
     def get_hero_banners(self, active_only: bool = True) -> List[CMSContent]:
         """Get hero banners"""
-        query = self.db.query(CMSContent).filter(CMSContent.content_type == "hero_banner")
+        query = self.db.query(CMSContent).filter(CMSContent.content_type == ContentType.HERO_BANNER)
         
         if active_only:
-            query = query.filter(
-                CMSContent.status == "published",
-                CMSContent.published_at <= datetime.utcnow()
-            ).filter(
-                (CMSContent.expires_at.is_(None)) | 
-                (CMSContent.expires_at > datetime.utcnow())
-            )
+            query = self.filter_published(query, datetime.utcnow())
         
         return query.order_by(CMSContent.display_order).all()
 
     def get_announcements(self, active_only: bool = True) -> List[CMSContent]:
         """Get announcements"""
-        query = self.db.query(CMSContent).filter(CMSContent.content_type == "announcement")
+        query = self.db.query(CMSContent).filter(CMSContent.content_type == ContentType.ANNOUNCEMENT)
         
         if active_only:
-            query = query.filter(
-                CMSContent.status == "published",
-                CMSContent.published_at <= datetime.utcnow()
-            ).filter(
-                (CMSContent.expires_at.is_(None)) | 
-                (CMSContent.expires_at > datetime.utcnow())
-            )
+            query = self.filter_published(query, datetime.utcnow())
         
         return query.order_by(CMSContent.created_at.desc()).all()
 
     def get_contact_info(self) -> Optional[CMSContent]:
         """Get contact information"""
-        return self.db.query(CMSContent).filter(
-            CMSContent.content_type == "contact_info",
-            CMSContent.status == "published"
-        ).first()
-
-    def search_content(self, search_term: str, content_type: Optional[str] = None, limit: int = 20) -> List[CMSContent]:
-        """Search content by title or content"""
-        search_pattern = f"%{search_term}%"
-        query = self.db.query(CMSContent).filter(
-            CMSContent.status == "published",
-            (CMSContent.title.ilike(search_pattern) | CMSContent.content.ilike(search_pattern))
-        )
-        
+        query = self.db.query(CMSContent).filter(CMSContent.content_type == ContentType.CONTACT_INFO)
+        return self.filter_published(query, datetime.utcnow()).order_by(CMSContent.display_order, CMSContent.id).first()
+
+    def search_content(self, search_term: str, content_type: Optional[ContentType] = None, limit: int = 20) -> List[Tuple[CMSContent, Optional[str]]]:
+        """Search published content by title, excerpt, body and keywords, best match first, with snippets"""
+        query = self.filter_published(self.db.query(CMSContent), datetime.utcnow())
         if content_type:
             query = query.filter(CMSContent.content_type == content_type)
         
-        return query.order_by(CMSContent.title).limit(limit).all()
+        return self.search_service.search(query, search_term, limit)
@@ -0,0 +1,149 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.responses import json_dumps
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from datetime import datetime
+import csv
+import enum
+import io
+import zlib
+
+class ExportFormat(enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+# Export column name -> source column; the names double as the CSV header
+ORDER_EXPORT_COLUMNS = {
+    "order_id": Order.id,
+    "order_number": Order.order_number,
+    "restaurant_id": Order.restaurant_id,
+    "order_type": Order.order_type,
+    "status": Order.status,
+    "payment_status": Order.payment_status,
+    "payment_method": Order.payment_method,
+    "customer_name": Order.customer_name,
+    "customer_phone": Order.customer_phone,
+    "customer_email": Order.customer_email,
+    "subtotal": Order.subtotal,
+    "tax_amount": Order.tax_amount,
+    "tip_amount": Order.tip_amount,
+    "total_amount": Order.total_amount,
+    "created_at": Order.created_at
+}
+ITEM_EXPORT_COLUMNS = {
+    "item_id": OrderItem.id,
+    "menu_item_id": OrderItem.menu_item_id,
+    "menu_item_name": MenuItem.name,
+    "quantity": OrderItem.quantity,
+    "unit_price": OrderItem.unit_price,
+    "item_total": OrderItem.total_price,
+    "modifiers": OrderItem.modifiers,
+    "item_special_instructions": OrderItem.special_instructions
+}
+
+CSV_HEADER = list(ORDER_EXPORT_COLUMNS) + list(ITEM_EXPORT_COLUMNS)
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _csv_value(value: Any) -> Any:
+    # Line item modifiers load as dicts; keep them as JSON inside the cell
+    if isinstance(value, (dict, list)):
+        return json_dumps(value).decode()
+    return value
+
+class OrderExportService:
+    """Streams orders with their line items without materializing the result set"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, batch_size: int = 1000, chunk_size: int = 64 * 1024):
+        # The export outlives the request-scoped session, so it opens its own
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+
+    def iter_rows(self,
+                  restaurant_id: Optional[int] = None,
+                  start_date: Optional[datetime] = None,
+                  end_date: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """Yield one flat row per order line (or per order without lines) in (created_at, id) order"""
+        columns = [column.label(name) for name, column in {**ORDER_EXPORT_COLUMNS, **ITEM_EXPORT_COLUMNS}.items()]
+        statement = select(*columns).select_from(Order).outerjoin(
+            OrderItem, OrderItem.order_id == Order.id
+        ).outerjoin(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+
+        if restaurant_id:
+            statement = statement.where(Order.restaurant_id == restaurant_id)
+        if start_date:
+            statement = statement.where(Order.created_at >= start_date)
+        if end_date:
+            statement = statement.where(Order.created_at <= end_date)
+        statement = statement.order_by(Order.created_at, Order.id, OrderItem.id)
+
+        db = self.session_factory()
+        try:
+            # yield_per streams through a server-side cursor where the driver supports one
+            result = db.execute(statement.execution_options(yield_per=self.batch_size))
+            for row in result:
+                yield {key: _export_value(value) for key, value in row._mapping.items()}
+        finally:
+            db.close()
+
+    def iter_orders(self, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """Yield one nested order document at a time, with its lines attached"""
+        current: Optional[Dict[str, Any]] = None
+        for row in self.iter_rows(**filters):
+            if current is None or current["order_id"] != row["order_id"]:
+                if current is not None:
+                    yield current
+                current = {name: row[name] for name in ORDER_EXPORT_COLUMNS}
+                current["items"] = []
+            if row["item_id"] is not None:
+                current["items"].append({name: row[name] for name in ITEM_EXPORT_COLUMNS})
+        if current is not None:
+            yield current
+
+    def iter_csv(self, **filters: Any) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        for row in self.iter_rows(**filters):
+            writer.writerow([_csv_value(row[name]) for name in CSV_HEADER])
+            if buffer.tell() >= self.chunk_size:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    def iter_ndjson(self, **filters: Any) -> Iterator[bytes]:
+        lines: List[bytes] = []
+        size = 0
+        for order in self.iter_orders(**filters):
+            line = json_dumps(order)
+            lines.append(line)
+            size += len(line) + 1
+            if size >= self.chunk_size:
+                yield b"\n".join(lines) + b"\n"
+                lines, size = [], 0
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+    def stream(self, export_format: ExportFormat, compress: bool = False, **filters: Any) -> Iterator[bytes]:
+        """Encode the export in the requested format, gzip-compressing chunk by chunk if asked"""
+        chunks = self.iter_csv(**filters) if export_format == ExportFormat.CSV else self.iter_ndjson(**filters)
+        if not compress:
+            yield from chunks
+            return
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
@@ -0,0 +1,100 @@
+from typing import Any, List, Optional, Sequence, Tuple
+import heapq
+import math
+
+EARTH_RADIUS_MILES = 3959
+
+def to_unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    """Project a latitude/longitude pair onto the unit sphere"""
+    lat_rad = math.radians(latitude)
+    lon_rad = math.radians(longitude)
+    cos_lat = math.cos(lat_rad)
+    return (cos_lat * math.cos(lon_rad), cos_lat * math.sin(lon_rad), math.sin(lat_rad))
+
+def chord_to_miles(chord_squared: float) -> float:
+    """Convert a squared chord length on the unit sphere to a great-circle distance"""
+    chord = math.sqrt(chord_squared)
+    return EARTH_RADIUS_MILES * 2 * math.asin(min(1.0, chord / 2))
+
+def miles_to_chord_squared(miles: float) -> float:
+    angle = min(math.pi, miles / EARTH_RADIUS_MILES)
+    chord = 2 * math.sin(angle / 2)
+    return chord * chord
+
+class GeoIndex:
+    """Static KD-tree over points on the sphere for k-nearest and radius queries.
+
+    Points are stored as 3-D unit vectors, so straight-line (chord) distance
+    orders results exactly like great-circle distance.
+    """
+
+    def __init__(self, points: Sequence[Tuple[float, float, Any]]):
+        self.coords: List[Tuple[float, float, float]] = []
+        self.payloads: List[Any] = []
+        for latitude, longitude, payload in points:
+            self.coords.append(to_unit_vector(latitude, longitude))
+            self.payloads.append(payload)
+
+        self.node_point: List[int] = []
+        self.node_axis: List[int] = []
+        self.node_left: List[int] = []
+        self.node_right: List[int] = []
+        self.root = self._build(list(range(len(self.coords))), 0)
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def _build(self, indices: List[int], depth: int) -> int:
+        if not indices:
+            return -1
+
+        axis = depth % 3
+        indices.sort(key=lambda i: self.coords[i][axis])
+        mid = len(indices) // 2
+
+        node = len(self.node_point)
+        self.node_point.append(indices[mid])
+        self.node_axis.append(axis)
+        self.node_left.append(-1)
+        self.node_right.append(-1)
+
+        self.node_left[node] = self._build(indices[:mid], depth + 1)
+        self.node_right[node] = self._build(indices[mid + 1:], depth + 1)
+        return node
+
+    def nearest(self, latitude: float, longitude: float, k: int, max_distance: Optional[float] = None) -> List[Tuple[float, Any]]:
+        """Return up to k (distance_in_miles, payload) pairs ordered by distance"""
+        if self.root == -1 or k <= 0:
+            return []
+
+        query = to_unit_vector(latitude, longitude)
+        bound = miles_to_chord_squared(max_distance) if max_distance is not None else math.inf
+        coords = self.coords
+
+        best: List[Tuple[float, int]] = []  # max-heap of (-chord_squared, point)
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, lower_bound = stack.pop()
+            worst = -best[0][0] if len(best) == k else bound
+            if lower_bound > worst:
+                continue
+
+            point = self.node_point[node]
+            x, y, z = coords[point]
+            distance = (query[0] - x) ** 2 + (query[1] - y) ** 2 + (query[2] - z) ** 2
+            if distance <= worst:
+                if len(best) == k:
+                    heapq.heapreplace(best, (-distance, point))
+                else:
+                    heapq.heappush(best, (-distance, point))
+
+            axis = self.node_axis[node]
+            diff = query[axis] - coords[point][axis]
+            near, far = (self.node_left[node], self.node_right[node]) if diff < 0 else (self.node_right[node], self.node_left[node])
+            if far != -1:
+                stack.append((far, max(lower_bound, diff * diff)))
+            if near != -1:
+                stack.append((near, lower_bound))
+
+        results = sorted((-negative, point) for negative, point in best)
+        return [(chord_to_miles(distance), self.payloads[point]) for distance, point in results]
@@ -0,0 +1,259 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from app.core.concurrency import get_blocking_limiter
+from app.core.config import settings
+from app.core.database import engine
+from app.core.security import get_password_executor
+from app.models.notification import NotificationOutbox, NotificationStatus
+from app.models.pos_submission import POSSubmission, POSSubmissionStatus
+from app.models.pos_webhook import POSWebhookEvent, POSWebhookStatus
+from app.services.analytics_service import order_rollup_aggregator
+from app.services.notification_service import notification_dispatcher
+from app.services.order_event_service import order_event_relay
+from app.services.pos_submission_service import pos_submission_dispatcher
+from app.services.pos_webhook_service import pos_webhook_consumer
+import asyncio
+import logging
+import signal
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def utilization_check(used: int, limit: int, **details: Any) -> Dict[str, Any]:
+    """A pool or queue is healthy while it is below readiness_max_utilization of its limit"""
+    return {
+        "ok": used < limit * settings.readiness_max_utilization,
+        "used": used,
+        "limit": limit,
+        **details
+    }
+
+class ReadinessService:
+    """Decides whether this worker should be sent traffic.
+
+    Liveness only says the process is up; readiness also needs a database
+    that answers within readiness_db_timeout, headroom in the connection
+    pool, the blocking thread pool and the password-hash queue, every
+    enabled background worker running, and no enabled outbox whose oldest
+    due row has waited readiness_max_queue_lag seconds or more. Headroom is
+    read from counters, so a saturated worker answers immediately; the
+    database and queue probes only run when a connection can be had, on
+    their own thread so they never queue behind the requests they are
+    judging. On SIGTERM the worker reports not ready but keeps serving for
+    shutdown_drain_delay seconds, so the load balancer stops routing here
+    before the server closes its listener.
+    """
+
+    def __init__(self, engine: Engine = engine, workers: Optional[Dict[str, Any]] = None,
+                 queues: Optional[Dict[str, Any]] = None):
+        self.engine = engine
+        self.workers = workers if workers is not None else {
+            "notification_dispatcher": (settings.notification_dispatcher_enabled, notification_dispatcher),
+            "order_event_relay": (settings.order_events_enabled, order_event_relay),
+            "order_rollup_aggregator": (settings.analytics_rollup_enabled, order_rollup_aggregator),
+            "pos_webhook_consumer": (settings.pos_webhooks_enabled, pos_webhook_consumer),
+            "pos_submission_dispatcher": (settings.pos_submission_enabled, pos_submission_dispatcher)
+        }
+        # name -> (enabled, model, status of rows waiting for a worker); read through each (status, next_attempt_at) index
+        self.queues = queues if queues is not None else {
+            "notification_outbox": (settings.notification_dispatcher_enabled, NotificationOutbox, NotificationStatus.PENDING),
+            "pos_webhook_inbox": (settings.pos_webhooks_enabled, POSWebhookEvent, POSWebhookStatus.PENDING),
+            "pos_submission_outbox": (settings.pos_submission_enabled, POSSubmission, POSSubmissionStatus.PENDING)
+        }
+        self.draining = False
+        self.in_flight = 0
+        self._probes: Dict[str, asyncio.Future] = {}
+        self._probe_executor: Optional[ThreadPoolExecutor] = None
+        self._server_handlers: Dict[int, Callable] = {}
+
+    def start(self):
+        self.draining = False
+        self._probes = {}
+        if self._probe_executor is None:
+            self._probe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readiness")
+
+    def pool_check(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool) or settings.db_max_overflow < 0:
+            return {"ok": True, "pool_class": type(pool).__name__}
+        return utilization_check(pool.checkedout(), pool.size() + settings.db_max_overflow)
+
+    def threads_check(self) -> Dict[str, Any]:
+        limiter = get_blocking_limiter()
+        waiting = limiter.statistics().tasks_waiting
+        check = utilization_check(int(limiter.borrowed_tokens), int(limiter.total_tokens), waiting=waiting)
+        check["ok"] = check["ok"] and not waiting
+        return check
+
+    def password_queue_check(self) -> Dict[str, Any]:
+        executor = get_password_executor().snapshot()
+        return utilization_check(executor["pending"], executor["max_workers"] + executor["max_queue"])
+
+    def workers_check(self) -> Dict[str, Any]:
+        running = {name: worker.running for name, (enabled, worker) in self.workers.items() if enabled}
+        return {"ok": all(running.values()), "running": running}
+
+    def _ping(self):
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def _queue_lags(self) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        lags = {}
+        with self.engine.connect() as connection:
+            for name, (enabled, model, status) in self.queues.items():
+                if not enabled:
+                    continue
+                oldest = connection.execute(
+                    select(func.min(model.next_attempt_at)).where(model.status == status, model.next_attempt_at <= now)
+                ).scalar()
+                if oldest is not None and oldest.tzinfo is not None:
+                    oldest = oldest.astimezone(timezone.utc).replace(tzinfo=None)
+                lags[name] = round((now - oldest).total_seconds(), 3) if oldest is not None else 0.0
+        return {"lag_seconds": lags}
+
+    async def _run_probe(self, name: str, probe: Callable[[], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run `probe` on the readiness thread within readiness_db_timeout.
+        A probe still hanging from an earlier check is awaited, not repeated."""
+        start = time.perf_counter()
+        if self._probe_executor is None:
+            return {"ok": False, "skipped": "not started"}
+        future = self._probes.get(name)
+        if future is None or future.done():
+            future = self._probes[name] = asyncio.get_running_loop().run_in_executor(self._probe_executor, probe)
+            # A probe that outlives its caller still has its error retrieved
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), settings.readiness_db_timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"no answer within {settings.readiness_db_timeout:g}s"}
+        except Exception as e:
+            return {"ok": False, "error": str(e).splitlines()[0] if str(e) else type(e).__name__}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 3), **(result or {})}
+
+    async def database_check(self) -> Dict[str, Any]:
+        """SELECT 1 within readiness_db_timeout"""
+        return await self._run_probe("database", self._ping)
+
+    async def queues_check(self) -> Dict[str, Any]:
+        """Seconds the oldest due row of each enabled outbox has waited, failing past readiness_max_queue_lag"""
+        check = await self._run_probe("queues", self._queue_lags)
+        if check["ok"] and settings.readiness_max_queue_lag > 0:
+            check["ok"] = all(lag < settings.readiness_max_queue_lag for lag in check["lag_seconds"].values())
+        return check
+
+    async def check(self) -> Dict[str, Any]:
+        """Run every readiness check; `ready` is true only when all of them pass"""
+        checks = {
+            "db_pool": self.pool_check(),
+            "blocking_threads": self.threads_check(),
+            "password_queue": self.password_queue_check(),
+            "workers": self.workers_check()
+        }
+        if self.draining:
+            checks["database"] = checks["queues"] = {"ok": False, "skipped": "draining"}
+        elif not checks["db_pool"]["ok"]:
+            # Checking out a connection would wait for db_pool_timeout; the pool check already answered
+            checks["database"] = checks["queues"] = {"ok": False, "skipped": "connection pool exhausted"}
+        else:
+            checks["database"] = await self.database_check()
+            checks["queues"] = (
+                await self.queues_check() if checks["database"]["ok"] else {"ok": False, "skipped": "database unavailable"}
+            )
+
+        return {
+            "ready": not self.draining and all(check["ok"] for check in checks.values()),
+            "draining": self.draining,
+            "in_flight": self.in_flight,
+            "checks": checks
+        }
+
+    async def drain(self, timeout: float):
+        """Report not ready from now on and wait up to `timeout` seconds for in-flight requests to finish"""
+        self.draining = True
+        deadline = time.monotonic() + timeout
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self.in_flight:
+            logger.warning("Shutting down with %d requests still in flight", self.in_flight)
+
+    def drain_on_signal(self, delay: float, signals=(signal.SIGTERM,)):
+        """Put the server's handler for `signals` behind a drain delay.
+
+        The first signal turns readiness 503 at once and hands the signal on to
+        the server after `delay` seconds; a second one is handed on straight
+        away. Only possible from the main thread, where the server installed
+        its handlers; elsewhere (tests, embedded servers) this does nothing.
+        """
+        if delay <= 0 or threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        for signum in signals:
+            handler = signal.getsignal(signum)
+            if not callable(handler):
+                continue
+            self._server_handlers[signum] = handler
+
+            def on_signal(signum, frame, handler=handler):
+                loop.call_soon_threadsafe(self._begin_drain, signum, handler, delay)
+            signal.signal(signum, on_signal)
+
+    def _begin_drain(self, signum: int, handler: Callable, delay: float):
+        if self.draining:
+            handler(signum, None)
+            return
+        logger.info("Received signal %d: not ready, shutting down in %gs", signum, delay)
+        self.draining = True
+        asyncio.get_running_loop().call_later(delay, handler, signum, None)
+
+    def restore_signals(self):
+        for signum, handler in self._server_handlers.items():
+            signal.signal(signum, handler)
+        self._server_handlers.clear()
+
+    def close(self):
+        if self._probe_executor is not None:
+            self._probe_executor.shutdown(wait=False)
+            self._probe_executor = None
+
+def is_event_stream(message: Dict[str, Any]) -> bool:
+    return any(
+        name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+        for name, value in message.get("headers", [])
+    )
+
+class InFlightMiddleware:
+    """ASGI middleware counting the HTTP requests in progress, so shutdown can wait for them.
+    Event streams stop counting once their response starts."""
+
+    def __init__(self, app, readiness_service: ReadinessService):
+        self.app = app
+        self.readiness_service = readiness_service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        counted = True
+        self.readiness_service.in_flight += 1
+
+        async def send_counted(message):
+            nonlocal counted
+            if counted and message["type"] == "http.response.start" and is_event_stream(message):
+                # A server-sent event stream stays open until the client leaves; shutdown does not wait for it
+                counted = False
+                self.readiness_service.in_flight -= 1
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_counted)
+        finally:
+            if counted:
+                self.readiness_service.in_flight -= 1
+
+readiness_service = ReadinessService()
@@ -2,13 +2,30 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from app.models.menu import Menu, MenuItem, MenuCategory, MenuStatus
 from app.models.restaurant import Restaurant
-from app.schemas.menu import MenuCreate, MenuUpdate, MenuItemCreate, MenuItemUpdate, MenuCategoryCreate, MenuCategoryUpdate
+from app.schemas.menu import MenuCreate, MenuUpdate, MenuItemCreate, MenuItemUpdate, MenuCategoryCreate, MenuCategoryUpdate, MenuWithItems
+from app.services.cache_service import CacheVersionService
+from app.services.search_service import MenuSearchService
+from app.core.cache import LRUCache, make_etag
+from app.core.responses import ResponseSerializer
+from app.core.config import settings
 from fastapi import HTTPException, status
-import json
+
+menu_snapshot_cache = LRUCache(max_entries=settings.menu_snapshot_cache_size)
+menu_snapshot_serializer = ResponseSerializer(MenuWithItems)
 
 class MenuService:
     def __init__(self, db: Session):
         self.db = db
+        self.cache_versions = CacheVersionService(db)
+        self.search_service = MenuSearchService(db)
+
+    def menu_cache_key(self, menu_id: int) -> str:
+        return f"menu:{menu_id}"
+
+    def invalidate_menu(self, menu_id: int):
+        """Bump the menu snapshot version; cached snapshots go stale on commit"""
+        self.cache_versions.bump_version(self.menu_cache_key(menu_id))
+        self.search_service.invalidate()
 
     def create_menu(self, menu_data: MenuCreate) -> Menu:
         restaurant = self.db.query(Restaurant).filter(Restaurant.id == menu_data.restaurant_id).first()
@@ -26,6 +43,8 @@ class MenuService:
         )
         
         self.db.add(db_menu)
+        self.db.flush()
+        self.invalidate_menu(db_menu.id)
         self.db.commit()
         self.db.refresh(db_menu)
         return db_menu
@@ -33,6 +52,32 @@ class MenuService:
     def get_menu(self, menu_id: int) -> Optional[Menu]:
         return self.db.query(Menu).filter(Menu.id == menu_id).first()
 
+    def build_menu_snapshot(self, menu_id: int) -> Optional[bytes]:
+        """Render a menu with its active categories and available items as JSON"""
+        menu = self.get_menu(menu_id)
+        if not menu:
+            return None
+
+        menu_dict = menu.__dict__.copy()
+        menu_dict['categories'] = self.get_menu_categories(menu_id)
+        menu_dict['items'] = self.get_menu_items(menu_id)
+        return menu_snapshot_serializer.dump(menu_dict)
+
+    def get_menu_snapshot(self, menu_id: int) -> Optional[Dict[str, Any]]:
+        """Get the pre-rendered menu snapshot, rebuilding it when its version changed"""
+        version = self.cache_versions.get_version(self.menu_cache_key(menu_id))
+        snapshot = menu_snapshot_cache.get(menu_id)
+        if snapshot and snapshot["version"] == version:
+            return snapshot
+
+        body = self.build_menu_snapshot(menu_id)
+        if body is None:
+            return None
+
+        snapshot = {"version": version, "etag": make_etag(body), "body": body}
+        menu_snapshot_cache.set(menu_id, snapshot)
+        return snapshot
+
     def get_restaurant_menus(self, restaurant_id: int, active_only: bool = True) -> List[Menu]:
         query = self.db.query(Menu).filter(Menu.restaurant_id == restaurant_id)
         if active_only:
@@ -48,6 +93,7 @@ class MenuService:
         for field, value in update_data.items():
             setattr(db_menu, field, value)
 
+        self.invalidate_menu(menu_id)
         self.db.commit()
         self.db.refresh(db_menu)
         return db_menu
@@ -58,6 +104,7 @@ class MenuService:
             return False
 
         self.db.delete(db_menu)
+        self.invalidate_menu(menu_id)
         self.db.commit()
         return True
 
@@ -78,6 +125,7 @@ class MenuService:
         )
         
         self.db.add(db_category)
+        self.invalidate_menu(category_data.menu_id)
         self.db.commit()
         self.db.refresh(db_category)
         return db_category
@@ -100,6 +148,7 @@ class MenuService:
         for field, value in update_data.items():
             setattr(db_category, field, value)
 
+        self.invalidate_menu(db_category.menu_id)
         self.db.commit()
         self.db.refresh(db_category)
         return db_category
@@ -110,6 +159,7 @@ class MenuService:
             return False
 
         self.db.delete(db_category)
+        self.invalidate_menu(db_category.menu_id)
         self.db.commit()
         return True
 
@@ -129,12 +179,6 @@ class MenuService:
                     detail="Menu category not found"
                 )
 
-        ingredients_json = json.dumps(item_data.ingredients) if item_data.ingredients else None
-        allergens_json = json.dumps(item_data.allergens) if item_data.allergens else None
-        dietary_info_json = json.dumps(item_data.dietary_info) if item_data.dietary_info else None
-        images_json = json.dumps(item_data.images) if item_data.images else None
-        modifiers_json = json.dumps(item_data.modifiers) if item_data.modifiers else None
-
         db_item = MenuItem(
             menu_id=item_data.menu_id,
             category_id=item_data.category_id,
@@ -142,16 +186,17 @@ class MenuService:
             description=item_data.description,
             price=item_data.price,
             calories=item_data.calories,
-            ingredients=ingredients_json,
-            allergens=allergens_json,
-            dietary_info=dietary_info_json,
+            ingredients=item_data.ingredients or None,
+            allergens=item_data.allergens or None,
+            dietary_info=item_data.dietary_info or None,
             image_url=item_data.image_url,
-            images=images_json,
+            images=item_data.images or None,
             display_order=item_data.display_order,
-            modifiers=modifiers_json
+            modifiers=item_data.modifiers or None
         )
         
         self.db.add(db_item)
+        self.invalidate_menu(item_data.menu_id)
         self.db.commit()
         self.db.refresh(db_item)
         return db_item
@@ -176,21 +221,11 @@ class MenuService:
             return None
 
         update_data = item_data.dict(exclude_unset=True)
-        
-        if 'ingredients' in update_data and update_data['ingredients'] is not None:
-            update_data['ingredients'] = json.dumps(update_data['ingredients'])
-        if 'allergens' in update_data and update_data['allergens'] is not None:
-            update_data['allergens'] = json.dumps(update_data['allergens'])
-        if 'dietary_info' in update_data and update_data['dietary_info'] is not None:
-            update_data['dietary_info'] = json.dumps(update_data['dietary_info'])
-        if 'images' in update_data and update_data['images'] is not None:
-            update_data['images'] = json.dumps(update_data['images'])
-        if 'modifiers' in update_data and update_data['modifiers'] is not None:
-            update_data['modifiers'] = json.dumps(update_data['modifiers'])
 
         for field, value in update_data.items():
             setattr(db_item, field, value)
 
+        self.invalidate_menu(db_item.menu_id)
         self.db.commit()
         self.db.refresh(db_item)
         return db_item
@@ -201,6 +236,7 @@ class MenuService:
             return False
 
         self.db.delete(db_item)
+        self.invalidate_menu(db_item.menu_id)
         self.db.commit()
         return True
 
@@ -212,11 +248,11 @@ class MenuService:
             MenuItem.is_available == True
         ).order_by(MenuItem.display_order).limit(limit).all()
 
-    def search_menu_items(self, restaurant_id: int, search_term: str, limit: int = 20) -> List[MenuItem]:
-        """Search menu items by name or description"""
-        search_pattern = f"%{search_term}%"
-        return self.db.query(MenuItem).join(Menu).filter(
-            Menu.restaurant_id == restaurant_id,
-            MenuItem.is_available == True,
-            (MenuItem.name.ilike(search_pattern) | MenuItem.description.ilike(search_pattern))
-        ).order_by(MenuItem.name).limit(limit).all()
+    def search_menu_items(self,
+                          restaurant_id: int,
+                          search_term: str,
+                          limit: int = 20,
+                          exclude_allergens: Optional[List[str]] = None,
+                          dietary: Optional[List[str]] = None) -> List[MenuItem]:
+        """Search menu items by name or description, best matches first"""
+        return self.search_service.search(restaurant_id, search_term, limit, exclude_allergens, dietary)
@@ -0,0 +1,316 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from dataclasses import asdict, dataclass, field
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.menu import Menu, MenuCategory, MenuItem, MenuStatus
+from app.services.menu_service import MenuService
+from datetime import datetime, timezone
+import hashlib
+import json
+import time
+
+@dataclass
+class SyncCounts:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+@dataclass
+class MenuSyncStats:
+    provider: str
+    menus: SyncCounts = field(default_factory=SyncCounts)
+    categories: SyncCounts = field(default_factory=SyncCounts)
+    items: SyncCounts = field(default_factory=SyncCounts)
+    duration_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+@dataclass
+class CatalogMenu:
+    """One POS menu normalized to our column names, keyed by the provider's ids"""
+    external_id: str
+    name: str
+    categories: List[Dict[str, Any]] = field(default_factory=list)
+    items: List[Dict[str, Any]] = field(default_factory=list)  # "category" holds the provider category id
+
+
+@dataclass(frozen=True)
+class _ProviderColumns:
+    menu: Any
+    category: Any
+    item: Any
+
+PROVIDER_COLUMNS = {
+    "toast": _ProviderColumns(Menu.toast_menu_id, MenuCategory.toast_category_id, MenuItem.toast_item_id),
+    "clover": _ProviderColumns(Menu.clover_menu_id, MenuCategory.clover_category_id, MenuItem.clover_item_id)
+}
+
+def content_hash(row: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()
+
+# Spacing between positional display_order values, leaving room for later inserts in between
+DISPLAY_ORDER_GAP = 1024
+
+def stable_display_orders(external_ids: Sequence[str], stored: Dict[str, int]) -> List[int]:
+    """display_order values for rows in catalog order, reusing the stored ones while their order still holds.
+
+    Positions alone would shift every row after a removal or insert and so
+    change its hash; this way only a reorder, or an insert with no gap left,
+    renumbers the whole list.
+    """
+    upper_bounds: List[Optional[int]] = []
+    upper = None
+    for external_id in reversed(external_ids):
+        upper_bounds.append(upper)
+        upper = stored.get(external_id, upper)
+    upper_bounds.reverse()
+
+    orders: List[int] = []
+    previous: Optional[int] = None
+    for external_id, upper in zip(external_ids, upper_bounds):
+        value = stored.get(external_id)
+        if value is None:
+            if upper is None:
+                value = 0 if previous is None else previous + DISPLAY_ORDER_GAP
+            else:
+                value = upper - DISPLAY_ORDER_GAP if previous is None else (previous + upper) // 2
+        if previous is not None and value <= previous:
+            return [position * DISPLAY_ORDER_GAP for position in range(len(external_ids))]
+        orders.append(value)
+        previous = value
+    return orders
+
+def _chunks(rows: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def parse_toast_menus(payload: Any) -> List[CatalogMenu]:
+    """Map a Toast menus response (menus -> menuGroups -> menuItems) onto our menu shape"""
+    menus = payload.get("menus", []) if isinstance(payload, dict) else payload or []
+    catalogs = []
+    for menu in menus:
+        catalog = CatalogMenu(external_id=menu["guid"], name=menu.get("name") or "Toast menu")
+        for group_order, group in enumerate(menu.get("menuGroups") or []):
+            catalog.categories.append({
+                "toast_category_id": group["guid"],
+                "name": group.get("name") or "",
+                "description": group.get("description"),
+                "display_order": group_order,
+                "is_active": True
+            })
+            for item_order, item in enumerate(group.get("menuItems") or []):
+                # Toast menus carry no stock state; availability comes from stock webhooks
+                catalog.items.append({
+                    "toast_item_id": item["guid"],
+                    "category": group["guid"],
+                    "name": item.get("name") or "",
+                    "description": item.get("description"),
+                    "price": float(item.get("price") or 0),
+                    "display_order": item_order
+                })
+        catalogs.append(catalog)
+    return catalogs
+
+def parse_clover_items(merchant_id: str, elements: List[Dict[str, Any]]) -> List[CatalogMenu]:
+    """Map Clover inventory items (with expanded categories) onto a single menu per merchant"""
+    catalog = CatalogMenu(external_id=merchant_id, name="Clover menu")
+    seen_categories = set()
+    for item_order, item in enumerate(elements):
+        categories = (item.get("categories") or {}).get("elements") or []
+        category = categories[0] if categories else None
+        if category and category["id"] not in seen_categories:
+            seen_categories.add(category["id"])
+            catalog.categories.append({
+                "clover_category_id": category["id"],
+                "name": category.get("name") or "",
+                "description": None,
+                "display_order": category.get("sortOrder") or 0,
+                "is_active": True
+            })
+        catalog.items.append({
+            "clover_item_id": item["id"],
+            "category": category["id"] if category else None,
+            "name": item.get("name") or "",
+            "description": item.get("alternateName"),
+            "price": (item.get("price") or 0) / 100,  # Clover prices are in cents
+            "display_order": item_order,
+            "is_available": item.get("available", True) and not item.get("hidden", False)
+        })
+    return [catalog]
+
+class MenuSyncService:
+    """Applies POS catalogs to menus, categories and items as a diff.
+
+    Each synced row stores a hash of the POS fields it was last written
+    from, so an unchanged catalog costs one indexed read per menu and no
+    writes. Changes go out as batched INSERT/UPDATE statements; rows that
+    disappear from the POS are soft-deleted so past orders keep their items.
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.menu_sync_batch_size
+
+    def sync_toast_menus(self, restaurant_id: int, payload: Any) -> MenuSyncStats:
+        return self.apply(restaurant_id, "toast", parse_toast_menus(payload))
+
+    def sync_clover_inventory(self, restaurant_id: int, merchant_id: str, elements: List[Dict[str, Any]]) -> MenuSyncStats:
+        return self.apply(restaurant_id, "clover", parse_clover_items(merchant_id, elements))
+
+    def apply(self, restaurant_id: int, provider: str, catalogs: List[CatalogMenu]) -> MenuSyncStats:
+        """Bring a restaurant's menus from one provider in line with the catalogs, in one transaction"""
+        started = time.perf_counter()
+        columns = PROVIDER_COLUMNS[provider]
+        stats = MenuSyncStats(provider=provider)
+        changed_menus = set()
+        now = datetime.now(timezone.utc)
+
+        existing_menus = {
+            getattr(menu, columns.menu.key): menu
+            for menu in self.db.query(Menu).filter(Menu.restaurant_id == restaurant_id, columns.menu.isnot(None))
+        }
+        for catalog in catalogs:
+            menu = existing_menus.pop(catalog.external_id, None)
+            if menu is None:
+                menu = Menu(restaurant_id=restaurant_id, name=catalog.name, **{columns.menu.key: catalog.external_id})
+                self.db.add(menu)
+                self.db.flush()
+                stats.menus.inserted += 1
+                changed_menus.add(menu.id)
+            elif menu.name != catalog.name or menu.status != MenuStatus.ACTIVE:
+                menu.name = catalog.name
+                menu.status = MenuStatus.ACTIVE
+                stats.menus.updated += 1
+                changed_menus.add(menu.id)
+            else:
+                stats.menus.unchanged += 1
+
+            # Clover categories carry their own sortOrder; Toast groups are ordered by position
+            if self._sync_rows(MenuCategory, columns.category, menu.id, catalog.categories, stats.categories, now,
+                               deleted_values={"is_active": False}, positional=provider == "toast"):
+                changed_menus.add(menu.id)
+
+            category_ids = dict(
+                self.db.query(columns.category, MenuCategory.id).filter(
+                    MenuCategory.menu_id == menu.id, columns.category.isnot(None)
+                )
+            )
+            items = []
+            for item in catalog.items:
+                row = {key: value for key, value in item.items() if key != "category"}
+                row["category_id"] = category_ids.get(item["category"])
+                items.append(row)
+            if self._sync_rows(MenuItem, columns.item, menu.id, items, stats.items, now,
+                               deleted_values={"is_available": False, "pos_deleted_at": now},
+                               restored_values={"is_available": True, "pos_deleted_at": None}, positional=True):
+                changed_menus.add(menu.id)
+
+        # Menus the POS no longer has are retired, not deleted
+        for menu in existing_menus.values():
+            if menu.status != MenuStatus.INACTIVE:
+                menu.status = MenuStatus.INACTIVE
+                stats.menus.deleted += 1
+                changed_menus.add(menu.id)
+
+        menu_service = MenuService(self.db)
+        for menu_id in changed_menus:
+            menu_service.invalidate_menu(menu_id)
+        self.db.commit()
+
+        stats.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        return stats
+
+    def _sync_rows(self, model: Any, external_column: Any, menu_id: int, rows: List[Dict[str, Any]],
+                   counts: SyncCounts, now: datetime, deleted_values: Dict[str, Any],
+                   restored_values: Optional[Dict[str, Any]] = None, positional: bool = False) -> bool:
+        """Write the inserts, updates and soft-deletes for one table; returns whether anything changed.
+
+        With positional set, display_order follows the rows' order in the
+        catalog (see stable_display_orders) rather than the parsed value.
+        """
+        existing = {
+            external_id: (row_id, digest, display_order)
+            for row_id, external_id, digest, display_order in self.db.query(
+                model.id, external_column, model.pos_sync_hash, model.display_order
+            ).filter(model.menu_id == menu_id, external_column.isnot(None))
+        }
+
+        unique, seen = [], set()
+        for row in rows:
+            external_id = row[external_column.key]
+            if external_id not in seen:
+                seen.add(external_id)
+                unique.append(row)
+        if positional:
+            # Soft-deleted rows (no hash) coming back are placed like new ones
+            stored = {
+                external_id: display_order
+                for external_id, (_, digest, display_order) in existing.items() if digest and display_order is not None
+            }
+            orders = stable_display_orders([row[external_column.key] for row in unique], stored)
+            unique = [{**row, "display_order": order} for row, order in zip(unique, orders)]
+
+        inserts, updates = [], []
+        for row in unique:
+            digest = content_hash(row)
+            current = existing.get(row[external_column.key])
+            if current is None:
+                inserts.append({**row, "menu_id": menu_id, "pos_sync_hash": digest})
+            elif current[1] != digest:
+                # A row without a hash is being adopted or was soft-deleted and came back
+                restored = (restored_values or {}) if current[1] is None else {}
+                updates.append({**restored, **row, "id": current[0], "pos_sync_hash": digest, "updated_at": now})
+            else:
+                counts.unchanged += 1
+
+        # Rows without a hash were never synced or are already soft-deleted
+        removed = [row_id for external_id, (row_id, digest, _) in existing.items() if external_id not in seen and digest]
+
+        for chunk in _chunks(inserts, self.batch_size):
+            self.db.execute(insert(model), chunk)
+        for chunk in _chunks(updates, self.batch_size):
+            self.db.execute(update(model), chunk)
+        for chunk in _chunks(removed, self.batch_size):
+            self.db.execute(
+                update(model).where(model.id.in_(chunk)).values(pos_sync_hash=None, updated_at=now, **deleted_values),
+                execution_options={"synchronize_session": False}
+            )
+
+        counts.inserted += len(inserts)
+        counts.updated += len(updates)
+        counts.deleted += len(removed)
+        return bool(inserts or updates or removed)
+
+    def apply_item_changes(self, provider: str, changes: Dict[str, Dict[str, Any]]) -> int:
+        """Apply field changes to items keyed by the provider's item id, in one transaction"""
+        updated = self.record_item_changes(provider, changes)
+        self.db.commit()
+        return updated
+
+    def record_item_changes(self, provider: str, changes: Dict[str, Dict[str, Any]]) -> int:
+        """Stage field changes to items keyed by the provider's item id, batched by primary key.
+
+        The updates and the menu cache bumps take effect when the caller commits.
+        """
+        if not changes:
+            return 0
+        external_column = PROVIDER_COLUMNS[provider].item
+        now = datetime.now(timezone.utc)
+
+        rows, menu_ids = [], set()
+        for chunk in _chunks(list(changes), self.batch_size):
+            for row_id, menu_id, external_id in self.db.query(MenuItem.id, MenuItem.menu_id, external_column).filter(
+                external_column.in_(chunk)
+            ):
+                rows.append({**changes[external_id], "id": row_id, "updated_at": now})
+                menu_ids.add(menu_id)
+
+        for chunk in _chunks(rows, self.batch_size):
+            self.db.execute(update(MenuItem), chunk)
+        menu_service = MenuService(self.db)
+        for menu_id in menu_ids:
+            menu_service.invalidate_menu(menu_id)
+        return len(rows)
@@ -0,0 +1,270 @@
+from typing import List, Optional, Dict, Any, Callable
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.orm import Session
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.notification import NotificationOutbox, NotificationKind, NotificationStatus
+from app.services.sms_service import SMSService
+from datetime import datetime, timedelta
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class NotificationService:
+    """Writes customer notifications to the outbox inside the caller's transaction"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, kind: NotificationKind, phone_number: str, payload: Dict[str, Any], order_id: Optional[int] = None) -> NotificationOutbox:
+        """Add a notification to the outbox; it is sent once the caller commits"""
+        notification = NotificationOutbox(
+            order_id=order_id,
+            kind=kind,
+            status=NotificationStatus.PENDING,
+            phone_number=phone_number,
+            payload=json.dumps(payload),
+            attempts=0,
+            next_attempt_at=datetime.utcnow()
+        )
+        self.db.add(notification)
+        return notification
+
+    def enqueue_otp(self, phone_number: str, otp_code: str, order_id: Optional[int] = None) -> NotificationOutbox:
+        return self.enqueue(NotificationKind.OTP, phone_number, {"otp_code": otp_code}, order_id)
+
+    def enqueue_order_confirmation(self, phone_number: str, order_number: str, restaurant_name: str, order_id: Optional[int] = None) -> NotificationOutbox:
+        return self.enqueue(
+            NotificationKind.ORDER_CONFIRMATION,
+            phone_number,
+            {"order_number": order_number, "restaurant_name": restaurant_name},
+            order_id
+        )
+
+    def enqueue_order_ready(self, phone_number: str, order_number: str, order_id: Optional[int] = None) -> NotificationOutbox:
+        return self.enqueue(NotificationKind.ORDER_READY, phone_number, {"order_number": order_number}, order_id)
+
+    def get_dead_letters(self, limit: int = 100) -> List[NotificationOutbox]:
+        """Get notifications that exhausted their retries"""
+        return self.db.query(NotificationOutbox).filter(
+            NotificationOutbox.status == NotificationStatus.DEAD
+        ).order_by(NotificationOutbox.id.desc()).limit(limit).all()
+
+    def prune(self, cutoff: datetime) -> int:
+        """Delete sent notifications older than the cutoff"""
+        result = self.db.execute(
+            delete(NotificationOutbox).where(
+                NotificationOutbox.status == NotificationStatus.SENT,
+                NotificationOutbox.sent_at < cutoff
+            )
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def requeue(self, notification_id: int) -> bool:
+        """Move a dead-lettered notification back to the pending queue"""
+        notification = self.db.query(NotificationOutbox).filter(NotificationOutbox.id == notification_id).first()
+        if not notification or notification.status != NotificationStatus.DEAD:
+            return False
+
+        notification.status = NotificationStatus.PENDING
+        notification.attempts = 0
+        notification.next_attempt_at = datetime.utcnow()
+        self.db.commit()
+        return True
+
+class NotificationDispatcher:
+    """Background task that drains the notification outbox with bounded concurrency.
+
+    Writers call notify() after committing so a new OTP goes out at once
+    rather than on the next poll. Payloads are cleared once a message is
+    sent, and sent rows are pruned after notification_retention_hours.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, sms_service: Optional[SMSService] = None):
+        self.session_factory = session_factory
+        self.sms_service = sms_service
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_pruned: Optional[datetime] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        if self.sms_service is None:
+            self.sms_service = SMSService()
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def notify(self):
+        """Wake the dispatcher after notifications were queued; safe to call from any thread"""
+        if self._loop is not None and self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self):
+        semaphore = asyncio.Semaphore(settings.notification_concurrency)
+        while not self._stopping.is_set():
+            try:
+                dispatched = await self.dispatch_batch(semaphore)
+                await self._maybe_prune()
+            except Exception:
+                logger.exception("Notification dispatch cycle failed")
+                dispatched = 0
+
+            if dispatched < settings.notification_batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.notification_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def dispatch_batch(self, semaphore: Optional[asyncio.Semaphore] = None) -> int:
+        """Claim one batch of due notifications and deliver them concurrently"""
+        if self.sms_service is None:
+            self.sms_service = SMSService()
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.notification_concurrency)
+
+        notifications = await run_blocking(self._claim_batch)
+
+        async def deliver(notification: Dict[str, Any]):
+            async with semaphore:
+                error = None
+                try:
+                    sent = await run_blocking(self._send, notification)
+                    if not sent:
+                        error = "SMS provider rejected the message"
+                except Exception as e:
+                    sent = False
+                    error = str(e)
+                await run_blocking(self._record_result, notification["id"], sent, error)
+
+        await asyncio.gather(*(deliver(notification) for notification in notifications))
+        return len(notifications)
+
+    def _claim_batch(self) -> List[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            lease_expired = now - timedelta(seconds=settings.notification_lease_seconds)
+            claimable = or_(
+                and_(
+                    NotificationOutbox.status == NotificationStatus.PENDING,
+                    NotificationOutbox.next_attempt_at <= now
+                ),
+                and_(
+                    NotificationOutbox.status == NotificationStatus.SENDING,
+                    NotificationOutbox.locked_at < lease_expired
+                )
+            )
+
+            candidates = db.query(NotificationOutbox).filter(claimable).order_by(
+                NotificationOutbox.id
+            ).limit(settings.notification_batch_size).all()
+
+            claimed = []
+            for notification in candidates:
+                result = db.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id == notification.id, claimable)
+                    .values(status=NotificationStatus.SENDING, locked_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 1:
+                    claimed.append({
+                        "id": notification.id,
+                        "kind": notification.kind,
+                        "phone_number": notification.phone_number,
+                        "payload": json.loads(notification.payload) if notification.payload else {}
+                    })
+
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def _send(self, notification: Dict[str, Any]) -> bool:
+        payload = notification["payload"]
+        phone_number = notification["phone_number"]
+        kind = notification["kind"]
+
+        if kind == NotificationKind.OTP:
+            return self.sms_service.send_otp(phone_number, payload["otp_code"])
+        if kind == NotificationKind.ORDER_CONFIRMATION:
+            return self.sms_service.send_order_confirmation(
+                phone_number,
+                payload["order_number"],
+                payload["restaurant_name"]
+            )
+        if kind == NotificationKind.ORDER_READY:
+            return self.sms_service.send_order_ready_notification(phone_number, payload["order_number"])
+
+        raise ValueError(f"Unknown notification kind: {kind}")
+
+    def _record_result(self, notification_id: int, sent: bool, error: Optional[str] = None):
+        db = self.session_factory()
+        try:
+            notification = db.query(NotificationOutbox).filter(NotificationOutbox.id == notification_id).first()
+            if not notification:
+                return
+
+            now = datetime.utcnow()
+            notification.locked_at = None
+            if sent:
+                notification.status = NotificationStatus.SENT
+                notification.sent_at = now
+                notification.last_error = None
+                # The message is out; an OTP code has no business staying in the table
+                notification.payload = None
+            else:
+                notification.attempts += 1
+                notification.last_error = error
+                if notification.attempts >= settings.notification_max_attempts:
+                    notification.status = NotificationStatus.DEAD
+                    logger.error("Notification %s dead-lettered after %s attempts: %s", notification_id, notification.attempts, error)
+                else:
+                    delay = settings.notification_retry_base_seconds * (2 ** (notification.attempts - 1))
+                    notification.status = NotificationStatus.PENDING
+                    notification.next_attempt_at = now + timedelta(seconds=delay)
+
+            db.commit()
+        finally:
+            db.close()
+
+    async def _maybe_prune(self):
+        now = datetime.utcnow()
+        if self._last_pruned is not None and now - self._last_pruned < timedelta(hours=1):
+            return
+        self._last_pruned = now
+        cutoff = now - timedelta(hours=settings.notification_retention_hours)
+        await run_blocking(self._prune, cutoff)
+
+    def _prune(self, cutoff: datetime):
+        db = self.session_factory()
+        try:
+            deleted = NotificationService(db).prune(cutoff)
+            if deleted:
+                logger.info("Pruned %s sent notifications older than %s", deleted, cutoff)
+        finally:
+            db.close()
+
+notification_dispatcher = NotificationDispatcher()
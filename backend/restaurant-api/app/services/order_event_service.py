@@ -0,0 +1,234 @@
+from typing import Any, Callable, Dict, List, Optional, Set
+from dataclasses import dataclass
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.order import Order, OrderStatus
+from app.models.order_event import OrderEvent, OrderEventType
+from datetime import datetime, timedelta
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Serializes order event writers on Postgres so ids become visible in commit order
+_POSTGRES_EVENT_LOCK_KEY = 7303
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def order_event_payload(order: Order, previous_status: Optional[OrderStatus] = None) -> Dict[str, Any]:
+    """Summarize an order the way kitchen displays render it"""
+    payload = {
+        "id": order.id,
+        "order_number": order.order_number,
+        "order_type": order.order_type.value,
+        "status": order.status.value if order.status else OrderStatus.PENDING.value,
+        "customer_name": order.customer_name,
+        "total_amount": order.total_amount,
+        "special_instructions": order.special_instructions,
+        "estimated_ready_time": _isoformat(order.estimated_ready_time),
+        "created_at": _isoformat(order.created_at)
+    }
+    if previous_status is not None:
+        payload["previous_status"] = previous_status.value
+    return payload
+
+@dataclass(frozen=True)
+class PublishedOrderEvent:
+    id: int
+    restaurant_id: int
+    frame: bytes  # Encoded once as an SSE frame and shared by every subscriber
+
+    @classmethod
+    def from_row(cls, event: OrderEvent) -> "PublishedOrderEvent":
+        frame = f"id: {event.id}\nevent: {event.event_type.value}\ndata: {event.payload}\n\n"
+        return cls(id=event.id, restaurant_id=event.restaurant_id, frame=frame.encode())
+
+class OrderEventService:
+    """Appends order events inside the caller's transaction and reads them back for replay"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, order: Order, event_type: OrderEventType, previous_status: Optional[OrderStatus] = None) -> OrderEvent:
+        """Add an event to the log; subscribers see it once the caller commits"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _POSTGRES_EVENT_LOCK_KEY})
+
+        event = OrderEvent(
+            restaurant_id=order.restaurant_id,
+            order_id=order.id,
+            event_type=event_type,
+            payload=json.dumps(order_event_payload(order, previous_status), separators=(",", ":"))
+        )
+        self.db.add(event)
+        return event
+
+    def get_events_after(self, after_id: int, restaurant_id: Optional[int] = None, limit: int = 500) -> List[OrderEvent]:
+        query = self.db.query(OrderEvent).filter(OrderEvent.id > after_id)
+        if restaurant_id is not None:
+            query = query.filter(OrderEvent.restaurant_id == restaurant_id)
+        return query.order_by(OrderEvent.id).limit(limit).all()
+
+    def get_latest_event_id(self) -> int:
+        return self.db.query(func.max(OrderEvent.id)).scalar() or 0
+
+    def prune(self, older_than: datetime) -> int:
+        deleted = self.db.query(OrderEvent).filter(OrderEvent.created_at < older_than).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+class OrderEventSubscription:
+    """A bounded per-connection queue; a None entry means the subscriber fell behind"""
+
+    def __init__(self, restaurant_id: int, max_size: int):
+        self.restaurant_id = restaurant_id
+        self.queue: "asyncio.Queue[Optional[PublishedOrderEvent]]" = asyncio.Queue(max_size)
+
+    def push(self, event: PublishedOrderEvent):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog and tell the stream to end; the client resumes from the log via Last-Event-ID
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self) -> Optional[PublishedOrderEvent]:
+        return await self.queue.get()
+
+class OrderEventHub:
+    """In-process fan-out of order events to the streams connected to this worker"""
+
+    def __init__(self):
+        self._subscriptions: Dict[int, Set[OrderEventSubscription]] = {}
+
+    def subscribe(self, restaurant_id: int) -> OrderEventSubscription:
+        subscription = OrderEventSubscription(restaurant_id, settings.order_events_queue_size)
+        self._subscriptions.setdefault(restaurant_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: OrderEventSubscription):
+        subscriptions = self._subscriptions.get(subscription.restaurant_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.restaurant_id]
+
+    def publish(self, event: PublishedOrderEvent):
+        for subscription in list(self._subscriptions.get(event.restaurant_id, ())):
+            subscription.push(event)
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+class OrderEventRelay:
+    """Background task that tails the order event log and publishes new events to the hub.
+
+    The log is the broker: every worker runs its own relay, so a change
+    committed by one worker reaches screens connected to any other within
+    one poll interval. Writers in this process call notify() to skip the wait.
+    """
+
+    def __init__(self, hub: OrderEventHub, session_factory: Callable[[], Session] = SessionLocal):
+        self.hub = hub
+        self.session_factory = session_factory
+        self.last_event_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_pruned: Optional[datetime] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def notify(self):
+        """Wake the relay after a commit; safe to call from any thread"""
+        if self._loop is not None and self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self):
+        self.last_event_id = await run_blocking(self._load_latest_event_id)
+        while not self._stopping.is_set():
+            try:
+                published = await self.poll()
+                await self._maybe_prune()
+            except Exception:
+                logger.exception("Order event relay cycle failed")
+                published = 0
+
+            if published < settings.order_events_batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.order_events_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def poll(self) -> int:
+        """Publish events committed since the last poll"""
+        events = await run_blocking(self._load_events_after, self.last_event_id or 0, None, settings.order_events_batch_size)
+        for event in events:
+            self.hub.publish(event)
+            self.last_event_id = event.id
+        return len(events)
+
+    async def replay(self, restaurant_id: int, after_id: int) -> List[PublishedOrderEvent]:
+        """Load a restaurant's events after a Last-Event-ID, oldest first"""
+        return await run_blocking(self._load_events_after, after_id, restaurant_id, settings.order_events_replay_limit)
+
+    async def _maybe_prune(self):
+        now = datetime.utcnow()
+        if self._last_pruned is not None and now - self._last_pruned < timedelta(hours=1):
+            return
+        self._last_pruned = now
+        cutoff = now - timedelta(hours=settings.order_events_retention_hours)
+        await run_blocking(self._prune, cutoff)
+
+    def _load_latest_event_id(self) -> int:
+        db = self.session_factory()
+        try:
+            return OrderEventService(db).get_latest_event_id()
+        finally:
+            db.close()
+
+    def _load_events_after(self, after_id: int, restaurant_id: Optional[int], limit: int) -> List[PublishedOrderEvent]:
+        db = self.session_factory()
+        try:
+            events = OrderEventService(db).get_events_after(after_id, restaurant_id, limit)
+            return [PublishedOrderEvent.from_row(event) for event in events]
+        finally:
+            db.close()
+
+    def _prune(self, cutoff: datetime):
+        db = self.session_factory()
+        try:
+            deleted = OrderEventService(db).prune(cutoff)
+            if deleted:
+                logger.info("Pruned %s order events older than %s", deleted, cutoff)
+        finally:
+            db.close()
+
+order_event_hub = OrderEventHub()
+order_event_relay = OrderEventRelay(order_event_hub)
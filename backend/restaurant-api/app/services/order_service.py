@@ -1,10 +1,20 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from app.models.order import Order, OrderItem
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from app.models.order import Order, OrderItem, OrderStatus
 from app.models.menu import MenuItem
 from app.models.restaurant import Restaurant
 from app.schemas.order import OrderCreate, OrderUpdate, OrderItemCreate
 from app.services.sms_service import SMSService
+from app.services.notification_service import NotificationService, notification_dispatcher
+from app.services.analytics_service import OrderAnalyticsService
+from app.services.order_event_service import OrderEventService, order_event_relay
+from app.services.pos_submission_service import POSSubmissionService, pos_submission_dispatcher
+from app.models.order_event import OrderEventType
+from app.models.analytics import RollupGranularity
+from app.core.config import settings
+from app.core.pagination import Page, keyset_paginate
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta
 import uuid
@@ -15,6 +25,10 @@ class OrderService:
     def __init__(self, db: Session):
         self.db = db
         self.sms_service = SMSService()
+        self.notification_service = NotificationService(db)
+        self.analytics_service = OrderAnalyticsService(db)
+        self.event_service = OrderEventService(db)
+        self.pos_submission_service = POSSubmissionService(db)
 
     def generate_order_number(self) -> str:
         """Generate a unique order number"""
@@ -22,12 +36,21 @@ class OrderService:
         random_suffix = ''.join(random.choices(string.digits, k=4))
         return f"ORD-{timestamp}-{random_suffix}"
 
-    def calculate_order_totals(self, items: List[OrderItemCreate]) -> Dict[str, float]:
+    def get_order_menu_items(self, items: List[OrderItemCreate]) -> Dict[int, MenuItem]:
+        """Load every menu item referenced by the order lines in a single query"""
+        menu_item_ids = {item_data.menu_item_id for item_data in items}
+        menu_items = self.db.query(MenuItem).filter(MenuItem.id.in_(menu_item_ids)).all()
+        return {menu_item.id: menu_item for menu_item in menu_items}
+
+    def calculate_order_totals(self, items: List[OrderItemCreate], menu_items: Optional[Dict[int, MenuItem]] = None) -> Dict[str, float]:
         """Calculate order subtotal, tax, and total"""
+        if menu_items is None:
+            menu_items = self.get_order_menu_items(items)
+
         subtotal = 0.0
         
         for item_data in items:
-            menu_item = self.db.query(MenuItem).filter(MenuItem.id == item_data.menu_item_id).first()
+            menu_item = menu_items.get(item_data.menu_item_id)
             if not menu_item:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -67,7 +90,8 @@ class OrderService:
                 detail="Restaurant is currently closed"
             )
 
-        totals = self.calculate_order_totals(order_data.items)
+        menu_items = self.get_order_menu_items(order_data.items)
+        totals = self.calculate_order_totals(order_data.items, menu_items)
 
         otp_code = self.sms_service.generate_otp()
         otp_expires_at = datetime.utcnow() + timedelta(minutes=10)
@@ -90,27 +114,29 @@ class OrderService:
         self.db.add(db_order)
         self.db.flush()  # Get the order ID
 
+        order_items = []
         for item_data in order_data.items:
-            menu_item = self.db.query(MenuItem).filter(MenuItem.id == item_data.menu_item_id).first()
-            
-            item_total = menu_item.price * item_data.quantity
-            
-            db_order_item = OrderItem(
-                order_id=db_order.id,
-                menu_item_id=item_data.menu_item_id,
-                quantity=item_data.quantity,
-                unit_price=menu_item.price,
-                total_price=item_total,
-                modifiers=item_data.modifiers,
-                special_instructions=item_data.special_instructions
-            )
-            self.db.add(db_order_item)
+            menu_item = menu_items[item_data.menu_item_id]
+            order_items.append({
+                "order_id": db_order.id,
+                "menu_item_id": item_data.menu_item_id,
+                "quantity": item_data.quantity,
+                "unit_price": menu_item.price,
+                "total_price": menu_item.price * item_data.quantity,
+                "modifiers": item_data.modifiers,
+                "special_instructions": item_data.special_instructions
+            })
+        self.db.execute(insert(OrderItem), order_items)
+
+        self.notification_service.enqueue_otp(order_data.customer_phone, otp_code, db_order.id)
+        self.analytics_service.record_order_created(db_order)
+        self.event_service.record(db_order, OrderEventType.CREATED)
 
         self.db.commit()
+        order_event_relay.notify()
+        notification_dispatcher.notify()
         self.db.refresh(db_order)
 
-        self.sms_service.send_otp(order_data.customer_phone, otp_code)
-
         return db_order
 
     def verify_otp(self, order_id: int, otp_code: str) -> bool:
@@ -128,30 +154,62 @@ class OrderService:
         if order.otp_expires_at and datetime.utcnow() > order.otp_expires_at:
             return False
 
-        order.otp_verified = True
-        self.db.commit()
+        # Only the request that flips the flag sends the confirmation and queues POS submissions
+        verified = self.db.query(Order).filter(
+            Order.id == order.id,
+            or_(Order.otp_verified.is_(False), Order.otp_verified.is_(None))
+        ).update({Order.otp_verified: True}, synchronize_session="fetch")
+        if not verified:
+            self.db.rollback()
+            return True
 
         restaurant = self.db.query(Restaurant).filter(Restaurant.id == order.restaurant_id).first()
+        submissions = []
         if restaurant:
-            self.sms_service.send_order_confirmation(
+            self.notification_service.enqueue_order_confirmation(
                 order.customer_phone, 
                 order.order_number, 
-                restaurant.name
+                restaurant.name,
+                order.id
             )
+            if settings.pos_submission_enabled:
+                submissions = self.pos_submission_service.enqueue_for_order(order, restaurant)
+
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # The order was already queued for this POS (unique order_id, provider); nothing left to do
+            self.db.rollback()
+            return True
+        if restaurant:
+            notification_dispatcher.notify()
+        if submissions:
+            pos_submission_dispatcher.notify()
 
         return True
 
     def get_order(self, order_id: int) -> Optional[Order]:
-        return self.db.query(Order).filter(Order.id == order_id).first()
+        return self.db.query(Order).options(selectinload(Order.items)).filter(Order.id == order_id).first()
 
     def get_order_by_number(self, order_number: str) -> Optional[Order]:
-        return self.db.query(Order).filter(Order.order_number == order_number).first()
+        return self.db.query(Order).options(selectinload(Order.items)).filter(Order.order_number == order_number).first()
 
     def get_orders(self, restaurant_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Order]:
+        return self.get_orders_page(restaurant_id, skip=skip, limit=limit).items
+
+    def get_orders_page(self,
+                        restaurant_id: Optional[int] = None,
+                        cursor: Optional[str] = None,
+                        skip: int = 0,
+                        limit: int = 100) -> Page:
+        """Get orders newest first, paginated on (created_at, id)"""
         query = self.db.query(Order)
         if restaurant_id:
             query = query.filter(Order.restaurant_id == restaurant_id)
-        return query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+        return keyset_paginate(
+            query, Order, [Order.created_at, Order.id], limit,
+            cursor=cursor, descending=True, skip=skip
+        )
 
     def update_order(self, order_id: int, order_data: OrderUpdate) -> Optional[Order]:
         db_order = self.get_order(order_id)
@@ -164,65 +222,103 @@ class OrderService:
         for field, value in update_data.items():
             setattr(db_order, field, value)
 
-        if 'status' in update_data and update_data['status'] != old_status:
-            if update_data['status'] == 'ready':
-                self.sms_service.send_order_ready_notification(
-                    db_order.customer_phone,
-                    db_order.order_number
-                )
+        status_changed = 'status' in update_data and update_data['status'] != old_status
+        if status_changed:
+            self._record_status_change(db_order, old_status, update_data['status'])
 
         self.db.commit()
+        if status_changed:
+            order_event_relay.notify()
+            if update_data['status'] == OrderStatus.READY:
+                notification_dispatcher.notify()
         self.db.refresh(db_order)
         return db_order
 
+    def _record_status_change(self, db_order: Order, old_status: OrderStatus, new_status: OrderStatus):
+        """Side effects of a status change: rollups, the kitchen event log and the ready SMS"""
+        self.analytics_service.record_status_change(db_order, old_status, new_status)
+        self.event_service.record(db_order, OrderEventType.STATUS_CHANGED, old_status)
+        if new_status == OrderStatus.READY:
+            self.notification_service.enqueue_order_ready(
+                db_order.customer_phone,
+                db_order.order_number,
+                db_order.id
+            )
+
+    def apply_pos_statuses(self, pos_order_column: Any, statuses: Dict[str, OrderStatus]) -> int:
+        """Apply POS-reported statuses, keyed by toast_order_id or clover_order_id, in one transaction"""
+        changed, ready = self.record_pos_statuses(pos_order_column, statuses)
+        self.db.commit()
+        self.notify_status_changes(changed, ready)
+        return changed
+
+    def record_pos_statuses(self, pos_order_column: Any, statuses: Dict[str, OrderStatus]) -> Tuple[int, int]:
+        """Stage POS-reported statuses in the caller's transaction; returns (changed, became ready).
+
+        Completed and cancelled orders are left alone, so a late or
+        out-of-order webhook cannot reopen them. Once the caller commits it
+        passes the counts to notify_status_changes.
+        """
+        if not statuses:
+            return 0, 0
+
+        orders = self.db.query(Order).filter(pos_order_column.in_(list(statuses))).all()
+        changed = ready = 0
+        for db_order in orders:
+            new_status = statuses[getattr(db_order, pos_order_column.key)]
+            old_status = db_order.status
+            if new_status == old_status or old_status in (OrderStatus.COMPLETED, OrderStatus.CANCELLED):
+                continue
+            db_order.status = new_status
+            self._record_status_change(db_order, old_status, new_status)
+            changed += 1
+            ready += new_status == OrderStatus.READY
+        return changed, ready
+
+    def notify_status_changes(self, changed: int, ready: int):
+        """Wake the event relay and the ready-SMS dispatcher after committed status changes"""
+        if changed:
+            order_event_relay.notify()
+        if ready:
+            notification_dispatcher.notify()
+
     def cancel_order(self, order_id: int) -> bool:
         """Cancel an order"""
         db_order = self.get_order(order_id)
         if not db_order:
             return False
 
-        if db_order.status in ['completed', 'cancelled']:
+        if db_order.status in [OrderStatus.COMPLETED, OrderStatus.CANCELLED]:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot cancel order in current status"
             )
 
-        db_order.status = 'cancelled'
+        old_status = db_order.status
+        self.analytics_service.record_status_change(db_order, old_status, OrderStatus.CANCELLED)
+        db_order.status = OrderStatus.CANCELLED
+        self.event_service.record(db_order, OrderEventType.STATUS_CHANGED, old_status)
         self.db.commit()
+        order_event_relay.notify()
         return True
 
-    def get_orders_by_status(self, restaurant_id: int, status: str) -> List[Order]:
-        """Get orders by status for a restaurant"""
+    def get_orders_by_status(self, restaurant_id: int, status: OrderStatus, limit: int = 100) -> List[Order]:
+        """Get the most recent orders in a status for a restaurant"""
         return self.db.query(Order).filter(
             Order.restaurant_id == restaurant_id,
             Order.status == status
-        ).order_by(Order.created_at.desc()).all()
-
-    def get_order_analytics(self, restaurant_id: int, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
-        """Get order analytics for a restaurant"""
-        orders = self.db.query(Order).filter(
-            Order.restaurant_id == restaurant_id,
-            Order.created_at >= start_date,
-            Order.created_at <= end_date,
-            Order.status != 'cancelled'
-        ).all()
-
-        total_orders = len(orders)
-        total_revenue = sum(order.total_amount for order in orders)
-        avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
+        ).order_by(Order.created_at.desc()).limit(limit).all()
+
+    def get_order_analytics(self, restaurant_id: int, start_date: datetime, end_date: datetime, bucket: Optional[RollupGranularity] = None) -> Dict[str, Any]:
+        """Get order analytics for a restaurant, optionally with a per-bucket time series"""
+        analytics = self.analytics_service.get_summary(restaurant_id, start_date, end_date)
+        analytics["period"] = {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat()
+        }
 
-        order_types = {}
-        for order in orders:
-            order_type = order.order_type.value
-            order_types[order_type] = order_types.get(order_type, 0) + 1
+        if bucket is not None:
+            analytics["bucket"] = bucket.value
+            analytics["series"] = self.analytics_service.get_time_series(restaurant_id, start_date, end_date, bucket)
 
-        return {
-            "total_orders": total_orders,
-            "total_revenue": round(total_revenue, 2),
-            "average_order_value": round(avg_order_value, 2),
-            "order_types": order_types,
-            "period": {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat()
-            }
-        }
+        return analytics
@@ -0,0 +1,148 @@
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Tuple
+from dataclasses import dataclass
+from app.core.config import settings
+import asyncio
+import logging
+import time
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class AccessToken:
+    value: str
+    expires_at: float  # time.monotonic() deadline
+
+    @classmethod
+    def expiring_in(cls, value: str, expires_in: Optional[float]) -> "AccessToken":
+        ttl = expires_in if expires_in else settings.pos_token_default_ttl_seconds
+        return cls(value=value, expires_at=time.monotonic() + float(ttl))
+
+@dataclass
+class MerchantLimit:
+    semaphore: asyncio.Semaphore
+    users: int = 0  # requests holding or waiting for the semaphore
+
+class TokenCache:
+    """Per-key OAuth token cache that refreshes ahead of expiry with one fetch in flight per key"""
+
+    def __init__(self, refresh_margin: float):
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[str, AccessToken] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._background: Dict[str, asyncio.Task] = {}
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Optional[AccessToken]]]) -> Optional[str]:
+        token = self._tokens.get(key)
+        now = time.monotonic()
+        if token and now < token.expires_at - self.refresh_margin:
+            return token.value
+        if token and now < token.expires_at:
+            # Still valid: hand it out and refresh in the background
+            if key not in self._background:
+                task = asyncio.create_task(self._refresh(key, fetch))
+                self._background[key] = task
+                task.add_done_callback(lambda _: self._background.pop(key, None))
+            return token.value
+        return await self._refresh(key, fetch)
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Optional[AccessToken]]]) -> Optional[str]:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            token = self._tokens.get(key)
+            if token and time.monotonic() < token.expires_at - self.refresh_margin:
+                return token.value
+
+            fresh = await fetch()
+            if fresh is None:
+                # Keep serving the old token until it actually expires
+                return token.value if token and time.monotonic() < token.expires_at else None
+            self._tokens[key] = fresh
+            return fresh.value
+
+    def discard(self, value: str):
+        """Forget a token the provider rejected"""
+        for key, token in list(self._tokens.items()):
+            if token.value == value:
+                del self._tokens[key]
+
+    def reset_locks(self):
+        for task in self._background.values():
+            task.cancel()
+        self._background.clear()
+        self._locks.clear()
+
+class POSHttpClient:
+    """Shared, pooled async HTTP clients for the POS providers.
+
+    One keep-alive connection pool per provider, explicit connect/read
+    timeouts, and a concurrency cap per merchant so one busy location
+    cannot monopolize the pool.
+    """
+
+    def __init__(self):
+        self.tokens = TokenCache(settings.pos_token_refresh_margin_seconds)
+        self._clients: Dict[str, "httpx.AsyncClient"] = {}
+        # Only merchants with a request running or waiting have an entry, so the map stays bounded
+        self._merchant_limits: Dict[Tuple[str, str], MerchantLimit] = {}
+
+    def get_client(self, provider: str, base_url: str) -> "httpx.AsyncClient":
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            # Imported on first use so workers that never call a POS do not pay for httpx at startup
+            import httpx
+
+            transport = None
+            if settings.pos_transport == "mock":
+                from app.services.pos_mock import mock_pos_app
+                transport = httpx.ASGITransport(app=mock_pos_app)
+                base_url = f"http://{provider}.mock"
+
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                transport=transport,
+                timeout=httpx.Timeout(
+                    settings.pos_read_timeout,
+                    connect=settings.pos_connect_timeout,
+                    pool=settings.pos_pool_timeout
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.pos_max_connections,
+                    max_keepalive_connections=settings.pos_max_keepalive_connections
+                )
+            )
+            self._clients[provider] = client
+        return client
+
+    async def request(self, provider: str, base_url: str, method: str, path: str,
+                      merchant_key: Optional[str] = None, **kwargs) -> "httpx.Response":
+        client = self.get_client(provider, base_url)
+        if merchant_key is None:
+            return await client.request(method, path, **kwargs)
+
+        key = (provider, merchant_key)
+        limit = self._merchant_limits.get(key)
+        if limit is None:
+            limit = MerchantLimit(asyncio.Semaphore(settings.pos_max_concurrency_per_merchant))
+            self._merchant_limits[key] = limit
+        limit.users += 1
+        try:
+            async with limit.semaphore:
+                return await client.request(method, path, **kwargs)
+        finally:
+            limit.users -= 1
+            if limit.users == 0 and self._merchant_limits.get(key) is limit:
+                del self._merchant_limits[key]
+
+    async def aclose(self):
+        """Close pooled connections; called from the application lifespan"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._merchant_limits.clear()
+        self.tokens.reset_locks()
+        for client in clients:
+            await client.aclose()
+
+pos_client = POSHttpClient()
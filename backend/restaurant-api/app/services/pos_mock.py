@@ -0,0 +1,146 @@
+"""Local stand-in for the Toast and Clover APIs.
+
+Used in-process when POS_TRANSPORT=mock, or run on its own for latency
+and throughput tests:
+
+    uvicorn app.services.pos_mock:mock_pos_app --port 9100
+
+and point TOAST_API_BASE_URL / CLOVER_API_BASE_URL at it.
+"""
+from typing import Any, Dict, List, Optional, Set
+from fastapi import FastAPI, Header, HTTPException, Request
+from app.core.config import settings
+from collections import Counter
+import asyncio
+import uuid
+
+mock_pos_app = FastAPI(title="Mock POS API")
+mock_pos_stats: Counter = Counter()
+# State the Clover fetch endpoints report back; tests and benchmarks set these before sending webhooks
+mock_item_availability: Dict[str, bool] = {}
+mock_order_states: Dict[str, str] = {}
+# Merchants (Toast location guid or Clover merchant id) whose order endpoints answer 503
+mock_merchant_outages: Set[str] = set()
+_orders_by_idempotency_key: Dict[str, str] = {}
+
+_TOAST_RESTAURANTS = [
+    {
+        "guid": "toast-location-1",
+        "restaurantName": "Mock Bistro",
+        "phone": "555-010-0001",
+        "address": {"address1": "1 Market St", "city": "San Francisco", "stateCode": "CA", "zipCode": "94105"}
+    }
+]
+
+def _catalog(size: int) -> List[Dict[str, Any]]:
+    """A deterministic catalog of `size` items in groups of 50"""
+    return [
+        {"id": f"item-{i}", "name": f"Item {i}", "price": 500 + i % 1000, "group": i // 50}
+        for i in range(size)
+    ]
+
+def _toast_menu() -> Dict[str, Any]:
+    groups: Dict[int, List[Dict[str, Any]]] = {}
+    for item in _catalog(settings.pos_mock_catalog_size):
+        groups.setdefault(item["group"], []).append(
+            {"guid": f"toast-{item['id']}", "name": item["name"], "description": None, "price": item["price"] / 100}
+        )
+    return {
+        "menus": [
+            {
+                "guid": "toast-menu-1",
+                "name": "All Day",
+                "menuGroups": [
+                    {"guid": f"toast-group-{group}", "name": f"Group {group}", "menuItems": items}
+                    for group, items in groups.items()
+                ]
+            }
+        ]
+    }
+
+def _clover_items() -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"clover-{item['id']}",
+            "name": item["name"],
+            "price": item["price"],
+            "hidden": False,
+            "categories": {"elements": [{"id": f"clover-category-{item['group']}", "name": f"Group {item['group']}", "sortOrder": item["group"]}]}
+        }
+        for item in _catalog(settings.pos_mock_catalog_size)
+    ]
+
+def _create_order(merchant_id: str, idempotency_key: Optional[str], prefix: str) -> str:
+    if merchant_id in mock_merchant_outages:
+        raise HTTPException(status_code=503, detail="POS unavailable")
+    if idempotency_key and idempotency_key in _orders_by_idempotency_key:
+        mock_pos_stats["idempotent replays"] += 1
+        return _orders_by_idempotency_key[idempotency_key]
+    order_id = f"{prefix}-{uuid.uuid4().hex}"
+    if idempotency_key:
+        _orders_by_idempotency_key[idempotency_key] = order_id
+    return order_id
+
+@mock_pos_app.middleware("http")
+async def simulate_latency(request: Request, call_next):
+    mock_pos_stats[f"{request.method} {request.url.path}"] += 1
+    if settings.pos_mock_latency_ms:
+        await asyncio.sleep(settings.pos_mock_latency_ms / 1000)
+    return await call_next(request)
+
+@mock_pos_app.post("/authentication/v1/authentication/login")
+async def toast_login(body: Dict[str, Any]):
+    return {"status": "SUCCESS", "token": {"accessToken": f"toast-{uuid.uuid4().hex}", "tokenType": "Bearer", "expiresIn": 86400}}
+
+@mock_pos_app.get("/restaurants/v1/restaurants")
+async def toast_restaurants():
+    return _TOAST_RESTAURANTS
+
+@mock_pos_app.get("/menus/v1/menus")
+async def toast_menus():
+    return _toast_menu()
+
+@mock_pos_app.post("/orders/v1/orders", status_code=201)
+async def toast_submit_order(body: Dict[str, Any],
+                             toast_restaurant_external_id: str = Header(""),
+                             idempotency_key: Optional[str] = Header(None)):
+    return {"guid": _create_order(toast_restaurant_external_id, idempotency_key, "toast-order")}
+
+@mock_pos_app.post("/orders/v1/orderPayments", status_code=201)
+async def toast_payment(body: Dict[str, Any]):
+    return {"guid": f"toast-payment-{uuid.uuid4().hex}"}
+
+@mock_pos_app.post("/oauth/token")
+async def clover_token():
+    return {"access_token": f"clover-{uuid.uuid4().hex}"}
+
+@mock_pos_app.get("/v3/merchants/{merchant_id}")
+async def clover_merchant(merchant_id: str):
+    return {"id": merchant_id, "name": "Mock Cafe"}
+
+@mock_pos_app.get("/v3/merchants/{merchant_id}/items")
+async def clover_items(merchant_id: str, limit: int = 100, offset: int = 0):
+    return {"elements": _clover_items()[offset:offset + limit]}
+
+@mock_pos_app.get("/v3/merchants/{merchant_id}/items/{item_id}")
+async def clover_item(merchant_id: str, item_id: str):
+    item = next((item for item in _clover_items() if item["id"] == item_id), None)
+    if item is None:
+        raise HTTPException(status_code=404)
+    return {**item, "available": mock_item_availability.get(item_id, True)}
+
+@mock_pos_app.get("/v3/merchants/{merchant_id}/orders/{order_id}")
+async def clover_order(merchant_id: str, order_id: str):
+    return {"id": order_id, "state": mock_order_states.get(order_id, "open")}
+
+@mock_pos_app.post("/v3/merchants/{merchant_id}/orders")
+async def clover_submit_order(merchant_id: str, body: Dict[str, Any], idempotency_key: Optional[str] = Header(None)):
+    return {"id": _create_order(merchant_id, idempotency_key, "clover-order")}
+
+@mock_pos_app.post("/v3/merchants/{merchant_id}/payments")
+async def clover_payment(merchant_id: str, body: Dict[str, Any]):
+    return {"id": f"clover-payment-{uuid.uuid4().hex}"}
+
+@mock_pos_app.get("/_stats")
+async def stats():
+    return dict(mock_pos_stats)
@@ -1,47 +1,83 @@
-import requests
-import json
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from app.core.config import settings
+from app.services.pos_client import AccessToken, POSHttpClient, pos_client
 import logging
 
+if TYPE_CHECKING:
+    import httpx
+
 logger = logging.getLogger(__name__)
 
+TOAST = "toast"
+CLOVER = "clover"
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Statuses worth retrying; any other 4xx means the request itself is wrong
+RETRYABLE_STATUSES = {401, 408, 409, 425, 429}
+
+class POSRequestError(Exception):
+    """A POS call that failed; `retryable` is False when repeating it cannot succeed"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
 class POSService:
-    def __init__(self):
+    def __init__(self, client: POSHttpClient = pos_client):
         self.toast_base_url = settings.toast_api_base_url
         self.clover_base_url = settings.clover_api_base_url
+        self.client = client
 
-    def get_toast_access_token(self, client_id: str, client_secret: str) -> Optional[str]:
-        """Get OAuth access token for Toast API"""
+    def _base_url(self, provider: str) -> str:
+        return self.toast_base_url if provider == TOAST else self.clover_base_url
+
+    async def _send(self, provider: str, method: str, path: str, access_token: Optional[str] = None,
+                    merchant_key: Optional[str] = None, headers: Optional[Dict[str, str]] = None,
+                    **kwargs) -> "httpx.Response":
+        headers = dict(headers or {})
+        if access_token:
+            headers["Authorization"] = f"Bearer {access_token}"
+        response = await self.client.request(
+            provider, self._base_url(provider), method, path,
+            merchant_key=merchant_key, headers=headers, **kwargs
+        )
+        if response.status_code == 401 and access_token:
+            # Revoked or expired early; the next call fetches a fresh token
+            self.client.tokens.discard(access_token)
+        return response
+
+    async def _fetch_toast_token(self, client_id: str, client_secret: str) -> Optional[AccessToken]:
         try:
-            url = f"{self.toast_base_url}/authentication/v1/authentication/login"
-            headers = {"Content-Type": "application/json"}
             data = {
                 "clientId": client_id,
                 "clientSecret": client_secret,
                 "userAccessType": "TOAST_MACHINE_CLIENT"
             }
-            
-            response = requests.post(url, headers=headers, json=data)
+            response = await self._send(TOAST, "POST", "/authentication/v1/authentication/login", json=data)
             if response.status_code == 200:
-                return response.json().get("token", {}).get("accessToken")
-            else:
-                logger.error("Failed to get Toast access token: %s", response.text)
-                return None
+                token = response.json().get("token", {})
+                if token.get("accessToken"):
+                    return AccessToken.expiring_in(token["accessToken"], token.get("expiresIn"))
+            logger.error("Failed to get Toast access token: %s", response.text)
+            return None
         except Exception as e:
             logger.error("Error getting Toast access token: %s", str(e))
             return None
 
-    def sync_toast_restaurants(self, access_token: str) -> List[Dict[str, Any]]:
+    async def get_toast_access_token(self, client_id: Optional[str] = None, client_secret: Optional[str] = None) -> Optional[str]:
+        """Get OAuth access token for Toast API, reusing the cached one until it nears expiry"""
+        client_id = client_id or settings.toast_client_id
+        client_secret = client_secret or settings.toast_client_secret
+        return await self.client.tokens.get(
+            f"{TOAST}:{client_id}",
+            lambda: self._fetch_toast_token(client_id, client_secret)
+        )
+
+    async def sync_toast_restaurants(self, access_token: str) -> List[Dict[str, Any]]:
         """Sync restaurant locations from Toast"""
         try:
-            url = f"{self.toast_base_url}/restaurants/v1/restaurants"
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Toast-Restaurant-External-ID": "YOUR_RESTAURANT_ID"
-            }
-            
-            response = requests.get(url, headers=headers)
+            headers = {"Toast-Restaurant-External-ID": "YOUR_RESTAURANT_ID"}
+            response = await self._send(TOAST, "GET", "/restaurants/v1/restaurants", access_token, headers=headers)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -51,16 +87,11 @@ class POSService:
             logger.error("Error syncing Toast restaurants: %s", str(e))
             return []
 
-    def sync_toast_menu(self, access_token: str, restaurant_id: str) -> Dict[str, Any]:
+    async def sync_toast_menu(self, access_token: str, restaurant_id: str) -> Dict[str, Any]:
         """Sync menu from Toast"""
         try:
-            url = f"{self.toast_base_url}/menus/v1/menus"
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Toast-Restaurant-External-ID": restaurant_id
-            }
-            
-            response = requests.get(url, headers=headers)
+            headers = {"Toast-Restaurant-External-ID": restaurant_id}
+            response = await self._send(TOAST, "GET", "/menus/v1/menus", access_token, restaurant_id, headers=headers)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -70,53 +101,76 @@ class POSService:
             logger.error("Error syncing Toast menu: %s", str(e))
             return {}
 
-    def submit_toast_order(self, access_token: str, restaurant_id: str, order_data: Dict[str, Any]) -> Optional[str]:
+    async def submit_order(self, provider: str, access_token: str, merchant_id: str, order_data: Dict[str, Any],
+                           idempotency_key: Optional[str] = None) -> str:
+        """Submit an order and return the POS order id.
+
+        Raises POSRequestError instead of returning None so callers can tell
+        a dead POS from a rejected order. With an idempotency key a retry
+        whose first response was lost returns the original order.
+        """
+        headers = {IDEMPOTENCY_HEADER: idempotency_key} if idempotency_key else {}
+        if provider == TOAST:
+            headers["Toast-Restaurant-External-ID"] = merchant_id
+            path, id_field = "/orders/v1/orders", "guid"
+        else:
+            path, id_field = f"/v3/merchants/{merchant_id}/orders", "id"
+
+        import httpx  # already loaded by the client; see POSHttpClient.get_client
+
+        try:
+            response = await self._send(provider, "POST", path, access_token, merchant_id, headers=headers, json=order_data)
+        except httpx.HTTPError as e:
+            raise POSRequestError(f"{provider} order request failed: {e!r}") from e
+
+        if response.status_code not in (200, 201):
+            retryable = response.status_code >= 500 or response.status_code in RETRYABLE_STATUSES
+            raise POSRequestError(f"{provider} rejected order ({response.status_code}): {response.text[:500]}", retryable)
+        pos_order_id = response.json().get(id_field)
+        if not pos_order_id:
+            raise POSRequestError(f"{provider} accepted order without an id: {response.text[:500]}")
+        return pos_order_id
+
+    async def submit_toast_order(self, access_token: str, restaurant_id: str, order_data: Dict[str, Any]) -> Optional[str]:
         """Submit order to Toast POS"""
         try:
-            url = f"{self.toast_base_url}/orders/v1/orders"
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Toast-Restaurant-External-ID": restaurant_id,
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(url, headers=headers, json=order_data)
-            if response.status_code == 201:
-                return response.json().get("guid")
-            else:
-                logger.error("Failed to submit Toast order: %s", response.text)
-                return None
-        except Exception as e:
+            return await self.submit_order(TOAST, access_token, restaurant_id, order_data)
+        except POSRequestError as e:
             logger.error("Error submitting Toast order: %s", str(e))
             return None
 
-    def get_clover_access_token(self, client_id: str, client_secret: str, merchant_id: str) -> Optional[str]:
-        """Get OAuth access token for Clover API"""
+    async def _fetch_clover_token(self, client_id: str, client_secret: str) -> Optional[AccessToken]:
         try:
-            url = f"{self.clover_base_url}/oauth/token"
             data = {
                 "client_id": client_id,
                 "client_secret": client_secret,
                 "code": "authorization_code_here"  # This would come from OAuth flow
             }
-            
-            response = requests.post(url, data=data)
+            response = await self._send(CLOVER, "POST", "/oauth/token", data=data)
             if response.status_code == 200:
-                return response.json().get("access_token")
-            else:
-                logger.error("Failed to get Clover access token: %s", response.text)
-                return None
+                body = response.json()
+                if body.get("access_token"):
+                    return AccessToken.expiring_in(body["access_token"], body.get("expires_in"))
+            logger.error("Failed to get Clover access token: %s", response.text)
+            return None
         except Exception as e:
             logger.error("Error getting Clover access token: %s", str(e))
             return None
 
-    def sync_clover_merchant(self, access_token: str, merchant_id: str) -> Dict[str, Any]:
+    async def get_clover_access_token(self, client_id: Optional[str] = None, client_secret: Optional[str] = None,
+                                      merchant_id: Optional[str] = None) -> Optional[str]:
+        """Get OAuth access token for Clover API; tokens are cached per merchant"""
+        client_id = client_id or settings.clover_client_id
+        client_secret = client_secret or settings.clover_client_secret
+        return await self.client.tokens.get(
+            f"{CLOVER}:{client_id}:{merchant_id}",
+            lambda: self._fetch_clover_token(client_id, client_secret)
+        )
+
+    async def sync_clover_merchant(self, access_token: str, merchant_id: str) -> Dict[str, Any]:
         """Sync merchant information from Clover"""
         try:
-            url = f"{self.clover_base_url}/v3/merchants/{merchant_id}"
-            headers = {"Authorization": f"Bearer {access_token}"}
-            
-            response = requests.get(url, headers=headers)
+            response = await self._send(CLOVER, "GET", f"/v3/merchants/{merchant_id}", access_token, merchant_id)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -126,67 +180,68 @@ class POSService:
             logger.error("Error syncing Clover merchant: %s", str(e))
             return {}
 
-    def sync_clover_inventory(self, access_token: str, merchant_id: str) -> List[Dict[str, Any]]:
-        """Sync inventory/menu items from Clover"""
+    async def sync_clover_inventory(self, access_token: str, merchant_id: str) -> List[Dict[str, Any]]:
+        """Sync inventory/menu items from Clover, following limit/offset pages.
+
+        Returns [] unless every page was fetched, so a partial catalog is
+        never mistaken for items having been removed.
+        """
         try:
-            url = f"{self.clover_base_url}/v3/merchants/{merchant_id}/items"
-            headers = {"Authorization": f"Bearer {access_token}"}
-            
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                return response.json().get("elements", [])
-            else:
-                logger.error("Failed to sync Clover inventory: %s", response.text)
-                return []
+            items: List[Dict[str, Any]] = []
+            page_size = settings.pos_clover_page_size
+            while True:
+                params = {"limit": page_size, "offset": len(items), "expand": "categories"}
+                response = await self._send(CLOVER, "GET", f"/v3/merchants/{merchant_id}/items", access_token, merchant_id,
+                                            params=params)
+                if response.status_code != 200:
+                    logger.error("Failed to sync Clover inventory: %s", response.text)
+                    return []
+                elements = response.json().get("elements", [])
+                items.extend(elements)
+                if len(elements) < page_size:
+                    return items
         except Exception as e:
             logger.error("Error syncing Clover inventory: %s", str(e))
             return []
 
-    def submit_clover_order(self, access_token: str, merchant_id: str, order_data: Dict[str, Any]) -> Optional[str]:
-        """Submit order to Clover POS"""
+    async def get_clover_object(self, access_token: str, merchant_id: str, kind: str, object_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch one Clover item or order; webhooks only say which object changed"""
         try:
-            url = f"{self.clover_base_url}/v3/merchants/{merchant_id}/orders"
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(url, headers=headers, json=order_data)
+            response = await self._send(CLOVER, "GET", f"/v3/merchants/{merchant_id}/{kind}/{object_id}", access_token, merchant_id)
             if response.status_code == 200:
-                return response.json().get("id")
-            else:
-                logger.error("Failed to submit Clover order: %s", response.text)
-                return None
+                return response.json()
+            if response.status_code == 404:
+                return {}
+            logger.error("Failed to fetch Clover %s %s: %s", kind, object_id, response.text)
+            return None
         except Exception as e:
+            logger.error("Error fetching Clover %s %s: %s", kind, object_id, str(e))
+            return None
+
+    async def submit_clover_order(self, access_token: str, merchant_id: str, order_data: Dict[str, Any]) -> Optional[str]:
+        """Submit order to Clover POS"""
+        try:
+            return await self.submit_order(CLOVER, access_token, merchant_id, order_data)
+        except POSRequestError as e:
             logger.error("Error submitting Clover order: %s", str(e))
             return None
 
-    def process_payment_toast(self, access_token: str, restaurant_id: str, payment_data: Dict[str, Any]) -> bool:
+    async def process_payment_toast(self, access_token: str, restaurant_id: str, payment_data: Dict[str, Any]) -> bool:
         """Process payment through Toast"""
         try:
-            url = f"{self.toast_base_url}/orders/v1/orderPayments"
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Toast-Restaurant-External-ID": restaurant_id,
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(url, headers=headers, json=payment_data)
+            headers = {"Toast-Restaurant-External-ID": restaurant_id}
+            response = await self._send(TOAST, "POST", "/orders/v1/orderPayments", access_token, restaurant_id,
+                                        headers=headers, json=payment_data)
             return response.status_code == 201
         except Exception as e:
             logger.error("Error processing Toast payment: %s", str(e))
             return False
 
-    def process_payment_clover(self, access_token: str, merchant_id: str, payment_data: Dict[str, Any]) -> bool:
+    async def process_payment_clover(self, access_token: str, merchant_id: str, payment_data: Dict[str, Any]) -> bool:
         """Process payment through Clover"""
         try:
-            url = f"{self.clover_base_url}/v3/merchants/{merchant_id}/payments"
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(url, headers=headers, json=payment_data)
+            response = await self._send(CLOVER, "POST", f"/v3/merchants/{merchant_id}/payments", access_token, merchant_id,
+                                        json=payment_data)
             return response.status_code == 200
         except Exception as e:
             logger.error("Error processing Clover payment: %s", str(e))
@@ -0,0 +1,478 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from collections import Counter, defaultdict
+from sqlalchemy import and_, func, or_, tuple_, update
+from sqlalchemy.orm import Session, selectinload
+from app.core.concurrency import CircuitBreaker, run_blocking
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.menu import MenuItem
+from app.models.order import Order
+from app.models.pos_submission import POSSubmission, POSSubmissionStatus
+from app.models.restaurant import Restaurant
+from app.services.analytics_service import to_utc_naive
+from app.services.menu_sync_service import PROVIDER_COLUMNS
+from app.services.pos_service import CLOVER, TOAST, POSRequestError, POSService
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import math
+import uuid
+
+logger = logging.getLogger(__name__)
+
+ORDER_COLUMNS = {TOAST: Order.toast_order_id, CLOVER: Order.clover_order_id}
+
+def build_toast_order(order: Order, pos_item_ids: Dict[int, str]) -> Dict[str, Any]:
+    """Map an order onto a Toast order with a single check"""
+    return {
+        "externalId": order.order_number,
+        "checks": [
+            {
+                "customer": {
+                    "firstName": order.customer_name,
+                    "phone": order.customer_phone,
+                    "email": order.customer_email
+                },
+                "selections": [
+                    {
+                        "item": {"guid": pos_item_ids[item.menu_item_id]},
+                        "quantity": item.quantity,
+                        "specialRequest": item.special_instructions
+                    }
+                    for item in order.items
+                ]
+            }
+        ]
+    }
+
+def build_clover_order(order: Order, pos_item_ids: Dict[int, str]) -> Dict[str, Any]:
+    """Map an order onto a Clover order with its line items"""
+    return {
+        "title": order.order_number,
+        "note": order.special_instructions,
+        "state": "open",
+        "lineItems": [
+            {
+                "item": {"id": pos_item_ids[item.menu_item_id]},
+                "unitQty": item.quantity,
+                "note": item.special_instructions
+            }
+            for item in order.items
+        ]
+    }
+
+ORDER_BUILDERS = {TOAST: build_toast_order, CLOVER: build_clover_order}
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+class POSSubmissionService:
+    """Writes POS submissions to the outbox inside the caller's transaction"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue_for_order(self, order: Order, restaurant: Restaurant) -> List[POSSubmission]:
+        """Queue the order for each POS the restaurant is linked to; it is sent once the caller commits"""
+        submissions = []
+        for provider, merchant_id in ((TOAST, restaurant.toast_location_id), (CLOVER, restaurant.clover_merchant_id)):
+            if not merchant_id:
+                continue
+            submission = POSSubmission(
+                order_id=order.id,
+                restaurant_id=restaurant.id,
+                provider=provider,
+                merchant_id=merchant_id,
+                idempotency_key=str(uuid.uuid4()),
+                status=POSSubmissionStatus.PENDING,
+                attempts=0,
+                next_attempt_at=datetime.utcnow()
+            )
+            self.db.add(submission)
+            submissions.append(submission)
+        return submissions
+
+    def get_dead_letters(self, restaurant_id: Optional[int] = None, limit: int = 100) -> List[POSSubmission]:
+        """Get submissions that exhausted their retries or were rejected"""
+        query = self.db.query(POSSubmission).filter(POSSubmission.status == POSSubmissionStatus.DEAD)
+        if restaurant_id:
+            query = query.filter(POSSubmission.restaurant_id == restaurant_id)
+        return query.order_by(POSSubmission.id.desc()).limit(limit).all()
+
+    def requeue(self, submission_id: int) -> bool:
+        """Move a dead-lettered submission back to the pending queue; its idempotency key is kept"""
+        submission = self.db.query(POSSubmission).filter(POSSubmission.id == submission_id).first()
+        if not submission or submission.status != POSSubmissionStatus.DEAD:
+            return False
+
+        submission.status = POSSubmissionStatus.PENDING
+        submission.attempts = 0
+        submission.next_attempt_at = datetime.utcnow()
+        self.db.commit()
+        return True
+
+    def get_lag_report(self, window_minutes: int) -> List[Dict[str, Any]]:
+        """Per-restaurant submission backlog and the lag of orders submitted within the window.
+
+        Lag runs from the order being queued (OTP verified) to the POS
+        accepting it. Restaurants with the oldest waiting order come first.
+        """
+        now = datetime.utcnow()
+        since = now - timedelta(minutes=window_minutes)
+        report: Dict[int, Dict[str, Any]] = {}
+
+        def entry(restaurant_id: int) -> Dict[str, Any]:
+            return report.setdefault(restaurant_id, {
+                "restaurant_id": restaurant_id,
+                "restaurant_name": None,
+                "pending": 0,
+                "submitting": 0,
+                "dead": 0,
+                "oldest_waiting_seconds": None,
+                "submitted": 0,
+                "lag_avg_seconds": None,
+                "lag_p95_seconds": None,
+                "lag_max_seconds": None
+            })
+
+        backlog = self.db.query(
+            POSSubmission.restaurant_id,
+            POSSubmission.status,
+            func.count(POSSubmission.id),
+            func.min(POSSubmission.created_at)
+        ).filter(
+            POSSubmission.status != POSSubmissionStatus.SUBMITTED
+        ).group_by(POSSubmission.restaurant_id, POSSubmission.status)
+
+        for restaurant_id, submission_status, count, oldest in backlog:
+            row = entry(restaurant_id)
+            row[submission_status.value] = count
+            if submission_status != POSSubmissionStatus.DEAD and oldest is not None:
+                waiting = round((now - to_utc_naive(oldest)).total_seconds(), 1)
+                row["oldest_waiting_seconds"] = max(row["oldest_waiting_seconds"] or 0, waiting)
+
+        lags: Dict[int, List[float]] = defaultdict(list)
+        submitted = self.db.query(
+            POSSubmission.restaurant_id, POSSubmission.created_at, POSSubmission.submitted_at
+        ).filter(
+            POSSubmission.status == POSSubmissionStatus.SUBMITTED,
+            POSSubmission.submitted_at >= since
+        )
+        for restaurant_id, created_at, submitted_at in submitted:
+            lags[restaurant_id].append(max(0.0, (to_utc_naive(submitted_at) - to_utc_naive(created_at)).total_seconds()))
+
+        for restaurant_id, values in lags.items():
+            values.sort()
+            row = entry(restaurant_id)
+            row["submitted"] = len(values)
+            row["lag_avg_seconds"] = round(sum(values) / len(values), 1)
+            row["lag_p95_seconds"] = round(_percentile(values, 0.95), 1)
+            row["lag_max_seconds"] = round(values[-1], 1)
+
+        if report:
+            for restaurant_id, name in self.db.query(Restaurant.id, Restaurant.name).filter(Restaurant.id.in_(report)):
+                report[restaurant_id]["restaurant_name"] = name
+
+        return sorted(report.values(), key=lambda row: row["oldest_waiting_seconds"] or 0, reverse=True)
+
+class POSSubmissionDispatcher:
+    """Background task that submits queued orders to Toast and Clover.
+
+    Submissions run as independent tasks rather than in lockstep batches, so
+    a slow POS does not hold up the others. Each merchant is limited to
+    pos_max_concurrency_per_merchant of the pos_submission_concurrency
+    slots, and once a merchant fails pos_circuit_failure_threshold times in
+    a row its circuit opens: its submissions stay queued without spending
+    attempts until a single trial call finds the POS healthy again.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, pos_service: Optional[POSService] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.session_factory = session_factory
+        self.pos_service = pos_service or POSService()
+        self.breaker = breaker or CircuitBreaker(settings.pos_circuit_failure_threshold, settings.pos_circuit_reset_seconds)
+        self.stats: Counter = Counter()
+        self._in_flight: Counter = Counter()
+        self._tasks: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def notify(self):
+        """Wake the dispatcher after submissions were queued; safe to call from any thread"""
+        if self._loop is not None and self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                started = await self.dispatch()
+            except Exception:
+                logger.exception("POS submission dispatch cycle failed")
+                started = 0
+
+            if not started:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.pos_submission_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+        # Let in-flight submissions finish; anything cut short is reclaimed once its lease expires
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": sum(self._in_flight.values()),
+            "stats": dict(self.stats),
+            "circuits": self.breaker.snapshot()
+        }
+
+    async def dispatch(self) -> int:
+        """Claim due submissions for the free worker slots and start them; returns how many started"""
+        free = settings.pos_submission_concurrency - len(self._tasks)
+        if free <= 0:
+            return 0
+
+        per_merchant = settings.pos_max_concurrency_per_merchant
+        allowance = {key: per_merchant - count for key, count in self._in_flight.items()}
+        for key, state in self.breaker.states().items():
+            if state == "open":
+                allowance[key] = 0
+            elif state == "half_open":
+                # Only the trial call goes out until the circuit closes again
+                allowance[key] = min(allowance.get(key, per_merchant), 1 - self._in_flight[key])
+
+        submissions = await run_blocking(self._claim_batch, free, allowance)
+        for submission in submissions:
+            key = (submission["provider"], submission["merchant_id"])
+            self._in_flight[key] += 1
+            task = asyncio.create_task(self._deliver(submission))
+            self._tasks.add(task)
+            task.add_done_callback(lambda done, key=key: self._finished(done, key))
+        return len(submissions)
+
+    def _finished(self, task: asyncio.Task, key: Tuple[str, str]):
+        self._tasks.discard(task)
+        self._in_flight[key] -= 1
+        if self._in_flight[key] <= 0:
+            del self._in_flight[key]
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _deliver(self, submission: Dict[str, Any]):
+        key = (submission["provider"], submission["merchant_id"])
+        try:
+            try:
+                order_data = await run_blocking(self._build_order_data, submission)
+            except POSRequestError as e:
+                await self._fail(submission, e)
+                return
+
+            if not self.breaker.allow(key):
+                self.stats["deferred"] += 1
+                delay = self.breaker.retry_after(key) or settings.pos_circuit_reset_seconds
+                await run_blocking(self._defer, submission["id"], delay)
+                return
+
+            try:
+                access_token = await self._access_token(submission["provider"], submission["merchant_id"])
+                pos_order_id = await self.pos_service.submit_order(
+                    submission["provider"], access_token, submission["merchant_id"], order_data,
+                    idempotency_key=submission["idempotency_key"]
+                )
+            except POSRequestError as e:
+                # A rejected order still proves the POS is up
+                if e.retryable:
+                    self.breaker.record_failure(key)
+                else:
+                    self.breaker.record_success(key)
+                await self._fail(submission, e)
+                return
+
+            self.breaker.record_success(key)
+            await run_blocking(self._record_success, submission["id"], pos_order_id)
+            self.stats["submitted"] += 1
+        except Exception:
+            logger.exception("POS submission %s failed unexpectedly", submission["id"])
+
+    async def _fail(self, submission: Dict[str, Any], error: POSRequestError):
+        dead = await run_blocking(self._record_failure, submission["id"], str(error), error.retryable)
+        self.stats["dead" if dead else "retried"] += 1
+
+    async def _access_token(self, provider: str, merchant_id: str) -> str:
+        if provider == TOAST:
+            token = await self.pos_service.get_toast_access_token()
+        else:
+            token = await self.pos_service.get_clover_access_token(merchant_id=merchant_id)
+        if not token:
+            raise POSRequestError(f"Could not obtain a {provider} access token")
+        return token
+
+    def _claim_batch(self, limit: int, allowance: Dict[Tuple[str, str], int]) -> List[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            lease_expired = now - timedelta(seconds=settings.pos_submission_lease_seconds)
+            claimable = or_(
+                and_(
+                    POSSubmission.status == POSSubmissionStatus.PENDING,
+                    POSSubmission.next_attempt_at <= now
+                ),
+                and_(
+                    POSSubmission.status == POSSubmissionStatus.SUBMITTING,
+                    POSSubmission.locked_at < lease_expired
+                )
+            )
+
+            query = db.query(POSSubmission).filter(claimable)
+            blocked = [key for key, remaining in allowance.items() if remaining <= 0]
+            if blocked:
+                # Per (provider, merchant): a Toast location and a Clover merchant may share an id
+                query = query.filter(tuple_(POSSubmission.provider, POSSubmission.merchant_id).notin_(blocked))
+            # Read past the first few merchants so one deep backlog does not fill every slot
+            candidates = query.order_by(POSSubmission.id).limit(limit * settings.pos_max_concurrency_per_merchant).all()
+
+            claimed = []
+            taken: Counter = Counter()
+            for submission in candidates:
+                if len(claimed) >= limit:
+                    break
+                key = (submission.provider, submission.merchant_id)
+                if taken[key] >= allowance.get(key, settings.pos_max_concurrency_per_merchant):
+                    continue
+
+                result = db.execute(
+                    update(POSSubmission)
+                    .where(POSSubmission.id == submission.id, claimable)
+                    .values(status=POSSubmissionStatus.SUBMITTING, locked_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 1:
+                    taken[key] += 1
+                    claimed.append({
+                        "id": submission.id,
+                        "order_id": submission.order_id,
+                        "provider": submission.provider,
+                        "merchant_id": submission.merchant_id,
+                        "idempotency_key": submission.idempotency_key
+                    })
+
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def _build_order_data(self, submission: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the POS payload; raises a permanent POSRequestError if the order cannot be mapped"""
+        provider = submission["provider"]
+        db = self.session_factory()
+        try:
+            order = db.query(Order).options(selectinload(Order.items)).filter(Order.id == submission["order_id"]).first()
+            if not order:
+                raise POSRequestError(f"Order {submission['order_id']} no longer exists", retryable=False)
+
+            item_column = PROVIDER_COLUMNS[provider].item
+            pos_item_ids = dict(
+                db.query(MenuItem.id, item_column).filter(MenuItem.id.in_({item.menu_item_id for item in order.items}))
+            )
+            unmapped = sorted({item.menu_item_id for item in order.items if not pos_item_ids.get(item.menu_item_id)})
+            if unmapped:
+                raise POSRequestError(f"Menu items {unmapped} have no {provider} item id", retryable=False)
+
+            return ORDER_BUILDERS[provider](order, pos_item_ids)
+        finally:
+            db.close()
+
+    def _record_success(self, submission_id: int, pos_order_id: str):
+        db = self.session_factory()
+        try:
+            submission = db.query(POSSubmission).filter(POSSubmission.id == submission_id).first()
+            if not submission:
+                return
+
+            submission.status = POSSubmissionStatus.SUBMITTED
+            submission.pos_order_id = pos_order_id
+            submission.submitted_at = datetime.utcnow()
+            submission.locked_at = None
+            submission.last_error = None
+            db.execute(
+                update(Order)
+                .where(Order.id == submission.order_id)
+                .values({ORDER_COLUMNS[submission.provider]: pos_order_id})
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _record_failure(self, submission_id: int, error: str, retryable: bool) -> bool:
+        """Schedule a retry with exponential backoff; returns whether the submission was dead-lettered"""
+        db = self.session_factory()
+        try:
+            submission = db.query(POSSubmission).filter(POSSubmission.id == submission_id).first()
+            if not submission:
+                return False
+
+            now = datetime.utcnow()
+            submission.attempts += 1
+            submission.last_error = error
+            submission.locked_at = None
+            if not retryable or submission.attempts >= settings.pos_submission_max_attempts:
+                submission.status = POSSubmissionStatus.DEAD
+                logger.error("POS submission %s dead-lettered after %s attempts: %s", submission_id, submission.attempts, error)
+            else:
+                delay = min(
+                    settings.pos_submission_retry_base_seconds * (2 ** (submission.attempts - 1)),
+                    settings.pos_submission_max_backoff_seconds
+                )
+                submission.status = POSSubmissionStatus.PENDING
+                submission.next_attempt_at = now + timedelta(seconds=delay)
+
+            db.commit()
+            return submission.status == POSSubmissionStatus.DEAD
+        finally:
+            db.close()
+
+    def _defer(self, submission_id: int, delay: float):
+        """Put a submission back without spending an attempt, for merchants whose circuit is open"""
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(POSSubmission)
+                .where(POSSubmission.id == submission_id)
+                .values(
+                    status=POSSubmissionStatus.PENDING,
+                    locked_at=None,
+                    next_attempt_at=datetime.utcnow() + timedelta(seconds=delay)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+pos_submission_dispatcher = POSSubmissionDispatcher()
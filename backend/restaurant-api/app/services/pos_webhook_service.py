@@ -0,0 +1,540 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from collections import Counter
+from dataclasses import dataclass, field
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.order import OrderStatus
+from app.models.pos_webhook import POSWebhookEvent, POSWebhookStatus
+from app.models.restaurant import Restaurant
+from app.services.menu_sync_service import MenuSyncService
+from app.services.order_service import OrderService
+from app.services.pos_service import CLOVER, TOAST, POSService
+from app.services.pos_submission_service import ORDER_COLUMNS
+from datetime import datetime, timedelta
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOAST_SIGNATURE_HEADER = "Toast-Signature"
+CLOVER_AUTH_HEADER = "X-Clover-Auth"
+
+CLOVER_ORDER_STATES = {
+    "open": OrderStatus.CONFIRMED,
+    "locked": OrderStatus.COMPLETED
+}
+
+def sign_toast_payload(body: bytes, secret: str) -> str:
+    return base64.b64encode(hmac.new(secret.encode(), body, hashlib.sha256).digest()).decode()
+
+def verify_toast_signature(body: bytes, signature: Optional[str]) -> bool:
+    """Check the base64 HMAC-SHA256 of the raw body; fails closed when no secret is configured"""
+    secret = settings.toast_webhook_secret
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign_toast_payload(body, secret), signature)
+
+def verify_clover_auth(auth_code: Optional[str]) -> bool:
+    expected = settings.clover_webhook_auth_code
+    if not expected or not auth_code:
+        return False
+    return hmac.compare_digest(expected, auth_code)
+
+@dataclass
+class InboundWebhookEvent:
+    provider: str
+    event_id: str
+    event_type: str
+    payload: Dict[str, Any]
+
+def parse_toast_webhook(body: Dict[str, Any]) -> List[InboundWebhookEvent]:
+    """Toast sends one event per delivery, identified by its guid"""
+    event_type = f"{body.get('eventCategory')}.{body.get('eventType')}"
+    return [InboundWebhookEvent(TOAST, body["guid"], event_type, body)]
+
+def parse_clover_webhook(body: Dict[str, Any]) -> List[InboundWebhookEvent]:
+    """Clover batches object change notices per merchant; they carry no id, so one is derived"""
+    events = []
+    for merchant_id, changes in (body.get("merchants") or {}).items():
+        for change in changes:
+            object_id = change["objectId"]
+            kind = object_id.split(":", 1)[0]
+            events.append(InboundWebhookEvent(
+                CLOVER,
+                f"{merchant_id}:{object_id}:{change.get('type')}:{change.get('ts')}",
+                f"{kind}.{change.get('type')}",
+                {"merchant_id": merchant_id, **change}
+            ))
+    return events
+
+def toast_order_status(order: Dict[str, Any]) -> Optional[OrderStatus]:
+    """Derive our status from a Toast order's kitchen fulfillment state"""
+    if order.get("voided") or order.get("deleted"):
+        return OrderStatus.CANCELLED
+    statuses = {
+        selection.get("fulfillmentStatus")
+        for check in order.get("checks") or []
+        for selection in check.get("selections") or []
+    }
+    statuses.discard(None)
+    if not statuses:
+        return None
+    if statuses == {"READY"}:
+        return OrderStatus.READY
+    if statuses & {"SENT", "READY"}:
+        return OrderStatus.PREPARING
+    return OrderStatus.CONFIRMED
+
+def webhook_merchant_key(event: Dict[str, Any]) -> Tuple[str, str]:
+    """The (provider, merchant) an inbox event belongs to; failures are isolated per merchant"""
+    payload = event["payload"]
+    if not isinstance(payload, dict):
+        return event["provider"], ""
+    if event["provider"] == CLOVER:
+        return CLOVER, str(payload.get("merchant_id") or "")
+    details = payload.get("details") if isinstance(payload.get("details"), dict) else {}
+    return TOAST, str(payload.get("restaurantGuid") or details.get("restaurantGuid") or "")
+
+@dataclass
+class CoalescedChanges:
+    """The net effect of a batch of webhook events; later events win"""
+    items: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)  # provider -> item id -> fields
+    orders: Dict[str, Dict[str, OrderStatus]] = field(default_factory=dict)  # provider -> order id -> status
+    toast_menu_locations: Set[str] = field(default_factory=set)
+    clover_fetches: Dict[Tuple[str, str, str], None] = field(default_factory=dict)  # ordered set of (merchant, kind, id)
+    ignored: int = 0
+
+    def set_item(self, provider: str, item_id: str, **fields: Any):
+        self.items.setdefault(provider, {}).setdefault(item_id, {}).update(fields)
+
+    def set_order(self, provider: str, order_id: str, status: OrderStatus):
+        self.orders.setdefault(provider, {})[order_id] = status
+
+def coalesce_events(events: List[Dict[str, Any]]) -> CoalescedChanges:
+    """Fold events (oldest first) into one set of changes, so a burst costs one write per row"""
+    changes = CoalescedChanges()
+    for event in events:
+        try:
+            if event["provider"] == TOAST:
+                _coalesce_toast(changes, event["payload"])
+            else:
+                _coalesce_clover(changes, event["payload"])
+        except (KeyError, TypeError, AttributeError, ValueError):
+            # A malformed event is skipped rather than failing the whole batch with it
+            logger.warning("Ignoring malformed POS webhook event %s", event["id"])
+            changes.ignored += 1
+    return changes
+
+def _coalesce_toast(changes: CoalescedChanges, body: Dict[str, Any]):
+    category = body.get("eventCategory")
+    details = body.get("details") or {}
+    if category == "stock":
+        for entry in details.get("inventory") or []:
+            in_stock = entry.get("status") != "OUT_OF_STOCK" and not (
+                entry.get("status") == "QUANTITY" and (entry.get("quantity") or 0) <= 0
+            )
+            changes.set_item(TOAST, entry["guid"], is_available=in_stock)
+    elif category == "menus":
+        # Menu webhooks only announce a publish; prices come from a diff sync of the location
+        location_id = body.get("restaurantGuid") or details.get("restaurantGuid")
+        if location_id:
+            changes.toast_menu_locations.add(location_id)
+        else:
+            changes.ignored += 1
+    elif category == "orders" and details.get("order"):
+        order = details["order"]
+        status = toast_order_status(order)
+        if status is not None:
+            changes.set_order(TOAST, order["guid"], status)
+        else:
+            changes.ignored += 1
+    else:
+        changes.ignored += 1
+
+def _coalesce_clover(changes: CoalescedChanges, change: Dict[str, Any]):
+    kind, _, object_id = change["objectId"].partition(":")
+    merchant_id = change["merchant_id"]
+    key = (merchant_id, "items" if kind == "I" else "orders", object_id)
+    if kind not in ("I", "O"):
+        changes.ignored += 1
+    elif change.get("type") == "DELETE":
+        changes.clover_fetches.pop(key, None)
+        if kind == "I":
+            changes.set_item(CLOVER, object_id, is_available=False)
+        else:
+            changes.set_order(CLOVER, object_id, OrderStatus.CANCELLED)
+    else:
+        # Clover notices say what changed, not how; the object is fetched once per batch
+        changes.clover_fetches.pop(key, None)
+        changes.clover_fetches[key] = None
+
+class POSWebhookService:
+    """Stores verified webhook deliveries in the inbox and manages their lifecycle"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ingest(self, events: List[InboundWebhookEvent]) -> int:
+        """Insert new events, skipping ids already in the inbox; returns how many were new"""
+        now = datetime.utcnow()
+        rows, seen = [], set()
+        for event in events:
+            if (event.provider, event.event_id) in seen:
+                continue
+            seen.add((event.provider, event.event_id))
+            rows.append({
+                "provider": event.provider,
+                "event_id": event.event_id,
+                "event_type": event.event_type,
+                "payload": json.dumps(event.payload, separators=(",", ":")),
+                "status": POSWebhookStatus.PENDING,
+                "attempts": 0,
+                "next_attempt_at": now
+            })
+        if not rows:
+            return 0
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            result = self.db.execute(
+                insert(POSWebhookEvent).values(rows).on_conflict_do_nothing(index_elements=["provider", "event_id"])
+            )
+            inserted = result.rowcount
+        else:
+            known = {
+                (provider, event_id)
+                for provider, event_id in self.db.query(POSWebhookEvent.provider, POSWebhookEvent.event_id).filter(
+                    POSWebhookEvent.event_id.in_([row["event_id"] for row in rows])
+                )
+            }
+            new_rows = [row for row in rows if (row["provider"], row["event_id"]) not in known]
+            for row in new_rows:
+                self.db.add(POSWebhookEvent(**row))
+            inserted = len(new_rows)
+
+        self.db.commit()
+        return inserted
+
+    def get_status_counts(self) -> Dict[str, int]:
+        counts = self.db.query(POSWebhookEvent.status, func.count(POSWebhookEvent.id)).group_by(POSWebhookEvent.status).all()
+        return {status.value: count for status, count in counts}
+
+    def requeue(self,
+                provider: Optional[str] = None,
+                since: Optional[datetime] = None,
+                statuses: Tuple[POSWebhookStatus, ...] = (POSWebhookStatus.FAILED,)) -> int:
+        """Move stored events back to the pending queue so the consumer applies them again"""
+        query = self.db.query(POSWebhookEvent).filter(POSWebhookEvent.status.in_(statuses))
+        if provider:
+            query = query.filter(POSWebhookEvent.provider == provider)
+        if since:
+            query = query.filter(POSWebhookEvent.received_at >= since)
+        requeued = query.update({
+            POSWebhookEvent.status: POSWebhookStatus.PENDING,
+            POSWebhookEvent.attempts: 0,
+            POSWebhookEvent.next_attempt_at: datetime.utcnow(),
+            POSWebhookEvent.locked_at: None,
+            POSWebhookEvent.last_error: None
+        }, synchronize_session=False)
+        self.db.commit()
+        return requeued
+
+    def iter_deliveries(self, provider: Optional[str] = None, since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """Yield stored events as webhook request bodies, oldest first, for recording and replay"""
+        query = self.db.query(POSWebhookEvent.provider, POSWebhookEvent.payload)
+        if provider:
+            query = query.filter(POSWebhookEvent.provider == provider)
+        if since:
+            query = query.filter(POSWebhookEvent.received_at >= since)
+        for event_provider, payload in query.order_by(POSWebhookEvent.id).yield_per(1000):
+            body = json.loads(payload)
+            if event_provider == CLOVER:
+                merchant_id = body.pop("merchant_id")
+                body = {"merchants": {merchant_id: [body]}}
+            yield {"provider": event_provider, "body": body}
+
+    def prune(self, older_than: datetime) -> int:
+        deleted = self.db.query(POSWebhookEvent).filter(
+            POSWebhookEvent.status == POSWebhookStatus.PROCESSED,
+            POSWebhookEvent.received_at < older_than
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+class POSWebhookConsumer:
+    """Background task that drains the webhook inbox in coalesced batches.
+
+    After a delivery wakes it, the consumer waits pos_webhook_coalesce_ms
+    so a burst is claimed as one batch. The batch is split per merchant;
+    each merchant's events are folded into their net effect and applied in
+    one transaction, so a merchant whose POS is down or whose data is bad
+    only holds back its own events. Updates are idempotent, so a group
+    that fails is simply retried.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, pos_service: Optional[POSService] = None):
+        self.session_factory = session_factory
+        self.pos_service = pos_service or POSService()
+        self.stats: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_pruned: Optional[datetime] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def notify(self):
+        """Wake the consumer after new events were stored; safe to call from any thread"""
+        if self._loop is not None and self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                processed = await self.process_batch()
+                await self._maybe_prune()
+            except Exception:
+                logger.exception("POS webhook consumer cycle failed")
+                processed = 0
+
+            if processed < settings.pos_webhook_batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.pos_webhook_poll_interval)
+                    await asyncio.sleep(settings.pos_webhook_coalesce_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def process_batch(self) -> int:
+        """Claim a batch of pending events and apply their net effect, merchant by merchant"""
+        events = await run_blocking(self._claim_batch)
+        if not events:
+            return 0
+
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for event in events:
+            groups.setdefault(webhook_merchant_key(event), []).append(event)
+        for group in groups.values():
+            await self._process_group(group)
+        self.stats["batches"] += 1
+        return len(events)
+
+    async def _process_group(self, events: List[Dict[str, Any]]):
+        event_ids = [event["id"] for event in events]
+        try:
+            changes = coalesce_events(events)
+            await self._resolve_clover_fetches(changes)
+            menus_synced = await self._sync_toast_menus(changes)
+            items_updated, orders_updated = await run_blocking(self._apply, changes, event_ids)
+        except Exception as e:
+            logger.exception("Failed to apply %s POS webhook events", len(event_ids))
+            await run_blocking(self._record_failure, event_ids, str(e))
+            self.stats.update({"failed_groups": 1, "failed_events": len(event_ids)})
+            return
+
+        self.stats.update({
+            "events": len(event_ids),
+            "items_updated": items_updated,
+            "orders_updated": orders_updated,
+            "menus_synced": menus_synced,
+            "ignored": changes.ignored
+        })
+
+    async def _resolve_clover_fetches(self, changes: CoalescedChanges):
+        if not changes.clover_fetches:
+            return
+
+        tokens: Dict[str, str] = {}
+        for merchant_id in {merchant_id for merchant_id, _, _ in changes.clover_fetches}:
+            token = await self.pos_service.get_clover_access_token(merchant_id=merchant_id)
+            if not token:
+                raise RuntimeError(f"Could not obtain a Clover access token for merchant {merchant_id}")
+            tokens[merchant_id] = token
+
+        keys = list(changes.clover_fetches)
+        # The POS client caps concurrency per merchant, so one gather is safe
+        objects = await asyncio.gather(*(
+            self.pos_service.get_clover_object(tokens[merchant_id], merchant_id, kind, object_id)
+            for merchant_id, kind, object_id in keys
+        ))
+        for (merchant_id, kind, object_id), obj in zip(keys, objects):
+            if obj is None:
+                raise RuntimeError(f"Could not fetch Clover {kind} {object_id}")
+            if kind == "items":
+                if not obj:
+                    changes.set_item(CLOVER, object_id, is_available=False)
+                    continue
+                fields = {"is_available": obj.get("available", True) and not obj.get("hidden", False)}
+                if obj.get("price") is not None:
+                    fields["price"] = obj["price"] / 100  # Clover prices are in cents
+                changes.set_item(CLOVER, object_id, **fields)
+            else:
+                status = CLOVER_ORDER_STATES.get(obj.get("state")) if obj else OrderStatus.CANCELLED
+                if status is not None:
+                    changes.set_order(CLOVER, object_id, status)
+
+    async def _sync_toast_menus(self, changes: CoalescedChanges) -> int:
+        if not changes.toast_menu_locations:
+            return 0
+
+        token = await self.pos_service.get_toast_access_token()
+        if not token:
+            raise RuntimeError("Could not obtain a Toast access token")
+        synced = 0
+        for location_id in changes.toast_menu_locations:
+            payload = await self.pos_service.sync_toast_menu(token, location_id)
+            if not payload:
+                raise RuntimeError(f"Toast returned no menu for location {location_id}")
+            if await run_blocking(self._sync_toast_menu, location_id, payload):
+                synced += 1
+        return synced
+
+    def _sync_toast_menu(self, location_id: str, payload: Dict[str, Any]) -> bool:
+        db = self.session_factory()
+        try:
+            restaurant_id = db.query(Restaurant.id).filter(Restaurant.toast_location_id == location_id).scalar()
+            if restaurant_id is None:
+                logger.warning("Ignoring Toast menu webhook for unknown location %s", location_id)
+                return False
+            MenuSyncService(db).sync_toast_menus(restaurant_id, payload)
+            return True
+        finally:
+            db.close()
+
+    def _apply(self, changes: CoalescedChanges, event_ids: List[int]) -> Tuple[int, int]:
+        """Write the item and order changes and mark the events processed in one transaction"""
+        db = self.session_factory()
+        try:
+            menu_sync_service = MenuSyncService(db)
+            order_service = OrderService(db)
+            items_updated = sum(
+                menu_sync_service.record_item_changes(provider, items) for provider, items in changes.items.items()
+            )
+            orders_updated = ready = 0
+            for provider, statuses in changes.orders.items():
+                changed, became_ready = order_service.record_pos_statuses(ORDER_COLUMNS[provider], statuses)
+                orders_updated += changed
+                ready += became_ready
+
+            db.execute(
+                update(POSWebhookEvent)
+                .where(POSWebhookEvent.id.in_(event_ids))
+                .values(status=POSWebhookStatus.PROCESSED, processed_at=datetime.utcnow(), locked_at=None, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            order_service.notify_status_changes(orders_updated, ready)
+            return items_updated, orders_updated
+        finally:
+            db.close()
+
+    def _claim_batch(self) -> List[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            lease_expired = now - timedelta(seconds=settings.pos_webhook_lease_seconds)
+            claimable = or_(
+                and_(
+                    POSWebhookEvent.status == POSWebhookStatus.PENDING,
+                    POSWebhookEvent.next_attempt_at <= now
+                ),
+                and_(
+                    POSWebhookEvent.status == POSWebhookStatus.PROCESSING,
+                    POSWebhookEvent.locked_at < lease_expired
+                )
+            )
+
+            candidates = db.query(POSWebhookEvent.id).filter(claimable).order_by(
+                POSWebhookEvent.id
+            ).limit(settings.pos_webhook_batch_size).all()
+            candidate_ids = [event_id for (event_id,) in candidates]
+            if not candidate_ids:
+                return []
+
+            # Claim with one guarded UPDATE, then read back what this worker actually locked
+            db.execute(
+                update(POSWebhookEvent)
+                .where(POSWebhookEvent.id.in_(candidate_ids), claimable)
+                .values(status=POSWebhookStatus.PROCESSING, locked_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+            claimed = db.query(POSWebhookEvent.id, POSWebhookEvent.provider, POSWebhookEvent.payload).filter(
+                POSWebhookEvent.id.in_(candidate_ids),
+                POSWebhookEvent.status == POSWebhookStatus.PROCESSING,
+                POSWebhookEvent.locked_at == now
+            ).order_by(POSWebhookEvent.id).all()
+            return [
+                {"id": event_id, "provider": provider, "payload": json.loads(payload)}
+                for event_id, provider, payload in claimed
+            ]
+        finally:
+            db.close()
+
+    def _record_failure(self, event_ids: List[int], error: str):
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            events = db.query(POSWebhookEvent).filter(POSWebhookEvent.id.in_(event_ids)).all()
+            for event in events:
+                event.attempts += 1
+                event.last_error = error
+                event.locked_at = None
+                if event.attempts >= settings.pos_webhook_max_attempts:
+                    event.status = POSWebhookStatus.FAILED
+                    logger.error("POS webhook event %s failed after %s attempts: %s", event.id, event.attempts, error)
+                else:
+                    delay = settings.pos_webhook_retry_base_seconds * (2 ** (event.attempts - 1))
+                    event.status = POSWebhookStatus.PENDING
+                    event.next_attempt_at = now + timedelta(seconds=delay)
+            db.commit()
+        finally:
+            db.close()
+
+    async def _maybe_prune(self):
+        now = datetime.utcnow()
+        if self._last_pruned is not None and now - self._last_pruned < timedelta(hours=1):
+            return
+        self._last_pruned = now
+        cutoff = now - timedelta(hours=settings.pos_webhook_retention_hours)
+        await run_blocking(self._prune, cutoff)
+
+    def _prune(self, cutoff: datetime):
+        db = self.session_factory()
+        try:
+            deleted = POSWebhookService(db).prune(cutoff)
+            if deleted:
+                logger.info("Pruned %s processed POS webhook events older than %s", deleted, cutoff)
+        finally:
+            db.close()
+
+pos_webhook_consumer = POSWebhookConsumer()
@@ -1,21 +1,91 @@
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.models.restaurant import Restaurant
 from app.schemas.restaurant import RestaurantCreate, RestaurantUpdate, RestaurantLocation
+from app.services.cache_service import CacheVersionService
+from app.services.geo_index import GeoIndex
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pagination import Page, keyset_paginate
 from fastapi import HTTPException, status
-import json
+import heapq
+import logging
 import math
+import threading
+
+logger = logging.getLogger(__name__)
+
+RESTAURANTS_CACHE_KEY = "restaurants"
+
+def build_geo_index(db: Session) -> GeoIndex:
+    """Build the spatial index over every active restaurant with coordinates"""
+    rows = db.query(
+        Restaurant.id, Restaurant.name, Restaurant.address, Restaurant.city, Restaurant.state,
+        Restaurant.latitude, Restaurant.longitude, Restaurant.phone_number, Restaurant.is_open
+    ).filter(
+        Restaurant.is_active == True,
+        Restaurant.latitude.isnot(None),
+        Restaurant.longitude.isnot(None)
+    ).all()
+    return GeoIndex([(row.latitude, row.longitude, row._asdict()) for row in rows])
+
+class GeoIndexHolder:
+    """The process-wide spatial index, rebuilt off the request path.
+
+    When the restaurants version moves on, callers keep getting the index
+    they have while a single background thread builds its replacement and
+    swaps it in; a nearby query never waits for a rebuild. Only the very
+    first build, with nothing to serve yet, happens on the request path.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self.version: Optional[int] = None
+        self.index: Optional[GeoIndex] = None
+        self._building: Optional[int] = None
+        self._lock = threading.Lock()
+        self._initial_build_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="geo-index")
+
+    def get(self, db: Session, version: int) -> GeoIndex:
+        with self._lock:
+            if self.index is not None:
+                if self.version != version and self._building is None:
+                    self._building = version
+                    self._executor.submit(self._rebuild, version)
+                return self.index
+
+        with self._initial_build_lock:
+            if self.index is None:
+                self._install(version, build_geo_index(db))
+            return self.index
+
+    def _install(self, version: int, index: GeoIndex):
+        with self._lock:
+            self.version = version
+            self.index = index
+
+    def _rebuild(self, version: int):
+        db = self.session_factory()
+        try:
+            self._install(version, build_geo_index(db))
+        except Exception:
+            logger.exception("Rebuilding the restaurant spatial index failed; serving the previous one")
+        finally:
+            db.close()
+            with self._lock:
+                self._building = None
+
+geo_index_holder = GeoIndexHolder()
 
 class RestaurantService:
     def __init__(self, db: Session):
         self.db = db
+        self.cache_versions = CacheVersionService(db)
 
     def create_restaurant(self, restaurant_data: RestaurantCreate) -> Restaurant:
-        opening_hours_json = None
-        if restaurant_data.opening_hours:
-            opening_hours_json = json.dumps(restaurant_data.opening_hours)
-
         db_restaurant = Restaurant(
             name=restaurant_data.name,
             address=restaurant_data.address,
@@ -30,10 +100,11 @@ class RestaurantService:
             description=restaurant_data.description,
             website=restaurant_data.website,
             image_url=restaurant_data.image_url,
-            opening_hours=opening_hours_json
+            opening_hours=restaurant_data.opening_hours or None
         )
         
         self.db.add(db_restaurant)
+        self.cache_versions.bump_version(RESTAURANTS_CACHE_KEY)
         self.db.commit()
         self.db.refresh(db_restaurant)
         return db_restaurant
@@ -42,10 +113,21 @@ class RestaurantService:
         return self.db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
 
     def get_restaurants(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Restaurant]:
+        return self.get_restaurants_page(skip=skip, limit=limit, active_only=active_only).items
+
+    def get_restaurants_page(self,
+                             cursor: Optional[str] = None,
+                             skip: int = 0,
+                             limit: int = 100,
+                             active_only: bool = True) -> Page:
+        """Get restaurants oldest first, paginated on (created_at, id)"""
         query = self.db.query(Restaurant)
         if active_only:
             query = query.filter(Restaurant.is_active == True)
-        return query.offset(skip).limit(limit).all()
+        return keyset_paginate(
+            query, Restaurant, [Restaurant.created_at, Restaurant.id], limit,
+            cursor=cursor, skip=skip
+        )
 
     def update_restaurant(self, restaurant_id: int, restaurant_data: RestaurantUpdate) -> Optional[Restaurant]:
         db_restaurant = self.get_restaurant(restaurant_id)
@@ -53,13 +135,23 @@ class RestaurantService:
             return None
 
         update_data = restaurant_data.dict(exclude_unset=True)
-        
-        if 'opening_hours' in update_data and update_data['opening_hours'] is not None:
-            update_data['opening_hours'] = json.dumps(update_data['opening_hours'])
 
         for field, value in update_data.items():
             setattr(db_restaurant, field, value)
 
+        self.cache_versions.bump_version(RESTAURANTS_CACHE_KEY)
+        self.db.commit()
+        self.db.refresh(db_restaurant)
+        return db_restaurant
+
+    def link_clover_merchant(self, restaurant_id: int, merchant_id: str) -> Optional[Restaurant]:
+        """Record the Clover merchant a restaurant syncs from"""
+        db_restaurant = self.get_restaurant(restaurant_id)
+        if not db_restaurant:
+            return None
+
+        db_restaurant.clover_merchant_id = merchant_id
+        self.cache_versions.bump_version(RESTAURANTS_CACHE_KEY)
         self.db.commit()
         self.db.refresh(db_restaurant)
         return db_restaurant
@@ -70,6 +162,7 @@ class RestaurantService:
             return False
 
         db_restaurant.is_active = False
+        self.cache_versions.bump_version(RESTAURANTS_CACHE_KEY)
         self.db.commit()
         return True
 
@@ -91,19 +184,43 @@ class RestaurantService:
 
         return distance
 
-    def find_nearest_restaurants(self, user_lat: float, user_lon: float, limit: int = 10) -> List[RestaurantLocation]:
-        """Find nearest restaurants to user location"""
-        restaurants = self.db.query(Restaurant).filter(
+    def get_geo_index(self) -> GeoIndex:
+        """Get the in-memory spatial index; after restaurant changes the previous index
+        is served until its background rebuild is swapped in"""
+        return geo_index_holder.get(self.db, self.cache_versions.get_version(RESTAURANTS_CACHE_KEY))
+
+    def find_nearest_restaurants(self, user_lat: float, user_lon: float, limit: int = 10, radius: Optional[float] = None) -> List[RestaurantLocation]:
+        """Find nearest restaurants to user location, optionally within radius miles"""
+        if settings.geo_index_enabled:
+            matches = self.get_geo_index().nearest(user_lat, user_lon, limit, radius)
+            return [RestaurantLocation(**location, distance=distance) for distance, location in matches]
+
+        query = self.db.query(Restaurant).filter(
             Restaurant.is_active == True,
             Restaurant.latitude.isnot(None),
             Restaurant.longitude.isnot(None)
-        ).all()
+        )
 
-        restaurant_locations = []
-        for restaurant in restaurants:
-            distance = self.calculate_distance(user_lat, user_lon, restaurant.latitude, restaurant.longitude)
-            
-            location = RestaurantLocation(
+        if radius is not None:
+            lat_delta = radius / 69.0
+            query = query.filter(Restaurant.latitude.between(user_lat - lat_delta, user_lat + lat_delta))
+
+            cos_lat = math.cos(math.radians(user_lat))
+            if cos_lat > 0.01:
+                lon_delta = radius / (69.0 * cos_lat)
+                if user_lon - lon_delta >= -180 and user_lon + lon_delta <= 180:
+                    query = query.filter(Restaurant.longitude.between(user_lon - lon_delta, user_lon + lon_delta))
+
+        candidates = (
+            (self.calculate_distance(user_lat, user_lon, restaurant.latitude, restaurant.longitude), restaurant)
+            for restaurant in query.all()
+        )
+        if radius is not None:
+            candidates = (candidate for candidate in candidates if candidate[0] <= radius)
+
+        nearest = heapq.nsmallest(limit, candidates, key=lambda candidate: candidate[0])
+        return [
+            RestaurantLocation(
                 id=restaurant.id,
                 name=restaurant.name,
                 address=restaurant.address,
@@ -114,11 +231,8 @@ class RestaurantService:
                 phone_number=restaurant.phone_number,
                 is_open=restaurant.is_open,
                 distance=distance
-            )
-            restaurant_locations.append(location)
-
-        restaurant_locations.sort(key=lambda x: x.distance)
-        return restaurant_locations[:limit]
+            ) for distance, restaurant in nearest
+        ]
 
     def get_restaurant_by_location_id(self, toast_location_id: Optional[str] = None, clover_merchant_id: Optional[str] = None) -> Optional[Restaurant]:
         """Get restaurant by POS location ID"""
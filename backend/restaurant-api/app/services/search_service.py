@@ -0,0 +1,396 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import func, literal_column, table, column
+from sqlalchemy.orm import Session, Query
+from app.core.config import settings
+from app.core.search import (
+    tokenize, fts5_available, has_table,
+    MENU_ITEMS_FTS_TABLE, POSTGRES_MENU_SEARCH_VECTOR,
+    CMS_CONTENT_FTS_TABLE, POSTGRES_CMS_SEARCH_VECTOR,
+    HIGHLIGHT_START, HIGHLIGHT_END
+)
+from app.models.cms import CMSContent
+from app.models.menu import Menu, MenuItem
+from app.services.cache_service import CacheVersionService
+from collections import defaultdict
+import bisect
+import html
+import math
+import threading
+
+MENU_SEARCH_CACHE_KEY = "menu_search"
+CMS_SEARCH_CACHE_KEY = "cms_search"
+SNIPPET_WORDS = 12
+
+class InMemorySearchIndex:
+    """Inverted index with prefix matching and BM25-style ranking over weighted fields"""
+
+    def __init__(self, field_weights: Dict[str, float]):
+        self.field_weights = field_weights
+        self.postings: Dict[str, Dict[Any, float]] = defaultdict(dict)
+        self.documents: Dict[Any, Dict[str, List[str]]] = {}
+        self.metadata: Dict[Any, Any] = {}
+        self._terms: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, doc_id: Any, fields: Dict[str, Optional[str]], metadata: Any = None):
+        if doc_id in self.documents:
+            self.remove(doc_id)
+
+        tokens_by_field = {name: tokenize(fields.get(name) or "") for name in self.field_weights}
+        self.documents[doc_id] = tokens_by_field
+        self.metadata[doc_id] = metadata
+
+        scores: Dict[str, float] = defaultdict(float)
+        for name, tokens in tokens_by_field.items():
+            weight = self.field_weights[name]
+            for token in tokens:
+                scores[token] += weight
+        for token, score in scores.items():
+            self.postings[token][doc_id] = score
+        self._terms = None
+
+    def remove(self, doc_id: Any):
+        tokens_by_field = self.documents.pop(doc_id, None)
+        self.metadata.pop(doc_id, None)
+        if tokens_by_field is None:
+            return
+        for tokens in tokens_by_field.values():
+            for token in tokens:
+                postings = self.postings.get(token)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self.postings[token]
+        self._terms = None
+
+    def _expand(self, token: str, prefix: bool) -> List[str]:
+        if not prefix:
+            return [token] if token in self.postings else []
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        start = bisect.bisect_left(self._terms, token)
+        matches = []
+        for term in self._terms[start:]:
+            if not term.startswith(token):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, query: str, prefix: bool = True) -> List[Tuple[Any, float]]:
+        """Return (doc_id, score) pairs matching every query token, best first"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        total = len(self.documents) or 1
+        scores: Optional[Dict[Any, float]] = None
+        for token in tokens:
+            terms = self._expand(token, prefix)
+            token_scores: Dict[Any, float] = defaultdict(float)
+            for term in terms:
+                postings = self.postings[term]
+                idf = math.log(1 + total / len(postings))
+                for doc_id, weight in postings.items():
+                    token_scores[doc_id] = max(token_scores[doc_id], weight * idf)
+
+            if scores is None:
+                scores = dict(token_scores)
+            else:
+                scores = {doc_id: score + token_scores[doc_id] for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                return []
+
+        return sorted(scores.items(), key=lambda item: -item[1])
+
+_memory_index_lock = threading.Lock()
+_memory_index_state: Dict[str, Any] = {"version": None, "index": None}
+_cms_memory_index_state: Dict[str, Any] = {"version": None, "index": None}
+_resolved_backends: Dict[Tuple[str, str], str] = {}
+
+def _json_list(value: Any) -> List[str]:
+    return [str(entry).lower() for entry in value] if isinstance(value, list) else []
+
+def tags_match(allergens: Any, dietary_info: Any, excluded: Set[str], required: Set[str]) -> bool:
+    """The allergen and dietary filter for every backend, compared on decoded, lowercased
+    values so SQL and in-memory search agree regardless of how the JSON was stored"""
+    return not excluded & set(_json_list(allergens)) and required <= set(_json_list(dietary_info))
+
+def resolve_search_backend(db: Session, configured: str, fts_table: str) -> str:
+    """Pick the search backend for a setting of "auto": tsvector on Postgres, FTS5 on SQLite when
+    the virtual table exists, otherwise the in-memory index"""
+    if configured != "auto":
+        return configured
+
+    bind = db.get_bind()
+    cache_key = (str(bind.url), fts_table)
+    if cache_key in _resolved_backends:
+        return _resolved_backends[cache_key]
+
+    backend = "memory"
+    if bind.dialect.name == "postgresql":
+        backend = "postgres"
+    elif bind.dialect.name == "sqlite":
+        connection = db.connection()
+        if not fts5_available(connection):
+            _resolved_backends[cache_key] = backend
+        elif has_table(connection, fts_table):
+            backend = "sqlite"
+        else:
+            # Not cached: the table lookup repeats until a migration creates the FTS table
+            return backend
+    _resolved_backends[cache_key] = backend
+    return backend
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    """Escape a snippet carrying highlight markers and turn the markers into <mark> tags"""
+    if not snippet:
+        return None
+    return html.escape(snippet).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+def make_snippet(text: Optional[str], tokens: List[str], size: int = SNIPPET_WORDS) -> Optional[str]:
+    """Cut a window of `size` words around the first prefix match of any token, with matches marked"""
+    words = (text or "").split()
+    if not words:
+        return None
+
+    def matches(word: str) -> bool:
+        return any(part.startswith(token) for part in tokenize(word) for token in tokens)
+
+    first = next((position for position, word in enumerate(words) if matches(word)), None)
+    if first is None:
+        return None
+    start = max(0, min(first - size // 4, len(words) - size))
+    window = [
+        f"{HIGHLIGHT_START}{word}{HIGHLIGHT_END}" if matches(word) else word
+        for word in words[start:start + size]
+    ]
+    prefix = "… " if start > 0 else ""
+    suffix = " …" if start + size < len(words) else ""
+    return prefix + " ".join(window) + suffix
+
+class MenuSearchService:
+    """Ranked, prefix-aware menu item search over FTS5, tsvector or an in-memory index"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.cache_versions = CacheVersionService(db)
+
+    def get_backend(self) -> str:
+        return resolve_search_backend(self.db, settings.menu_search_backend, MENU_ITEMS_FTS_TABLE)
+
+    def invalidate(self):
+        """Mark the in-memory index stale; the SQL indexes are kept current by the database"""
+        if self.get_backend() == "memory":
+            self.cache_versions.bump_version(MENU_SEARCH_CACHE_KEY)
+
+    def search(self,
+               restaurant_id: int,
+               search_term: str,
+               limit: int = 20,
+               exclude_allergens: Optional[Iterable[str]] = None,
+               dietary: Optional[Iterable[str]] = None) -> List[MenuItem]:
+        tokens = tokenize(search_term)
+        if not tokens:
+            return []
+
+        backend = self.get_backend()
+        if backend == "memory":
+            return self._search_memory(restaurant_id, search_term, limit, exclude_allergens, dietary)
+
+        query = self.db.query(MenuItem).join(Menu).filter(
+            Menu.restaurant_id == restaurant_id,
+            MenuItem.is_available == True
+        )
+
+        if backend == "sqlite":
+            fts = table(MENU_ITEMS_FTS_TABLE, column("rowid"))
+            match = " AND ".join(f'"{token}"*' for token in tokens)
+            query = query.join(fts, fts.c.rowid == MenuItem.id).filter(
+                literal_column(MENU_ITEMS_FTS_TABLE).op("MATCH")(match)
+            ).order_by(literal_column(f"{MENU_ITEMS_FTS_TABLE}.rank"), MenuItem.name)
+        else:
+            vector = literal_column(POSTGRES_MENU_SEARCH_VECTOR)
+            ts_query = func.to_tsquery(
+                literal_column("'simple'::regconfig"),
+                " & ".join(f"{token}:*" for token in tokens)
+            )
+            query = query.filter(vector.op("@@")(ts_query)).order_by(
+                func.ts_rank(vector, ts_query).desc(), MenuItem.name
+            )
+
+        if exclude_allergens or dietary:
+            return self._filter_tags(query, limit, exclude_allergens, dietary)
+        return query.limit(limit).all()
+
+    def _filter_tags(self, query: Query, limit: int, exclude_allergens, dietary) -> List[MenuItem]:
+        """Walk the ranked matches and keep the first `limit` that pass the tag filter.
+
+        The tags live in JSON text whose encoding and case differ between
+        writers and databases, so they are compared after decoding, exactly
+        as the in-memory index does.
+        """
+        excluded = {allergen.lower() for allergen in exclude_allergens or []}
+        required = {tag.lower() for tag in dietary or []}
+
+        item_ids = []
+        candidates = query.with_entities(MenuItem.id, MenuItem.allergens, MenuItem.dietary_info).yield_per(500)
+        for item_id, allergens, dietary_info in candidates:
+            if tags_match(allergens, dietary_info, excluded, required):
+                item_ids.append(item_id)
+                if len(item_ids) == limit:
+                    break
+
+        if not item_ids:
+            return []
+        items = {item.id: item for item in self.db.query(MenuItem).filter(MenuItem.id.in_(item_ids)).all()}
+        return [items[item_id] for item_id in item_ids if item_id in items]
+
+    def get_memory_index(self) -> InMemorySearchIndex:
+        version = self.cache_versions.get_version(MENU_SEARCH_CACHE_KEY)
+        with _memory_index_lock:
+            if _memory_index_state["index"] is not None and _memory_index_state["version"] == version:
+                return _memory_index_state["index"]
+
+            index = InMemorySearchIndex({"name": 3.0, "description": 1.0})
+            rows = self.db.query(
+                MenuItem.id, MenuItem.name, MenuItem.description, MenuItem.allergens,
+                MenuItem.dietary_info, MenuItem.is_available, Menu.restaurant_id
+            ).join(Menu).yield_per(1000)
+            for row in rows:
+                index.add(
+                    row.id,
+                    {"name": row.name, "description": row.description},
+                    {
+                        "restaurant_id": row.restaurant_id,
+                        "is_available": row.is_available,
+                        "allergens": row.allergens,
+                        "dietary_info": row.dietary_info
+                    }
+                )
+
+            _memory_index_state["version"] = version
+            _memory_index_state["index"] = index
+            return index
+
+    def _search_memory(self, restaurant_id, search_term, limit, exclude_allergens, dietary) -> List[MenuItem]:
+        index = self.get_memory_index()
+        excluded = {allergen.lower() for allergen in exclude_allergens or []}
+        required = {tag.lower() for tag in dietary or []}
+
+        item_ids = []
+        for item_id, score in index.search(search_term):
+            metadata = index.metadata[item_id]
+            if metadata["restaurant_id"] != restaurant_id or not metadata["is_available"]:
+                continue
+            if not tags_match(metadata["allergens"], metadata["dietary_info"], excluded, required):
+                continue
+            item_ids.append(item_id)
+            if len(item_ids) == limit:
+                break
+
+        if not item_ids:
+            return []
+
+        items = {item.id: item for item in self.db.query(MenuItem).filter(MenuItem.id.in_(item_ids)).all()}
+        return [items[item_id] for item_id in item_ids if item_id in items]
+
+class CMSSearchService:
+    """Ranked CMS content search with highlighted snippets over FTS5, tsvector or an in-memory index.
+
+    Indexes title, excerpt, meta keywords and the page body with its markup
+    stripped (CMSContent.search_text).
+    """
+
+    field_weights = {"title": 4.0, "excerpt": 2.0, "search_text": 1.0, "meta_keywords": 2.0}
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.cache_versions = CacheVersionService(db)
+
+    def get_backend(self) -> str:
+        return resolve_search_backend(self.db, settings.cms_search_backend, CMS_CONTENT_FTS_TABLE)
+
+    def invalidate(self):
+        """Mark the in-memory index stale; the SQL indexes are kept current by the database"""
+        if self.get_backend() == "memory":
+            self.cache_versions.bump_version(CMS_SEARCH_CACHE_KEY)
+
+    def search(self, query: Query, search_term: str, limit: int = 20) -> List[Tuple[CMSContent, Optional[str]]]:
+        """Rank the CMSContent rows selected by `query` against search_term, best first,
+        each with an HTML snippet of the matching text"""
+        tokens = tokenize(search_term)
+        if not tokens:
+            return []
+
+        backend = self.get_backend()
+        if backend == "memory":
+            return self._search_memory(query, tokens, limit)
+
+        if backend == "sqlite":
+            fts = table(CMS_CONTENT_FTS_TABLE, column("rowid"))
+            match = " AND ".join(f'"{token}"*' for token in tokens)
+            weights = ", ".join(str(weight) for weight in self.field_weights.values())
+            snippet = literal_column(
+                f"snippet({CMS_CONTENT_FTS_TABLE}, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', {SNIPPET_WORDS})"
+            )
+            query = query.join(fts, fts.c.rowid == CMSContent.id).filter(
+                literal_column(CMS_CONTENT_FTS_TABLE).op("MATCH")(match)
+            ).add_columns(snippet).order_by(
+                literal_column(f"bm25({CMS_CONTENT_FTS_TABLE}, {weights})"), CMSContent.title
+            )
+        else:
+            vector = literal_column(POSTGRES_CMS_SEARCH_VECTOR)
+            ts_query = func.to_tsquery(
+                literal_column("'simple'::regconfig"),
+                " & ".join(f"{token}:*" for token in tokens)
+            )
+            snippet = func.ts_headline(
+                literal_column("'simple'::regconfig"),
+                func.coalesce(CMSContent.search_text, CMSContent.excerpt, CMSContent.title),
+                ts_query,
+                f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={SNIPPET_WORDS}, MinWords=4, MaxFragments=1"
+            )
+            query = query.filter(vector.op("@@")(ts_query)).add_columns(snippet).order_by(
+                func.ts_rank(vector, ts_query).desc(), CMSContent.title
+            )
+
+        return [(content, render_snippet(snippet)) for content, snippet in query.limit(limit).all()]
+
+    def get_memory_index(self) -> InMemorySearchIndex:
+        version = self.cache_versions.get_version(CMS_SEARCH_CACHE_KEY)
+        with _memory_index_lock:
+            if _cms_memory_index_state["index"] is not None and _cms_memory_index_state["version"] == version:
+                return _cms_memory_index_state["index"]
+
+            index = InMemorySearchIndex(self.field_weights)
+            rows = self.db.query(
+                CMSContent.id, CMSContent.title, CMSContent.excerpt, CMSContent.search_text, CMSContent.meta_keywords
+            ).yield_per(1000)
+            for row in rows:
+                index.add(row.id, {name: getattr(row, name) for name in self.field_weights})
+
+            _cms_memory_index_state["version"] = version
+            _cms_memory_index_state["index"] = index
+            return index
+
+    def _search_memory(self, query: Query, tokens: List[str], limit: int) -> List[Tuple[CMSContent, Optional[str]]]:
+        ranked = [content_id for content_id, score in self.get_memory_index().search(" ".join(tokens))]
+
+        # The index covers every row; `query` decides which of the ranked ids are visible
+        results: List[CMSContent] = []
+        chunk_size = max(limit * 4, 100)
+        for start in range(0, len(ranked), chunk_size):
+            chunk = ranked[start:start + chunk_size]
+            contents = {content.id: content for content in query.filter(CMSContent.id.in_(chunk)).all()}
+            results.extend(contents[content_id] for content_id in chunk if content_id in contents)
+            if len(results) >= limit:
+                break
+
+        snippets = []
+        for content in results[:limit]:
+            fields = (content.search_text, content.excerpt, content.title)
+            snippet = next((snippet for snippet in (make_snippet(text, tokens) for text in fields) if snippet), None)
+            snippets.append((content, render_snippet(snippet)))
+        return snippets
@@ -1,18 +1,70 @@
 from typing import Optional
 import random
 import string
+import time
+import uuid
 from datetime import datetime, timedelta
-from twilio.rest import Client
 from app.core.config import settings
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+_twilio_client = None
+_twilio_client_lock = threading.Lock()
+
+def get_twilio_client():
+    """The shared Twilio client, created on first use.
+
+    twilio (and the requests stack under it) is imported here rather than at
+    module load, so workers start without it and only pay once a message is sent.
+    """
+    global _twilio_client
+    if _twilio_client is None:
+        with _twilio_client_lock:
+            if _twilio_client is None:
+                from twilio.rest import Client
+                _twilio_client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+    return _twilio_client
+
+class FakeTwilioMessage:
+    def __init__(self, sid: str):
+        self.sid = sid
+
+class FakeTwilioMessages:
+    def __init__(self, latency_ms: int = 0, failure_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.sent_count = 0
+
+    def create(self, body: str, from_: str, to: str) -> FakeTwilioMessage:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError("Simulated Twilio failure")
+        self.sent_count += 1
+        return FakeTwilioMessage(f"SMfake{uuid.uuid4().hex}")
+
+class FakeTwilioClient:
+    """Local stand-in for the Twilio client, for offline runs and load tests"""
+
+    def __init__(self, latency_ms: int = 0, failure_rate: float = 0.0):
+        self.messages = FakeTwilioMessages(latency_ms, failure_rate)
+
 class SMSService:
     def __init__(self):
-        self.client = None
-        if settings.twilio_account_sid and settings.twilio_auth_token:
-            self.client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+        self._client = None
+        if settings.sms_transport == "fake":
+            self._client = FakeTwilioClient(settings.sms_fake_latency_ms, settings.sms_fake_failure_rate)
+        self.from_number = settings.twilio_phone_number
+        if settings.sms_transport == "fake" and not self.from_number:
+            self.from_number = "+15550000000"
+
+    @property
+    def client(self):
+        if self._client is None and settings.twilio_account_sid and settings.twilio_auth_token:
+            self._client = get_twilio_client()
+        return self._client
 
     def generate_otp(self, length: int = 6) -> str:
         """Generate a random OTP code"""
@@ -20,14 +72,14 @@ class SMSService:
 
     def send_otp(self, phone_number: str, otp_code: str) -> bool:
         """Send OTP via SMS using Twilio"""
-        if not self.client or not settings.twilio_phone_number:
+        if not self.client or not self.from_number:
             logger.warning("Twilio not configured, OTP would be sent to: %s with code: %s", phone_number, otp_code)
             return True  # Return True for development/testing
 
         try:
             message = self.client.messages.create(
                 body=f"Your restaurant order verification code is: {otp_code}. This code expires in 10 minutes.",
-                from_=settings.twilio_phone_number,
+                from_=self.from_number,
                 to=phone_number
             )
             logger.info("OTP sent successfully to %s, message SID: %s", phone_number, message.sid)
@@ -38,14 +90,14 @@ class SMSService:
 
     def send_order_confirmation(self, phone_number: str, order_number: str, restaurant_name: str) -> bool:
         """Send order confirmation SMS"""
-        if not self.client or not settings.twilio_phone_number:
+        if not self.client or not self.from_number:
             logger.warning("Order confirmation would be sent to: %s for order: %s", phone_number, order_number)
             return True
 
         try:
             message = self.client.messages.create(
                 body=f"Order confirmed! Your order #{order_number} at {restaurant_name} has been received. You'll receive updates on your order status.",
-                from_=settings.twilio_phone_number,
+                from_=self.from_number,
                 to=phone_number
             )
             logger.info("Order confirmation sent to %s, message SID: %s", phone_number, message.sid)
@@ -56,14 +108,14 @@ class SMSService:
 
     def send_order_ready_notification(self, phone_number: str, order_number: str) -> bool:
         """Send order ready notification SMS"""
-        if not self.client or not settings.twilio_phone_number:
+        if not self.client or not self.from_number:
             logger.warning("Order ready notification would be sent to: %s for order: %s", phone_number, order_number)
             return True
 
         try:
             message = self.client.messages.create(
                 body=f"Your order #{order_number} is ready for pickup! Please come to the restaurant to collect your order.",
-                from_=settings.twilio_phone_number,
+                from_=self.from_number,
                 to=phone_number
             )
             logger.info("Order ready notification sent to %s, message SID: %s", phone_number, message.sid)
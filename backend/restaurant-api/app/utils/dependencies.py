@@ -1,23 +1,22 @@
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.core.security import verify_token
-from app.models.user import User, UserRole
-from app.services.auth_service import AuthService
+from app.models.user import UserRole
+from app.services.auth_service import AuthService, Principal
 
 security = HTTPBearer()
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """Get current authenticated user"""
     try:
         payload = verify_token(credentials.credentials)
-        username = payload.get("sub")
-        if username is None:
+        if payload.get("sub") is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
@@ -31,7 +30,7 @@ def get_current_user(
         )
 
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_username(username)
+    user = auth_service.get_principal(payload)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,7 +46,7 @@ def get_current_user(
     
     return user
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Get current user and verify admin role"""
     if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
         raise HTTPException(
@@ -56,26 +55,45 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)) -> Us
         )
     return current_user
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Get current active user"""
     return current_user
 
 def get_optional_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[Principal]:
     """Get current user if authenticated, otherwise return None"""
     if not credentials:
         return None
     
     try:
         payload = verify_token(credentials.credentials)
-        username = payload.get("sub")
-        if username is None:
+        if payload.get("sub") is None:
             return None
         
         auth_service = AuthService(db)
-        user = auth_service.get_user_by_username(username)
+        user = auth_service.get_principal(payload)
         return user if user and user.is_active else None
     except Exception:
         return None
+
+def get_event_stream_admin_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    access_token: Optional[str] = Query(None, description="Bearer token for clients such as EventSource that cannot set headers")
+) -> Principal:
+    """Authenticate a long-lived stream as an admin without holding a session for its lifetime"""
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    db = SessionLocal()
+    try:
+        user = get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+    finally:
+        db.close()
+    return get_current_admin_user(user)
@@ -0,0 +1,103 @@
+"""
+Compare the order analytics endpoint before and after the SQL aggregates and rollups.
+
+    python benchmark_analytics.py [--orders 1000000] [--days 30] [--repeat 3]
+
+Seeds a temporary SQLite database with --orders orders for one restaurant,
+spread over --days days of mixed order types and statuses, folds their
+rollup deltas, then times one dashboard refresh over the whole period:
+
+  orm loop     the original implementation: load every non-cancelled order
+               as an ORM object and count and sum them in Python
+  group by     OrderAnalyticsService.get_summary, aggregated in SQL
+  + series     get_order_analytics with a daily series from the rollups
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models import Order
+from app.models.analytics import OrderRollupDelta, RollupGranularity
+from app.models.order import OrderType, OrderStatus
+from app.services.analytics_service import OrderAnalyticsService
+from app.services.order_service import OrderService
+import argparse
+import os
+import random
+import tempfile
+import timeit
+
+RESTAURANT_ID = 1
+
+def seed(db, orders: int, days: int, batch_size: int = 50000):
+    rng = random.Random(7)
+    start = datetime.utcnow() - timedelta(days=days)
+    order_types, statuses = list(OrderType), list(OrderStatus)
+    rows = []
+    for n in range(orders):
+        total = round(rng.uniform(8, 120), 2)
+        created_at = start + timedelta(seconds=rng.uniform(0, days * 86400))
+        order_type, status = rng.choice(order_types), rng.choice(statuses)
+        rows.append({
+            "restaurant_id": RESTAURANT_ID, "order_number": f"ORD-{n}", "order_type": order_type,
+            "status": status, "customer_name": "Guest", "customer_phone": "555-555-5555",
+            "subtotal": total, "total_amount": total, "created_at": created_at
+        })
+        if len(rows) == batch_size:
+            db.execute(insert(Order), rows)
+            rows = []
+    if rows:
+        db.execute(insert(Order), rows)
+    db.commit()
+
+def orm_loop(db, start_date: datetime, end_date: datetime):
+    orders = db.query(Order).filter(
+        Order.restaurant_id == RESTAURANT_ID,
+        Order.created_at >= start_date,
+        Order.created_at <= end_date,
+        Order.status != OrderStatus.CANCELLED
+    ).all()
+    total_revenue = sum(order.total_amount for order in orders)
+    order_types = {}
+    for order in orders:
+        order_types[order.order_type.value] = order_types.get(order.order_type.value, 0) + 1
+    db.expunge_all()
+    return len(orders), round(total_revenue, 2), order_types
+
+def measure(func, repeat: int) -> float:
+    return min(timeit.repeat(func, repeat=repeat, number=1))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark order analytics before and after the rollups")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "analytics.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    print(f"Seeding {args.orders:,} orders over {args.days} days...")
+    seed(db, args.orders, args.days)
+    analytics = OrderAnalyticsService(db)
+    analytics.rebuild_rollups()
+    assert db.query(OrderRollupDelta).count() == 0
+
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=args.days)
+    service = OrderService(db)
+
+    count, revenue, order_types = orm_loop(db, start_date, end_date)
+    summary = analytics.get_summary(RESTAURANT_ID, start_date, end_date)
+    assert (summary["total_orders"], summary["order_types"]) == (count, order_types), (summary, count, order_types)
+    assert abs(summary["total_revenue"] - revenue) < 0.05, (summary["total_revenue"], revenue)
+
+    print(f"One dashboard refresh over {count:,} non-cancelled orders")
+    before = measure(lambda: orm_loop(db, start_date, end_date), args.repeat)
+    grouped = measure(lambda: analytics.get_summary(RESTAURANT_ID, start_date, end_date), args.repeat)
+    series = measure(lambda: service.get_order_analytics(RESTAURANT_ID, start_date, end_date, RollupGranularity.DAY), args.repeat)
+    print(f"  orm loop  {before * 1000:10.1f} ms")
+    print(f"  group by  {grouped * 1000:10.1f} ms  x{before / grouped:6.1f}")
+    print(f"  + series  {series * 1000:10.1f} ms  x{before / series:6.1f}")
@@ -0,0 +1,83 @@
+"""
+Compare the first-screen call sequence with the single bootstrap request.
+
+    python benchmark_bootstrap.py [--restaurant-id 1] [--loads 200] [--rtt-ms 0]
+    python benchmark_bootstrap.py --url http://localhost:8000 [--restaurant-id 1] [--loads 200]
+
+Without --url the app runs in-process against a seeded temporary SQLite
+database, so the numbers are server time only. --rtt-ms adds the given round
+trip per request on top, to estimate a mobile client: the current sequence
+needs two round trips before the last call can start (the menu list, then the
+menu detail), the bootstrap request needs one.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+def current_sequence(client, restaurant_id: int):
+    client.get(f"/restaurants/{restaurant_id}").raise_for_status()
+    menus = client.get(f"/menus/restaurant/{restaurant_id}")
+    menus.raise_for_status()
+    for path in (
+        f"/menus/{menus.json()[0]['id']}",
+        f"/menus/restaurant/{restaurant_id}/featured",
+        "/cms/banners",
+        "/cms/announcements",
+        "/cms/pages"
+    ):
+        client.get(path).raise_for_status()
+
+def bootstrap(client, restaurant_id: int):
+    client.get(f"/restaurants/{restaurant_id}/bootstrap").raise_for_status()
+
+def run(client, loads: int, restaurant_id: int, rtt_ms: float):
+    cases = {
+        "current (7 calls)": (current_sequence, 2),
+        "bootstrap (1 call)": (bootstrap, 1)
+    }
+    for func, _ in cases.values():
+        func(client, restaurant_id)  # warm the caches
+
+    print(f"First-screen load, restaurant {restaurant_id}, {loads} loads")
+    baseline = None
+    for name, (func, round_trips) in cases.items():
+        timings = []
+        for _ in range(loads):
+            start = time.perf_counter()
+            func(client, restaurant_id)
+            timings.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(timings)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        total = median + round_trips * rtt_ms
+        baseline = baseline or total
+        line = f"  {name:<20} median {median:7.2f} ms  p95 {p95:7.2f} ms"
+        if rtt_ms:
+            line += f"  with {rtt_ms:g} ms RTT {total:7.1f} ms"
+        print(f"{line}  x{baseline / total:5.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the bootstrap endpoint against the current call sequence")
+    parser.add_argument("--url", help="base URL of a running API; defaults to an in-process app on a seeded database")
+    parser.add_argument("--restaurant-id", type=int, default=1)
+    parser.add_argument("--loads", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="network round trip to add per sequential request")
+    args = parser.parse_args()
+
+    if args.url:
+        import httpx
+        with httpx.Client(base_url=args.url) as client:
+            run(client, args.loads, args.restaurant_id, args.rtt_ms)
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bootstrap.db"
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.core.database import Base, engine
+        from app.core.search import setup_search_indexes
+        from app.db_init import create_sample_data
+        Base.metadata.create_all(engine)
+        setup_search_indexes(engine)
+        create_sample_data()
+        with TestClient(app) as client:
+            run(client, args.loads, args.restaurant_id, args.rtt_ms)
@@ -0,0 +1,89 @@
+"""
+Compare the homepage CMS fan-out with and without the published-view cache.
+
+    python benchmark_cms.py [--rows 20] [--repeat 5]
+
+A homepage load calls /cms/pages, /cms/banners, /cms/announcements,
+/cms/gallery and /cms/contact. Each case runs those five service calls
+against an in-memory SQLite database seeded with --rows published items per
+content type (plus some scheduled for later) and renders the response bodies:
+
+  uncached   query with the publish window filter, then serialize
+  cached     CMSService.get_public_view: one version lookup per call
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.models import CMSContent
+from app.models.cms import ContentType, ContentStatus
+from app.services.cms_service import CMSService, cms_content_item, cms_content_list, cms_view_cache
+import argparse
+import timeit
+
+def seed(db, rows: int):
+    now = datetime.utcnow()
+    contents = []
+    for content_type in ContentType:
+        for n in range(rows):
+            contents.append(CMSContent(
+                title=f"{content_type.value} {n}", slug=f"{content_type.value}-{n}",
+                content_type=content_type, status=ContentStatus.PUBLISHED,
+                content="<p>" + "Fresh, locally sourced and made to order. " * 20 + "</p>",
+                excerpt="Seasonal specials every week", meta_data={"cta": "Order now", "position": n},
+                featured_image=f"https://cdn.example.com/cms/{content_type.value}/{n}.jpg",
+                gallery_images=[f"https://cdn.example.com/cms/{n}-{i}.jpg" for i in range(4)],
+                display_order=n, show_in_menu=True,
+                # every fifth item goes live tomorrow, so the cache has a boundary to honour
+                published_at=now + timedelta(days=1) if n % 5 == 0 else now - timedelta(days=1),
+                expires_at=now + timedelta(days=30)
+            ))
+    db.add_all(contents)
+    db.commit()
+
+def fan_out_uncached(service: CMSService) -> int:
+    size = len(cms_content_list.dump(service.get_published_pages()))
+    size += len(cms_content_list.dump(service.get_hero_banners(True)))
+    size += len(cms_content_list.dump(service.get_announcements(True)))
+    size += len(cms_content_list.dump(service.get_gallery_images(50)))
+    size += len(cms_content_item.dump(service.get_contact_info()))
+    return size
+
+def fan_out_cached(service: CMSService) -> int:
+    views = [
+        service.get_public_view(ContentType.PAGE, service.get_published_pages),
+        service.get_public_view(ContentType.HERO_BANNER, service.get_hero_banners, True),
+        service.get_public_view(ContentType.ANNOUNCEMENT, service.get_announcements, True),
+        service.get_public_view(ContentType.GALLERY_IMAGE, service.get_gallery_images, 50),
+        service.get_public_view(ContentType.CONTACT_INFO, service.get_contact_info)
+    ]
+    return sum(len(view["body"]) for view in views)
+
+def measure(func, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the homepage CMS fan-out with and without caching")
+    parser.add_argument("--rows", type=int, default=20, help="published items per content type")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.rows)
+    service = CMSService(db)
+
+    uncached_size = fan_out_uncached(service)
+    cached_size = fan_out_cached(service)
+    assert uncached_size == cached_size, (uncached_size, cached_size)
+
+    print(f"Homepage fan-out, 5 calls, {args.rows} items per type ({uncached_size / 1024:.1f} KiB)")
+    uncached = measure(lambda: fan_out_uncached(service), args.repeat)
+    cached = measure(lambda: fan_out_cached(service), args.repeat)
+    print(f"  uncached  {uncached * 1000:8.3f} ms")
+    print(f"  cached    {cached * 1000:8.3f} ms  x{uncached / cached:5.1f}")
+    print(f"  cached views: {len(cms_view_cache)}")
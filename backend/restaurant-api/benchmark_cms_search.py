@@ -0,0 +1,113 @@
+"""
+Compare CMS search paths on a generated corpus.
+
+    python benchmark_cms_search.py [--documents 20000] [--repeat 5]
+
+Builds a temporary SQLite database of HTML pages (a few hundred words each,
+drawn from a Zipf-like vocabulary so some terms are common and some rare),
+then times each query through:
+
+  ilike    the previous search: ILIKE '%term%' over title and raw HTML
+  fts5     CMSSearchService on the FTS5 index, with ranking and snippets
+  memory   CMSSearchService on the in-memory index (used without FTS5)
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import Base
+from app.core.search import setup_search_indexes
+from app.models import CMSContent
+from app.models.cms import ContentType, ContentStatus
+from app.services.cms_service import CMSService
+import argparse
+import os
+import random
+import tempfile
+import time
+import timeit
+
+QUERIES = ["pasta", "seasonal menu", "truffle risotto", "gluten", "brunch reservations", "zzyzx"]
+FOOD_WORDS = [
+    "pasta", "seasonal", "menu", "truffle", "risotto", "gluten", "free", "brunch", "reservations",
+    "wine", "tasting", "chef", "local", "farm", "dessert", "catering", "private", "events", "vegan"
+]
+
+def build_corpus(db, documents: int, seed: int = 7):
+    rng = random.Random(seed)
+    filler = [f"w{n}" for n in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(filler))]
+    published = datetime.utcnow() - timedelta(days=1)
+    types = list(ContentType)
+    batch = []
+    for n in range(documents):
+        paragraphs = []
+        for _ in range(rng.randint(3, 8)):
+            words = rng.choices(filler, weights, k=rng.randint(30, 80))
+            for _ in range(rng.randint(0, 3)):
+                words.insert(rng.randrange(len(words)), rng.choice(FOOD_WORDS))
+            paragraphs.append(f"<p class=\"body\">{' '.join(words)} <a href=\"/p/{n}\">more</a></p>")
+        batch.append(CMSContent(
+            title=f"{rng.choice(FOOD_WORDS).title()} {rng.choice(filler)} {n}", slug=f"doc-{n}",
+            content_type=types[n % len(types)], status=ContentStatus.PUBLISHED,
+            content="<article>" + "".join(paragraphs) + "</article>",
+            excerpt=" ".join(rng.choices(filler, weights, k=12)), meta_keywords=", ".join(rng.sample(FOOD_WORDS, 3)),
+            published_at=published, show_in_menu=True
+        ))
+        if len(batch) == 1000:
+            db.add_all(batch)
+            db.commit()
+            batch = []
+    db.add_all(batch)
+    db.commit()
+
+def ilike_search(db, term: str, limit: int = 20):
+    pattern = f"%{term}%"
+    return db.query(CMSContent).filter(
+        CMSContent.status == ContentStatus.PUBLISHED,
+        CMSContent.title.ilike(pattern) | CMSContent.content.ilike(pattern)
+    ).order_by(CMSContent.title).limit(limit).all()
+
+def measure(func, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CMS search backends on a generated corpus")
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "cms_search.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    setup_search_indexes(engine)
+    db = sessionmaker(bind=engine)()
+
+    start = time.perf_counter()
+    build_corpus(db, args.documents)
+    print(f"Generated and inserted {args.documents} documents in {time.perf_counter() - start:.1f} s "
+          f"({os.path.getsize(path) / 2 ** 20:.0f} MiB database, FTS maintained by triggers)")
+
+    cms_service = CMSService(db)
+    backends = {}
+    for backend in ("fts5", "memory"):
+        settings.cms_search_backend = "sqlite" if backend == "fts5" else backend
+        if backend == "memory":
+            start = time.perf_counter()
+            cms_service.search_service.get_memory_index()
+            print(f"In-memory index built in {time.perf_counter() - start:.1f} s")
+        backends[backend] = settings.cms_search_backend
+
+    print(f"\n{'query':<22} {'ilike':>10} {'fts5':>10} {'memory':>10}   hits (ilike / fts5)")
+    for query in QUERIES:
+        timings = {"ilike": measure(lambda: ilike_search(db, query), args.repeat)}
+        hits = {"ilike": len(ilike_search(db, query, limit=args.documents))}
+        for backend, setting in backends.items():
+            settings.cms_search_backend = setting
+            timings[backend] = measure(lambda: cms_service.search_content(query), args.repeat)
+            if backend == "fts5":
+                hits[backend] = len(cms_service.search_content(query, limit=args.documents))
+        print(f"{query:<22} " + " ".join(f"{timings[name] * 1000:8.2f}ms" for name in ("ilike", "fts5", "memory"))
+              + f"   {hits['ilike']} / {hits['fts5']}")
@@ -0,0 +1,148 @@
+"""
+Compare request latency under mixed load with database work inline on the event loop and offloaded.
+
+    python benchmark_concurrency.py [--clients 50] [--duration 10] [--db-latency-ms 20]
+
+Serves the app with uvicorn in-process (one worker) against a seeded temporary
+SQLite database. Every statement waits --db-latency-ms first, standing in for
+the round trip to a networked database. --clients concurrent clients then
+loop over a mix of menu, restaurant, CMS and order-detail reads plus the
+/healthz probe, for --duration seconds per case:
+
+  inline    the routers call services directly on the event loop, as they
+            did before run_blocking
+  offload   the routers go through run_blocking (blocking_pool_size threads)
+
+Reports throughput and p50/p99 latency overall and for /healthz alone, which
+does no database work and so shows how long the loop itself was blocked.
+Requests that fail or time out (--timeout) are counted as errors and their
+elapsed time is kept in the percentiles: inline, a request waiting for a pool
+connection blocks the loop that would hand one back.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+MIX = [
+    "/menus/1",
+    "/menus/restaurant/1",
+    "/restaurants/1",
+    "/cms/pages",
+    "/orders/number/{order_number}",
+    "/healthz"
+]
+
+async def run_inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+def percentile(timings, pct: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def load(base_url: str, paths, clients: int, duration: float, timeout: float):
+    import httpx
+    timings = {path: [] for path in paths}
+    errors = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def worker(offset: int):
+            n = offset
+            while time.perf_counter() < deadline:
+                path = paths[n % len(paths)]
+                n += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    errors.append(type(e).__name__)
+                timings[path].append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+    return timings, errors
+
+def report(name: str, timings, errors, duration: float):
+    everything = [ms for values in timings.values() for ms in values]
+    health = timings["/healthz"]
+    print(f"  {name:<8} {len(everything) / duration:7.1f} req/s"
+          f"  all p50 {statistics.median(everything):7.1f} ms  p99 {percentile(everything, 99):7.1f} ms"
+          f"  /healthz p50 {statistics.median(health):7.1f} ms  p99 {percentile(health, 99):7.1f} ms"
+          f"  errors {len(errors)}")
+    return percentile(everything, 99)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark p99 latency with inline and offloaded database work")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per case")
+    parser.add_argument("--db-latency-ms", type=float, default=20.0, help="delay added before every statement")
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout per request, in seconds")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/concurrency.db",
+        "SMS_TRANSPORT": "fake",
+        "NOTIFICATION_DISPATCHER_ENABLED": "false",
+        "ORDER_EVENTS_ENABLED": "false",
+        "ANALYTICS_ROLLUP_ENABLED": "false",
+        "POS_WEBHOOKS_ENABLED": "false",
+        "POS_SUBMISSION_ENABLED": "false"
+    })
+    import uvicorn
+    from sqlalchemy import event
+    from app.core.concurrency import run_blocking
+    from app.core.config import settings
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.search import setup_search_indexes
+    from app.db_init import create_sample_data
+    from app.main import app
+    from app.models import Order
+    from app.routers import auth, cms, menus, orders, pos, restaurants
+
+    Base.metadata.create_all(engine)
+    setup_search_indexes(engine)
+    create_sample_data()
+    db = SessionLocal()
+    order_number = db.query(Order.order_number).first()
+    db.close()
+    paths = [path.format(order_number=order_number[0] if order_number else "missing") for path in MIX]
+    if not order_number:
+        paths = [path for path in paths if not path.startswith("/orders")]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def database_latency(*_):
+        time.sleep(args.db_latency_ms / 1000)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    router_modules = (auth, cms, menus, orders, pos, restaurants)
+    print(f"Mixed load, {args.clients} clients, {args.duration:g} s per case, "
+          f"{args.db_latency_ms:g} ms per statement, {settings.blocking_pool_size} offload threads")
+    results = {}
+    try:
+        for name, implementation in (("inline", run_inline), ("offload", run_blocking)):
+            for module in router_modules:
+                module.run_blocking = implementation
+            asyncio.run(load(f"http://127.0.0.1:{port}", paths, args.clients, 1.0, args.timeout))  # warm up
+            timings, errors = asyncio.run(load(f"http://127.0.0.1:{port}", paths, args.clients, args.duration, args.timeout))
+            results[name] = report(name, timings, errors, args.duration)
+    finally:
+        for module in router_modules:
+            module.run_blocking = run_blocking
+        server.should_exit = True
+        thread.join()
+
+    print(f"  p99 x{results['inline'] / results['offload']:.1f} lower with offload")
@@ -0,0 +1,158 @@
+"""
+Compare JSON encoding paths for the hot list responses.
+
+    python benchmark_json.py [--items 200] [--orders 100] [--repeat 5]
+
+Payloads are built from in-memory ORM rows shaped like production data (a
+menu with categories and items carrying ingredient/allergen lists and
+modifiers, a page of order summaries), so no database is needed. Each case
+produces the response body bytes:
+
+  legacy          JSON columns decoded per response, response_model path
+                  (validate, dump to Python, json.dumps) as on FastAPI 0.116
+  response_model  same, with JSON columns already decoded at load time
+  + orjson        response_model path rendered by ORJSONResponse
+  serializer      ResponseSerializer: TypeAdapter straight to bytes
+"""
+from typing import Any, Callable, Dict, List
+from datetime import datetime, timedelta
+from pydantic import TypeAdapter
+from app.core.responses import ResponseSerializer, json_dumps
+from app.models import Menu, MenuCategory, MenuItem, Order
+from app.models.menu import MenuStatus
+from app.models.order import OrderStatus, OrderType, PaymentStatus
+from app.schemas.menu import MenuItemResponse, MenuWithItems
+from app.schemas.order import OrderSummary
+import argparse
+import json
+import timeit
+
+JSON_COLUMNS = ("ingredients", "allergens", "dietary_info", "images", "modifiers")
+
+def build_items(count: int) -> List[MenuItem]:
+    now = datetime(2026, 10, 17, 12, 0, 0)
+    return [
+        MenuItem(
+            id=i, menu_id=1, category_id=i % 8, name=f"Dish {i}",
+            description="Slow-roasted with seasonal vegetables, herb butter and a lemon-garlic glaze",
+            price=9.5 + i % 20, calories=300 + i % 500,
+            ingredients=["salmon", "lemon", "herbs", "butter", "garlic", "vegetables"],
+            allergens=["fish", "dairy"], dietary_info=["gluten-free"] if i % 3 else None,
+            is_available=True, is_featured=i % 10 == 0, display_order=i,
+            image_url=f"https://cdn.example.com/items/{i}.jpg",
+            images=[f"https://cdn.example.com/items/{i}-{n}.jpg" for n in range(3)],
+            modifiers={"size": ["regular", "large"], "sides": {"fries": 2.5, "salad": 3.0}},
+            toast_item_id=f"toast-{i}", created_at=now, updated_at=now
+        )
+        for i in range(count)
+    ]
+
+def build_menu(items: List[MenuItem]) -> Dict[str, Any]:
+    now = datetime(2026, 10, 17, 12, 0, 0)
+    menu = Menu(id=1, restaurant_id=1, name="All Day", description="Lunch and dinner",
+                status=MenuStatus.ACTIVE, is_default=True, created_at=now)
+    categories = [
+        MenuCategory(id=n, menu_id=1, name=f"Group {n}", display_order=n, is_active=True, created_at=now)
+        for n in range(8)
+    ]
+    menu_dict = {column.key: getattr(menu, column.key) for column in Menu.__table__.columns}
+    menu_dict.update(categories=categories, items=items)
+    return menu_dict
+
+def build_orders(count: int) -> List[Order]:
+    now = datetime(2026, 10, 17, 12, 0, 0)
+    return [
+        Order(
+            id=i, restaurant_id=1, order_number=f"ORD-20261017-{i:04d}", order_type=OrderType.PICKUP,
+            status=OrderStatus.PREPARING, customer_name="Alex Customer", customer_phone="555-010-0000",
+            total_amount=42.5, payment_status=PaymentStatus.COMPLETED,
+            estimated_ready_time=now + timedelta(minutes=20), created_at=now - timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+def legacy_rows(items: List[MenuItem]) -> List[Dict[str, Any]]:
+    """Items as they used to load, with the JSON columns still encoded"""
+    rows = []
+    for item in items:
+        row = {column.key: getattr(item, column.key) for column in MenuItem.__table__.columns}
+        for key in JSON_COLUMNS:
+            row[key] = json.dumps(row[key]) if row[key] is not None else None
+        rows.append(row)
+    return rows
+
+def response_model_path(adapter: TypeAdapter, render: Callable[[Any], bytes]) -> Callable[[Any], bytes]:
+    def encode(value: Any) -> bytes:
+        return render(adapter.dump_python(adapter.validate_python(value, from_attributes=True), mode="json"))
+    return encode
+
+def stdlib_render(content: Any) -> bytes:
+    # starlette JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+def legacy_path(adapter: TypeAdapter) -> Callable[[List[Dict[str, Any]]], bytes]:
+    encode = response_model_path(adapter, stdlib_render)
+
+    def decode_then_encode(rows: List[Dict[str, Any]]) -> bytes:
+        decoded = [
+            {**row, **{key: json.loads(row[key]) if row[key] else None for key in JSON_COLUMNS}}
+            for row in rows
+        ]
+        return encode(decoded)
+    return decode_then_encode
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def run_cases(title: str, cases: Dict[str, Callable[[], bytes]], repeat: int):
+    print(f"\n{title}")
+    baseline = None
+    for name, func in cases.items():
+        size = len(func())
+        seconds = measure(func, repeat)
+        baseline = baseline or seconds
+        print(f"  {name:<16} {seconds * 1000:8.3f} ms  {size / 1024:7.1f} KiB  x{baseline / seconds:5.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare JSON encoders on realistic response payloads")
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    items = build_items(args.items)
+    rows = legacy_rows(items)
+    item_adapter = TypeAdapter(List[MenuItemResponse])
+    item_serializer = ResponseSerializer(List[MenuItemResponse])
+    run_cases(f"GET /menus/{{id}}/items ({args.items} items)", {
+        "legacy": lambda: legacy_path(item_adapter)(rows),
+        "response_model": lambda: response_model_path(item_adapter, stdlib_render)(items),
+        "+ orjson": lambda: response_model_path(item_adapter, json_dumps)(items),
+        "serializer": lambda: item_serializer.dump(items)
+    }, args.repeat)
+
+    menu = build_menu(items)
+    menu_adapter = TypeAdapter(MenuWithItems)
+    menu_serializer = ResponseSerializer(MenuWithItems)
+    run_cases(f"GET /menus/{{id}} snapshot rebuild ({args.items} items)", {
+        "response_model": lambda: response_model_path(menu_adapter, stdlib_render)(menu),
+        "+ orjson": lambda: response_model_path(menu_adapter, json_dumps)(menu),
+        "serializer": lambda: menu_serializer.dump(menu)
+    }, args.repeat)
+
+    orders = build_orders(args.orders)
+    order_adapter = TypeAdapter(List[OrderSummary])
+    order_serializer = ResponseSerializer(List[OrderSummary])
+    run_cases(f"GET /orders ({args.orders} orders)", {
+        "response_model": lambda: response_model_path(order_adapter, stdlib_render)(orders),
+        "+ orjson": lambda: response_model_path(order_adapter, json_dumps)(orders),
+        "serializer": lambda: order_serializer.dump(orders)
+    }, args.repeat)
+
+    document = order_adapter.dump_python(order_adapter.validate_python(orders, from_attributes=True), mode="json")
+    run_cases(f"Plain dict body ({args.orders} orders, no response model)", {
+        "json.dumps": lambda: stdlib_render(document),
+        "orjson": lambda: json_dumps(document)
+    }, args.repeat)
@@ -0,0 +1,134 @@
+"""
+Compare a login storm with bcrypt on the event loop and on the bounded password pool.
+
+    python benchmark_login.py [--logins 40] [--rounds 12] [--probe-ms 10]
+
+Serves the app with uvicorn in-process (one worker) against a temporary
+SQLite database holding --logins staff accounts hashed at --rounds. All of
+them log in at once, as at a shift change, while a probe requests /healthz
+every --probe-ms to see how long the event loop is unavailable:
+
+  inline    the original handler: authenticate_user, bcrypt included, runs
+            on the event loop
+  pooled    authenticate_user on run_blocking, bcrypt on the password pool
+            (password_hash_workers threads, password_hash_max_queue queued,
+            429 beyond that)
+
+Reports how long the storm took, login p50/p99, how many were rejected with
+429, and the worst /healthz latency during the storm.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+async def run_inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+def percentile(timings, pct: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def storm(base_url: str, logins: int, password: str, probe_ms: float):
+    import httpx
+    limits = httpx.Limits(max_connections=logins + 1, max_keepalive_connections=logins + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await client.get("/healthz")
+        done = asyncio.Event()
+        probes = []
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/healthz")
+                probes.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(probe_ms / 1000)
+
+        async def login(n: int):
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json={"username": f"staff{n}", "password": password})
+            return response.status_code, (time.perf_counter() - start) * 1000
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(login(n) for n in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+    return elapsed, results, probes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark a login storm with inline and pooled password hashing")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor of the seeded accounts")
+    parser.add_argument("--probe-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/login.db",
+        "PASSWORD_HASH_ROUNDS": str(args.rounds),
+        "NOTIFICATION_DISPATCHER_ENABLED": "false",
+        "ORDER_EVENTS_ENABLED": "false",
+        "ANALYTICS_ROLLUP_ENABLED": "false",
+        "POS_WEBHOOKS_ENABLED": "false",
+        "POS_SUBMISSION_ENABLED": "false"
+    })
+    import uvicorn
+    from app.core.concurrency import run_blocking
+    from app.core.config import settings
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.security import get_password_hash, run_password_task
+    from app.main import app
+    from app.models.user import User, UserRole
+    from app.routers import auth as auth_router
+    from app.services import auth_service
+
+    Base.metadata.create_all(engine)
+    password = "shift-change-2024"
+    hashed = get_password_hash(password)
+    db = SessionLocal()
+    db.add_all([
+        User(email=f"staff{n}@restaurant.com", username=f"staff{n}", hashed_password=hashed,
+             full_name=f"Staff {n}", role=UserRole.STAFF, is_active=True)
+        for n in range(args.logins)
+    ])
+    db.commit()
+    db.close()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    print(f"{args.logins} simultaneous logins, bcrypt cost {args.rounds}, "
+          f"{settings.password_hash_workers} hash workers + {settings.password_hash_max_queue} queued")
+    cases = {
+        "inline": (run_inline, lambda func, *task_args: func(*task_args)),
+        "pooled": (run_blocking, run_password_task)
+    }
+    try:
+        for name, (blocking, password_task) in cases.items():
+            auth_router.run_blocking = blocking
+            auth_service.run_password_task = password_task
+            elapsed, results, probes = asyncio.run(storm(f"http://127.0.0.1:{port}", args.logins, password, args.probe_ms))
+            ok = [ms for code, ms in results if code == 200]
+            rejected = sum(code == 429 for code, _ in results)
+            failed = len(results) - len(ok) - rejected
+            line = f"  {name:<7} storm {elapsed * 1000:7.0f} ms"
+            if ok:
+                line += f"  login p50 {statistics.median(ok):7.0f} ms  p99 {percentile(ok, 99):7.0f} ms"
+            line += f"  429s {rejected}  errors {failed}  /healthz max {max(probes, default=0):7.1f} ms ({len(probes)} probes)"
+            print(line)
+    finally:
+        auth_router.run_blocking = run_blocking
+        auth_service.run_password_task = run_password_task
+        server.should_exit = True
+        thread.join()
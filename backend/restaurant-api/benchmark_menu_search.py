@@ -0,0 +1,141 @@
+"""
+Compare menu item search paths on a generated catalog.
+
+    python benchmark_menu_search.py [--items 50000] [--restaurants 1] [--repeat 5]
+
+Builds a temporary SQLite database of --items menu items spread over
+--restaurants restaurants (names and descriptions drawn from a food
+vocabulary plus Zipf-distributed filler, with random allergens and dietary
+tags), then times each query for restaurant 1 through:
+
+  ilike    the previous search: ILIKE '%term%' over name and description,
+           with the allergen/dietary filter applied to the rows it returns
+  fts5     MenuSearchService on the FTS5 index, ranked, prefix-matched
+  memory   MenuSearchService on the in-memory index (used without FTS5)
+
+Queries cover whole words, type-ahead prefixes, several terms and the
+exclude_allergens/dietary filters.
+"""
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import Base
+from app.core.search import setup_search_indexes
+from app.models import Menu, MenuItem, Restaurant
+from app.services.search_service import MenuSearchService, tags_match
+import argparse
+import os
+import random
+import tempfile
+import time
+import timeit
+
+# (search term, exclude_allergens, dietary)
+QUERIES = [
+    ("truffle", None, None),
+    ("tr", None, None),
+    ("chick", None, None),
+    ("spicy chicken", None, None),
+    ("pasta", ["gluten"], None),
+    ("sal", None, ["vegan"]),
+    ("burg", ["dairy", "gluten"], ["gluten-free"]),
+    ("zzyzx", None, None)
+]
+FOOD_WORDS = [
+    "truffle", "pasta", "chicken", "spicy", "salad", "salmon", "burger", "tacos", "risotto", "mushroom",
+    "grilled", "roasted", "crispy", "garlic", "lemon", "basil", "tomato", "cheese", "smoked", "bowl"
+]
+ALLERGENS = ["gluten", "dairy", "nuts", "eggs", "soy", "shellfish"]
+DIETARY = ["vegan", "vegetarian", "gluten-free", "halal", "keto"]
+
+def build_catalog(db, items: int, restaurants: int, seed: int = 7):
+    rng = random.Random(seed)
+    filler = [f"w{n}" for n in range(3000)]
+    weights = [1 / (rank + 1) for rank in range(len(filler))]
+    db.execute(insert(Restaurant), [
+        {"id": n + 1, "name": f"Restaurant {n + 1}", "address": "1 Main St", "city": "Springfield",
+         "state": "IL", "zip_code": "62701", "phone_number": "555-010-0000"}
+        for n in range(restaurants)
+    ])
+    db.execute(insert(Menu), [{"id": n + 1, "restaurant_id": n + 1, "name": "Menu"} for n in range(restaurants)])
+    rows = []
+    for n in range(items):
+        name = " ".join(rng.sample(FOOD_WORDS, rng.randint(1, 3))).title() + f" {rng.choice(filler)}"
+        description = rng.choices(filler, weights, k=rng.randint(8, 25))
+        for _ in range(rng.randint(0, 3)):
+            description.insert(rng.randrange(len(description)), rng.choice(FOOD_WORDS))
+        rows.append({
+            "menu_id": n % restaurants + 1, "name": name, "description": " ".join(description), "price": 9.5,
+            "allergens": rng.sample(ALLERGENS, rng.randint(0, 3)), "dietary_info": rng.sample(DIETARY, rng.randint(0, 2)),
+            "is_available": True
+        })
+        if len(rows) == 5000:
+            db.execute(insert(MenuItem), rows)
+            rows = []
+    if rows:
+        db.execute(insert(MenuItem), rows)
+    db.commit()
+
+def ilike_search(db, term: str, exclude_allergens, dietary, limit: int = 20):
+    pattern = f"%{term}%"
+    rows = db.query(MenuItem).join(Menu).filter(
+        Menu.restaurant_id == 1,
+        MenuItem.is_available == True,
+        MenuItem.name.ilike(pattern) | MenuItem.description.ilike(pattern)
+    ).order_by(MenuItem.name).all()
+    excluded = set(exclude_allergens or [])
+    required = set(dietary or [])
+    return [item for item in rows if tags_match(item.allergens, item.dietary_info, excluded, required)][:limit]
+
+def measure(func, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark menu search backends on a generated catalog")
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--restaurants", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "menu_search.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    setup_search_indexes(engine)
+    db = sessionmaker(bind=engine)()
+
+    start = time.perf_counter()
+    build_catalog(db, args.items, args.restaurants)
+    print(f"Generated and inserted {args.items} items over {args.restaurants} restaurant(s) in "
+          f"{time.perf_counter() - start:.1f} s (FTS maintained by triggers)")
+
+    search_service = MenuSearchService(db)
+    configured = settings.menu_search_backend
+    try:
+        settings.menu_search_backend = "memory"
+        start = time.perf_counter()
+        search_service.get_memory_index()
+        print(f"In-memory index built in {time.perf_counter() - start:.1f} s")
+
+        print(f"\n{'query':<16} {'filters':<30} {'ilike':>10} {'fts5':>10} {'memory':>10}   hits (ilike / fts5)")
+        for term, exclude_allergens, dietary in QUERIES:
+            filters = " ".join(
+                part for part in (
+                    f"-{','.join(exclude_allergens)}" if exclude_allergens else "",
+                    f"+{','.join(dietary)}" if dietary else ""
+                ) if part
+            ) or "-"
+            timings = {"ilike": measure(lambda: ilike_search(db, term, exclude_allergens, dietary), args.repeat)}
+            hits = {"ilike": len(ilike_search(db, term, exclude_allergens, dietary, limit=args.items))}
+            for backend, setting in (("fts5", "sqlite"), ("memory", "memory")):
+                settings.menu_search_backend = setting
+                timings[backend] = measure(
+                    lambda: search_service.search(1, term, 20, exclude_allergens, dietary), args.repeat
+                )
+                if backend == "fts5":
+                    hits[backend] = len(search_service.search(1, term, args.items, exclude_allergens, dietary))
+            print(f"{term:<16} {filters:<30} " + " ".join(f"{timings[name] * 1000:8.2f}ms" for name in ("ilike", "fts5", "memory"))
+                  + f"   {hits['ilike']} / {hits['fts5']}")
+    finally:
+        settings.menu_search_backend = configured
@@ -0,0 +1,110 @@
+"""
+Compare serving a menu rebuilt per request with serving its cached snapshot.
+
+    python benchmark_menu_snapshot.py [--items 300] [--categories 12] [--repeat 5]
+
+Seeds an in-memory SQLite database with one menu of --items available items
+in --categories categories, then times one GET /menus/{id} worth of work:
+
+  rebuilt    the original handler: three queries, copy menu.__dict__,
+             validate MenuWithItems and encode it the way FastAPI encodes a
+             response_model (jsonable_encoder, then json.dumps)
+  miss       MenuService.build_menu_snapshot: the same queries rendered
+             straight to JSON bytes, as on the first request after a change
+  hit        MenuService.get_menu_snapshot with a warm cache: one version
+             lookup, the body is reused
+  304        a hit whose ETag matches If-None-Match, so no body is sent
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.encoders import jsonable_encoder
+from app.core.cache import etag_matches
+from app.core.database import Base
+from app.models import Menu, MenuCategory, MenuItem
+from app.schemas.menu import MenuWithItems
+from app.services.menu_service import MenuService, menu_snapshot_cache
+import argparse
+import json
+import timeit
+
+def seed(db, items: int, categories: int) -> int:
+    menu = Menu(restaurant_id=1, name="Dinner", description="Served from 5pm", is_default=True)
+    db.add(menu)
+    db.flush()
+    category_rows = [MenuCategory(menu_id=menu.id, name=f"Category {n}", display_order=n) for n in range(categories)]
+    db.add_all(category_rows)
+    db.flush()
+    db.add_all([
+        MenuItem(
+            menu_id=menu.id, category_id=category_rows[n % categories].id,
+            name=f"Dish {n}", description="Slow-braised, finished over charcoal and served with seasonal greens",
+            price=9.5 + n % 20, calories=400 + n % 300,
+            ingredients=["beef", "shallot", "thyme", "butter", "greens"],
+            allergens=["dairy"] if n % 3 else ["gluten", "dairy"],
+            dietary_info=["gluten-free"] if n % 4 == 0 else [],
+            image_url=f"https://cdn.example.com/menu/{n}.jpg", display_order=n
+        ) for n in range(items)
+    ])
+    db.commit()
+    return menu.id
+
+def rebuilt(service: MenuService, menu_id: int) -> int:
+    menu = service.get_menu(menu_id)
+    menu_dict = menu.__dict__.copy()
+    menu_dict["categories"] = service.get_menu_categories(menu_id)
+    menu_dict["items"] = service.get_menu_items(menu_id)
+    body = json.dumps(jsonable_encoder(MenuWithItems.model_validate(menu_dict))).encode()
+    service.db.expire_all()
+    return len(body)
+
+def miss(service: MenuService, menu_id: int) -> int:
+    body = service.build_menu_snapshot(menu_id)
+    service.db.expire_all()
+    return len(body)
+
+def hit(service: MenuService, menu_id: int) -> int:
+    return len(service.get_menu_snapshot(menu_id)["body"])
+
+def not_modified(service: MenuService, menu_id: int, etag: str) -> int:
+    snapshot = service.get_menu_snapshot(menu_id)
+    return 0 if etag_matches(etag, snapshot["etag"]) else len(snapshot["body"])
+
+def measure(func, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the menu snapshot cache")
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    menu_id = seed(db, args.items, args.categories)
+    service = MenuService(db)
+
+    menu_snapshot_cache.clear()
+    etag = service.get_menu_snapshot(menu_id)["etag"]
+    assert json.loads(service.build_menu_snapshot(menu_id))["items"] == json.loads(
+        json.dumps(jsonable_encoder(MenuWithItems.model_validate({
+            **service.get_menu(menu_id).__dict__,
+            "categories": service.get_menu_categories(menu_id),
+            "items": service.get_menu_items(menu_id)
+        })))
+    )["items"]
+
+    print(f"GET /menus/{{id}}, {args.items} items in {args.categories} categories ({miss(service, menu_id) / 1024:.1f} KiB)")
+    baseline = measure(lambda: rebuilt(service, menu_id), args.repeat)
+    print(f"  rebuilt  {baseline * 1000:8.3f} ms")
+    for name, func in (
+        ("miss", lambda: miss(service, menu_id)),
+        ("hit", lambda: hit(service, menu_id)),
+        ("304", lambda: not_modified(service, menu_id, etag))
+    ):
+        seconds = measure(func, args.repeat)
+        print(f"  {name:<8} {seconds * 1000:8.3f} ms  x{baseline / seconds:7.1f}")
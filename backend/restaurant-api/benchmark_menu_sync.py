@@ -0,0 +1,112 @@
+"""
+Compare a full rewrite of a POS menu with the content-hash diff sync on a large catalog.
+
+    python benchmark_menu_sync.py [--items 5000] [--categories 50] [--churn 1.0] [--repeat 5]
+
+Builds a Clover inventory of --items items in --categories categories and
+a copy where --churn percent of the items changed: a third repriced, a
+third removed and a third new. Against a temporary SQLite database holding
+the original catalog, times one sync of the changed copy:
+
+  rewrite   delete the menu's categories and items and insert the catalog
+            again, in one transaction, as a naive persist would
+  diff      MenuSyncService.sync_clover_inventory: hash every row, write
+            only the inserts, updates and soft-deletes in batches
+  no-op     the diff sync when nothing changed
+
+Reports the time the write transaction took, the write statements and the
+rows they touched.
+"""
+from sqlalchemy import create_engine, delete, event, insert
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models import Menu, MenuCategory, MenuItem
+from app.services.menu_sync_service import MenuSyncService, parse_clover_items
+import argparse
+import os
+import tempfile
+import time
+
+RESTAURANT_ID = 1
+MERCHANT_ID = "clover-merchant-1"
+
+def catalog(items: int, categories: int):
+    return [
+        {
+            "id": f"item-{n}",
+            "name": f"Dish {n}",
+            "alternateName": "Slow-braised, finished over charcoal",
+            "price": 950 + n % 2000,
+            "available": True,
+            "categories": {"elements": [{"id": f"category-{n % categories}", "name": f"Category {n % categories}",
+                                         "sortOrder": n % categories}]}
+        }
+        for n in range(items)
+    ]
+
+def churned(elements, percent: float):
+    changed = max(3, int(len(elements) * percent / 100))
+    third = changed // 3
+    elements = [dict(element) for element in elements]
+    for element in elements[:third]:
+        element["price"] += 50
+    removed = elements[third:2 * third]
+    kept = elements[:third] + elements[2 * third:]
+    new = [{**element, "id": f"new-{element['id']}", "name": f"New {element['name']}"} for element in removed]
+    return kept + new, changed
+
+def rewrite(db, elements):
+    """Replace the menu's categories and items wholesale"""
+    menu = db.query(Menu).filter(Menu.restaurant_id == RESTAURANT_ID, Menu.clover_menu_id == MERCHANT_ID).one()
+    parsed = parse_clover_items(MERCHANT_ID, elements)[0]
+    db.execute(delete(MenuItem).where(MenuItem.menu_id == menu.id))
+    db.execute(delete(MenuCategory).where(MenuCategory.menu_id == menu.id))
+    db.execute(insert(MenuCategory), [{**category, "menu_id": menu.id} for category in parsed.categories])
+    category_ids = dict(db.query(MenuCategory.clover_category_id, MenuCategory.id).filter(MenuCategory.menu_id == menu.id))
+    db.execute(insert(MenuItem), [
+        {**{key: value for key, value in item.items() if key != "category"},
+         "menu_id": menu.id, "category_id": category_ids.get(item["category"])}
+        for item in parsed.items
+    ])
+    db.commit()
+
+def diff(db, elements):
+    MenuSyncService(db).sync_clover_inventory(RESTAURANT_ID, MERCHANT_ID, elements)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark full-rewrite and diff POS menu sync")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--churn", type=float, default=1.0, help="percent of items changed between syncs")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'menu_sync.db')}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    writes = {"statements": 0, "rows": 0}
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def count_writes(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("INSERT", "UPDATE", "DELETE"):
+            writes["statements"] += 1
+            writes["rows"] += max(cursor.rowcount, 0)
+
+    original = catalog(args.items, args.categories)
+    changed, count = churned(original, args.churn)
+    print(f"{args.items} items in {args.categories} categories, {count} changed ({args.churn:g}%)")
+
+    for name, sync, before, after in (
+        ("rewrite", rewrite, original, changed),
+        ("diff", diff, original, changed),
+        ("no-op", diff, changed, changed)
+    ):
+        timings = []
+        for _ in range(args.repeat):
+            diff(db, before)
+            writes.update(statements=0, rows=0)
+            start = time.perf_counter()
+            sync(db, after)
+            timings.append(time.perf_counter() - start)
+        print(f"  {name:<8} {min(timings) * 1000:8.1f} ms  {writes['statements']:5} write statements"
+              f"  {writes['rows']:6} rows written")
@@ -0,0 +1,105 @@
+"""
+Compare the /restaurants/nearby lookup paths at franchise scale.
+
+    python benchmark_nearby.py [--sizes 10000,100000] [--queries 200] [--limit 10] [--radius 25]
+
+For each size, seeds a temporary SQLite database with that many active
+restaurants spread over the continental US and runs RestaurantService
+.find_nearest_restaurants for --queries random user locations through:
+
+  sql scan     GEO_INDEX_ENABLED=false, no radius: every row is loaded and
+               measured with Python haversine, the top --limit via a heap
+  sql bbox     GEO_INDEX_ENABLED=false with --radius: the latitude/longitude
+               bounding box is filtered in SQL first
+  kd-tree      the in-memory GeoIndex, without and with --radius
+
+Reports the index build time and the mean and p99 time per lookup, and
+checks that both paths return the same restaurants.
+"""
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Restaurant
+from app.services import restaurant_service as restaurant_service_module
+from app.services.restaurant_service import GeoIndexHolder, RestaurantService
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# Continental US
+LATITUDES = (25.0, 49.0)
+LONGITUDES = (-124.0, -67.0)
+
+def seed_restaurants(db, count: int, seed: int = 7):
+    rng = random.Random(seed)
+    rows = [
+        {
+            "name": f"Location {n}", "address": f"{n} Main St", "city": "Springfield", "state": "IL",
+            "zip_code": "62701", "phone_number": "555-010-0000", "is_active": True, "is_open": True,
+            "latitude": rng.uniform(*LATITUDES), "longitude": rng.uniform(*LONGITUDES)
+        }
+        for n in range(count)
+    ]
+    for start in range(0, count, 10000):
+        db.execute(insert(Restaurant), rows[start:start + 10000])
+    db.commit()
+
+def percentile(timings, pct: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def run(service: RestaurantService, points, limit: int, radius):
+    timings, results = [], []
+    for latitude, longitude in points:
+        start = time.perf_counter()
+        locations = service.find_nearest_restaurants(latitude, longitude, limit, radius)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append([location.id for location in locations])
+    return timings, results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark nearby-restaurant lookups with and without the spatial index")
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated restaurant counts")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--radius", type=float, default=25.0, help="miles")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    points = [(rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)) for _ in range(args.queries)]
+    configured = settings.geo_index_enabled
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'nearby.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        seed_restaurants(db, size)
+        # A fresh holder per database, so the first lookup builds the index over it
+        restaurant_service_module.geo_index_holder = GeoIndexHolder(session_factory=Session)
+        service = RestaurantService(db)
+
+        start = time.perf_counter()
+        service.get_geo_index()
+        print(f"{size} restaurants, {args.queries} lookups, limit {args.limit}; "
+              f"index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        try:
+            for radius in (None, args.radius):
+                outcomes = {}
+                for name, enabled in (("sql scan" if radius is None else "sql bbox", False), ("kd-tree", True)):
+                    settings.geo_index_enabled = enabled
+                    outcomes[name] = run(service, points, args.limit, radius)
+                (sql_name, (sql_timings, sql_results)), (_, (tree_timings, tree_results)) = outcomes.items()
+                within = "" if radius is None else f" within {radius:g} mi"
+                for name, timings in ((sql_name, sql_timings), ("kd-tree", tree_timings)):
+                    print(f"  {name:<9}{within:<14} mean {sum(timings) / len(timings):8.2f} ms"
+                          f"  p99 {percentile(timings, 99):8.2f} ms")
+                assert sql_results == tree_results, f"paths disagree{within}"
+        finally:
+            settings.geo_index_enabled = configured
+        db.close()
+        engine.dispose()
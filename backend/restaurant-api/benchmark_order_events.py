@@ -0,0 +1,172 @@
+"""
+Compare kitchen screens polling order status with screens on the SSE order feed.
+
+    python benchmark_order_events.py [--screens 500] [--orders 20] [--poll-interval 3] [--duration 10]
+
+Serves the app with uvicorn in-process (one worker, order event relay on)
+against a seeded temporary SQLite database, with --screens kitchen displays
+for restaurant 1:
+
+  poll    every screen requests /orders/restaurant/1/status/pending each
+          --poll-interval seconds for --duration seconds, as before the feed
+  push    every screen holds GET /orders/restaurant/1/events open while
+          --orders orders are placed one after another through POST /orders/
+
+Reports requests and SQL statements per second for both, and for push how
+long each order took from POST to every screen (p50/p99/max over all
+screen x order deliveries) and how many deliveries were missed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+def percentile(timings, pct: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def poll(base_url: str, headers, screens: int, interval: float, duration: float):
+    import httpx
+    timings, errors = [], []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=screens, max_keepalive_connections=screens)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        async def screen(offset: float):
+            await asyncio.sleep(offset)
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get("/orders/restaurant/1/status/pending")
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    errors.append(type(e).__name__)
+                timings.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(max(0.0, interval - (time.perf_counter() - start)))
+
+        # Spread the screens over one interval, as tablets switched on at different times would be
+        await asyncio.gather(*(screen(interval * n / screens) for n in range(screens)))
+    return timings, errors
+
+async def push(base_url: str, headers, screens: int, orders: int, order_items):
+    import httpx
+    placed = {}
+    received = [dict() for _ in range(screens)]
+    connected = 0
+    all_connected = asyncio.Event()
+    limits = httpx.Limits(max_connections=screens + 1, max_keepalive_connections=screens + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        async def screen(n: int):
+            nonlocal connected
+            async with client.stream("GET", "/orders/restaurant/1/events", headers=headers) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.startswith("retry:"):
+                        connected += 1
+                        if connected == screens:
+                            all_connected.set()
+                    elif line.startswith("data: "):
+                        received[n][json.loads(line[6:])["id"]] = time.perf_counter()
+
+        streams = [asyncio.create_task(screen(n)) for n in range(screens)]
+        await asyncio.wait_for(all_connected.wait(), timeout=60)
+
+        for _ in range(orders):
+            start = time.perf_counter()
+            response = await client.post("/orders/", json={
+                "restaurant_id": 1, "order_type": "pickup", "customer_name": "Screen test",
+                "customer_phone": "555-555-5555", "items": order_items
+            })
+            response.raise_for_status()
+            placed[response.json()["id"]] = start
+            await asyncio.sleep(0.1)
+
+        deadline = time.perf_counter() + 10
+        while time.perf_counter() < deadline and any(len(screen) < orders for screen in received):
+            await asyncio.sleep(0.05)
+        for stream in streams:
+            stream.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
+
+    latencies = [
+        (screen[order_id] - start) * 1000
+        for screen in received for order_id, start in placed.items() if order_id in screen
+    ]
+    return latencies, screens * orders - len(latencies)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark status polling against the SSE order feed")
+    parser.add_argument("--screens", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--poll-interval", type=float, default=3.0, help="seconds between polls per screen")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of polling")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/order_events.db",
+        "SMS_TRANSPORT": "fake",
+        "POS_TRANSPORT": "mock",
+        "NOTIFICATION_DISPATCHER_ENABLED": "false",
+        "ANALYTICS_ROLLUP_ENABLED": "false",
+        "POS_WEBHOOKS_ENABLED": "false",
+        "POS_SUBMISSION_ENABLED": "false"
+    })
+    import httpx
+    import uvicorn
+    from sqlalchemy import event
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.search import setup_search_indexes
+    from app.db_init import create_sample_data
+    from app.main import app
+    from app.models import MenuItem
+
+    Base.metadata.create_all(engine)
+    setup_search_indexes(engine)
+    create_sample_data()
+    db = SessionLocal()
+    order_items = [{"menu_item_id": item_id, "quantity": 1} for (item_id,) in db.query(MenuItem.id).limit(2)]
+    db.close()
+
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(*_):
+        global statements
+        statements += 1
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    token = httpx.post(f"{base_url}/auth/login", json={"username": "admin", "password": "admin123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    print(f"{args.screens} kitchen screens for one restaurant")
+    try:
+        start, statements = time.perf_counter(), 0
+        timings, errors = asyncio.run(poll(base_url, headers, args.screens, args.poll_interval, args.duration))
+        elapsed = time.perf_counter() - start
+        print(f"  poll    {len(timings) / elapsed:7.1f} req/s  {statements / elapsed:8.1f} statements/s"
+              f"  p50 {statistics.median(timings):7.1f} ms  p99 {percentile(timings, 99):7.1f} ms  errors {len(errors)}"
+              f"  (every {args.poll_interval:g} s)")
+
+        start, statements = time.perf_counter(), 0
+        latencies, missed = asyncio.run(push(base_url, headers, args.screens, args.orders, order_items))
+        elapsed = time.perf_counter() - start
+        line = f"  push    {args.orders / elapsed:7.1f} req/s  {statements / elapsed:8.1f} statements/s"
+        if latencies:
+            line += (f"  order on every screen p50 {statistics.median(latencies):7.1f} ms"
+                     f"  p99 {percentile(latencies, 99):7.1f} ms  max {max(latencies):7.1f} ms")
+        print(line + f"  missed {missed} of {args.screens * args.orders}")
+    finally:
+        server.should_exit = True
+        thread.join()
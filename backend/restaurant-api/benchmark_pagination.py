@@ -0,0 +1,95 @@
+"""
+Compare offset and keyset pagination of a restaurant's order history at page 1 and deep pages.
+
+    python benchmark_pagination.py [--orders 600000] [--page-size 100] [--deep-page 5000] [--repeat 5]
+
+Seeds a temporary SQLite database with --orders orders for one restaurant,
+a year of history, then times one GET /orders?restaurant_id=... worth of
+work through OrderService.get_orders_page:
+
+  offset    skip/limit, as before cursors: the database reads and discards
+            every row before the page
+  cursor    the X-Next-Cursor of the previous page: a seek on
+            (created_at, id) straight to the page
+
+Each is timed at page 1 and at --deep-page, and the pages are checked to
+hold the same orders.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.core.pagination import Cursor, encode_cursor
+from app.models import Order
+from app.models.order import OrderType, OrderStatus
+from app.services.order_service import OrderService
+import argparse
+import os
+import random
+import tempfile
+import timeit
+
+RESTAURANT_ID = 1
+
+def seed(db, orders: int, batch_size: int = 50000):
+    rng = random.Random(13)
+    start = datetime.utcnow() - timedelta(days=365)
+    rows = []
+    for n in range(orders):
+        total = round(rng.uniform(8, 120), 2)
+        rows.append({
+            "restaurant_id": RESTAURANT_ID, "order_number": f"ORD-{n}", "order_type": OrderType.PICKUP,
+            "status": OrderStatus.COMPLETED, "customer_name": "Guest", "customer_phone": "555-555-5555",
+            "subtotal": total, "total_amount": total,
+            "created_at": start + timedelta(seconds=rng.uniform(0, 365 * 86400))
+        })
+        if len(rows) == batch_size:
+            db.execute(insert(Order), rows)
+            rows = []
+    if rows:
+        db.execute(insert(Order), rows)
+    db.commit()
+
+def cursor_before(service: OrderService, page: int, page_size: int):
+    """The next cursor a client would hold after reading page - 1 (None for page 1)"""
+    if page == 1:
+        return None
+    previous = service.get_orders_page(RESTAURANT_ID, skip=(page - 2) * page_size, limit=page_size)
+    last = previous.items[-1]
+    return encode_cursor(Cursor(anchor_id=last.id, values=[last.created_at, last.id]))
+
+def order_ids(service: OrderService, page_size: int, skip: int = 0, cursor=None):
+    page = service.get_orders_page(RESTAURANT_ID, cursor=cursor, skip=skip, limit=page_size)
+    service.db.expunge_all()
+    return [order.id for order in page.items]
+
+def measure(func, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark offset and keyset pagination of order history")
+    parser.add_argument("--orders", type=int, default=600_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--deep-page", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    assert args.orders >= args.deep_page * args.page_size, "--orders must reach --deep-page"
+
+    path = os.path.join(tempfile.mkdtemp(), "pagination.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    print(f"Seeding {args.orders:,} orders...")
+    seed(db, args.orders)
+    service = OrderService(db)
+
+    print(f"One page of {args.page_size} orders, newest first")
+    for page in (1, args.deep_page):
+        skip = (page - 1) * args.page_size
+        cursor = cursor_before(service, page, args.page_size)
+        assert order_ids(service, args.page_size, skip=skip) == order_ids(service, args.page_size, cursor=cursor)
+        offset = measure(lambda: order_ids(service, args.page_size, skip=skip), args.repeat)
+        keyset = measure(lambda: order_ids(service, args.page_size, cursor=cursor), args.repeat)
+        print(f"  page {page:<6} offset {offset * 1000:8.2f} ms  cursor {keyset * 1000:8.2f} ms  x{offset / keyset:7.1f}")
@@ -0,0 +1,116 @@
+"""
+Compare Toast order submission with per-call requests and with the pooled async POS client.
+
+    python benchmark_pos_client.py [--calls 200] [--merchants 10] [--latency-ms 20]
+
+Serves the mock Toast/Clover API (app.services.pos_mock) with uvicorn on a
+local port, answering every request after --latency-ms, then submits --calls
+orders spread over --merchants Toast locations from concurrent async route
+handlers:
+
+  requests  the original POSService: a blocking requests.post to log in and
+            another to submit, each on a fresh connection, called straight
+            from the async handler so the calls run one after another
+  pooled    POSService on POSHttpClient: one keep-alive pool, the token
+            cached until it nears expiry, at most
+            pos_max_concurrency_per_merchant calls in flight per location
+
+Reports orders/s, p50/p99 latency from the moment all handlers started, and
+how many login and order requests reached the mock.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import threading
+import time
+
+ORDER = {"diningOption": {"guid": "takeout"}, "checks": [{"selections": [{"item": {"guid": "item-1"}, "quantity": 2}]}]}
+
+def percentile(timings, pct: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def submit_with_requests(base_url: str, merchant: str) -> str:
+    import requests
+    login = requests.post(f"{base_url}/authentication/v1/authentication/login", json={
+        "clientId": "bench", "clientSecret": "bench", "userAccessType": "TOAST_MACHINE_CLIENT"
+    })
+    token = login.json()["token"]["accessToken"]
+    response = requests.post(f"{base_url}/orders/v1/orders", json=ORDER, headers={
+        "Authorization": f"Bearer {token}", "Toast-Restaurant-External-ID": merchant
+    })
+    response.raise_for_status()
+    return response.json()["guid"]
+
+async def run_requests(base_url: str, merchants):
+    async def handler(merchant: str) -> float:
+        submit_with_requests(base_url, merchant)
+        return time.perf_counter()
+
+    start = time.perf_counter()
+    finished = await asyncio.gather(*(handler(merchant) for merchant in merchants))
+    return [(end - start) * 1000 for end in finished], time.perf_counter() - start
+
+async def run_pooled(merchants):
+    from app.services.pos_client import POSHttpClient
+    from app.services.pos_service import POSService, TOAST
+    client = POSHttpClient()
+    service = POSService(client)
+
+    async def handler(merchant: str) -> float:
+        token = await service.get_toast_access_token("bench", "bench")
+        await service.submit_order(TOAST, token, merchant, ORDER)
+        return time.perf_counter()
+
+    try:
+        start = time.perf_counter()
+        finished = await asyncio.gather(*(handler(merchant) for merchant in merchants))
+        return [(end - start) * 1000 for end in finished], time.perf_counter() - start
+    finally:
+        await client.aclose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-call requests against the pooled POS client")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--merchants", type=int, default=10)
+    parser.add_argument("--latency-ms", type=int, default=20, help="mock POS response delay")
+    args = parser.parse_args()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    os.environ.update({
+        "POS_TRANSPORT": "http",
+        "POS_MOCK_LATENCY_MS": str(args.latency_ms),
+        "TOAST_API_BASE_URL": base_url
+    })
+    import uvicorn
+    from app.core.config import settings
+    from app.services.pos_mock import mock_pos_app, mock_pos_stats
+
+    server = uvicorn.Server(uvicorn.Config(mock_pos_app, host="127.0.0.1", port=port, log_level="critical"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    merchants = [f"toast-location-{n % args.merchants}" for n in range(args.calls)]
+    print(f"{args.calls} Toast orders over {args.merchants} locations, mock POS answering in {args.latency_ms} ms, "
+          f"{settings.pos_max_concurrency_per_merchant} in flight per location")
+    try:
+        for name, run in (
+            ("requests", lambda: run_requests(base_url, merchants)),
+            ("pooled", lambda: run_pooled(merchants))
+        ):
+            mock_pos_stats.clear()
+            latencies, elapsed = asyncio.run(run())
+            print(f"  {name:<9} {args.calls / elapsed:7.1f} orders/s"
+                  f"  p50 {statistics.median(latencies):8.1f} ms  p99 {percentile(latencies, 99):8.1f} ms"
+                  f"  logins {mock_pos_stats['POST /authentication/v1/authentication/login']}"
+                  f"  order requests {mock_pos_stats['POST /orders/v1/orders']}")
+    finally:
+        server.should_exit = True
+        thread.join()
@@ -0,0 +1,120 @@
+"""
+Compare SQLite contention between order inserts and menu reads with default and tuned PRAGMAs.
+
+    python benchmark_sqlite.py [--writers 4] [--readers 8] [--duration 10]
+
+Each profile gets a fresh database file seeded with the sample data. For
+--duration seconds, --writers threads create three-line orders through
+OrderService while --readers threads build menu 1 through MenuService, each
+thread with its own session from a pool built the way the app builds it:
+
+  default   rollback journal, synchronous=FULL, SQLite's default cache and
+            no mmap (busy timeout left at the driver's 5 s)
+  tuned     apply_sqlite_pragmas: WAL, synchronous=NORMAL, mmap, a larger
+            cache, busy_timeout and foreign keys, from settings
+
+Reports orders/s and menu reads/s with p50/p99 latency, and the operations
+that failed (e.g. "database is locked").
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app import db_init
+from app.core.database import Base, apply_sqlite_pragmas, build_engine_options
+from app.core.search import setup_search_indexes
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.menu_service import MenuService
+from app.services.order_service import OrderService
+
+def default_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode = DELETE")
+        cursor.execute("PRAGMA synchronous = FULL")
+    finally:
+        cursor.close()
+
+PROFILES = {
+    "default": default_pragmas,
+    "tuned": apply_sqlite_pragmas
+}
+
+def percentile(timings, pct: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def create_order(session_factory):
+    db = session_factory()
+    try:
+        OrderService(db).create_order(OrderCreate(
+            restaurant_id=1, order_type="pickup", customer_name="Load", customer_phone="555-555-5555",
+            items=[OrderItemCreate(menu_item_id=item_id, quantity=2) for item_id in (1, 2, 3)]
+        ))
+    finally:
+        db.close()
+
+def read_menu(session_factory):
+    db = session_factory()
+    try:
+        assert MenuService(db).build_menu_snapshot(1) is not None
+    finally:
+        db.close()
+
+def run_profile(name: str, pragmas, writers: int, readers: int, duration: float):
+    url = f"sqlite:///{tempfile.mkdtemp()}/{name}.db"
+    engine = create_engine(url, **build_engine_options(url))
+    event.listen(engine, "connect", pragmas)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(engine)
+    setup_search_indexes(engine)
+    db_init.SessionLocal = session_factory
+    db_init.create_sample_data()
+
+    timings = {"orders": [], "reads": []}
+    errors = {"orders": [], "reads": []}
+    deadline = time.perf_counter() + duration
+
+    def worker(kind: str, operation):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                operation(session_factory)
+            except Exception as e:
+                errors[kind].append(str(e).splitlines()[0])
+                continue
+            timings[kind].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=worker, args=("orders", create_order)) for _ in range(writers)]
+    threads += [threading.Thread(target=worker, args=("reads", read_menu)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    line = f"  {name:<8}"
+    for kind, label in (("orders", "orders"), ("reads", "menu reads")):
+        values = timings[kind] or [float("nan")]
+        line += (f"  {len(timings[kind]) / duration:7.1f} {label}/s"
+                 f" p50 {statistics.median(values):7.1f} ms p99 {percentile(values, 99):7.1f} ms")
+    failed = errors["orders"] + errors["reads"]
+    line += f"  errors {len(failed)}"
+    if failed:
+        line += f" ({max(set(failed), key=failed.count)})"
+    print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SQLite contention with default and tuned PRAGMAs")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per profile")
+    args = parser.parse_args()
+
+    print(f"{args.writers} order writers and {args.readers} menu readers, {args.duration:g} s per profile")
+    for name, pragmas in PROFILES.items():
+        run_profile(name, pragmas, args.writers, args.readers, args.duration)
@@ -0,0 +1,87 @@
+"""
+Measure the cold-start import of the API and fail when it regresses.
+
+    python benchmark_startup.py [--runs 7] [--max-ms 1500] [--top 10]
+
+Each run imports app.main in a fresh interpreter under `-X importtime` and
+reads the module's cumulative time from the report. DATABASE_URL points at a
+path that cannot be opened, so an import that touches the database fails the
+run instead of being timed. A run also fails when any of the clients that are
+meant to load on first use (twilio, requests, httpx) were imported.
+
+Exits 1 when a run fails or the median exceeds --max-ms, so CI can run it as
+a check.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+MODULE = "app.main"
+LAZY_MODULES = ("twilio", "requests", "httpx")
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+CHILD = f"""
+import json, sys
+import {MODULE}
+print(json.dumps(sorted(name for name in {LAZY_MODULES!r} if name in sys.modules)))
+"""
+
+def import_once():
+    """Import the app in a fresh interpreter; returns (cumulative ms, per-module self ms, eagerly loaded clients)"""
+    env = dict(os.environ, DATABASE_URL="sqlite:////nonexistent/startup-benchmark/restaurant.db", PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {MODULE} failed:\n{result.stderr[-2000:]}")
+
+    total, self_times = None, {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        self_times[name] = int(self_us) / 1000
+        if name == MODULE:
+            total = int(cumulative_us) / 1000
+    return total, self_times, json.loads(result.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the cold-start import of the API")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=1500.0, help="fail when the median import exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="show the slowest modules by self time")
+    args = parser.parse_args()
+
+    timings, failures, slowest = [], [], {}
+    for run in range(args.runs):
+        try:
+            total, self_times, loaded = import_once()
+        except RuntimeError as e:
+            print(e)
+            sys.exit(1)
+        timings.append(total)
+        if loaded:
+            failures.append(f"run {run + 1}: {', '.join(loaded)} imported at startup")
+        for name, ms in self_times.items():
+            slowest.setdefault(name, []).append(ms)
+
+    median = statistics.median(timings)
+    print(f"Cold import of {MODULE}, {args.runs} runs")
+    print(f"  median {median:7.1f} ms  min {min(timings):7.1f} ms  max {max(timings):7.1f} ms  budget {args.max_ms:g} ms")
+    if args.top:
+        print(f"  slowest modules (median self time):")
+        ranked = sorted(((statistics.median(ms), name) for name, ms in slowest.items()), reverse=True)
+        for ms, name in ranked[:args.top]:
+            print(f"    {ms:7.1f} ms  {name}")
+
+    if median > args.max_ms:
+        failures.append(f"median {median:.1f} ms is over the {args.max_ms:g} ms budget")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
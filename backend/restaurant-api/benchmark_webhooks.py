@@ -0,0 +1,150 @@
+"""
+Measure POS webhook throughput: receivers storing a burst, then the consumer applying it per event and coalesced.
+
+    python benchmark_webhooks.py [--deliveries recorded.jsonl] [--events 5000] [--items 1000] [--concurrency 20]
+
+Serves the app with uvicorn in-process (one worker, background consumer
+off) against a seeded temporary SQLite database with a Toast and a Clover
+menu of --items items each. The deliveries come from --deliveries, recorded
+with `python replay_webhooks.py export`, or are generated: --events
+availability flips, nine Toast stock updates to one Clover item deletion,
+on random items.
+
+  ingest      replay_webhooks.send_deliveries posts them, signed, to
+              /pos/webhooks/{provider} with --concurrency in flight
+  per event   the consumer with pos_webhook_batch_size=1: one claim and
+              one transaction per event
+  coalesced   the consumer with the configured batch size: a batch folds
+              to its net effect, one transaction per merchant
+
+Reports events/s and the write statements the consumer issued.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+import uuid
+
+def generate_deliveries(path: str, events: int, items: int):
+    rng = random.Random(18)
+    with open(path, "w") as out:
+        for _ in range(events):
+            if rng.random() < 0.9:
+                body = {
+                    "guid": str(uuid.uuid4()), "eventCategory": "stock", "eventType": "inventory_update",
+                    "details": {"inventory": [{
+                        "guid": f"toast-item-{rng.randrange(items)}",
+                        "status": rng.choice(["IN_STOCK", "OUT_OF_STOCK"])
+                    }]}
+                }
+                delivery = {"provider": "toast", "body": body}
+            else:
+                change = {"objectId": f"I:clover-item-{rng.randrange(items)}", "type": "DELETE", "ts": time.time_ns()}
+                delivery = {"provider": "clover", "body": {"merchants": {"clover-merchant-1": [change]}}}
+            out.write(json.dumps(delivery, separators=(",", ":")) + "\n")
+
+def seed_menus(db, items: int):
+    from app.services.menu_sync_service import MenuSyncService
+    service = MenuSyncService(db)
+    service.sync_toast_menus(1, {"menus": [{"guid": "toast-menu-1", "name": "Toast menu", "menuGroups": [{
+        "guid": "toast-group-1", "name": "Mains",
+        "menuItems": [{"guid": f"toast-item-{n}", "name": f"Dish {n}", "price": 12.5} for n in range(items)]
+    }]}]})
+    service.sync_clover_inventory(1, "clover-merchant-1", [
+        {"id": f"clover-item-{n}", "name": f"Dish {n}", "price": 1250} for n in range(items)
+    ])
+
+async def drain(consumer) -> int:
+    processed = 0
+    while True:
+        claimed = await consumer.process_batch()
+        if not claimed:
+            return processed
+        processed += claimed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark POS webhook ingestion and coalesced application")
+    parser.add_argument("--deliveries", help="recorded deliveries (JSON lines); generated when omitted")
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{workdir}/webhooks.db",
+        "TOAST_WEBHOOK_SECRET": "benchmark-secret",
+        "CLOVER_WEBHOOK_AUTH_CODE": "benchmark-auth-code",
+        "SMS_TRANSPORT": "fake",
+        "POS_TRANSPORT": "mock",
+        "NOTIFICATION_DISPATCHER_ENABLED": "false",
+        "ORDER_EVENTS_ENABLED": "false",
+        "ANALYTICS_ROLLUP_ENABLED": "false",
+        "POS_WEBHOOKS_ENABLED": "false",
+        "POS_SUBMISSION_ENABLED": "false"
+    })
+    import uvicorn
+    from sqlalchemy import event
+    from app.core.config import settings
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.search import setup_search_indexes
+    from app.db_init import create_sample_data
+    from app.main import app
+    from app.models.pos_webhook import POSWebhookStatus
+    from app.services.pos_webhook_service import POSWebhookConsumer, POSWebhookService
+    from replay_webhooks import send_deliveries
+
+    Base.metadata.create_all(engine)
+    setup_search_indexes(engine)
+    create_sample_data()
+    db = SessionLocal()
+    seed_menus(db, args.items)
+    path = args.deliveries
+    if path is None:
+        path = os.path.join(workdir, "deliveries.jsonl")
+        generate_deliveries(path, args.events, args.items)
+
+    writes = {"statements": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_writes(conn, cursor, statement, *_):
+        if statement.lstrip().split(None, 1)[0].upper() in ("INSERT", "UPDATE", "DELETE"):
+            writes["statements"] += 1
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        print("ingest")
+        asyncio.run(send_deliveries(path, f"http://127.0.0.1:{port}", False, args.concurrency))
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    stored = sum(POSWebhookService(db).get_status_counts().values())
+    configured_batch_size = settings.pos_webhook_batch_size
+    try:
+        for name, batch_size in (("per event", 1), ("coalesced", configured_batch_size)):
+            POSWebhookService(db).requeue(statuses=(POSWebhookStatus.PENDING, POSWebhookStatus.PROCESSED))
+            settings.pos_webhook_batch_size = batch_size
+            consumer = POSWebhookConsumer()
+            writes["statements"] = 0
+            start = time.perf_counter()
+            processed = asyncio.run(drain(consumer))
+            elapsed = time.perf_counter() - start
+            print(f"  {name:<10} {processed / elapsed:8.0f} events/s  {elapsed:6.2f} s  "
+                  f"{writes['statements']:6} write statements  failed {consumer.stats['failed_events']}")
+    finally:
+        settings.pos_webhook_batch_size = configured_batch_size
+    assert stored == processed, (stored, processed)
@@ -0,0 +1,124 @@
+"""
+Record, replay and requeue POS webhook deliveries.
+
+    python replay_webhooks.py export deliveries.jsonl [--provider toast] [--since 2026-10-01T00:00:00]
+    python replay_webhooks.py send deliveries.jsonl --url http://localhost:8000 [--fresh-ids] [--concurrency 20]
+    python replay_webhooks.py requeue [--provider clover] [--since ...] [--include-processed]
+
+`export` writes stored inbox events as request bodies, one JSON object per
+line. `send` posts them back to the receivers, signed with
+TOAST_WEBHOOK_SECRET / CLOVER_WEBHOOK_AUTH_CODE, and reports throughput;
+--fresh-ids rewrites event ids so the deliveries are not deduplicated.
+`requeue` moves stored events back to pending without going over HTTP.
+"""
+from datetime import datetime
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.pos_webhook import POSWebhookStatus
+from app.services.pos_webhook_service import (
+    POSWebhookService,
+    sign_toast_payload,
+    TOAST_SIGNATURE_HEADER,
+    CLOVER_AUTH_HEADER
+)
+import argparse
+import asyncio
+import httpx
+import json
+import time
+import uuid
+
+def export_deliveries(path: str, provider: str = None, since: datetime = None):
+    db = SessionLocal()
+    try:
+        count = 0
+        with open(path, "w") as out:
+            for delivery in POSWebhookService(db).iter_deliveries(provider, since):
+                out.write(json.dumps(delivery, separators=(",", ":")) + "\n")
+                count += 1
+        print(f"Exported {count} deliveries to {path}")
+    finally:
+        db.close()
+
+def _request_for(delivery: dict, fresh_ids: bool):
+    body = delivery["body"]
+    if delivery["provider"] == "toast":
+        if fresh_ids:
+            body = {**body, "guid": str(uuid.uuid4())}
+        raw = json.dumps(body, separators=(",", ":")).encode()
+        headers = {TOAST_SIGNATURE_HEADER: sign_toast_payload(raw, settings.toast_webhook_secret or "")}
+    else:
+        if fresh_ids:
+            body = {
+                "merchants": {
+                    merchant_id: [{**change, "ts": time.time_ns()} for change in changes]
+                    for merchant_id, changes in body["merchants"].items()
+                }
+            }
+        raw = json.dumps(body, separators=(",", ":")).encode()
+        headers = {CLOVER_AUTH_HEADER: settings.clover_webhook_auth_code or ""}
+    headers["Content-Type"] = "application/json"
+    return f"/pos/webhooks/{delivery['provider']}", raw, headers
+
+async def send_deliveries(path: str, url: str, fresh_ids: bool, concurrency: int):
+    with open(path) as source:
+        deliveries = [json.loads(line) for line in source if line.strip()]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {"accepted": 0, "duplicates": 0, "errors": 0}
+
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        async def send(delivery: dict):
+            endpoint, raw, headers = _request_for(delivery, fresh_ids)
+            async with semaphore:
+                response = await client.post(endpoint, content=raw, headers=headers)
+            if response.status_code != 202:
+                results["errors"] += 1
+                print(f"{endpoint}: {response.status_code} {response.text}")
+                return
+            body = response.json()
+            results["accepted"] += body["accepted"]
+            results["duplicates"] += body["received"] - body["accepted"]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(delivery) for delivery in deliveries))
+        elapsed = time.perf_counter() - started
+
+    rate = len(deliveries) / elapsed if elapsed else 0
+    print(f"Sent {len(deliveries)} deliveries in {elapsed:.2f}s ({rate:.0f}/s): {results}")
+
+def requeue(provider: str = None, since: datetime = None, include_processed: bool = False):
+    statuses = (POSWebhookStatus.FAILED, POSWebhookStatus.PROCESSED) if include_processed else (POSWebhookStatus.FAILED,)
+    db = SessionLocal()
+    try:
+        print(f"Requeued {POSWebhookService(db).requeue(provider, since, statuses)} events")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record, replay and requeue POS webhook deliveries")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--provider", choices=["toast", "clover"])
+    export_parser.add_argument("--since", type=datetime.fromisoformat)
+
+    send_parser = commands.add_parser("send")
+    send_parser.add_argument("path")
+    send_parser.add_argument("--url", default="http://localhost:8000")
+    send_parser.add_argument("--fresh-ids", action="store_true")
+    send_parser.add_argument("--concurrency", type=int, default=20)
+
+    requeue_parser = commands.add_parser("requeue")
+    requeue_parser.add_argument("--provider", choices=["toast", "clover"])
+    requeue_parser.add_argument("--since", type=datetime.fromisoformat)
+    requeue_parser.add_argument("--include-processed", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        export_deliveries(args.path, args.provider, args.since)
+    elif args.command == "send":
+        asyncio.run(send_deliveries(args.path, args.url, args.fresh_ids, args.concurrency))
+    else:
+        requeue(args.provider, args.since, args.include_processed)
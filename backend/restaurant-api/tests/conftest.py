@@ -0,0 +1,64 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database before anything imports app.core.database
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ["SMS_TRANSPORT"] = "fake"
+os.environ["POS_TRANSPORT"] = "mock"
+
+from contextlib import contextmanager
+from typing import Iterator, List
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+import app.models  # noqa: F401  registers every table on Base.metadata
+from app.core.database import Base, SessionLocal, engine
+from app.core.search import setup_search_indexes
+from app.db_init import create_sample_data
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Schema, search indexes and the development sample data, once per run"""
+    Base.metadata.create_all(engine)
+    setup_search_indexes(engine)
+    create_sample_data()
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client():
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def admin_headers(client):
+    response = client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@contextmanager
+def _capture_statements() -> Iterator[List[str]]:
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def capture_statements():
+    """Context manager collecting the SQL statements the engine executes inside the block"""
+    return _capture_statements
@@ -0,0 +1,77 @@
+import uuid
+import pytest
+from app.core.security import verify_token
+from app.models.user import User, UserRole
+from app.services.auth_service import AuthService, principal_cache_key, principal_versions
+from app.services.cache_service import CacheVersionService
+
+def register(client, role: UserRole = UserRole.STAFF):
+    name = f"user-{uuid.uuid4().hex[:8]}"
+    response = client.post("/auth/register", json={
+        "email": f"{name}@restaurant.com", "username": name, "password": "secret123",
+        "full_name": name.title(), "role": role.value
+    })
+    assert response.status_code == 200, response.text
+    login = client.post("/auth/login", json={"username": name, "password": "secret123"})
+    assert login.status_code == 200, login.text
+    return response.json(), {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+@pytest.mark.parametrize("target, payload", [
+    ("admin", {"role": "manager"}),
+    ("admin", {"full_name": "Taken Over"}),
+    ("staff", {"is_active": False}),
+    ("staff", {"role": "manager"}),
+    ("self", {"role": "admin"})
+])
+def test_manager_cannot_escalate_or_deactivate(client, target, payload):
+    manager, headers = register(client, UserRole.MANAGER)
+    staff, _ = register(client)
+    user_id = {"admin": 1, "staff": staff["id"], "self": manager["id"]}[target]
+
+    response = client.put(f"/auth/users/{user_id}", json=payload, headers=headers)
+
+    assert response.status_code == 403, response.text
+
+def test_manager_can_edit_staff_profile(client):
+    _, headers = register(client, UserRole.MANAGER)
+    staff, _ = register(client)
+
+    response = client.put(f"/auth/users/{staff['id']}", json={"full_name": "Renamed"}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["full_name"] == "Renamed"
+
+def test_admin_can_promote(client, admin_headers):
+    staff, _ = register(client)
+
+    response = client.put(f"/auth/users/{staff['id']}", json={"role": "manager"}, headers=admin_headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["role"] == "manager"
+
+def test_duplicate_email_is_rejected(client, admin_headers):
+    first, _ = register(client)
+    second, _ = register(client)
+
+    response = client.put(f"/auth/users/{second['id']}", json={"email": first["email"]}, headers=admin_headers)
+
+    assert response.status_code == 400, response.text
+
+@pytest.mark.parametrize("trust_claims", [False, True])
+def test_change_from_another_worker_is_seen_after_version_ttl(client, db, monkeypatch, trust_claims):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "auth_trust_token_claims", trust_claims)
+    staff, headers = register(client)
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    # Another worker deactivates the user: only the database and the shared version move
+    db.query(User).filter(User.id == staff["id"]).update({"is_active": False})
+    CacheVersionService(db).bump_version(principal_cache_key(staff["id"]))
+    db.commit()
+    payload = verify_token(headers["Authorization"].split()[1])
+    assert AuthService(db).get_principal(payload).is_active
+
+    principal_versions.delete(staff["id"])  # principal_version_ttl elapsed
+
+    assert AuthService(db).get_principal(payload).is_active is False
+    assert client.get("/auth/me", headers=headers).status_code == 400
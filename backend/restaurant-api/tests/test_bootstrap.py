@@ -0,0 +1,47 @@
+import asyncio
+from app.models import Restaurant
+from app.services.bootstrap_service import BootstrapService, bootstrap_builds, bootstrap_cache
+
+def new_restaurant(db, name: str) -> Restaurant:
+    restaurant = Restaurant(
+        name=name, address="2 Main St", city="Springfield", state="IL", zip_code="62701", phone_number="555-010-0003"
+    )
+    db.add(restaurant)
+    db.commit()
+    return restaurant
+
+def test_linking_clover_merchant_refreshes_bootstrap(client, admin_headers, db):
+    restaurant = new_restaurant(db, "Bootstrap Linked Diner")
+    before = client.get(f"/restaurants/{restaurant.id}/bootstrap")
+    assert before.json()["restaurant"]["clover_merchant_id"] is None
+
+    response = client.post(
+        f"/pos/clover/sync-merchant/{restaurant.id}",
+        params={"merchant_id": "bootstrap-merchant", "access_token": "token"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+
+    after = client.get(f"/restaurants/{restaurant.id}/bootstrap", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.json()["restaurant"]["clover_merchant_id"] == "bootstrap-merchant"
+
+def test_concurrent_misses_share_one_build(db, monkeypatch):
+    restaurant = new_restaurant(db, "Bootstrap Burst Diner")
+    builds = []
+    build = BootstrapService.build
+
+    async def slow_build(self, restaurant_id, state):
+        builds.append(restaurant_id)
+        await asyncio.sleep(0.05)
+        return await build(self, restaurant_id, state)
+    monkeypatch.setattr(BootstrapService, "build", slow_build)
+
+    async def burst():
+        return await asyncio.gather(*(BootstrapService().get_payload(restaurant.id) for _ in range(20)))
+    bootstrap_cache.delete(restaurant.id)
+    payloads = asyncio.run(burst())
+
+    assert builds == [restaurant.id]
+    assert all(payload is payloads[0] for payload in payloads)
+    assert not bootstrap_builds
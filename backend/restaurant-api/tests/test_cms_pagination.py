@@ -0,0 +1,33 @@
+from app.core.pagination import NEXT_CURSOR_HEADER
+
+def create_gallery_image(client, admin_headers, slug: str, display_order: int) -> dict:
+    response = client.post("/cms/", json={
+        "title": slug.title(), "slug": slug, "content_type": "gallery_image", "display_order": display_order
+    }, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_display_order_cannot_be_cleared(client, admin_headers):
+    content = create_gallery_image(client, admin_headers, "ordered-image", 2)
+
+    response = client.put(f"/cms/{content['id']}", json={"display_order": None}, headers=admin_headers)
+
+    assert response.status_code == 422
+    assert client.get(f"/cms/{content['id']}", headers=admin_headers).json()["display_order"] == 2
+
+def test_cursor_walk_visits_every_row(client, admin_headers):
+    for n, display_order in enumerate([3, 0, 3, 1, 0, 2, 1]):
+        create_gallery_image(client, admin_headers, f"walked-image-{n}", display_order)
+    params = {"content_type": "gallery_image"}
+    everything = client.get("/cms/", params={**params, "limit": 100}, headers=admin_headers).json()
+
+    walked, cursor = [], None
+    while True:
+        response = client.get("/cms/", params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})},
+                              headers=admin_headers)
+        walked += [content["id"] for content in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert walked == [content["id"] for content in everything]
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+import pytest
+import app.routers.cms
+import app.services.cms_service
+
+class Clock(datetime):
+    """datetime whose utcnow the test moves by hand"""
+    now = None
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(Clock, "now", datetime(2030, 1, 1, 12, 0, 0))
+    monkeypatch.setattr(app.services.cms_service, "datetime", Clock)
+    monkeypatch.setattr(app.routers.cms, "datetime", Clock)
+    return Clock
+
+def schedule(client, admin_headers, slug: str, published_at: datetime, **fields) -> dict:
+    response = client.post("/cms/", json={
+        "title": slug.title(), "slug": slug, "content_type": "announcement", "status": "published",
+        "published_at": published_at.isoformat(), **fields
+    }, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def announced(client) -> list:
+    response = client.get("/cms/announcements")
+    assert response.status_code == 200, response.text
+    return [content["slug"] for content in response.json()]
+
+def test_scheduled_announcement_flips_at_published_at(client, admin_headers, clock):
+    start = clock.now + timedelta(hours=1)
+    content = schedule(client, admin_headers, "scheduled-sale", start,
+                       expires_at=(start + timedelta(hours=1)).isoformat())
+
+    clock.now = start - timedelta(microseconds=1)
+    assert "scheduled-sale" not in announced(client)
+    assert client.get(f"/cms/{content['id']}").status_code == 404
+    assert client.get("/cms/slug/scheduled-sale").status_code == 404
+    assert client.get(f"/cms/{content['id']}", headers=admin_headers).status_code == 200
+
+    # The view cached a moment ago is only valid until the publish time
+    clock.now = start
+    assert "scheduled-sale" in announced(client)
+    assert client.get(f"/cms/{content['id']}").status_code == 200
+    assert client.get("/cms/slug/scheduled-sale").status_code == 200
+
+    clock.now = start + timedelta(hours=1)
+    assert "scheduled-sale" not in announced(client)
+    assert client.get("/cms/slug/scheduled-sale").status_code == 404
+
+def test_republishing_keeps_the_scheduled_time(client, admin_headers, clock):
+    start = clock.now + timedelta(days=1)
+    content = schedule(client, admin_headers, "republished-notice", start)
+    assert client.put(f"/cms/{content['id']}", json={"status": "draft"}, headers=admin_headers).status_code == 200
+
+    response = client.put(f"/cms/{content['id']}", json={"status": "published"}, headers=admin_headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["published_at"].startswith(start.isoformat())
+    assert "republished-notice" not in announced(client)
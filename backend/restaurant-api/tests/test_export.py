@@ -0,0 +1,76 @@
+import gzip
+import os
+import zlib
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.services.export_service import CSV_HEADER, ExportFormat, OrderExportService
+
+# Kept small so the default run stays fast; the budget check is meant for a full-size export:
+#   EXPORT_TEST_ORDERS=1000000 pytest tests/test_export.py
+EXPORT_ORDERS = int(os.environ.get("EXPORT_TEST_ORDERS", "20000"))
+# Growth allowed over the RSS measured once the first chunk is out; at 1M orders the export is 100+ MiB
+RSS_BUDGET = 64 * 1024 * 1024
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+@pytest.fixture(scope="module")
+def export_sessions(tmp_path_factory):
+    """A separate database with EXPORT_ORDERS orders of one line each, generated in SQL"""
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('export')}/export.db")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("""
+            INSERT INTO menu_items (id, menu_id, category_id, name, price)
+            VALUES (1, 1, 1, 'Burger', 12.5)
+        """))
+        connection.execute(text("""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :orders)
+            INSERT INTO orders (id, restaurant_id, order_number, order_type, status, payment_status,
+                                customer_name, customer_phone, subtotal, tax_amount, tip_amount,
+                                total_amount, created_at)
+            SELECT i, 1 + i % 3, 'ORD-' || i, 'PICKUP', 'COMPLETED', 'COMPLETED', 'Guest', '555-555-5555',
+                   25.0, 2.0, 3.0, 30.0, datetime('2024-01-01', '+' || (i / 3) || ' seconds')
+            FROM n
+        """), {"orders": EXPORT_ORDERS})
+        connection.execute(text("""
+            INSERT INTO order_items (order_id, menu_item_id, quantity, unit_price, total_price, modifiers)
+            SELECT id, 1, 2, 12.5, 25.0, '{"size":"large"}' FROM orders
+        """))
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+@pytest.mark.parametrize("export_format", [ExportFormat.CSV, ExportFormat.NDJSON])
+def test_export_memory_stays_flat(export_sessions, export_format):
+    service = OrderExportService(session_factory=export_sessions)
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    chunks = service.stream(export_format, compress=True)
+
+    first = decompressor.decompress(next(chunks))
+    baseline = peak = current_rss()
+    newlines = first.count(b"\n")
+    exported = len(first)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        newlines += data.count(b"\n")
+        exported += len(data)
+        peak = max(peak, current_rss())
+
+    header_lines = 1 if export_format == ExportFormat.CSV else 0
+    assert newlines == EXPORT_ORDERS + header_lines
+    assert peak - baseline < RSS_BUDGET, (
+        f"RSS grew {(peak - baseline) / 2**20:.0f} MiB exporting {exported / 2**20:.0f} MiB"
+    )
+
+def test_export_filters_and_format(export_sessions):
+    service = OrderExportService(session_factory=export_sessions)
+    body = gzip.decompress(b"".join(service.stream(ExportFormat.CSV, compress=True, restaurant_id=2)))
+    lines = body.decode().splitlines()
+
+    assert lines[0].split(",") == CSV_HEADER
+    assert len(lines) - 1 == len(range(1, EXPORT_ORDERS + 1, 3))
+    assert lines[1].startswith("1,ORD-1,2,pickup,completed,completed,")
+    assert '"{""size"":""large""}"' in lines[1]
@@ -0,0 +1,51 @@
+import math
+import random
+import pytest
+from app.services.geo_index import EARTH_RADIUS_MILES, GeoIndex
+
+def haversine(lat1, lon1, lat2, lon2) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_MILES * 2 * math.asin(math.sqrt(a))
+
+def brute_force(points, latitude, longitude, k, radius=None):
+    distances = sorted((haversine(latitude, longitude, lat, lon), payload) for lat, lon, payload in points)
+    if radius is not None:
+        distances = [(distance, payload) for distance, payload in distances if distance <= radius]
+    return distances[:k]
+
+@pytest.fixture(scope="module")
+def points():
+    rng = random.Random(7)
+    return [(rng.uniform(25, 49), rng.uniform(-124, -67), n) for n in range(2000)]
+
+@pytest.fixture(scope="module")
+def index(points):
+    return GeoIndex(points)
+
+def assert_same(found, expected):
+    assert [payload for _, payload in found] == [payload for _, payload in expected]
+    assert [distance for distance, _ in found] == pytest.approx([distance for distance, _ in expected], abs=1e-6)
+
+@pytest.mark.parametrize("k, radius", [(1, None), (10, None), (50, None), (10, 50.0), (200, 100.0)])
+def test_matches_brute_force(points, index, k, radius):
+    rng = random.Random(k)
+    for _ in range(25):
+        latitude, longitude = rng.uniform(20, 52), rng.uniform(-130, -60)
+        assert_same(index.nearest(latitude, longitude, k, radius), brute_force(points, latitude, longitude, k, radius))
+
+def test_radius_with_nothing_inside_is_empty(index):
+    # Mid-Atlantic, far from every point
+    assert index.nearest(35.0, -40.0, 10, max_distance=100.0) == []
+
+def test_k_larger_than_the_index_returns_everything_in_order():
+    points = [(40.0, -75.0, "a"), (41.0, -75.0, "b"), (39.0, -80.0, "c")]
+
+    found = GeoIndex(points).nearest(40.2, -75.0, 10)
+
+    assert_same(found, brute_force(points, 40.2, -75.0, 10))
+    assert len(found) == 3
+
+def test_empty_index_and_zero_k():
+    assert GeoIndex([]).nearest(40.0, -75.0, 5) == []
+    assert GeoIndex([(40.0, -75.0, "a")]).nearest(40.0, -75.0, 0) == []
@@ -0,0 +1,96 @@
+import pytest
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Restaurant
+from app.schemas.menu import MenuCreate, MenuItemCreate, MenuItemUpdate
+from app.services.menu_service import MenuService
+from app.services.cache_service import CacheVersionService
+from app.services.search_service import MENU_SEARCH_CACHE_KEY, tags_match
+
+# (name, description, allergens, dietary_info), ranked for "truffle" from the most to the fewest weighted hits
+ITEMS = [
+    ("Truffle Truffle Tagliatelle", "Fresh pasta in truffle cream", ["gluten", "dairy"], ["vegetarian"]),
+    ("Truffle Fries", "Hand cut, with parmesan and truffle oil", ["Dairy"], ["vegetarian", "gluten-free"]),
+    ("Truffle Burger", "Dry aged beef patty", ["gluten"], []),
+    ("Wild Mushroom Soup", "Finished with shaved truffle", [], ["vegan", "vegetarian", "gluten-free"]),
+    ("Margherita Pizza", "Tomato, mozzarella and basil", ["gluten", "dairy"], ["vegetarian"])
+]
+
+@pytest.fixture(scope="module")
+def menu_restaurant():
+    db = SessionLocal()
+    try:
+        restaurant = Restaurant(
+            name="Search Trattoria", address="3 Main St", city="Springfield", state="IL",
+            zip_code="62701", phone_number="555-010-0004"
+        )
+        db.add(restaurant)
+        db.commit()
+        service = MenuService(db)
+        menu = service.create_menu(MenuCreate(name="Search menu", restaurant_id=restaurant.id))
+        ids = [
+            service.create_menu_item(MenuItemCreate(
+                menu_id=menu.id, name=name, description=description, price=12.0,
+                allergens=allergens, dietary_info=dietary
+            )).id
+            for name, description, allergens, dietary in ITEMS
+        ]
+        # Written while the configured backend was SQL, so the in-memory index is told separately
+        CacheVersionService(db).bump_version(MENU_SEARCH_CACHE_KEY)
+        db.commit()
+        return restaurant.id, menu.id, ids
+    finally:
+        db.close()
+
+@pytest.fixture(params=["sqlite", "memory"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(settings, "menu_search_backend", request.param)
+    return request.param
+
+def ranked_ids(db, restaurant_id, term, **filters):
+    return [item.id for item in MenuService(db).search_menu_items(restaurant_id, term, 20, **filters)]
+
+@pytest.mark.parametrize("term, filters, expected", [
+    ("truffle", {}, [0, 1, 2, 3]),
+    ("truf", {}, [0, 1, 2, 3]),
+    ("truf tag", {}, [0]),
+    ("mozz", {}, [4]),
+    ("truf", {"exclude_allergens": ["dairy"]}, [2, 3]),
+    ("truf", {"dietary": ["Vegetarian", "gluten-free"]}, [1, 3]),
+    ("truf", {"exclude_allergens": ["gluten"], "dietary": ["vegetarian"]}, [1, 3]),
+    ("lobster", {}, [])
+])
+def test_backends_agree_on_ranked_results(db, menu_restaurant, monkeypatch, term, filters, expected):
+    restaurant_id, _, ids = menu_restaurant
+    results = {}
+    for backend in ("sqlite", "memory"):
+        monkeypatch.setattr(settings, "menu_search_backend", backend)
+        results[backend] = ranked_ids(db, restaurant_id, term, **filters)
+
+    assert results["sqlite"] == results["memory"] == [ids[position] for position in expected]
+
+def test_index_follows_item_writes(db, menu_restaurant, backend):
+    restaurant_id, menu_id, _ = menu_restaurant
+    service = MenuService(db)
+    item = service.create_menu_item(MenuItemCreate(
+        menu_id=menu_id, name=f"Saffron Risotto {backend}", description="Carnaroli rice", price=18.0
+    ))
+    assert ranked_ids(db, restaurant_id, "saffr") == [item.id]
+
+    service.update_menu_item(item.id, MenuItemUpdate(name=f"Porcini Risotto {backend}"))
+    assert ranked_ids(db, restaurant_id, "saffr") == []
+    assert ranked_ids(db, restaurant_id, "porc") == [item.id]
+
+    service.delete_menu_item(item.id)
+    assert ranked_ids(db, restaurant_id, "porc") == []
+
+@pytest.mark.parametrize("allergens, dietary, excluded, required, expected", [
+    (["Dairy"], ["Vegetarian"], {"dairy"}, set(), False),
+    (["gluten"], ["vegetarian"], {"dairy"}, {"vegetarian"}, True),
+    (None, None, set(), set(), True),
+    (None, None, set(), {"vegan"}, False),
+    ("dairy", ["vegan"], {"dairy"}, {"vegan"}, True),
+    ([], ["vegan", "gluten-free"], set(), {"vegan", "gluten-free"}, True)
+])
+def test_tags_match(allergens, dietary, excluded, required, expected):
+    assert tags_match(allergens, dietary, excluded, required) is expected
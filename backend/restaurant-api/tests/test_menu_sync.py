@@ -0,0 +1,38 @@
+from app.models import Menu, MenuItem
+from app.services.menu_sync_service import MenuSyncService
+
+def clover_items(ids, price=950):
+    return [
+        {"id": item_id, "name": f"Dish {item_id}", "price": price, "available": True,
+         "categories": {"elements": [{"id": "mains", "name": "Mains", "sortOrder": 1}]}}
+        for item_id in ids
+    ]
+
+def menu_order(db, merchant_id):
+    menu = db.query(Menu).filter(Menu.clover_menu_id == merchant_id).one()
+    return [item_id for (item_id,) in db.query(MenuItem.clover_item_id).filter(
+        MenuItem.menu_id == menu.id, MenuItem.is_available.is_(True)
+    ).order_by(MenuItem.display_order)]
+
+def test_removing_and_inserting_items_writes_only_those_rows(db):
+    service = MenuSyncService(db)
+    ids = [f"sync-{n}" for n in range(200)]
+    service.sync_clover_inventory(1, "sync-merchant", clover_items(ids))
+
+    changed = ids[:50] + [f"sync-new-{n}" for n in range(2)] + ids[52:150] + ["sync-new-end"] + ids[150:]
+    stats = service.sync_clover_inventory(1, "sync-merchant", clover_items(changed))
+
+    assert (stats.items.inserted, stats.items.updated, stats.items.deleted) == (3, 0, 2)
+    assert stats.items.unchanged == 198
+    assert menu_order(db, "sync-merchant") == changed
+
+def test_reorder_renumbers_items(db):
+    service = MenuSyncService(db)
+    ids = [f"reorder-{n}" for n in range(5)]
+    service.sync_clover_inventory(1, "reorder-merchant", clover_items(ids))
+
+    stats = service.sync_clover_inventory(1, "reorder-merchant", clover_items(list(reversed(ids))))
+
+    # The middle item lands on the position it already had
+    assert (stats.items.updated, stats.items.unchanged) == (4, 1)
+    assert menu_order(db, "reorder-merchant") == list(reversed(ids))
@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.models.notification import NotificationOutbox, NotificationStatus
+from app.services.notification_service import NotificationDispatcher, NotificationService
+
+class RecordingSMS:
+    """An SMS service that records what it was asked to send and answers with `delivered`"""
+
+    def __init__(self, delivered: bool = True):
+        self.delivered = delivered
+        self.sent = []
+
+    def send_otp(self, phone_number, otp_code):
+        self.sent.append((phone_number, otp_code))
+        return self.delivered
+
+    def send_order_confirmation(self, phone_number, order_number, restaurant_name):
+        self.sent.append((phone_number, order_number))
+        return self.delivered
+
+    def send_order_ready_notification(self, phone_number, order_number):
+        self.sent.append((phone_number, order_number))
+        return self.delivered
+
+def queued_otp(db, phone_number: str) -> NotificationOutbox:
+    notification = NotificationService(db).enqueue_otp(phone_number, "424242")
+    db.commit()
+    return notification
+
+def dispatch(sms) -> int:
+    return asyncio.run(NotificationDispatcher(sms_service=sms).dispatch_batch())
+
+def reloaded(db, notification: NotificationOutbox) -> NotificationOutbox:
+    db.expire_all()
+    return db.get(NotificationOutbox, notification.id)
+
+def test_sent_notification_has_its_payload_cleared(db):
+    notification = queued_otp(db, "+15550100001")
+    sms = RecordingSMS()
+
+    dispatch(sms)
+
+    assert ("+15550100001", "424242") in sms.sent
+    notification = reloaded(db, notification)
+    assert notification.status == NotificationStatus.SENT
+    assert notification.sent_at is not None
+    assert notification.payload is None
+
+def test_failed_send_backs_off_exponentially(db, monkeypatch):
+    monkeypatch.setattr(settings, "notification_retry_base_seconds", 30.0)
+    notification = queued_otp(db, "+15550100002")
+    sms = RecordingSMS(delivered=False)
+
+    before = datetime.utcnow()
+    dispatch(sms)
+    first = reloaded(db, notification)
+    assert (first.status, first.attempts) == (NotificationStatus.PENDING, 1)
+    assert first.last_error == "SMS provider rejected the message"
+    assert timedelta(seconds=29) < first.next_attempt_at - before < timedelta(seconds=31)
+
+    # Not due yet: the next batch leaves it alone
+    dispatch(sms)
+    assert reloaded(db, notification).attempts == 1
+
+    first.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    before = datetime.utcnow()
+    dispatch(sms)
+    second = reloaded(db, notification)
+    assert second.attempts == 2
+    assert timedelta(seconds=59) < second.next_attempt_at - before < timedelta(seconds=61)
+
+def test_exhausted_retries_are_dead_lettered(db, monkeypatch):
+    monkeypatch.setattr(settings, "notification_retry_base_seconds", 0.0)
+    monkeypatch.setattr(settings, "notification_max_attempts", 3)
+    notification = queued_otp(db, "+15550100003")
+    sms = RecordingSMS(delivered=False)
+
+    for _ in range(4):
+        dispatch(sms)
+
+    assert sms.sent.count(("+15550100003", "424242")) == 3
+    notification = reloaded(db, notification)
+    assert (notification.status, notification.attempts) == (NotificationStatus.DEAD, 3)
+    service = NotificationService(db)
+    assert notification.id in [dead.id for dead in service.get_dead_letters()]
+
+    assert service.requeue(notification.id)
+    dispatch(RecordingSMS())
+    assert reloaded(db, notification).status == NotificationStatus.SENT
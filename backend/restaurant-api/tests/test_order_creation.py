@@ -0,0 +1,52 @@
+from app.models import Menu, MenuItem, OrderItem
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.order_service import OrderService
+
+def add_menu_items(db, count: int):
+    menu = db.query(Menu).filter(Menu.restaurant_id == 1).first()
+    items = [MenuItem(menu_id=menu.id, name=f"Catering tray {n}", price=10.0 + n, is_available=True) for n in range(count)]
+    db.add_all(items)
+    db.commit()
+    return [item.id for item in items]
+
+def order_with_lines(item_ids):
+    return OrderCreate(
+        restaurant_id=1,
+        order_type="pickup",
+        customer_name="Catering",
+        customer_phone="555-555-5555",
+        items=[OrderItemCreate(menu_item_id=item_id, quantity=2) for item_id in item_ids]
+    )
+
+def create_order_statements(db, capture_statements, item_ids):
+    with capture_statements() as statements:
+        order = OrderService(db).create_order(order_with_lines(item_ids))
+    return order, statements
+
+def test_create_order_query_count_does_not_grow_with_lines(db, capture_statements):
+    item_ids = add_menu_items(db, 15)
+
+    counts = {}
+    for lines in (1, 5, 15):
+        order, statements = create_order_statements(db, capture_statements, item_ids[:lines])
+        assert db.query(OrderItem).filter(OrderItem.order_id == order.id).count() == lines
+        counts[lines] = (
+            sum(statement.lstrip().upper().startswith("SELECT") for statement in statements),
+            len(statements)
+        )
+
+    assert counts[1] == counts[5] == counts[15], counts
+
+def test_create_order_prices_every_line_from_one_lookup(db, capture_statements):
+    item_ids = add_menu_items(db, 3)
+    prices = {item.id: item.price for item in db.query(MenuItem).filter(MenuItem.id.in_(item_ids))}
+
+    order, statements = create_order_statements(db, capture_statements, item_ids)
+
+    menu_item_selects = [s for s in statements if s.lstrip().upper().startswith("SELECT") and "FROM menu_items" in s]
+    assert len(menu_item_selects) == 1
+    subtotal = round(sum(prices[item_id] * 2 for item_id in item_ids), 2)
+    assert order.subtotal == subtotal
+    assert sorted((line.menu_item_id, line.unit_price, line.total_price) for line in order.items) == sorted(
+        (item_id, prices[item_id], prices[item_id] * 2) for item_id in item_ids
+    )
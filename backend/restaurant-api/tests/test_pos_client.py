@@ -0,0 +1,33 @@
+import asyncio
+from app.core.config import settings
+from app.services.pos_client import POSHttpClient
+
+def test_merchant_limits_cap_concurrency_and_are_dropped_when_idle(monkeypatch):
+    monkeypatch.setattr(settings, "pos_max_concurrency_per_merchant", 2)
+    client = POSHttpClient()
+    in_flight = {}
+    peak = {}
+
+    async def fake_request(method, path, **kwargs):
+        in_flight[path] = in_flight.get(path, 0) + 1
+        peak[path] = max(peak.get(path, 0), in_flight[path])
+        await asyncio.sleep(0.01)
+        in_flight[path] -= 1
+        return path
+
+    async def run():
+        client.get_client("toast", "http://toast.test").request = fake_request
+        try:
+            merchants = [f"merchant-{n}" for n in range(50)] + ["busy"] * 10
+            results = await asyncio.gather(*(
+                client.request("toast", "http://toast.test", "GET", f"/{merchant}", merchant_key=merchant)
+                for merchant in merchants
+            ))
+            assert results == [f"/{merchant}" for merchant in merchants]
+            assert len(client._merchant_limits) == 0
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    assert peak["/busy"] == 2
+    assert peak["/merchant-0"] == 1
@@ -0,0 +1,52 @@
+from app.core.database import SessionLocal
+from app.models import Order, Restaurant
+from app.models.order import OrderType
+from app.models.pos_submission import POSSubmission
+from app.services.order_service import OrderService
+from app.services.pos_submission_service import POSSubmissionDispatcher
+
+def restaurant_sharing_merchant_id(db, merchant_id: str) -> Restaurant:
+    restaurant = Restaurant(
+        name="Shared Id Diner", address="1 Main St", city="Springfield", state="IL", zip_code="62701",
+        phone_number="555-010-0002", toast_location_id=merchant_id, clover_merchant_id=merchant_id
+    )
+    db.add(restaurant)
+    db.commit()
+    return restaurant
+
+def unverified_order(db, restaurant: Restaurant, number: str) -> Order:
+    order = Order(
+        restaurant_id=restaurant.id, order_number=number, order_type=OrderType.PICKUP,
+        customer_name="Guest", customer_phone="555-555-5555", subtotal=10.0, total_amount=10.0,
+        otp_code="123456", otp_verified=False
+    )
+    db.add(order)
+    db.commit()
+    return order
+
+def test_racing_otp_verifications_queue_the_order_once(db, monkeypatch):
+    restaurant = restaurant_sharing_merchant_id(db, "otp-race")
+    order = unverified_order(db, restaurant, "ORD-OTP-RACE")
+    other = SessionLocal()
+    try:
+        # The second request read the order before the first one committed
+        second = OrderService(other)
+        stale = other.get(Order, order.id)
+        monkeypatch.setattr(second, "get_order", lambda order_id: stale)
+
+        assert OrderService(db).verify_otp(order.id, "123456")
+        assert second.verify_otp(order.id, "123456")
+    finally:
+        other.close()
+
+    providers = [provider for (provider,) in db.query(POSSubmission.provider).filter(POSSubmission.order_id == order.id)]
+    assert sorted(providers) == ["clover", "toast"]
+
+def test_merchant_allowance_is_per_provider(db):
+    restaurant = restaurant_sharing_merchant_id(db, "shared-merchant")
+    order = unverified_order(db, restaurant, "ORD-SHARED")
+    assert OrderService(db).verify_otp(order.id, "123456")
+
+    claimed = POSSubmissionDispatcher()._claim_batch(10, {("toast", "shared-merchant"): 0})
+
+    assert [submission["provider"] for submission in claimed if submission["order_id"] == order.id] == ["clover"]
@@ -0,0 +1,62 @@
+import asyncio
+from app.models import MenuItem
+from app.models.pos_webhook import POSWebhookEvent, POSWebhookStatus
+from app.services.menu_sync_service import MenuSyncService
+from app.services.order_service import OrderService
+from app.services.pos_webhook_service import POSWebhookConsumer, POSWebhookService, parse_clover_webhook
+
+class UnreachableClover:
+    """A POS service whose Clover fetches all fail, as during an outage"""
+
+    async def get_clover_access_token(self, merchant_id=None, **_):
+        return "token"
+
+    async def get_clover_object(self, access_token, merchant_id, kind, object_id):
+        return None
+
+def seed_clover_item(db, merchant_id: str) -> str:
+    item_id = f"{merchant_id}-item"
+    MenuSyncService(db).sync_clover_inventory(1, merchant_id, [{"id": item_id, "name": "Soup", "price": 800}])
+    return item_id
+
+def deliver(db, merchant_id: str, *changes) -> list:
+    events = parse_clover_webhook({"merchants": {merchant_id: [
+        {"objectId": object_id, "type": change_type, "ts": 1} for object_id, change_type in changes
+    ]}})
+    POSWebhookService(db).ingest(events)
+    return [event.event_id for event in events]
+
+def statuses(db, event_ids) -> set:
+    db.expire_all()
+    return {status for (status,) in db.query(POSWebhookEvent.status).filter(POSWebhookEvent.event_id.in_(event_ids))}
+
+def available(db, clover_item_id: str) -> bool:
+    db.expire_all()
+    return db.query(MenuItem.is_available).filter(MenuItem.clover_item_id == clover_item_id).scalar()
+
+def test_failing_merchant_does_not_hold_back_others(db):
+    healthy_item = seed_clover_item(db, "wh-healthy")
+    seed_clover_item(db, "wh-down")
+    healthy = deliver(db, "wh-healthy", (f"I:{healthy_item}", "DELETE"))
+    down = deliver(db, "wh-down", ("I:wh-down-item", "UPDATE"))
+
+    consumer = POSWebhookConsumer(pos_service=UnreachableClover())
+    assert asyncio.run(consumer.process_batch()) == 2
+
+    assert statuses(db, healthy) == {POSWebhookStatus.PROCESSED}
+    assert available(db, healthy_item) is False
+    assert statuses(db, down) == {POSWebhookStatus.PENDING}
+    assert consumer.stats["failed_events"] == 1
+
+def test_group_is_applied_in_one_transaction(db, monkeypatch):
+    item = seed_clover_item(db, "wh-atomic")
+    event_ids = deliver(db, "wh-atomic", (f"I:{item}", "DELETE"), ("O:wh-atomic-order", "DELETE"))
+
+    def fail(*_):
+        raise RuntimeError("order update failed")
+    monkeypatch.setattr(OrderService, "record_pos_statuses", fail)
+    asyncio.run(POSWebhookConsumer(pos_service=UnreachableClover()).process_batch())
+
+    # The item update written before the failure was rolled back with it
+    assert available(db, item) is True
+    assert statuses(db, event_ids) == {POSWebhookStatus.PENDING}
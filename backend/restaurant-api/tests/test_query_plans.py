@@ -0,0 +1,61 @@
+from typing import List, Tuple
+import pytest
+from sqlalchemy import event
+from app.core.database import engine
+from app.models.cms import ContentType
+from app.models.order import OrderStatus
+from app.services.cms_service import CMSService
+from app.services.menu_service import MenuService
+from app.services.order_service import OrderService
+from app.services.restaurant_service import RestaurantService
+
+def query_plans(call, table: str) -> List[List[str]]:
+    """Run `call` and return the EXPLAIN QUERY PLAN lines of each SELECT it issued against `table`"""
+    statements: List[Tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and f"FROM {table}" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert statements, f"no SELECT against {table}"
+    with engine.connect() as connection:
+        return [
+            [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            for statement, parameters in statements
+        ]
+
+CASES = [
+    ("orders by status", lambda db: OrderService(db).get_orders_by_status(1, OrderStatus.PENDING),
+     "orders", "ix_orders_restaurant_status_created"),
+    ("restaurant order page", lambda db: OrderService(db).get_orders_page(1),
+     "orders", "ix_orders_restaurant_created"),
+    ("all orders page", lambda db: OrderService(db).get_orders_page(None),
+     "orders", "ix_orders_created"),
+    ("menu items", lambda db: MenuService(db).get_menu_items(1),
+     "menu_items", "ix_menu_items_menu_available_order"),
+    ("menu categories", lambda db: MenuService(db).get_menu_categories(1),
+     "menu_categories", "ix_menu_categories_menu_active_order"),
+    ("featured items", lambda db: MenuService(db).get_featured_items(1),
+     "menu_items", "ix_menu_items_featured"),
+    ("hero banners", lambda db: CMSService(db).get_hero_banners(True),
+     "cms_content", "ix_cms_content_type_"),
+    ("published pages", lambda db: CMSService(db).get_contents_page(ContentType.PAGE, published_only=True),
+     "cms_content", "ix_cms_content_type_"),
+    ("toast location", lambda db: RestaurantService(db).get_restaurant_by_location_id(toast_location_id="loc-1"),
+     "restaurants", "ix_restaurants_toast_location_id"),
+    ("clover merchant", lambda db: RestaurantService(db).get_restaurant_by_location_id(clover_merchant_id="m-1"),
+     "restaurants", "ix_restaurants_clover_merchant_id"),
+]
+
+@pytest.mark.parametrize("call,table,index", [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+def test_hot_queries_use_their_index(db, call, table, index):
+    for plan in query_plans(lambda: call(db), table):
+        steps = [step for step in plan if f" {table} " in f" {step} "]
+        assert any(f"INDEX {index}" in step for step in steps), plan
+        assert not any(step.startswith(f"SCAN {table}") and "INDEX" not in step for step in steps), plan
@@ -0,0 +1,172 @@
+import asyncio
+import math
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import Base, engine
+from app.models.notification import NotificationKind, NotificationOutbox, NotificationStatus
+from app.models.pos_submission import POSSubmission, POSSubmissionStatus
+from app.models.pos_webhook import POSWebhookEvent, POSWebhookStatus
+from app.services.health_service import InFlightMiddleware, ReadinessService, readiness_service
+
+def probe(client):
+    start = time.perf_counter()
+    response = client.get("/readyz")
+    return response, time.perf_counter() - start
+
+def test_healthy_worker_is_ready(client):
+    response, _ = probe(client)
+
+    assert response.status_code == 200, response.json()
+    assert response.headers["cache-control"] == "no-store"
+
+def test_exhausted_pool_fails_fast(client):
+    limit = engine.pool.size() + settings.db_max_overflow
+    # Hold connections as a burst of slow requests would, leaving one for the background workers
+    held = [engine.connect() for _ in range(math.ceil(limit * settings.readiness_max_utilization))]
+    try:
+        response, elapsed = probe(client)
+    finally:
+        for connection in held:
+            connection.close()
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["database"] == {"ok": False, "skipped": "connection pool exhausted"}
+    # Answered from the pool counters, without waiting for a connection
+    assert elapsed < 0.25
+    assert probe(client)[0].status_code == 200
+
+def test_slow_database_fails_at_the_deadline(client, monkeypatch):
+    monkeypatch.setattr(settings, "readiness_db_timeout", 0.2)
+    stall = threading.Event()
+
+    def slow_database(*_):
+        if stall.is_set():
+            time.sleep(0.4)
+    event.listen(engine, "before_cursor_execute", slow_database)
+    stall.set()
+    try:
+        response, elapsed = probe(client)
+    finally:
+        stall.clear()
+        time.sleep(0.5)  # let the stalled probe finish
+        event.remove(engine, "before_cursor_execute", slow_database)
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["database"]["ok"] is False
+    assert elapsed < 0.35
+
+def test_draining_worker_is_not_ready(client):
+    client.portal.call(readiness_service.drain, 0)
+
+    response, _ = probe(client)
+
+    assert response.status_code == 503
+    assert response.json()["draining"] is True
+
+def test_sigterm_reports_not_ready_before_the_server_stops():
+    service = ReadinessService(workers={})
+    stopped = []
+    previous = signal.signal(signal.SIGTERM, lambda signum, frame: stopped.append(time.monotonic()))
+
+    async def terminate():
+        service.drain_on_signal(0.2)
+        start = time.monotonic()
+        signal.raise_signal(signal.SIGTERM)
+        await asyncio.sleep(0.05)
+        draining_before_stop = service.draining and not stopped
+        await asyncio.sleep(0.3)
+        return start, draining_before_stop
+
+    try:
+        start, draining_before_stop = asyncio.run(terminate())
+    finally:
+        service.restore_signals()
+        signal.signal(signal.SIGTERM, previous)
+
+    assert draining_before_stop
+    assert len(stopped) == 1 and stopped[0] - start >= 0.2
+
+@pytest.mark.parametrize("content_type, counted", [(b"application/json", 1), (b"text/event-stream", 0)])
+def test_event_streams_are_not_counted_in_flight(content_type, counted):
+    service = ReadinessService(workers={})
+
+    async def request():
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+            await release.wait()
+
+        async def send(message):
+            pass
+
+        task = asyncio.create_task(InFlightMiddleware(app, service)({"type": "http"}, None, send))
+        await asyncio.sleep(0.01)
+        in_flight = service.in_flight
+        release.set()
+        await task
+        return in_flight
+
+    assert asyncio.run(request()) == counted
+    assert service.in_flight == 0
+
+@pytest.fixture
+def outbox_sessions(tmp_path):
+    """A separate database, so rows left by other tests or picked up by running workers do not interfere"""
+    queue_engine = create_engine(f"sqlite:///{tmp_path}/queues.db")
+    Base.metadata.create_all(queue_engine)
+    yield queue_engine, sessionmaker(bind=queue_engine)
+    queue_engine.dispose()
+
+def test_outbox_backlog_reports_not_ready(outbox_sessions, monkeypatch):
+    queue_engine, Session = outbox_sessions
+    service = ReadinessService(engine=queue_engine, workers={}, queues={
+        "notification_outbox": (True, NotificationOutbox, NotificationStatus.PENDING),
+        "pos_submission_outbox": (False, POSSubmission, POSSubmissionStatus.PENDING)
+    })
+    service.start()
+    now = datetime.utcnow()
+    with Session() as db:
+        db.add_all([
+            # Overdue, scheduled for a retry in the future, and already sent: only the first is a backlog
+            NotificationOutbox(kind=NotificationKind.OTP, phone_number="555-555-0100", status=NotificationStatus.PENDING,
+                               next_attempt_at=now - timedelta(minutes=10)),
+            NotificationOutbox(kind=NotificationKind.OTP, phone_number="555-555-0101", status=NotificationStatus.PENDING,
+                               next_attempt_at=now + timedelta(hours=1)),
+            NotificationOutbox(kind=NotificationKind.OTP, phone_number="555-555-0102", status=NotificationStatus.SENT,
+                               next_attempt_at=now - timedelta(hours=1))
+        ])
+        db.commit()
+
+    try:
+        report = asyncio.run(service.check())
+        monkeypatch.setattr(settings, "readiness_max_queue_lag", 0)
+        unchecked = asyncio.run(service.check())
+    finally:
+        service.close()
+
+    queues = report["checks"]["queues"]
+    assert report["ready"] is False and queues["ok"] is False
+    assert list(queues["lag_seconds"]) == ["notification_outbox"]
+    assert 600 <= queues["lag_seconds"]["notification_outbox"] < 660
+    assert unchecked["ready"] is True
+
+def test_empty_outboxes_are_ready(outbox_sessions):
+    queue_engine, _ = outbox_sessions
+    service = ReadinessService(engine=queue_engine, workers={}, queues={
+        "pos_webhook_inbox": (True, POSWebhookEvent, POSWebhookStatus.PENDING)
+    })
+    service.start()
+    try:
+        report = asyncio.run(service.check())
+    finally:
+        service.close()
+
+    assert report["ready"] is True
+    assert report["checks"]["queues"]["lag_seconds"] == {"pos_webhook_inbox": 0.0}
@@ -0,0 +1,10 @@
+from datetime import datetime, timezone
+from app.core.responses import ORJSONResponse, json_dumps, json_loads
+
+def test_renders_datetimes_and_non_string_keys():
+    content = {"generated_at": datetime(2026, 10, 17, 12, 30, tzinfo=timezone.utc), "counts": {1: 2}}
+
+    body = ORJSONResponse(content).body
+
+    assert json_loads(body) == {"generated_at": "2026-10-17T12:30:00+00:00", "counts": {"1": 2}}
+    assert json_dumps(["café"]) == '["café"]'.encode()